@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+API Request Overhead Benchmark
+
+Measures the per-request cost of the request logging middleware and log
+handlers, by driving a small FastAPI app directly through ASGI (no network,
+no server):
+
+- bare:   no middleware, no logging
+- before: the BaseHTTPMiddleware LoggingMiddleware this replaced, with the
+          JSON formatter and stream/file handlers running on the event loop
+- after:  src.middleware.logging.LoggingMiddleware (pure ASGI, route
+          histograms) with the queue handler and background listener
+
+Both logging setups write to two files in a temp directory, standing in for
+the container's stdout and /app/logs/api.log.
+
+Usage:
+    python benchmarks/bench_request_overhead.py
+    python benchmarks/bench_request_overhead.py --requests 20000 --concurrency 50
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import asyncio
+import logging
+import argparse
+import statistics
+import tempfile
+import logging.handlers
+from queue import SimpleQueue
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.core.logging import JSONFormatter, NonBlockingQueueHandler
+from src.core.request_metrics import RequestMetrics
+from src.middleware.logging import LoggingMiddleware
+
+legacy_logger = logging.getLogger("autonama.middleware.legacy")
+
+
+class LegacyLoggingMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation replaced by the pure ASGI one (kept for comparison)"""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        request_id = str(uuid.uuid4())
+        request.state.request_id = request_id
+        start_time = time.time()
+        legacy_logger.info(
+            "HTTP request started",
+            extra={"extra_fields": {
+                "request_id": request_id,
+                "method": request.method,
+                "url": str(request.url),
+                "endpoint": request.url.path,
+                "client_ip": request.client.host if request.client else None,
+                "user_agent": request.headers.get("user-agent")
+            }}
+        )
+        response = await call_next(request)
+        duration = (time.time() - start_time) * 1000
+        legacy_logger.info(
+            "HTTP request completed",
+            extra={"extra_fields": {
+                "request_id": request_id,
+                "method": request.method,
+                "endpoint": request.url.path,
+                "status_code": response.status_code,
+                "duration_ms": round(duration, 2)
+            }}
+        )
+        return response
+
+
+def build_app(middleware=None) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def read_item(item_id: str):
+        return {"item_id": item_id, "price": 43250.5, "signal": "BUY"}
+
+    if middleware is not None:
+        app.add_middleware(middleware)
+    return app
+
+
+def file_handlers(log_dir: str) -> List[logging.Handler]:
+    handlers = []
+    for name in ("stdout.log", "api.log"):
+        handler = logging.FileHandler(os.path.join(log_dir, name))
+        handler.setFormatter(JSONFormatter())
+        handlers.append(handler)
+    return handlers
+
+
+def configure_logging(mode: str, log_dir: str):
+    """Root logger setup per variant; returns the queue listener, if any"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.setLevel(logging.INFO)
+    if mode == "bare":
+        root.setLevel(logging.WARNING)
+        return None
+    handlers = file_handlers(log_dir)
+    if mode == "before":
+        for handler in handlers:
+            root.addHandler(handler)
+        return None
+    log_queue = SimpleQueue()
+    root.addHandler(NonBlockingQueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers)
+    listener.start()
+    return listener
+
+
+async def call(app, path: str) -> int:
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "root_path": "", "query_string": b"", "headers": [(b"host", b"bench"), (b"user-agent", b"bench")],
+        "client": ("127.0.0.1", 50000), "server": ("bench", 80),
+    }
+    status = 0
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run_load(app, n_requests: int, concurrency: int) -> List[float]:
+    """Per-batch latency per request, in microseconds"""
+    samples = []
+    for start in range(0, n_requests, concurrency):
+        batch = min(concurrency, n_requests - start)
+        t0 = time.perf_counter()
+        statuses = await asyncio.gather(*(call(app, f"/items/{start + i}") for i in range(batch)))
+        samples.append((time.perf_counter() - t0) / batch * 1e6)
+        if statuses[0] != 200:
+            raise RuntimeError(f"unexpected status {statuses[0]}")
+    return samples
+
+
+def bench(mode: str, n_requests: int, concurrency: int, repeat: int, log_dir: str) -> Dict:
+    middleware = {"bare": None, "before": LegacyLoggingMiddleware, "after": LoggingMiddleware}[mode]
+    listener = configure_logging(mode, log_dir)
+    app = build_app(middleware)
+    asyncio.run(run_load(app, min(500, n_requests), concurrency))  # warm-up
+
+    per_run = []
+    for _ in range(repeat):
+        samples = asyncio.run(run_load(app, n_requests, concurrency))
+        per_run.append(statistics.median(samples))
+    loop_us = statistics.median(per_run)
+
+    drain_s = 0.0
+    if listener is not None:
+        t0 = time.perf_counter()
+        listener.stop()
+        drain_s = time.perf_counter() - t0
+    return {"mode": mode, "us_per_request": round(loop_us, 2), "listener_drain_s": round(drain_s, 3)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API request overhead benchmark")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        results = [bench(mode, args.requests, args.concurrency, args.repeat, log_dir)
+                   for mode in ("bare", "before", "after")]
+
+    bare = results[0]["us_per_request"]
+    print(f"{'mode':<8} {'us/request':>11} {'overhead us':>12} {'drain s':>8}")
+    for r in results:
+        r["overhead_us"] = round(r["us_per_request"] - bare, 2)
+        print(f"{r['mode']:<8} {r['us_per_request']:>11.1f} {r['overhead_us']:>12.1f} {r['listener_drain_s']:>8.3f}")
+    before, after = results[1]["overhead_us"], results[2]["overhead_us"]
+    if after > 0:
+        print(f"\nmiddleware + logging overhead: {before / after:.1f}x lower after")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"requests": args.requests, "concurrency": args.concurrency, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 import uvicorn
@@ -6,10 +7,13 @@ from contextlib import asynccontextmanager
 
 from src.core.config import settings
 from src.core.database import init_db
-from src.core.logging import setup_logging, get_logger
+from src.core.logging import setup_logging, stop_logging, get_logger
+from src.core.request_metrics import request_metrics
 from src.middleware.logging import LoggingMiddleware
 from src.api.v1.api import api_router
 from src.core.database import SessionLocal
+from src.core import passwords
+from src.core.auth_cache import auth_cache
 from src.models.asset_models import User
 
 # Setup logging first
@@ -35,7 +39,7 @@ async def lifespan(app: FastAPI):
                         admin = User(
                             username=settings.DEFAULT_ADMIN_USERNAME,
                             email=(settings.DEFAULT_ADMIN_EMAIL or f"{settings.DEFAULT_ADMIN_USERNAME}@example.com"),
-                            password=settings.DEFAULT_ADMIN_PASSWORD,
+                            password=await passwords.hash_password(settings.DEFAULT_ADMIN_PASSWORD),
                             is_admin=True,
                             has_access=True,
                         )
@@ -46,6 +50,8 @@ async def lifespan(app: FastAPI):
                     db.close()
         except Exception as se:
             logger.error(f"Failed to seed default admin: {se}")
+
+        auth_cache.start()
         
         # Start WebSocket broadcasting service
         # from src.services.websocket_broadcaster import start_websocket_broadcasting
@@ -64,12 +70,15 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("Shutting down Autonama API...", extra={"extra_fields": {"event": "shutdown"}})
     try:
+        from src.services.optimization_service import optimization_service
+        optimization_service.shutdown()
+        auth_cache.shutdown()
         # from src.services.websocket_broadcaster import stop_websocket_broadcasting
         # await stop_websocket_broadcasting()
         # logger.info("WebSocket broadcasting service stopped", extra={"extra_fields": {"event": "websocket_shutdown"}})
-        pass
     except Exception as e:
         logger.error(f"Error during shutdown: {str(e)}", extra={"extra_fields": {"event": "shutdown_error"}})
+    stop_logging()
 
 
 app = FastAPI(
@@ -110,6 +119,14 @@ async def health_check():
     return {"status": "healthy", "version": "1.0.0"}
 
 
+@app.get("/metrics")
+async def metrics(format: str = "prometheus"):
+    """Request rate and latency percentiles per route (Prometheus text, or ?format=json)"""
+    if format == "json":
+        return request_metrics.summary()
+    return PlainTextResponse(request_metrics.to_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     logger.info("Starting Autonama API server", extra={"extra_fields": {"host": "0.0.0.0", "port": 8000}})
     uvicorn.run(
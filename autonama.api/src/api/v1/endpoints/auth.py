@@ -8,10 +8,13 @@ from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
+import time
 import jwt
 import logging
 
-from src.core.database import get_db
+from src.core import passwords
+from src.core.auth_cache import Principal, UserRecord, auth_cache
+from src.core.database import get_db, SessionLocal
 from src.models.asset_models import User, Alert
 
 logger = logging.getLogger(__name__)
@@ -66,22 +69,31 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 30
 
 def create_access_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"iat": now, "exp": expire})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
-def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
+def token_claims(user) -> dict:
+    """Claims that let requests authorize without loading the user (see src.core.auth_cache)."""
+    return {
+        "sub": user.username,
+        "uid": user.id,
+        "role": "admin" if getattr(user, "is_admin", False) else "user",
+        "access": bool(getattr(user, "has_access", False)),
+    }
+
+def decode_token(token: str) -> dict:
     try:
-        payload = jwt.decode(credentials.credentials, SECRET_KEY, algorithms=[ALGORITHM])
-        username: str = payload.get("sub")
-        if username is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        if payload.get("sub") is None:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return username
+        return payload
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -95,31 +107,73 @@ def verify_token(credentials: HTTPAuthorizationCredentials = Depends(security)):
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-def verify_admin(
-    username: str = Depends(verify_token),
-    db: Session = Depends(get_db),
-):
+def load_user_record(username: str) -> Optional[UserRecord]:
+    db = SessionLocal()
     try:
         user = db.query(User).filter(User.username == username).first()
-        if not user:
+        return UserRecord.from_user(user) if user else None
+    finally:
+        db.close()
+
+def current_principal(credentials: HTTPAuthorizationCredentials = Depends(security)) -> Principal:
+    """
+    The authenticated user's id, role and access.
+
+    Served from the auth cache for tokens seen before, from the token's own
+    claims for new tokens, and from the database only for tokens without
+    claims or whose claims a role/access change has made stale.
+    """
+    token = credentials.credentials
+    principal = auth_cache.principal(token)
+    if principal is not None:
+        return principal
+
+    claims = decode_token(token)
+    principal = auth_cache.principal_from_claims(claims)
+    if principal is None:
+        as_of = time.time()
+        try:
+            record = auth_cache.user(claims["sub"], load_user_record)
+        except Exception as e:
+            logger.error(f"User lookup error: {e}")
             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found",
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Authentication failed"
             )
-        if not getattr(user, "is_admin", False):
+        if not record:
             raise HTTPException(
-                status_code=status.HTTP_403_FORBIDDEN,
-                detail="Admin privileges required",
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
             )
-        return user
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Admin verification error: {e}")
+        principal = Principal(
+            username=record.username,
+            user_id=record.id,
+            is_admin=record.is_admin,
+            has_access=record.has_access,
+            as_of=as_of,
+            expires_at=float(claims["exp"]),
+        )
+    auth_cache.remember(token, principal)
+    return principal
+
+def verify_token(principal: Principal = Depends(current_principal)) -> str:
+    return principal.username
+
+def require_access(principal: Principal = Depends(current_principal)) -> Principal:
+    if not principal.has_access:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Admin verification failed"
+            status_code=status.HTTP_402_PAYMENT_REQUIRED,
+            detail="Active subscription required"
         )
+    return principal
+
+def verify_admin(principal: Principal = Depends(current_principal)) -> Principal:
+    if not principal.is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return principal
 
 @router.post("/register", response_model=UserResponse)
 async def register(user: UserCreate, db: Session = Depends(get_db)):
@@ -136,11 +190,10 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
                 detail="Username or email already registered"
             )
         
-        # Create new user (in production, hash the password)
         db_user = User(
             username=user.username,
             email=user.email,
-            password=user.password  # Should be hashed in production
+            password=await passwords.hash_password(user.password)
         )
         
         db.add(db_user)
@@ -156,6 +209,8 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
             is_admin=getattr(db_user, "is_admin", False),
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Registration error: {e}")
         raise HTTPException(
@@ -170,14 +225,22 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         # Find user
         user = db.query(User).filter(User.username == user_credentials.username).first()
         
-        if not user or user.password != user_credentials.password:  # Should verify hashed password
+        matches, new_hash = (False, None)
+        if user:
+            matches, new_hash = await passwords.verify_password(user_credentials.password, user.password)
+        if not matches:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect username or password"
             )
+        if new_hash:
+            # Plaintext or outdated hash: store the current one
+            user.password = new_hash
+            db.commit()
+            db.refresh(user)
         
         # Create access token
-        access_token = create_access_token(data={"sub": user.username})
+        access_token = create_access_token(data=token_claims(user))
         
         return {
             "access_token": access_token,
@@ -202,21 +265,16 @@ async def login(user_credentials: UserLogin, db: Session = Depends(get_db)):
         )
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user(username: str = Depends(verify_token), db: Session = Depends(get_db)):
+def get_current_user(principal: Principal = Depends(require_access)):
     """Get current user information"""
     try:
-        user = db.query(User).filter(User.username == username).first()
+        user = auth_cache.user(principal.username, load_user_record)
         
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User not found"
             )
-        if not user.has_access:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="Active subscription required"
-            )
         
         return UserResponse(
             id=user.id,
@@ -224,7 +282,7 @@ async def get_current_user(username: str = Depends(verify_token), db: Session =
             email=user.email,
             created_at=user.created_at,
             has_access=user.has_access,
-            is_admin=getattr(user, "is_admin", False),
+            is_admin=user.is_admin,
         )
     except HTTPException:
         raise
@@ -256,6 +314,7 @@ async def grant_access(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         user.has_access = True
         db.commit()
+        auth_cache.invalidate(username)
         return {"message": "Access granted", "username": username}
     except HTTPException:
         raise
@@ -284,6 +343,7 @@ async def revoke_access(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
         user.has_access = False
         db.commit()
+        auth_cache.invalidate(username)
         return {"message": "Access revoked", "username": username}
     except HTTPException:
         raise
@@ -311,6 +371,7 @@ async def make_admin(
         user.is_admin = True
         user.has_access = True
         db.commit()
+        auth_cache.invalidate(username)
         return {"message": "User promoted to admin", "username": username}
     except HTTPException:
         raise
@@ -328,7 +389,7 @@ class UserAdminListItem(BaseModel):
 
 @router.get("/admin/users", response_model=List[UserAdminListItem])
 async def admin_list_users(
-    _: User = Depends(verify_admin),
+    _: Principal = Depends(verify_admin),
     db: Session = Depends(get_db),
 ):
     users = db.query(User).all()
@@ -347,7 +408,7 @@ async def admin_list_users(
 @router.post("/admin/users/{username}/grant")
 async def admin_grant_user_access(
     username: str,
-    _: User = Depends(verify_admin),
+    _: Principal = Depends(verify_admin),
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.username == username).first()
@@ -355,12 +416,13 @@ async def admin_grant_user_access(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     user.has_access = True
     db.commit()
+    auth_cache.invalidate(username)
     return {"message": "Access granted", "username": username}
 
 @router.post("/admin/users/{username}/revoke")
 async def admin_revoke_user_access(
     username: str,
-    _: User = Depends(verify_admin),
+    _: Principal = Depends(verify_admin),
     db: Session = Depends(get_db),
 ):
     user = db.query(User).filter(User.username == username).first()
@@ -368,30 +430,18 @@ async def admin_revoke_user_access(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
     user.has_access = False
     db.commit()
+    auth_cache.invalidate(username)
     return {"message": "Access revoked", "username": username}
 
 # Alert endpoints
 @router.post("/alerts", response_model=AlertResponse)
 async def create_alert(
     alert: AlertCreate,
-    username: str = Depends(verify_token),
+    user: Principal = Depends(require_access),
     db: Session = Depends(get_db)
 ):
     """Create a new price alert"""
     try:
-        user = db.query(User).filter(User.username == username).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        if not user.has_access:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="Active subscription required"
-            )
-        
         # Validate condition
         valid_conditions = ["above", "below", "crosses_above", "crosses_below"]
         if alert.condition not in valid_conditions:
@@ -402,7 +452,7 @@ async def create_alert(
         
         # Create alert
         db_alert = Alert(
-            user_id=user.id,
+            user_id=user.user_id,
             symbol=alert.symbol,
             condition=alert.condition,
             price=alert.price,
@@ -437,25 +487,12 @@ async def create_alert(
 
 @router.get("/alerts", response_model=List[AlertResponse])
 async def get_alerts(
-    username: str = Depends(verify_token),
+    user: Principal = Depends(require_access),
     db: Session = Depends(get_db)
 ):
     """Get all alerts for the current user"""
     try:
-        user = db.query(User).filter(User.username == username).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        if not user.has_access:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="Active subscription required"
-            )
-        
-        alerts = db.query(Alert).filter(Alert.user_id == user.id).all()
+        alerts = db.query(Alert).filter(Alert.user_id == user.user_id).all()
         
         return [
             AlertResponse(
@@ -485,28 +522,15 @@ async def get_alerts(
 async def update_alert(
     alert_id: int,
     alert_update: AlertUpdate,
-    username: str = Depends(verify_token),
+    user: Principal = Depends(require_access),
     db: Session = Depends(get_db)
 ):
     """Update an existing alert"""
     try:
-        user = db.query(User).filter(User.username == username).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        if not user.has_access:
-            raise HTTPException(
-                status_code=status.HTTP_402_PAYMENT_REQUIRED,
-                detail="Active subscription required"
-            )
-        
         # Get alert and verify ownership
         alert = db.query(Alert).filter(
             Alert.id == alert_id,
-            Alert.user_id == user.id
+            Alert.user_id == user.user_id
         ).first()
         
         if not alert:
@@ -550,23 +574,15 @@ async def update_alert(
 @router.delete("/alerts/{alert_id}")
 async def delete_alert(
     alert_id: int,
-    username: str = Depends(verify_token),
+    user: Principal = Depends(current_principal),
     db: Session = Depends(get_db)
 ):
     """Delete an alert"""
     try:
-        user = db.query(User).filter(User.username == username).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
         # Get alert and verify ownership
         alert = db.query(Alert).filter(
             Alert.id == alert_id,
-            Alert.user_id == user.id
+            Alert.user_id == user.user_id
         ).first()
         
         if not alert:
@@ -591,22 +607,14 @@ async def delete_alert(
 
 @router.get("/alerts/check")
 async def check_alerts(
-    username: str = Depends(verify_token),
+    user: Principal = Depends(current_principal),
     db: Session = Depends(get_db)
 ):
     """Check for triggered alerts (for background processing)"""
     try:
-        user = db.query(User).filter(User.username == username).first()
-        
-        if not user:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="User not found"
-            )
-        
         # Get active alerts
         active_alerts = db.query(Alert).filter(
-            Alert.user_id == user.id,
+            Alert.user_id == user.user_id,
             Alert.enabled == True,
             Alert.triggered == False
         ).all()
@@ -10,6 +10,10 @@ Available endpoints:
 - GET /v1/autonama/optimize/history - Get optimization history
 - GET /v1/autonama/optimize/parameters - Get available parameters
 - GET /v1/autonama/optimize/health - Health check
+
+Optimizations run as jobs on the Redis Streams job queue (see
+src.services.queue_service): single-asset jobs on the interactive lane,
+multi-asset runs on the batch lane, executed by src.services.job_worker.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -20,7 +24,6 @@ from pydantic import BaseModel, Field
 import logging
 
 from src.core.database import get_db
-import uuid
 from src.services.queue_service import queue_service
 
 # Configure logging
@@ -62,14 +65,15 @@ async def trigger_autonama_optimization(
     try:
         logger.info(f"Triggering Autonama optimization with parameters: {request.dict()}")
         
-        # Generate mock task ID
-        import uuid
-        task_id = str(uuid.uuid4())
+        task_id = queue_service.submit_optimization_job(
+            job_type="multi_asset_optimization",
+            parameters=request.dict()
+        )
         
         return OptimizationResponse(
             task_id=task_id,
-            status="started",
-            message=f"Autonama optimization started for {request.n_assets} assets with {request.n_trials} trials each",
+            status="pending",
+            message=f"Autonama optimization queued for {request.n_assets} assets with {request.n_trials} trials each",
             parameters=request.dict()
         )
         
@@ -99,8 +103,8 @@ async def trigger_single_optimization(
         
         return OptimizationResponse(
             task_id=task_id,
-            status="started",
-            message=f"Autonama optimization started for {request.symbol}",
+            status="pending",
+            message=f"Autonama optimization queued for {request.symbol}",
             parameters=request.dict()
         )
         
@@ -129,6 +133,8 @@ async def get_optimization_status(task_id: str):
             # Job not found
             raise HTTPException(status_code=404, detail=f"Optimization task {task_id} not found")
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get optimization status: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -141,7 +147,7 @@ async def get_optimization_history(
     db: Session = Depends(get_db)
 ):
     """
-    Get optimization history from the database
+    Get finished optimization jobs from the job queue history
     
     Args:
         symbol: Optional symbol filter
@@ -152,84 +158,21 @@ async def get_optimization_history(
         List of optimization results
     """
     try:
-        # Mock optimization history for now
-        mock_history = [
-            {
-                "id": "1",
-                "task_id": "task_001",
-                "symbol": "BTC/USDT",
-                "category": "crypto",
-                "strategy": "polynomial_regression",
-                "status": "completed",
-                "created_at": "2025-07-29T10:00:00Z",
-                "completed_at": "2025-07-29T10:05:00Z",
-                "parameters": {
-                    "n_trials": 10,
-                    "n_cores": 4,
-                    "days_back": 365
-                },
-                "results": {
-                    "confidence": 0.85,
-                    "signal": "buy",
-                    "target_price": 45000,
-                    "stop_loss": 42000
-                }
-            },
-            {
-                "id": "2",
-                "task_id": "task_002",
-                "symbol": "ETH/USDT",
-                "category": "crypto",
-                "strategy": "polynomial_regression",
-                "status": "running",
-                "created_at": "2025-07-29T11:00:00Z",
-                "parameters": {
-                    "n_trials": 15,
-                    "n_cores": 4,
-                    "days_back": 365
-                }
-            },
-            {
-                "id": "3",
-                "task_id": "task_003",
-                "symbol": "AAPL",
-                "category": "stock",
-                "strategy": "polynomial_regression",
-                "status": "completed",
-                "created_at": "2025-07-29T09:00:00Z",
-                "completed_at": "2025-07-29T09:03:00Z",
-                "parameters": {
-                    "n_trials": 8,
-                    "n_cores": 2,
-                    "days_back": 365
-                },
-                "results": {
-                    "confidence": 0.72,
-                    "signal": "hold",
-                    "target_price": 180,
-                    "stop_loss": 170
-                }
-            }
-        ]
+        history = queue_service.get_job_history(limit=200 if symbol or category else limit)
         
         # Apply filters if provided
         if symbol or category:
-            filtered_history = []
-            for job in mock_history:
-                if symbol and job.get('symbol') != symbol:
-                    continue
-                if category and job.get('category') != category:
-                    continue
-                filtered_history.append(job)
-            mock_history = filtered_history
+            history = [
+                job for job in history
+                if (not symbol or job['parameters'].get('symbol') == symbol)
+                and (not category or job['parameters'].get('category') == category)
+            ]
         
-        # Apply limit
-        if limit:
-            mock_history = mock_history[:limit]
+        history = history[:limit]
         
         return {
-            "total_results": len(mock_history),
-            "history": mock_history
+            "total_results": len(history),
+            "history": history
         }
         
     except Exception as e:
@@ -319,6 +262,7 @@ async def optimization_health_check():
                 "celery_tasks": "operational",
                 "database": "operational"
             },
+            "queues": queue_service.get_queue_stats(),
             "message": "Autonama optimization system is ready"
         }
         
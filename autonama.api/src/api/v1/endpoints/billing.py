@@ -9,6 +9,7 @@ from datetime import datetime
 import logging
 
 from src.core.config import settings
+from src.core.auth_cache import auth_cache
 from src.core.database import get_db
 from src.models.asset_models import User
 
@@ -94,6 +95,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 user.stripe_current_period_end = datetime.utcfromtimestamp(current_period_end) if current_period_end else None
                 user.has_access = status_value in ("active", "trialing")
                 db.commit()
+                auth_cache.invalidate(user.username)
 
         if event["type"] in ("customer.subscription.deleted", "invoice.payment_failed"):
             data_object = event["data"]["object"]
@@ -103,6 +105,7 @@ async def stripe_webhook(request: Request, db: Session = Depends(get_db)):
                 user.stripe_subscription_status = "canceled"
                 user.has_access = False
                 db.commit()
+                auth_cache.invalidate(user.username)
 
         return {"received": True}
     except Exception as e:
@@ -9,16 +9,22 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
+from dataclasses import asdict
 from pydantic import BaseModel
 import logging
 import pandas as pd
-from sqlalchemy import text
+from sqlalchemy import bindparam, text
 
-from src.core.database import get_db
+from src.core.database import get_db, engine, redis_client
+from src.core import volume_profile
+from src.core.trading_universe import UniverseClient, UniverseStore
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Read-only: the data service's binance_asset_loader publishes the snapshots
+universe = UniverseClient(UniverseStore(redis_client, engine))
+
 # Pydantic models
 class AssetSummary(BaseModel):
     symbol: str
@@ -151,6 +157,23 @@ async def get_assets_count(
         logger.error(f"Error counting assets: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to count assets: {str(e)}")
 
+@router.get("/universe")
+async def get_universe(
+    limit: int = Query(default=100, ge=1, le=500, description="Number of ranked pairs to return")
+):
+    """Current trading universe: top Binance USDT pairs by 24h quote volume"""
+    snapshot = universe.snapshot()
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="Trading universe has not been published yet")
+    return {
+        "version": snapshot.version,
+        "updated_at": datetime.utcfromtimestamp(snapshot.version).isoformat(),
+        "exchange": snapshot.exchange,
+        "quote": snapshot.quote,
+        "total": len(snapshot.assets),
+        "assets": [asdict(asset) for asset in snapshot.assets[:limit]]
+    }
+
 @router.get("/assets/{symbol}", response_model=AssetSummary)
 async def get_asset_by_symbol(symbol: str, db: Session = Depends(get_db)):
     """Get asset by symbol"""
@@ -560,6 +583,56 @@ async def get_historical_data(symbol: str, days: int = Query(default=30, le=365,
         logger.error(f"Error fetching historical data for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch historical data: {str(e)}")
 
+@router.get("/volume-profile")
+async def get_volume_profiles(
+    symbols: List[str] = Query(..., description="Symbols to profile (repeat the parameter for several)"),
+    days: int = Query(default=30, ge=1, le=365, description="Number of days of candles"),
+    bins: int = Query(default=24, ge=2, le=500, description="Price bins per symbol"),
+    timeframe: str = Query(default='1d', description="Candle timeframe"),
+    mode: str = Query(default='range', description="'range' spreads volume over high-low, 'close' puts it at the close"),
+    db: Session = Depends(get_db)
+):
+    """Volume profile (volume per price bin) of one or more assets, computed in one pass"""
+    if mode not in volume_profile.MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {list(volume_profile.MODES)}")
+    try:
+        query = text("""
+            SELECT symbol, high, low, close, volume
+            FROM trading.ohlc_data
+            WHERE symbol IN :symbols
+            AND timeframe = :timeframe
+            AND timestamp >= :since
+        """).bindparams(bindparam('symbols', expanding=True))
+        rows = db.execute(query, {
+            "symbols": symbols,
+            "timeframe": timeframe,
+            "since": datetime.utcnow() - timedelta(days=days)
+        }).fetchall()
+        
+        if not rows:
+            raise HTTPException(status_code=404, detail="No candles found for the requested symbols")
+        
+        df = pd.DataFrame(rows, columns=['symbol', 'high', 'low', 'close', 'volume'])
+        profiles = volume_profile.symbol_profiles(df, bins=bins, mode=mode)
+        
+        return {
+            "timeframe": timeframe,
+            "days": days,
+            "bins": bins,
+            "mode": mode,
+            "profiles": {
+                symbol: volume_profile.profile_to_dict(result['edges'], result['volume'])
+                for symbol, result in profiles.items()
+            },
+            "missing": [symbol for symbol in symbols if symbol not in profiles]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error building volume profiles for {symbols}: {e}")
+        raise HTTPException(status_code=500, detail=f"Failed to build volume profile: {str(e)}")
+
 @router.get("/analytics-dashboard")
 async def get_analytics_dashboard(db: Session = Depends(get_db)):
     """Get comprehensive analytics dashboard data"""
@@ -2,19 +2,25 @@
 Optimization API Endpoints
 
 This module provides FastAPI endpoints for strategy optimization and signal generation.
+
+Optimizations run through src.services.optimization_service: results are
+cached per symbol, timeframe, data version and search space, concurrent
+requests for the same key share one computation, and progress is streamed on
+/ws/optimization.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query
 from typing import List, Optional, Dict, Any
 from datetime import datetime
 from pydantic import BaseModel, Field
+import asyncio
 import logging
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
 
-from src.core.database import get_db
+from src.core import channel_kernel
+from src.core.channel_optimizer import SearchSpace
+from src.services.optimization_service import optimization_service
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -25,7 +31,18 @@ class OptimizationRequest(BaseModel):
     strategy: str = Field(default="polynomial_regression", description="Strategy type")
     timeframe: str = Field(default="1h", description="Timeframe for analysis")
     lookback_days: int = Field(default=365, description="Days to look back")
-    optimization_trials: int = Field(default=10, description="Number of optimization trials")
+    optimization_trials: int = Field(default=10, ge=1, le=500, description="Number of optimization trials")
+    degree_range: List[int] = Field(default=[2, 5], min_length=2, max_length=2, description="Polynomial degree range")
+    kstd_range: List[float] = Field(default=[1.5, 3.0], min_length=2, max_length=2, description="Band width range")
+    lookback_range: List[int] = Field(default=[50, 350], min_length=2, max_length=2, description="Lookback range (candles)")
+
+    def search_space(self) -> SearchSpace:
+        return SearchSpace(
+            degree_range=tuple(self.degree_range),
+            kstd_range=tuple(self.kstd_range),
+            lookback_range=tuple(self.lookback_range),
+            n_trials=self.optimization_trials,
+        )
 
 class OptimizationResult(BaseModel):
     symbol: str
@@ -64,28 +81,11 @@ def calculate_polynomial_regression(data: pd.Series, degree: int = 4, kstd: floa
     Returns:
         Tuple of (regression_line, upper_band, lower_band) or (None, None, None) on error
     """
-    try:
-        if len(data) < degree + 1:
-            return None, None, None
-            
-        X = np.arange(len(data))
-        y = data.values
-        
-        # Fit polynomial
-        coefficients = np.polyfit(X, y, degree)
-        polynomial = np.poly1d(coefficients)
-        regression_line = polynomial(X)
-        
-        # Calculate bands
-        std_dev = np.std(y - regression_line)
-        upper_band = regression_line + kstd * std_dev
-        lower_band = regression_line - kstd * std_dev
-        
-        return regression_line, upper_band, lower_band
-        
-    except Exception as e:
-        logger.error(f"Error in polynomial regression: {e}")
+    fit = channel_kernel.fit_channel(data.to_numpy(dtype=np.float64), degree, kstd)
+    if fit is None:
         return None, None, None
+    
+    return fit.regression_line, fit.upper_band, fit.lower_band
 
 def generate_polynomial_signal(close_price: float, upper_band: float, lower_band: float) -> tuple:
     """
@@ -138,42 +138,66 @@ def generate_polynomial_signal(close_price: float, upper_band: float, lower_band
         logger.error(f"Error generating signal: {e}")
         return 'HOLD', 0.5, None, None, None
 
+def _signal_levels(result: Dict[str, Any]) -> Optional[tuple]:
+    """(snapshot, signal, confidence, target_price, stop_loss, take_profit) for an optimization result"""
+    snapshot = result.get('snapshot')
+    if not result.get('best') or not snapshot:
+        return None
+    return (snapshot,) + generate_polynomial_signal(
+        snapshot['current_price'], snapshot['upper_band'], snapshot['lower_band']
+    )
+
 @router.post("/optimize", response_model=OptimizationResult)
-async def optimize_strategy(
-    request: OptimizationRequest,
-    db: Session = Depends(get_db)
-):
+async def optimize_strategy(request: OptimizationRequest):
     """Optimize strategy parameters for a specific symbol"""
     try:
         logger.info(f"Optimizing {request.strategy} for {request.symbol}")
         
-        # For now, return a mock optimization result
-        # In a real implementation, this would run actual optimization
-        current_price = 43250.50  # Mock price
-        signal, confidence, target_price, stop_loss, take_profit = generate_polynomial_signal(
-            current_price, current_price * 1.05, current_price * 0.95
+        result = await optimization_service.optimize(
+            request.symbol, request.timeframe, request.lookback_days, request.search_space()
         )
+        levels = _signal_levels(result)
+        if levels is None:
+            raise HTTPException(status_code=422, detail=f"No usable channel for {request.symbol}")
+        snapshot, signal, confidence, target_price, stop_loss, take_profit = levels
+        best = result['best']
+        
+        risk_reward_ratio = None
+        if target_price is not None and stop_loss is not None and stop_loss != snapshot['current_price']:
+            risk_reward_ratio = abs(target_price - snapshot['current_price']) / abs(snapshot['current_price'] - stop_loss)
         
         return OptimizationResult(
             symbol=request.symbol,
             strategy=request.strategy,
             signal=signal,
             confidence=confidence,
-            current_price=current_price,
+            current_price=snapshot['current_price'],
             target_price=target_price,
             stop_loss=stop_loss,
             take_profit=take_profit,
-            risk_reward_ratio=2.0 if target_price and stop_loss else None,
-            expected_return=5.0,
+            risk_reward_ratio=risk_reward_ratio,
+            expected_return=best['total_return'],
             optimization_metrics={
-                "degree": 4,
-                "kstd": 2.0,
-                "lookback_period": 100,
-                "r_squared": 0.85
+                "degree": best['degree'],
+                "kstd": best['kstd'],
+                "lookback_period": best['lookback'],
+                "r_squared": snapshot['r_squared'],
+                "sharpe_ratio": best['sharpe_ratio'],
+                "trades": best['trades'],
+                "trials_scored": result['trials_scored'],
+                "data_points": result['data_points'],
+                "data_version": result['data_version'],
+                "computed_at": result['computed_at'],
+                "compute_s": result['compute_s'],
+                "source": result['source']
             },
             timestamp=datetime.now().isoformat()
         )
         
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         logger.error(f"Error in optimization: {e}")
         raise HTTPException(status_code=500, detail=f"Optimization failed: {str(e)}")
@@ -182,7 +206,7 @@ async def optimize_strategy(
 async def get_strategy_signals(
     symbols: Optional[str] = Query(None, description="Comma-separated list of symbols"),
     strategy: str = Query("polynomial_regression", description="Strategy type"),
-    db: Session = Depends(get_db)
+    timeframe: str = Query("1d", description="Timeframe for analysis")
 ):
     """Get strategy signals for multiple symbols"""
     try:
@@ -193,53 +217,39 @@ async def get_strategy_signals(
             # Default to top symbols
             symbol_list = ["BTC/USDT", "ETH/USDT", "SOL/USDT", "ADA/USDT", "BNB/USDT"]
         
+        # Default search space: repeated dashboard polls are cache hits
+        results = await asyncio.gather(
+            *(optimization_service.optimize(symbol, timeframe) for symbol in symbol_list),
+            return_exceptions=True
+        )
+        
         signals = []
         
-        for symbol in symbol_list:
-            try:
-                # Mock data for demonstration
-                # In real implementation, fetch actual price data
-                mock_prices = {
-                    "BTC/USDT": 43250.50,
-                    "ETH/USDT": 2650.75,
-                    "SOL/USDT": 98.45,
-                    "ADA/USDT": 0.485,
-                    "BNB/USDT": 320.50
-                }
-                
-                current_price = mock_prices.get(symbol, 100.0)
-                
-                # Calculate polynomial regression (mock)
-                regression_line, upper_band, lower_band = calculate_polynomial_regression(
-                    pd.Series([current_price * 0.95, current_price, current_price * 1.05]),
-                    degree=4,
-                    kstd=2.0
-                )
-                
-                if regression_line is not None:
-                    signal, confidence, target_price, stop_loss, take_profit = generate_polynomial_signal(
-                        current_price, upper_band[-1], lower_band[-1]
-                    )
-                    
-                    description = f"{symbol} showing {signal} signal with {confidence:.1%} confidence"
-                    
-                    signal_obj = StrategySignal(
-                        symbol=symbol,
-                        signal=signal,
-                        confidence=confidence,
-                        price=current_price,
-                        target_price=target_price,
-                        stop_loss=stop_loss,
-                        take_profit=take_profit,
-                        timestamp=datetime.now().isoformat(),
-                        description=description
-                    )
-                    
-                    signals.append(signal_obj)
-                
-            except Exception as e:
-                logger.error(f"Error processing {symbol}: {e}")
+        for symbol, result in zip(symbol_list, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error processing {symbol}: {result}")
+                continue
+            
+            levels = _signal_levels(result)
+            if levels is None:
                 continue
+            snapshot, signal, confidence, target_price, stop_loss, take_profit = levels
+            best = result['best']
+            
+            description = (f"{symbol} showing {signal} signal with {confidence:.1%} confidence "
+                           f"(degree {best['degree']}, kstd {best['kstd']}, lookback {best['lookback']})")
+            
+            signals.append(StrategySignal(
+                symbol=symbol,
+                signal=signal,
+                confidence=confidence,
+                price=snapshot['current_price'],
+                target_price=target_price,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+                timestamp=datetime.now().isoformat(),
+                description=description
+            ))
         
         return signals
         
@@ -271,5 +281,10 @@ async def optimization_health_check():
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "service": "optimization-api",
-        "available_strategies": ["polynomial_regression"]
+        "available_strategies": ["polynomial_regression"],
+        "optimizer": {
+            "workers": optimization_service.max_workers,
+            "in_flight": len(optimization_service._inflight),
+            **optimization_service.stats
+        }
     }
@@ -9,25 +9,63 @@ This module provides API endpoints for:
 4. Retrieving optimization summary
 """
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Response
 from typing import List, Optional
 import json
 import os
 import logging
 from pathlib import Path
 
+import pyarrow.compute as pc
+
+from src.core import export_bundle
+
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Results table of the last ingested run and the serialized responses built
+# from it, reloaded when the file changes
+_results_cache = {'mtime': None, 'table': None, 'responses': {}}
+
 def get_data_path():
     """Get the path to the ingested data"""
     return Path("/app/public/data/api")
 
+def get_results_table():
+    """Memory-mapped results table written by ingest_to_docker.py, or None"""
+    results_file = get_data_path() / "results.parquet"
+    if not results_file.exists():
+        return None
+    
+    mtime = results_file.stat().st_mtime
+    if _results_cache['mtime'] != mtime:
+        _results_cache['table'] = export_bundle.read_results(str(results_file))
+        _results_cache['responses'] = {}
+        _results_cache['mtime'] = mtime
+    return _results_cache['table']
+
+def cached_response(name, build):
+    """JSON response of build() over the results table, serialized once per results file"""
+    responses = _results_cache['responses']
+    if name not in responses:
+        responses[name] = json.dumps(build(_results_cache['table']), separators=(',', ':'), default=str)
+    return Response(content=responses[name], media_type="application/json")
+
+def build_alerts(table):
+    alerts = table.select(export_bundle.ALERT_COLUMNS).to_pylist()
+    for i, alert in enumerate(alerts):
+        alert['id'] = i + 1
+        alert['timestamp'] = alert['analysis_date']
+    return alerts
+
 @router.get("/alerts")
 async def get_alerts():
     """Get alerts from ingested JSON files"""
     try:
+        if get_results_table() is not None:
+            return cached_response('alerts', build_alerts)
+        
         data_path = get_data_path()
         alerts_file = data_path / "alerts.json"
         
@@ -46,6 +84,9 @@ async def get_alerts():
 async def get_analytics():
     """Get analytics from ingested JSON files"""
     try:
+        if get_results_table() is not None:
+            return cached_response('analytics', lambda table: table.to_pylist())
+        
         data_path = get_data_path()
         analytics_file = data_path / "analytics.json"
         
@@ -61,19 +102,38 @@ async def get_analytics():
         raise HTTPException(status_code=500, detail=f"Failed to fetch analytics: {str(e)}")
 
 @router.get("/analytics/{symbol}")
-async def get_asset_analytics(symbol: str):
-    """Get analytics for a specific asset"""
+async def get_asset_analytics(symbol: str, interval: Optional[str] = None):
+    """
+    Get analytics for a specific asset
+    
+    Results are keyed by (symbol, interval): with interval, the row for that
+    interval; without, a list with one row per interval.
+    """
     try:
-        data_path = get_data_path()
-        asset_file = data_path / "assets" / f"{symbol}.json"
-        
-        if not asset_file.exists():
-            raise HTTPException(status_code=404, detail=f"Analytics for {symbol} not found.")
+        table = get_results_table()
+        if table is not None:
+            mask = pc.equal(table['symbol'], symbol)
+            if interval is not None:
+                mask = pc.and_(mask, pc.equal(table['interval'], interval))
+            rows = table.filter(mask).to_pylist()
+        else:
+            asset_file = get_data_path() / "assets" / f"{symbol}.json"
+            rows = []
+            if asset_file.exists():
+                with open(asset_file, 'r') as f:
+                    rows = json.load(f)
+                # Files written before results were keyed by interval hold a single row
+                if isinstance(rows, dict):
+                    rows = [rows]
+                if interval is not None:
+                    rows = [row for row in rows if row.get('interval') == interval]
         
-        with open(asset_file, 'r') as f:
-            analytics = json.load(f)
-        
-        return analytics
+        if not rows:
+            detail = f"Analytics for {symbol}" + (f" ({interval})" if interval else "") + " not found."
+            raise HTTPException(status_code=404, detail=detail)
+        return rows[0] if interval is not None else rows
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching asset analytics for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to fetch asset analytics: {str(e)}")
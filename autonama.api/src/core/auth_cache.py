@@ -0,0 +1,288 @@
+"""
+Auth Cache
+
+Lets authenticated requests skip the users table:
+
+- Access tokens carry the user's id, role and access claims (see
+  endpoints/auth.py). A verified token is kept as a Principal in a bounded
+  LRU until it expires, so repeated requests with the same token are
+  neither re-decoded nor looked up
+- User records (the fields /me returns) are kept in a second bounded LRU
+- Whoever changes a user's role or access (grant-access, revoke-access,
+  make-admin, the admin user endpoints, billing webhooks) calls
+  invalidate(username) after committing: the change time is stored in Redis
+  (auth:changed:<username>, kept for one token lifetime) and published on
+  auth:invalidate. Every API worker listens on that channel and drops the
+  user's record and every principal built before the change; the next
+  request rebuilds them from the database once
+- A token this worker has not seen yet is checked against
+  auth:changed:<username> once (a change may predate the subscription or
+  have dropped out of the local change log)
+- Nothing is served from cache while the listener is not subscribed (Redis
+  down, worker starting up), so a change is never missed; requests then
+  fall back to the database as before
+
+A dashboard polling with the same token therefore costs no database or
+Redis round trip after its first request.
+"""
+
+import json
+import time
+import logging
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from src.core.config import settings
+from src.core.database import get_redis
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "auth:invalidate"
+CHANGED_PREFIX = "auth:changed"
+RECONNECT_DELAY = 5.0
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Who a token belongs to, and what they were allowed to do at as_of (epoch seconds)."""
+    username: str
+    user_id: int
+    is_admin: bool
+    has_access: bool
+    as_of: float
+    expires_at: float
+
+
+@dataclass(frozen=True)
+class UserRecord:
+    id: int
+    username: str
+    email: str
+    created_at: Optional[datetime]
+    has_access: bool
+    is_admin: bool
+
+    @classmethod
+    def from_user(cls, user) -> 'UserRecord':
+        return cls(
+            id=user.id,
+            username=user.username,
+            email=user.email,
+            created_at=user.created_at,
+            has_access=bool(getattr(user, "has_access", False)),
+            is_admin=bool(getattr(user, "is_admin", False)),
+        )
+
+
+class LRUCache:
+    """Thread-safe LRU with a per-entry expiry time (epoch seconds)."""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Any, tuple]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key, value, expires_at: float):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def discard(self, predicate: Callable[[Any, Any], bool]):
+        """Drop every entry for which predicate(key, value) is true."""
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.items() if predicate(key, value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AuthCache:
+    """Principal and user record caches of one API worker, kept coherent through Redis pub/sub."""
+
+    def __init__(self, redis_client=None, token_cache_size: int = settings.AUTH_TOKEN_CACHE_SIZE,
+                 user_cache_size: int = settings.AUTH_USER_CACHE_SIZE,
+                 user_ttl: int = settings.AUTH_USER_CACHE_TTL,
+                 change_ttl: int = settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60):
+        self._redis = redis_client
+        self.tokens = LRUCache(token_cache_size)
+        self.users = LRUCache(user_cache_size)
+        self.user_ttl = user_ttl
+        self.change_ttl = change_ttl
+        # username -> time of the last change seen by the listener
+        self._changed = LRUCache(user_cache_size)
+        self._subscribed_at: Optional[float] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'token_hits': 0, 'token_misses': 0, 'user_hits': 0, 'user_misses': 0, 'invalidations': 0}
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = get_redis()
+        return self._redis
+
+    @property
+    def ready(self) -> bool:
+        return self._subscribed_at is not None
+
+    # Listener
+
+    def start(self):
+        """Start the invalidation listener (one daemon thread per worker)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._listen, name="auth-cache-listener", daemon=True)
+        self._thread.start()
+
+    def shutdown(self):
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+
+    def _listen(self):
+        while not self._stopped.is_set():
+            pubsub = None
+            try:
+                pubsub = self.redis.pubsub()
+                pubsub.subscribe(CHANNEL)
+                while not self._stopped.is_set():
+                    message = pubsub.get_message(timeout=1.0)
+                    if not message:
+                        continue
+                    if message['type'] == 'subscribe':
+                        self._subscribed_at = time.time()
+                        logger.info("Auth cache listening for invalidations")
+                    elif message['type'] == 'message':
+                        self._apply(message['data'])
+            except Exception as e:
+                logger.warning(f"Auth cache listener disconnected: {e}")
+            finally:
+                self._subscribed_at = None
+                self.clear()
+                if pubsub is not None:
+                    try:
+                        pubsub.close()
+                    except Exception:
+                        pass
+            self._stopped.wait(RECONNECT_DELAY)
+
+    def _apply(self, data: str):
+        try:
+            event = json.loads(data)
+            self.forget(event['username'], float(event['at']))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Ignoring malformed auth invalidation {data!r}: {e}")
+
+    # Invalidation
+
+    def invalidate(self, username: str):
+        """Announce that a user's role or access changed; call after the change is committed."""
+        changed_at = time.time()
+        self.forget(username, changed_at)
+        try:
+            self.redis.set(f"{CHANGED_PREFIX}:{username}", changed_at, ex=self.change_ttl)
+            self.redis.publish(CHANNEL, json.dumps({'username': username, 'at': changed_at}))
+        except Exception as e:
+            logger.error(f"Failed to publish auth invalidation for {username}: {e}")
+
+    def forget(self, username: str, changed_at: float):
+        self.stats['invalidations'] += 1
+        self._changed.put(username, changed_at, time.time() + self.change_ttl)
+        self.users.pop(username)
+        self.tokens.discard(lambda token, principal: principal.username == username)
+
+    def clear(self):
+        self.tokens.clear()
+        self.users.clear()
+        self._changed.clear()
+
+    def _changed_since(self, username: str, since: float, remote: bool = False) -> bool:
+        """Whether the user's role or access changed at or after `since`."""
+        changed_at = self._changed.get(username)
+        if changed_at is None and remote:
+            try:
+                value = self.redis.get(f"{CHANGED_PREFIX}:{username}")
+            except Exception as e:
+                logger.warning(f"Auth change lookup failed for {username}: {e}")
+                return True
+            changed_at = float(value) if value else None
+        return changed_at is not None and changed_at >= since
+
+    # Principals
+
+    def principal(self, token: str) -> Optional[Principal]:
+        """Cached principal of a token, if it is still valid."""
+        if not self.ready:
+            return None
+        principal = self.tokens.get(token)
+        if principal is None or self._changed_since(principal.username, principal.as_of):
+            self.stats['token_misses'] += 1
+            return None
+        self.stats['token_hits'] += 1
+        return principal
+
+    def principal_from_claims(self, claims: Dict[str, Any]) -> Optional[Principal]:
+        """Principal described by a token's claims, or None when they are missing or may be stale."""
+        if not self.ready or 'uid' not in claims or 'role' not in claims or 'access' not in claims:
+            return None
+        issued_at = float(claims.get('iat', 0))
+        if self._changed_since(claims['sub'], issued_at, remote=True):
+            return None
+        return Principal(
+            username=claims['sub'],
+            user_id=int(claims['uid']),
+            is_admin=claims['role'] == 'admin',
+            has_access=bool(claims['access']),
+            as_of=issued_at,
+            expires_at=float(claims['exp']),
+        )
+
+    def remember(self, token: str, principal: Principal):
+        # Skip principals an invalidation overtook while they were being built
+        if self.ready and not self._changed_since(principal.username, principal.as_of):
+            self.tokens.put(token, principal, principal.expires_at)
+
+    # User records
+
+    def user(self, username: str, load: Callable[[str], Optional[UserRecord]]) -> Optional[UserRecord]:
+        """User record from cache, or from load(username) (which queries the database)."""
+        record = self.users.get(username) if self.ready else None
+        if record is not None:
+            self.stats['user_hits'] += 1
+            return record
+        self.stats['user_misses'] += 1
+        loaded_at = time.time()
+        record = load(username)
+        # A change that landed while loading may not be in the record
+        if record is not None and self.ready and not self._changed_since(username, loaded_at):
+            self.users.put(username, record, loaded_at + self.user_ttl)
+        return record
+
+
+auth_cache = AuthCache()
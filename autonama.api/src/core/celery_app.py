@@ -8,8 +8,53 @@ to avoid the import issues with separate containers.
 import os
 import sys
 from celery import Celery
+from kombu import Queue
 from src.core.config import settings
 
+# I/O-bound tasks (exchange and market data fetchers) run on the io queue's
+# gevent worker, CPU-bound optimizations on the cpu queue's prefork worker;
+# see the celery_worker services in docker-compose.yml
+IO_QUEUE = 'io'
+CPU_QUEUE = 'cpu'
+
+TASK_QUEUE_ROUTES = {
+    'src.tasks.binance_data_fetcher.*': IO_QUEUE,
+    'src.tasks.multi_asset_ingestion.*': IO_QUEUE,
+    'src.tasks.autonama_optimization.*': CPU_QUEUE,
+}
+
+# (soft, hard) time limits per queue, for tasks that do not set their own
+QUEUE_TIME_LIMITS = {
+    IO_QUEUE: (10 * 60, 12 * 60),
+    CPU_QUEUE: (55 * 60, 60 * 60),
+}
+
+
+class QueueTimeLimits:
+    """task_annotations entry applying the routed queue's time limits"""
+
+    def annotate(self, task):
+        queue = next((q for prefix, q in TASK_QUEUE_ROUTES.items() if task.name.startswith(prefix[:-1])), None)
+        if queue is None:
+            return None
+        soft, hard = QUEUE_TIME_LIMITS[queue]
+        limits = {}
+        if task.soft_time_limit is None:
+            limits['soft_time_limit'] = soft
+        if task.time_limit is None:
+            limits['time_limit'] = hard
+        return limits or None
+
+
+# psycopg2 blocks the whole gevent worker during queries unless patched
+try:
+    from gevent import monkey
+    if monkey.is_module_patched('socket'):
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+except ImportError:
+    pass
+
 # No need to add data directory to Python path - tasks are in src.tasks
 
 # Create Celery app
@@ -29,8 +74,13 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
+    task_queues=(Queue(IO_QUEUE), Queue(CPU_QUEUE)),
+    task_default_queue=CPU_QUEUE,
+    task_routes={pattern: {'queue': queue} for pattern, queue in TASK_QUEUE_ROUTES.items()},
+    task_annotations=(QueueTimeLimits(),),
+    # Prefetch and child recycling (--max-memory-per-child, rather than a
+    # task count that throws away warm caches) are set per worker
     worker_prefetch_multiplier=1,
-    worker_max_tasks_per_child=1000,
     # Explicitly set task discovery to only look in src.tasks
     include=['src.tasks.autonama_optimization', 'src.tasks.multi_asset_ingestion', 'src.tasks.binance_data_fetcher'],
     # Beat schedule for scheduled tasks
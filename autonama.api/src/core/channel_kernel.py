@@ -0,0 +1,259 @@
+"""
+Polynomial Channel Kernel
+
+Copy of autonama.engine/channel_kernel.py for the API image, which is built
+from autonama.api only. Keep the two files identical.
+
+Shared implementation of the polynomial-regression channel used by the
+engines, the Streamlit scanner and the API. Everything here works on raw
+float64 NumPy arrays; callers re-attach their own index only when they need
+a pandas object for output.
+
+Pipeline:
+- preprocess_close: de-duplicate, fill gaps, drop z-score outliers, smooth
+- fit_channel: least-squares polynomial on a scaled x axis plus +/- kstd bands
+- clamp_bands / channel_summary / check_channel: band bounding and validation
+  from a single min/max summary per array instead of repeated full scans
+- band_signals: entry/exit masks
+
+The legacy code fitted np.polyfit on x = 0..n-1. For degree 3-4 and a few
+thousand candles that Vandermonde matrix is badly conditioned (x**4 ~ 1e13),
+which is what produced the "extreme coefficient" retries. Fitting on x mapped
+to [-1, 1] gives the same curve in exact arithmetic with a well-conditioned
+system.
+"""
+
+import warnings
+from typing import NamedTuple, Optional, Tuple
+
+import numpy as np
+from numpy.polynomial import polynomial as P
+
+MIN_DEGREE = 1
+MAX_DEGREE = 10
+
+
+class ChannelFit(NamedTuple):
+    """Result of a channel fit. Arrays share the length of the input."""
+    regression_line: np.ndarray
+    upper_band: np.ndarray
+    lower_band: np.ndarray
+    std_dev: float
+    coefficients: np.ndarray  # ascending order, in scaled-x space
+
+
+class ChannelSummary(NamedTuple):
+    """Min/max of every channel array, computed once and reused by all checks."""
+    close_min: float
+    close_max: float
+    line_min: float
+    line_max: float
+    upper_min: float
+    upper_max: float
+    lower_min: float
+    lower_max: float
+    min_gap: float  # min(upper - lower)
+
+
+def as_float_array(values) -> np.ndarray:
+    """Return values as a contiguous float64 array without copying when possible."""
+    if hasattr(values, 'to_numpy'):
+        values = values.to_numpy(dtype=np.float64)
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def first_occurrence_mask(keys) -> np.ndarray:
+    """Boolean mask keeping the first occurrence of every key (index.duplicated(keep='first'))."""
+    keys = np.asarray(keys)
+    mask = np.zeros(keys.shape[0], dtype=np.bool_)
+    if keys.shape[0]:
+        _, first_idx = np.unique(keys, return_index=True)
+        mask[first_idx] = True
+    return mask
+
+
+def fill_missing(values: np.ndarray) -> np.ndarray:
+    """Forward fill then backward fill NaNs (ffill().bfill()) in one vectorised pass."""
+    nan_mask = np.isnan(values)
+    if not nan_mask.any():
+        return values
+    valid = ~nan_mask
+    if not valid.any():
+        return values
+    positions = np.where(valid, np.arange(values.shape[0]), 0)
+    np.maximum.accumulate(positions, out=positions)
+    # Leading NaNs have no previous value; take the first valid one instead
+    positions[:np.argmax(valid)] = np.argmax(valid)
+    return values[positions]
+
+
+def zscore_mask(values: np.ndarray, threshold: float = 3.0) -> np.ndarray:
+    """Mask of points within threshold sample standard deviations of the mean."""
+    if values.shape[0] < 2:
+        return np.ones(values.shape[0], dtype=np.bool_)
+    mean = values.mean()
+    std = values.std(ddof=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.abs(values - mean) < threshold * std
+
+
+def rolling_mean(values: np.ndarray, window: int, center: bool = False) -> np.ndarray:
+    """
+    Rolling mean over a prefix sum.
+
+    With center=False this matches rolling(window, min_periods=1).mean().
+    With center=True it matches rolling(window, center=True).mean(), i.e. NaN
+    wherever the full window is not available.
+    """
+    n = values.shape[0]
+    csum = np.empty(n + 1, dtype=np.float64)
+    csum[0] = 0.0
+    np.cumsum(values, out=csum[1:])
+
+    if not center:
+        ends = np.arange(1, n + 1)
+        starts = np.maximum(ends - window, 0)
+        return (csum[ends] - csum[starts]) / (ends - starts)
+
+    out = np.full(n, np.nan, dtype=np.float64)
+    if n >= window:
+        full = (csum[window:] - csum[:-window]) / window
+        offset = (window - 1) // 2
+        out[window - 1 - offset:n - offset] = full
+    return out
+
+
+def preprocess_close(values, window: int = 5, zscore_threshold: Optional[float] = 3.0,
+                     center: bool = False, keys=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Clean and smooth a close-price array.
+
+    Args:
+        values: Close prices
+        window: Smoothing window; series shorter than the window are not smoothed
+        zscore_threshold: Drop points further than this many std devs from the mean (None disables)
+        center: Use a centred window and drop the incomplete edges
+        keys: Optional index keys (e.g. int64 timestamps); duplicates keep the first row
+
+    Returns:
+        Tuple of (smoothed values, boolean mask of the input rows that were kept)
+    """
+    y = as_float_array(values)
+    keep = np.ones(y.shape[0], dtype=np.bool_)
+
+    if keys is not None:
+        keep &= first_occurrence_mask(keys)
+
+    y = fill_missing(y[keep]) if not keep.all() else fill_missing(y)
+
+    if zscore_threshold is not None and y.shape[0]:
+        inliers = zscore_mask(y, zscore_threshold)
+        if not inliers.all():
+            kept_positions = np.flatnonzero(keep)
+            keep[kept_positions[~inliers]] = False
+            y = y[inliers]
+
+    if y.shape[0] >= window > 1:
+        y = rolling_mean(y, window, center=center)
+        if center:
+            complete = ~np.isnan(y)
+            kept_positions = np.flatnonzero(keep)
+            keep[kept_positions[~complete]] = False
+            y = y[complete]
+
+    return y, keep
+
+
+def _scaled_axis(n: int) -> np.ndarray:
+    """x = 0..n-1 mapped affinely onto [-1, 1]."""
+    if n == 1:
+        return np.zeros(1, dtype=np.float64)
+    return np.linspace(-1.0, 1.0, n)
+
+
+def fit_channel(values, degree: int = 4, kstd: float = 2.0) -> Optional[ChannelFit]:
+    """
+    Fit a polynomial channel to values.
+
+    Returns None when there are too few points for the degree, the fit is
+    rank deficient, or the result is not finite.
+    """
+    y = as_float_array(values)
+    n = y.shape[0]
+    degree = max(MIN_DEGREE, min(int(degree), MAX_DEGREE))
+    if n < degree + 1:
+        return None
+
+    x = _scaled_axis(n)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            coefficients = P.polyfit(x, y, degree)
+    except (np.linalg.LinAlgError, ValueError):
+        return None
+
+    regression_line = P.polyval(x, coefficients)
+    residuals = y - regression_line
+    std_dev = float(np.sqrt(np.dot(residuals, residuals) / n))
+    if not np.isfinite(std_dev):
+        return None
+
+    width = kstd * std_dev
+    return ChannelFit(
+        regression_line=regression_line,
+        upper_band=regression_line + width,
+        lower_band=regression_line - width,
+        std_dev=std_dev,
+        coefficients=coefficients,
+    )
+
+
+def clamp_bands(upper: np.ndarray, lower: np.ndarray, anchor: float,
+                min_multiplier: float = 0.2, max_multiplier: float = 1.5,
+                min_gap_ratio: float = 0.95) -> None:
+    """Bound both bands to [min, max] x anchor and keep lower <= upper * min_gap_ratio, in place."""
+    lo = anchor * min_multiplier
+    hi = anchor * max_multiplier
+    np.clip(upper, lo, hi, out=upper)
+    np.clip(lower, lo, hi, out=lower)
+    np.minimum(lower, upper * min_gap_ratio, out=lower)
+
+
+def channel_summary(close: np.ndarray, fit: ChannelFit) -> ChannelSummary:
+    """Reduce every channel array to its min/max. NaNs propagate into the summary."""
+    return ChannelSummary(
+        close_min=float(close.min()), close_max=float(close.max()),
+        line_min=float(fit.regression_line.min()), line_max=float(fit.regression_line.max()),
+        upper_min=float(fit.upper_band.min()), upper_max=float(fit.upper_band.max()),
+        lower_min=float(fit.lower_band.min()), lower_max=float(fit.lower_band.max()),
+        min_gap=float((fit.upper_band - fit.lower_band).min()),
+    )
+
+
+def check_channel(summary: ChannelSummary, max_value: float = 1e6, max_line: float = 1e8,
+                  max_price_range: float = 100.0) -> Optional[str]:
+    """
+    Validate a channel from its summary.
+
+    Returns None when the channel is usable, otherwise a short reason.
+    """
+    if not all(np.isfinite(v) for v in summary):
+        return "non-finite values in channel"
+    if summary.close_min <= 0:
+        return "non-positive close prices"
+    if summary.line_min <= 0 or summary.line_max > max_line:
+        return "invalid regression line values"
+    if summary.upper_min <= 0 or summary.lower_min <= 0:
+        return "non-positive band values"
+    if summary.min_gap < 0:
+        return "upper band is lower than lower band"
+    if summary.close_max > max_value or summary.upper_max > max_value or summary.lower_max > max_value:
+        return f"extreme values (> {max_value:g})"
+    if summary.close_max / summary.close_min > max_price_range:
+        return f"extreme price range: {summary.close_max / summary.close_min:.2f}"
+    return None
+
+
+def band_signals(close: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Entry mask (close below lower band) and exit mask (close above upper band)."""
+    return np.less(close, lower), np.greater(close, upper)
@@ -0,0 +1,139 @@
+"""
+Polynomial Channel Optimizer
+
+Parameter search for the polynomial-regression channel on a plain float64
+close array, built on channel_kernel.
+
+- SearchSpace / candidate_grid: the (degree, kstd, lookback) grid and a
+  seeded sample of it, so the same search space always yields the same
+  candidates (and the same cache key)
+- evaluate_batch: scores a chunk of candidates; top-level and picklable so it
+  can run in a process pool or a Celery worker
+- channel_snapshot: bands, signal inputs and fit quality for the winner
+
+Scoring is a long-only band strategy: enter below the lower band, exit above
+the upper band, hold in between.
+"""
+
+import itertools
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core import channel_kernel
+
+Candidate = Tuple[int, float, int]
+
+
+class SearchSpace(NamedTuple):
+    degree_range: Tuple[int, int] = (2, 5)
+    kstd_range: Tuple[float, float] = (1.5, 3.0)
+    kstd_step: float = 0.25
+    lookback_range: Tuple[int, int] = (50, 350)
+    lookback_step: int = 25
+    n_trials: int = 10
+
+    def as_dict(self) -> Dict:
+        return {
+            'degree_range': list(self.degree_range),
+            'kstd_range': list(self.kstd_range),
+            'kstd_step': self.kstd_step,
+            'lookback_range': list(self.lookback_range),
+            'lookback_step': self.lookback_step,
+            'n_trials': self.n_trials,
+        }
+
+
+def candidate_grid(space: SearchSpace, max_lookback: Optional[int] = None, seed: int = 0) -> List[Candidate]:
+    """
+    Seeded sample of n_trials candidates from the full grid.
+
+    Lookbacks longer than max_lookback (the available history) are dropped.
+    """
+    degrees = range(max(space.degree_range[0], channel_kernel.MIN_DEGREE),
+                    min(space.degree_range[1], channel_kernel.MAX_DEGREE) + 1)
+    kstds = np.round(np.arange(space.kstd_range[0], space.kstd_range[1] + 1e-9, space.kstd_step), 4)
+    lookbacks = range(space.lookback_range[0], space.lookback_range[1] + 1, space.lookback_step)
+    if max_lookback is not None:
+        lookbacks = [lb for lb in lookbacks if lb <= max_lookback] or [max_lookback]
+
+    grid = [(int(d), float(k), int(lb)) for d, k, lb in itertools.product(degrees, kstds, lookbacks)]
+    if len(grid) <= space.n_trials:
+        return grid
+    picks = np.random.default_rng(seed).choice(len(grid), size=space.n_trials, replace=False)
+    return [grid[i] for i in sorted(picks)]
+
+
+def _band_positions(close: np.ndarray, upper: np.ndarray, lower: np.ndarray) -> np.ndarray:
+    """1 while long, 0 while flat: entries set 1, exits set 0, carried forward."""
+    entries, exits = channel_kernel.band_signals(close, upper, lower)
+    state = np.full(close.size, np.nan)
+    state[exits] = 0.0
+    state[entries] = 1.0
+    filled = np.where(np.isnan(state), 0, np.arange(close.size))
+    np.maximum.accumulate(filled, out=filled)
+    positions = state[filled]
+    return np.nan_to_num(positions, nan=0.0)
+
+
+def evaluate(close: np.ndarray, degree: int, kstd: float, lookback: int,
+             periods_per_year: int = 365) -> Optional[Dict]:
+    """Backtest one candidate on the last `lookback` closes. None if the channel is unusable."""
+    window = close[-lookback:]
+    if window.size < max(degree + 2, 10):
+        return None
+    fit = channel_kernel.fit_channel(window, degree, kstd)
+    if fit is None or channel_kernel.check_channel(channel_kernel.channel_summary(window, fit)):
+        return None
+
+    positions = _band_positions(window, fit.upper_band, fit.lower_band)
+    returns = positions[:-1] * (window[1:] / window[:-1] - 1.0)
+    total_return = float(np.prod(1.0 + returns) - 1.0) * 100
+    std = returns.std()
+    sharpe = float(returns.mean() / std * np.sqrt(periods_per_year)) if std > 0 else 0.0
+    trades = int(np.count_nonzero(np.diff(positions) > 0) + positions[0])
+
+    return {
+        'degree': degree,
+        'kstd': kstd,
+        'lookback': lookback,
+        'total_return': total_return,
+        'sharpe_ratio': sharpe,
+        'trades': trades,
+    }
+
+
+def evaluate_batch(close: np.ndarray, candidates: Sequence[Candidate],
+                   periods_per_year: int = 365) -> List[Dict]:
+    """Score a chunk of candidates, skipping unusable channels."""
+    results = []
+    for degree, kstd, lookback in candidates:
+        result = evaluate(close, degree, kstd, lookback, periods_per_year)
+        if result is not None:
+            results.append(result)
+    return results
+
+
+def best_result(results: Sequence[Dict]) -> Optional[Dict]:
+    """Highest total return; Sharpe ratio breaks ties."""
+    if not results:
+        return None
+    return max(results, key=lambda r: (r['total_return'], r['sharpe_ratio']))
+
+
+def channel_snapshot(close: np.ndarray, degree: int, kstd: float, lookback: int) -> Optional[Dict]:
+    """Last price, last band values and R^2 of the fitted channel."""
+    window = close[-lookback:]
+    fit = channel_kernel.fit_channel(window, degree, kstd)
+    if fit is None:
+        return None
+    residual = window - fit.regression_line
+    total = window - window.mean()
+    ss_tot = float(np.dot(total, total))
+    return {
+        'current_price': float(window[-1]),
+        'regression': float(fit.regression_line[-1]),
+        'upper_band': float(fit.upper_band[-1]),
+        'lower_band': float(fit.lower_band[-1]),
+        'r_squared': 1.0 - float(np.dot(residual, residual)) / ss_tot if ss_tot > 0 else 0.0,
+    }
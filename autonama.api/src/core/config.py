@@ -52,6 +52,23 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = os.getenv("CELERY_BROKER_URL", "redis://redis:6379/0")
     CELERY_RESULT_BACKEND: str = os.getenv("CELERY_RESULT_BACKEND", "redis://redis:6379/0")
 
+    # On-demand optimization (src/services/optimization_service.py)
+    OPTIMIZATION_WORKERS: int = int(os.getenv("OPTIMIZATION_WORKERS", "2"))
+    OPTIMIZATION_CACHE_TTL: int = int(os.getenv("OPTIMIZATION_CACHE_TTL", "3600"))
+    OPTIMIZATION_LOCK_TTL: int = int(os.getenv("OPTIMIZATION_LOCK_TTL", "300"))
+
+    # Job queue (src/core/job_queue.py)
+    JOB_QUEUE_MAXLEN: int = int(os.getenv("JOB_QUEUE_MAXLEN", "10000"))
+    JOB_HISTORY_TTL: int = int(os.getenv("JOB_HISTORY_TTL", "604800"))
+    JOB_RECLAIM_IDLE_MS: int = int(os.getenv("JOB_RECLAIM_IDLE_MS", "600000"))
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+
+    # Auth caches and password hashing (src/core/auth_cache.py, src/core/passwords.py)
+    AUTH_TOKEN_CACHE_SIZE: int = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+    AUTH_USER_CACHE_SIZE: int = int(os.getenv("AUTH_USER_CACHE_SIZE", "10000"))
+    AUTH_USER_CACHE_TTL: int = int(os.getenv("AUTH_USER_CACHE_TTL", "3600"))
+    AUTH_HASH_WORKERS: int = int(os.getenv("AUTH_HASH_WORKERS", "4"))
+
     # DuckDB - REMOVED: No longer needed
 # DUCKDB_PATH: str = os.getenv("DUCKDB_PATH", "/data/duckdb/")
 
@@ -1,17 +1,23 @@
 import logging
+import logging.handlers
 import json
 import sys
+import queue
+import atexit
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 from pathlib import Path
 import os
 
+# Background thread that formats and writes records queued by the app
+_listener: Optional[logging.handlers.QueueListener] = None
+
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging"""
     
     def format(self, record: logging.LogRecord) -> str:
         log_entry = {
-            "@timestamp": datetime.utcnow().isoformat() + "Z",
+            "@timestamp": datetime.utcfromtimestamp(record.created).isoformat() + "Z",
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -28,6 +34,8 @@ class JSONFormatter(logging.Formatter):
         # Add exception info if present
         if record.exc_info:
             log_entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            log_entry["exception"] = record.exc_text
         
         # Add extra fields if present
         if hasattr(record, 'extra_fields'):
@@ -36,8 +44,37 @@ class JSONFormatter(logging.Formatter):
         return json.dumps(log_entry, ensure_ascii=False)
 
 
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Queue records unformatted; JSON formatting and I/O happen on the listener thread"""
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        message = record.getMessage()
+        exc_text = None
+        if record.exc_info:
+            exc_text = logging.Formatter().formatException(record.exc_info)
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        record.exc_info = None
+        record.exc_text = exc_text or record.exc_text
+        return record
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(stop_logging)
+
+
 def setup_logging():
     """Setup structured logging for the application"""
+    global _listener
+    stop_logging()
     
     # Create logs directory in app directory (writable by container user)
     log_dir = Path("/app/logs")
@@ -55,6 +92,8 @@ def setup_logging():
     for handler in root_logger.handlers[:]:
         root_logger.removeHandler(handler)
     
+    handlers = []
+    
     # JSON formatter
     json_formatter = JSONFormatter()
     
@@ -62,7 +101,7 @@ def setup_logging():
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setFormatter(json_formatter)
     console_handler.setLevel(logging.INFO)
-    root_logger.addHandler(console_handler)
+    handlers.append(console_handler)
     
     # File handler (only if we can write to the logs directory)
     try:
@@ -70,11 +109,17 @@ def setup_logging():
             file_handler = logging.FileHandler("/app/logs/api.log")
             file_handler.setFormatter(json_formatter)
             file_handler.setLevel(logging.INFO)
-            root_logger.addHandler(file_handler)
+            handlers.append(file_handler)
     except (PermissionError, OSError):
         # If we can't write to the file, just use console logging
         pass
     
+    # The app only enqueues; formatting and I/O run on the listener thread
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(NonBlockingQueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    
     return root_logger
 
 
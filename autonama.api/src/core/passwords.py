@@ -0,0 +1,44 @@
+"""
+Passwords
+
+bcrypt hashing through passlib, run on a dedicated thread pool: one bcrypt
+round takes tens of milliseconds, which would stall every other request if
+it ran on the event loop. The pool is separate from the default executor so
+a burst of logins does not queue behind (or starve) sync endpoints.
+
+Accounts created before passwords were hashed store them in plaintext;
+verify_password() still accepts those and returns a hash to store in their
+place, as it does for hashes made with outdated settings.
+"""
+
+import hmac
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Tuple
+
+from passlib.context import CryptContext
+
+from src.core.config import settings
+
+_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+_executor = ThreadPoolExecutor(max_workers=settings.AUTH_HASH_WORKERS, thread_name_prefix="password-hash")
+
+
+def _verify(password: str, stored: str) -> Tuple[bool, Optional[str]]:
+    if not stored:
+        return False, None
+    if _context.identify(stored) is None:
+        # Plaintext from before hashing; upgrade on success
+        if hmac.compare_digest(password.encode(), stored.encode()):
+            return True, _context.hash(password)
+        return False, None
+    return _context.verify_and_update(password, stored)
+
+
+async def hash_password(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(_executor, _context.hash, password)
+
+
+async def verify_password(password: str, stored: str) -> Tuple[bool, Optional[str]]:
+    """(matches, replacement hash to store or None)."""
+    return await asyncio.get_running_loop().run_in_executor(_executor, _verify, password, stored)
@@ -0,0 +1,158 @@
+"""
+Request Metrics
+
+In-process request statistics for the API, fed by the ASGI middleware in
+src/middleware/logging.py and exposed on /metrics.
+
+Per (method, route template) it keeps:
+- a fixed-bucket latency histogram (count, sum, max, per-bucket counts), so
+  memory does not grow with traffic and p50/p95/p99 are interpolated from
+  the buckets
+- response counts per status code
+- a 60 x 1s ring of request counts for the current request rate
+
+Updates happen on the event loop thread only, so no locking is needed.
+"""
+
+import time
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# Upper bounds in seconds; the last bucket is +Inf
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUANTILES = (0.5, 0.95, 0.99)
+RATE_WINDOW = 60
+
+# Route label for requests that matched no route (keeps label cardinality bounded)
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RouteStats:
+    __slots__ = ('buckets', 'count', 'total', 'max', 'statuses', 'window_counts', 'window_stamps')
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.statuses: Dict[int, int] = {}
+        self.window_counts = [0] * RATE_WINDOW
+        self.window_stamps = [0] * RATE_WINDOW
+
+    def observe(self, seconds: float, status: int, now: float):
+        self.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+
+        second = int(now)
+        slot = second % RATE_WINDOW
+        if self.window_stamps[slot] != second:
+            self.window_stamps[slot] = second
+            self.window_counts[slot] = 0
+        self.window_counts[slot] += 1
+
+    def rate(self, now: float) -> float:
+        """Requests per second over the last RATE_WINDOW seconds."""
+        oldest = int(now) - RATE_WINDOW
+        return sum(c for c, s in zip(self.window_counts, self.window_stamps) if s > oldest) / RATE_WINDOW
+
+    def quantile(self, q: float) -> float:
+        """Linear interpolation inside the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if seen + n >= rank and n:
+                lower = LATENCY_BUCKETS[i - 1] if i > 0 else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                return min(lower + (upper - lower) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+
+class RequestMetrics:
+    """Request histograms keyed by (method, route template)."""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.routes: Dict[Tuple[str, str], RouteStats] = {}
+
+    def observe(self, method: str, route: Optional[str], status: int, seconds: float):
+        key = (method, route or UNMATCHED_ROUTE)
+        stats = self.routes.get(key)
+        if stats is None:
+            stats = self.routes[key] = RouteStats()
+        stats.observe(seconds, status, time.time())
+
+    def summary(self) -> Dict:
+        now = time.time()
+        routes = []
+        for (method, route), stats in sorted(self.routes.items(), key=lambda item: item[0][1]):
+            routes.append({
+                'method': method,
+                'route': route,
+                'count': stats.count,
+                'rate_per_s': round(stats.rate(now), 3),
+                'latency_ms': {
+                    **{f"p{int(q * 100)}": round(stats.quantile(q) * 1000, 3) for q in QUANTILES},
+                    'mean': round(stats.total / stats.count * 1000, 3) if stats.count else 0.0,
+                    'max': round(stats.max * 1000, 3),
+                },
+                'statuses': {str(code): n for code, n in sorted(stats.statuses.items())},
+            })
+        return {
+            'uptime_s': round(now - self.started_at, 1),
+            'rate_window_s': RATE_WINDOW,
+            'routes': routes,
+        }
+
+    def to_prometheus(self, prefix: str = 'autonama_api') -> str:
+        """Prometheus text exposition: counters, latency histograms, current rate and quantiles."""
+        now = time.time()
+        lines: List[str] = [
+            f"# HELP {prefix}_requests_total Requests by method, route and status",
+            f"# TYPE {prefix}_requests_total counter",
+        ]
+        items = sorted(self.routes.items(), key=lambda item: (item[0][1], item[0][0]))
+        for (method, route), stats in items:
+            for code, n in sorted(stats.statuses.items()):
+                lines.append(f'{prefix}_requests_total{{method="{method}",route="{route}",status="{code}"}} {n}')
+
+        lines += [
+            f"# HELP {prefix}_request_duration_seconds Request latency",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        for (method, route), stats in items:
+            labels = f'method="{method}",route="{route}"'
+            cumulative = 0
+            for bound, n in zip(LATENCY_BUCKETS, stats.buckets):
+                cumulative += n
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {stats.count}')
+            lines.append(f'{prefix}_request_duration_seconds_sum{{{labels}}} {stats.total:.6f}')
+            lines.append(f'{prefix}_request_duration_seconds_count{{{labels}}} {stats.count}')
+
+        lines += [
+            f"# HELP {prefix}_request_duration_quantile_seconds Interpolated latency quantiles since start",
+            f"# TYPE {prefix}_request_duration_quantile_seconds gauge",
+        ]
+        for (method, route), stats in items:
+            for q in QUANTILES:
+                lines.append(f'{prefix}_request_duration_quantile_seconds'
+                             f'{{method="{method}",route="{route}",quantile="{q}"}} {stats.quantile(q):.6f}')
+
+        lines += [
+            f"# HELP {prefix}_request_rate Requests per second over the last {RATE_WINDOW}s",
+            f"# TYPE {prefix}_request_rate gauge",
+        ]
+        for (method, route), stats in items:
+            lines.append(f'{prefix}_request_rate{{method="{method}",route="{route}"}} {stats.rate(now):.3f}')
+        return "\n".join(lines) + "\n"
+
+
+request_metrics = RequestMetrics()
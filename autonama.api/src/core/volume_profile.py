@@ -0,0 +1,253 @@
+"""
+Volume Profile
+
+Copy of autonama.data/utils/volume_profile.py for the API image, which is
+built from autonama.api only. Keep the two files identical.
+
+Price/volume distributions computed in one vectorised pass over the candles.
+
+Modes:
+- 'range' (default): each candle's volume is spread uniformly over its
+  low-high range, so a bin receives the fraction of the candle that overlaps
+  it and the profile sums to the traded volume (the previous implementation
+  added a candle's full volume to every bin it touched)
+- 'close': each candle's volume is placed at its close
+- tick_profile(): trade-level prices and sizes binned directly
+
+Cost is O(n + bins): the partially covered end bins of every candle are
+scattered with np.bincount and the fully covered bins in between are added
+with a difference array and one cumulative sum, instead of one mask over
+the whole frame per bin.
+
+symbol_profiles() builds the profiles of many symbols in the same single
+pass by offsetting every symbol into its own block of bins.
+
+VolumeProfile keeps a profile on a fixed-width price grid, so new candles
+(and corrections of a still-forming candle) are added incrementally; the
+grid grows when price leaves the current range.
+
+Usage:
+    result = volume_profile.profile_from_frame(df, bins=20)
+    profile = VolumeProfile.from_candles(high, low, close, volume, bins=20)
+    profile.add(new_high, new_low, new_close, new_volume)
+    profile.to_dict()
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MODES = ('range', 'close')
+
+
+def _as_arrays(*columns) -> List[np.ndarray]:
+    return [np.asarray(column, dtype=np.float64).ravel() for column in columns]
+
+
+def _distribute(start: np.ndarray, stop: np.ndarray, volume: np.ndarray, offset: np.ndarray,
+                nbins: np.ndarray, size: int) -> np.ndarray:
+    """
+    Spread volume uniformly over [start, stop] in bin coordinates (bin j spans [j, j + 1)).
+
+    offset / nbins place each candle in its own block of bins (one block per
+    symbol); coordinates are clipped to the block. Returns `size` bin volumes.
+    """
+    start = np.clip(start, 0.0, nbins)
+    stop = np.clip(stop, start, nbins)
+    first = np.minimum(np.floor(start), nbins - 1).astype(np.int64)
+    last = np.minimum(np.floor(stop), nbins - 1).astype(np.int64)
+    span = stop - start
+
+    single = last == first
+    out = np.zeros(size)
+    out += np.bincount(offset[single] + first[single], volume[single], minlength=size)
+
+    multi = ~single
+    if multi.any():
+        start, stop, first, last = start[multi], stop[multi], first[multi], last[multi]
+        density = volume[multi] / span[multi]
+        base = offset[multi]
+        # Partially covered end bins
+        out += np.bincount(base + first, density * (first + 1 - start), minlength=size)
+        out += np.bincount(base + last, density * (stop - last), minlength=size)
+        # Fully covered bins first+1 .. last-1 receive `density` each
+        diff = np.bincount(base + first + 1, density, minlength=size + 1)
+        diff -= np.bincount(base + last, density, minlength=size + 1)
+        out += np.maximum(np.cumsum(diff)[:size], 0.0)
+    return out
+
+
+def _bin_volumes(high, low, close, volume, origin, width, nbins, offset, size, mode) -> np.ndarray:
+    if mode not in MODES:
+        raise ValueError(f"Unknown volume profile mode: {mode} (expected one of {MODES})")
+    if mode == 'close':
+        position = np.clip(np.floor((close - origin) / width), 0, nbins - 1).astype(np.int64)
+        return np.bincount(offset + position, volume, minlength=size).astype(np.float64)
+    return _distribute((low - origin) / width, (high - origin) / width, volume, offset, nbins, size)
+
+
+def _valid(high, low, close, volume) -> np.ndarray:
+    return np.isfinite(high) & np.isfinite(low) & np.isfinite(close) & np.isfinite(volume) & (volume > 0)
+
+
+def price_edges(low, high, bins: int) -> np.ndarray:
+    """bins + 1 evenly spaced edges from the lowest low to the highest high."""
+    price_min, price_max = float(np.nanmin(low)), float(np.nanmax(high))
+    if price_max <= price_min:
+        price_max = price_min + max(abs(price_min) * 1e-9, 1e-12)
+    return np.linspace(price_min, price_max, bins + 1)
+
+
+def compute_profile(high, low, close, volume, bins: int = 20, mode: str = 'range',
+                    edges: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """
+    Volume per price bin for one symbol.
+
+    Returns {'edges': (bins + 1,), 'volume': (bins,)}. edges must be evenly
+    spaced when given (defaults to the candles' own low-high range).
+    """
+    high, low, close, volume = _as_arrays(high, low, close, volume)
+    valid = _valid(high, low, close, volume)
+    high, low, close, volume = high[valid], low[valid], close[valid], volume[valid]
+    if edges is None:
+        if not len(high):
+            raise ValueError("No candles with volume to build a profile from")
+        edges = price_edges(low, high, bins)
+    edges = np.asarray(edges, dtype=np.float64)
+    nbins = len(edges) - 1
+    width = (edges[-1] - edges[0]) / nbins
+    offset = np.zeros(len(high), dtype=np.int64)
+    volumes = _bin_volumes(high, low, close, volume, edges[0], width, np.full(len(high), nbins), offset, nbins, mode)
+    return {'edges': edges, 'volume': volumes}
+
+
+def tick_profile(prices, sizes, bins: int = 20, edges: Optional[np.ndarray] = None) -> Dict[str, np.ndarray]:
+    """Volume per price bin from individual trades."""
+    prices, sizes = _as_arrays(prices, sizes)
+    valid = np.isfinite(prices) & np.isfinite(sizes)
+    prices, sizes = prices[valid], sizes[valid]
+    if edges is None:
+        edges = price_edges(prices, prices, bins)
+    edges = np.asarray(edges, dtype=np.float64)
+    nbins = len(edges) - 1
+    width = (edges[-1] - edges[0]) / nbins
+    position = np.clip(np.floor((prices - edges[0]) / width), 0, nbins - 1).astype(np.int64)
+    return {'edges': edges, 'volume': np.bincount(position, sizes, minlength=nbins).astype(np.float64)}
+
+
+def symbol_profiles(df: pd.DataFrame, bins: int = 20, mode: str = 'range',
+                    symbol_column: str = 'symbol') -> Dict[str, Dict[str, np.ndarray]]:
+    """
+    Profiles of many symbols from one long frame (symbol, high, low, close, volume).
+
+    Every symbol gets `bins` bins over its own low-high range; all candles
+    are binned in one pass.
+    """
+    high, low, close, volume = _as_arrays(df['high'], df['low'], df['close'], df['volume'])
+    valid = _valid(high, low, close, volume)
+    codes, symbols = pd.factorize(df[symbol_column])
+    codes = np.asarray(codes)[valid]
+    high, low, close, volume = high[valid], low[valid], close[valid], volume[valid]
+
+    count = len(symbols)
+    price_min = np.full(count, np.inf)
+    price_max = np.full(count, -np.inf)
+    np.minimum.at(price_min, codes, low)
+    np.maximum.at(price_max, codes, high)
+    present = np.isfinite(price_min)
+    price_min[~present] = price_max[~present] = 0.0
+    flat = price_max <= price_min
+    price_max[flat] = price_min[flat] + np.maximum(np.abs(price_min[flat]) * 1e-9, 1e-12)
+    width = (price_max - price_min) / bins
+
+    volumes = _bin_volumes(high, low, close, volume, price_min[codes], width[codes],
+                           np.full(len(codes), bins), codes * bins, count * bins, mode).reshape(count, bins)
+    return {
+        symbol: {
+            'edges': price_min[i] + width[i] * np.arange(bins + 1),
+            'volume': volumes[i],
+        }
+        for i, symbol in enumerate(symbols) if present[i]
+    }
+
+
+def profile_to_dict(edges: np.ndarray, volumes: np.ndarray) -> Dict[str, Any]:
+    """{'profile': [{price_low, price_high, volume}], 'poc': <bin with the most volume>}."""
+    profile = [
+        {'price_low': float(low), 'price_high': float(high), 'volume': float(volume)}
+        for low, high, volume in zip(edges[:-1], edges[1:], volumes)
+    ]
+    return {
+        'profile': profile,
+        'poc': profile[int(np.argmax(volumes))] if profile else None,  # Point of Control
+    }
+
+
+def profile_from_frame(df: pd.DataFrame, bins: int = 20, mode: str = 'range') -> Dict[str, Any]:
+    """Volume profile of an OHLCV frame in the API/task output format."""
+    result = compute_profile(df['high'], df['low'], df['close'], df['volume'], bins, mode)
+    return profile_to_dict(result['edges'], result['volume'])
+
+
+class VolumeProfile:
+    """
+    Incrementally updated profile on a fixed-width price grid.
+
+    Bin k spans [origin + k * width, origin + (k + 1) * width). Adding a
+    candle outside the current range extends the grid instead of rebinning,
+    so the result equals a profile built from all candles at once.
+    """
+
+    def __init__(self, origin: float, width: float, mode: str = 'range'):
+        if width <= 0:
+            raise ValueError("Bin width must be positive")
+        if mode not in MODES:
+            raise ValueError(f"Unknown volume profile mode: {mode} (expected one of {MODES})")
+        self.origin = float(origin)
+        self.width = float(width)
+        self.mode = mode
+        self.volumes = np.zeros(0)
+
+    @classmethod
+    def from_candles(cls, high, low, close, volume, bins: int = 20, mode: str = 'range') -> 'VolumeProfile':
+        """Profile whose initial range is split into `bins` bins."""
+        high, low = _as_arrays(high, low)
+        edges = price_edges(low, high, bins)
+        profile = cls(edges[0], edges[1] - edges[0], mode)
+        profile.add(high, low, close, volume)
+        return profile
+
+    @property
+    def edges(self) -> np.ndarray:
+        return self.origin + self.width * np.arange(len(self.volumes) + 1)
+
+    def _extend(self, price_min: float, price_max: float):
+        below = max(int(np.ceil((self.origin - price_min) / self.width)), 0)
+        top = self.origin + self.width * len(self.volumes)
+        above = max(int(np.ceil((price_max - top) / self.width)), 0)
+        if not len(self.volumes):
+            above = max(above, 1)
+        if below or above:
+            self.volumes = np.concatenate([np.zeros(below), self.volumes, np.zeros(above)])
+            self.origin -= below * self.width
+
+    def add(self, high, low, close, volume, sign: float = 1.0) -> 'VolumeProfile':
+        """Add candles (sign=-1 removes them, e.g. to replace a still-forming candle)."""
+        high, low, close, volume = _as_arrays(high, low, close, volume)
+        valid = _valid(high, low, close, volume)
+        high, low, close, volume = high[valid], low[valid], close[valid], volume[valid]
+        if not len(high):
+            return self
+        self._extend(float(low.min()), float(high.max()))
+        nbins = len(self.volumes)
+        self.volumes += sign * _bin_volumes(high, low, close, volume, self.origin, self.width,
+                                            np.full(len(high), nbins), np.zeros(len(high), dtype=np.int64),
+                                            nbins, self.mode)
+        return self
+
+    def remove(self, high, low, close, volume) -> 'VolumeProfile':
+        return self.add(high, low, close, volume, sign=-1.0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return profile_to_dict(self.edges, self.volumes)
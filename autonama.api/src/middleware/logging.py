@@ -1,79 +1,92 @@
 import time
 import uuid
-from typing import Callable
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 from src.core.logging import get_logger
+from src.core.request_metrics import RequestMetrics, request_metrics
 
 logger = get_logger("autonama.middleware")
 
-class LoggingMiddleware(BaseHTTPMiddleware):
-    """Middleware to log HTTP requests and responses"""
-    
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        # Generate request ID
+class LoggingMiddleware:
+    """
+    Log HTTP requests and record their latency per route
+
+    Plain ASGI middleware: no per-request task or response stream wrapping
+    (which BaseHTTPMiddleware adds), only the status is read from the
+    response start message. Log records go through the queue handler set up
+    in src.core.logging, so no log I/O happens on the event loop.
+    """
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics = request_metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Generate request ID (available to endpoints as request.state.request_id)
         request_id = str(uuid.uuid4())
-        request.state.request_id = request_id
-        
-        # Start time
-        start_time = time.time()
-        
-        # Log request
-        logger.info(
-            "HTTP request started",
-            extra={
-                "extra_fields": {
-                    "request_id": request_id,
-                    "method": request.method,
-                    "url": str(request.url),
-                    "endpoint": request.url.path,
-                    "client_ip": request.client.host if request.client else None,
-                    "user_agent": request.headers.get("user-agent")
-                }
-            }
-        )
-        
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
         try:
-            # Process request
-            response = await call_next(request)
-            
-            # Calculate duration
-            duration = (time.time() - start_time) * 1000
-            
-            # Log response
-            logger.info(
-                "HTTP request completed",
-                extra={
-                    "extra_fields": {
-                        "request_id": request_id,
-                        "method": request.method,
-                        "endpoint": request.url.path,
-                        "status_code": response.status_code,
-                        "duration_ms": round(duration, 2)
-                    }
-                }
-            )
-            
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
         except Exception as e:
-            # Calculate duration
-            duration = (time.time() - start_time) * 1000
-            
+            duration = time.perf_counter() - start_time
+            route = self._route_template(scope)
+            self.metrics.observe(scope["method"], route, 500, duration)
+
             # Log error
             logger.error(
                 f"HTTP request failed: {str(e)}",
                 extra={
                     "extra_fields": {
                         "request_id": request_id,
-                        "method": request.method,
-                        "endpoint": request.url.path,
-                        "duration_ms": round(duration, 2),
+                        "method": scope["method"],
+                        "endpoint": scope["path"],
+                        "route": route,
+                        "duration_ms": round(duration * 1000, 2),
                         "error": str(e),
                         "error_type": type(e).__name__
                     }
                 },
                 exc_info=True
             )
-            
+
             raise
+
+        duration = time.perf_counter() - start_time
+        route = self._route_template(scope)
+        self.metrics.observe(scope["method"], route, status_code, duration)
+
+        # Log response
+        client = scope.get("client")
+        logger.info(
+            "HTTP request completed",
+            extra={
+                "extra_fields": {
+                    "request_id": request_id,
+                    "method": scope["method"],
+                    "endpoint": scope["path"],
+                    "route": route,
+                    "status_code": status_code,
+                    "duration_ms": round(duration * 1000, 2),
+                    "client_ip": client[0] if client else None
+                }
+            }
+        )
+
+    @staticmethod
+    def _route_template(scope: Scope):
+        """Path template of the matched route (set by the router), e.g. /api/v1/optimization/analytics/{symbol}"""
+        route = scope.get("route")
+        return getattr(route, "path", None)
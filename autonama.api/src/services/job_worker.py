@@ -0,0 +1,160 @@
+"""
+Optimization Job Worker
+
+Consumes the optimization job queue (src.core.job_queue) that the
+autonama optimization endpoints submit to, and runs each job with the cached
+optimizer (src.services.optimization_service.optimize_cached).
+
+- Interactive jobs (single asset) are always claimed before batch jobs
+- Progress is written to the job's status hash after every step, which also
+  keeps the stream entry from being reclaimed while the job is alive
+- Every RECLAIM_INTERVAL seconds the worker takes over entries left pending
+  by crashed workers
+
+Usage:
+    python -m src.services.job_worker
+"""
+
+import os
+import time
+import signal
+import socket
+import logging
+from typing import Any, Callable, Dict
+
+from src.core.channel_optimizer import SearchSpace
+from src.core.config import settings
+from src.core.database import get_redis
+from src.core.job_queue import JobQueue
+from src.services import optimization_service as service
+from src.services.queue_service import OPTIMIZATION_QUEUE
+
+logger = logging.getLogger(__name__)
+
+RECLAIM_INTERVAL = 60
+# days_back=0 means all available history
+MAX_DAYS_BACK = 3650
+
+
+def _search_space(parameters: Dict[str, Any]) -> SearchSpace:
+    return SearchSpace(**{'n_trials': parameters.get('n_trials', 10), **(parameters.get('search_space') or {})})
+
+
+def _days_back(parameters: Dict[str, Any]) -> int:
+    return parameters.get('days_back') or MAX_DAYS_BACK
+
+
+def run_single_asset(queue: JobQueue, job: Dict[str, Any]) -> Dict[str, Any]:
+    parameters = job['payload'].get('parameters', {})
+    symbol = parameters['symbol']
+
+    def progress(done, total):
+        queue.progress(job, 100.0 * done / total, f"Optimizing {symbol} step {done}/{total}")
+
+    result = service.optimize_cached(symbol, parameters.get('timeframe', '1d'), _days_back(parameters),
+                                     _search_space(parameters), progress)
+    best = result['best'] or {}
+    return {
+        'symbol': symbol,
+        'total_return': round(best.get('total_return', 0.0), 3),
+        'sharpe_ratio': round(best.get('sharpe_ratio', 0.0), 2),
+        'parameters': {k: best.get(k) for k in ('degree', 'kstd', 'lookback')},
+        'result': result
+    }
+
+
+def run_multi_asset(queue: JobQueue, job: Dict[str, Any]) -> Dict[str, Any]:
+    parameters = job['payload'].get('parameters', {})
+    timeframe = parameters.get('timeframe', '1d')
+    space = _search_space(parameters)
+    symbols = parameters.get('symbols') or service.default_symbols(timeframe, parameters.get('n_assets', 10))
+    results, failed = [], []
+
+    for i, symbol in enumerate(symbols):
+        queue.progress(job, 100.0 * i / len(symbols), f"Optimizing {symbol} ({i + 1}/{len(symbols)})")
+        try:
+            result = service.optimize_cached(symbol, timeframe, _days_back(parameters), space)
+            if result['best']:
+                results.append(result)
+        except Exception as e:
+            failed.append({'symbol': symbol, 'error': str(e)})
+
+    best = [r['best'] for r in results]
+    return {
+        'optimized_assets': len(results),
+        'failed_assets': failed,
+        'total_return': round(sum(b['total_return'] for b in best) / len(best), 3) if best else 0.0,
+        'sharpe_ratio': round(sum(b['sharpe_ratio'] for b in best) / len(best), 2) if best else 0.0,
+        'results': results
+    }
+
+
+HANDLERS: Dict[str, Callable[[JobQueue, Dict[str, Any]], Dict[str, Any]]] = {
+    'single_asset_optimization': run_single_asset,
+    'multi_asset_optimization': run_multi_asset,
+}
+
+
+class JobWorker:
+    def __init__(self, consumer: str = None):
+        self.queue = JobQueue(
+            get_redis(),
+            OPTIMIZATION_QUEUE,
+            maxlen=settings.JOB_QUEUE_MAXLEN,
+            history_ttl=settings.JOB_HISTORY_TTL
+        )
+        self.consumer = consumer or f"{socket.gethostname()}-{os.getpid()}"
+        self.running = True
+        self._last_reclaim = 0.0
+
+    def process(self, job: Dict[str, Any]):
+        handler = HANDLERS.get(job.get('job_type'))
+        if handler is None:
+            self.queue.fail(job, f"Unknown job type: {job.get('job_type')}")
+            return
+        logger.info(f"Running {job['job_type']} job {job['job_id']} ({job['lane']}, attempt {job['attempts']})")
+        started = time.perf_counter()
+        try:
+            result = handler(self.queue, job)
+        except Exception as e:
+            logger.error(f"Job {job['job_id']} failed: {e}")
+            self.queue.fail(job, str(e))
+            return
+        self.queue.complete(job, result)
+        logger.info(f"Job {job['job_id']} completed in {time.perf_counter() - started:.1f}s")
+
+    def next_jobs(self):
+        if time.monotonic() - self._last_reclaim >= RECLAIM_INTERVAL:
+            self._last_reclaim = time.monotonic()
+            jobs = self.queue.reclaim(self.consumer, settings.JOB_RECLAIM_IDLE_MS, settings.JOB_MAX_ATTEMPTS)
+            if jobs:
+                return jobs
+        return self.queue.claim(self.consumer)
+
+    def stop(self, *args):
+        self.running = False
+
+    def run(self):
+        logger.info(f"Starting job worker {self.consumer} on queue '{OPTIMIZATION_QUEUE}'")
+        while self.running:
+            try:
+                for job in self.next_jobs():
+                    self.process(job)
+            except Exception as e:
+                logger.error(f"Error in worker loop: {e}")
+                time.sleep(1)
+        logger.info(f"Job worker {self.consumer} stopped")
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    worker = JobWorker()
+    signal.signal(signal.SIGTERM, worker.stop)
+    try:
+        worker.run()
+    except KeyboardInterrupt:
+        logger.info("Worker stopped by user")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,346 @@
+"""
+On-demand Optimization Service
+
+Runs the polynomial-channel optimizer (src.core.channel_optimizer) for API
+requests without paying for the same optimization twice:
+
+- Results are cached under (symbol, timeframe, data version, search space),
+  in process and in Redis (cache:optimization:<key>), so a result stays valid
+  until new candles arrive or the search space changes
+- Concurrent requests for the same key share one in-flight computation
+  (single-flight): within a process through a shared future, across API
+  workers through a Redis lock whose holder publishes the result
+- Candidates are scored in chunks on a process pool; each finished chunk is
+  broadcast as progress on the /ws/optimization topic
+
+The Celery tasks in src.tasks.autonama_optimization and the job worker
+(src.services.job_worker) use the same data loading, cache keys and cache
+entries through optimize_cached().
+"""
+
+import json
+import time
+import asyncio
+import uuid
+import hashlib
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from src.core import channel_optimizer
+from src.core.config import settings
+from src.core.database import SessionLocal, get_redis
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "cache:optimization"
+LOCK_POLL_INTERVAL = 0.5
+MAX_LOCAL_RESULTS = 256
+
+# Deletes the lock only while it still holds this caller's token, so a holder
+# that outlived OPTIMIZATION_LOCK_TTL cannot release the next holder's lock
+RELEASE_LOCK_SCRIPT = """
+if redis.call('get', KEYS[1]) == ARGV[1] then
+    return redis.call('del', KEYS[1])
+end
+return 0
+"""
+
+
+def data_version(symbol: str, timeframe: str, lookback_days: int) -> Optional[str]:
+    """Cheap fingerprint of the candles an optimization would read (row count and last timestamp)."""
+    db = SessionLocal()
+    try:
+        row = db.execute(text("""
+            SELECT COUNT(*) AS n, MAX(timestamp) AS last_ts
+            FROM trading.ohlc_data
+            WHERE symbol = :symbol AND timeframe = :timeframe AND timestamp >= :since
+        """), {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'since': datetime.utcnow() - timedelta(days=lookback_days),
+        }).first()
+    finally:
+        db.close()
+    if not row or not row.n:
+        return None
+    return f"{row.n}:{row.last_ts.isoformat()}"
+
+
+def load_closes(symbol: str, timeframe: str, lookback_days: int) -> np.ndarray:
+    """Close prices, oldest first, as float64."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(text("""
+            SELECT close
+            FROM trading.ohlc_data
+            WHERE symbol = :symbol AND timeframe = :timeframe AND timestamp >= :since
+            ORDER BY timestamp
+        """), {
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'since': datetime.utcnow() - timedelta(days=lookback_days),
+        }).fetchall()
+    finally:
+        db.close()
+    return np.fromiter((float(r.close) for r in rows), dtype=np.float64, count=len(rows))
+
+
+def cache_key(symbol: str, timeframe: str, version: str, space: channel_optimizer.SearchSpace) -> str:
+    payload = json.dumps([symbol, timeframe, version, space.as_dict()], sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+
+def get_cached_result(key: str) -> Optional[Dict[str, Any]]:
+    try:
+        raw = get_redis().get(f"{CACHE_PREFIX}:{key}")
+        return json.loads(raw) if raw else None
+    except Exception as e:
+        logger.warning(f"Optimization cache read failed: {e}")
+        return None
+
+
+def store_cached_result(key: str, result: Dict[str, Any]):
+    try:
+        get_redis().set(f"{CACHE_PREFIX}:{key}", json.dumps(result, default=str),
+                        ex=settings.OPTIMIZATION_CACHE_TTL)
+    except Exception as e:
+        logger.warning(f"Optimization cache write failed: {e}")
+
+
+def chunk_candidates(candidates: List, n_chunks: int) -> List[List]:
+    size = max(1, -(-len(candidates) // max(1, n_chunks)))
+    return [candidates[i:i + size] for i in range(0, len(candidates), size)]
+
+
+def build_result(symbol: str, timeframe: str, version: str, space: channel_optimizer.SearchSpace,
+                 close: np.ndarray, scored: List[Dict], started: float) -> Dict[str, Any]:
+    """Cache entry for a finished optimization."""
+    best = channel_optimizer.best_result(scored)
+    snapshot = None
+    if best:
+        snapshot = channel_optimizer.channel_snapshot(close, best['degree'], best['kstd'], best['lookback'])
+    return {
+        'symbol': symbol,
+        'timeframe': timeframe,
+        'data_version': version,
+        'search_space': space.as_dict(),
+        'data_points': int(close.size),
+        'trials_scored': len(scored),
+        'best': best,
+        'snapshot': snapshot,
+        'compute_s': round(time.perf_counter() - started, 3),
+        'computed_at': datetime.utcnow().isoformat(),
+    }
+
+
+def run_optimization(symbol: str, timeframe: str, lookback_days: int,
+                     space: channel_optimizer.SearchSpace, version: Optional[str] = None,
+                     progress: Optional[Callable[[int, int], None]] = None, n_chunks: int = 4) -> Dict[str, Any]:
+    """Synchronous optimization in the calling process (Celery workers)."""
+    started = time.perf_counter()
+    version = version or data_version(symbol, timeframe, lookback_days)
+    if version is None:
+        raise ValueError(f"No {timeframe} data for {symbol}")
+    close = load_closes(symbol, timeframe, lookback_days)
+    candidates = channel_optimizer.candidate_grid(space, max_lookback=close.size)
+    chunks = chunk_candidates(candidates, n_chunks)
+
+    scored = []
+    for i, chunk in enumerate(chunks):
+        scored.extend(channel_optimizer.evaluate_batch(close, chunk))
+        if progress:
+            progress(i + 1, len(chunks))
+    return build_result(symbol, timeframe, version, space, close, scored, started)
+
+
+def optimize_cached(symbol: str, timeframe: str, days_back: int, space: channel_optimizer.SearchSpace,
+                    progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Any]:
+    """Cached result for the current data, or a fresh optimization stored in the cache (workers)."""
+    version = data_version(symbol, timeframe, days_back)
+    if version is None:
+        raise ValueError(f"No {timeframe} data for {symbol}")
+    key = cache_key(symbol, timeframe, version, space)
+    result = get_cached_result(key)
+    if result:
+        return {**result, 'source': 'cache'}
+    result = run_optimization(symbol, timeframe, days_back, space, version=version, progress=progress)
+    store_cached_result(key, result)
+    return {**result, 'source': 'computed'}
+
+
+def default_symbols(timeframe: str, n_assets: int) -> List[str]:
+    """First n_assets symbols with data on the timeframe (multi-asset runs without a symbol list)."""
+    db = SessionLocal()
+    try:
+        rows = db.execute(text("""
+            SELECT DISTINCT symbol FROM trading.ohlc_data
+            WHERE timeframe = :timeframe
+            ORDER BY symbol
+            LIMIT :limit
+        """), {'timeframe': timeframe, 'limit': n_assets}).fetchall()
+        return [row.symbol for row in rows]
+    finally:
+        db.close()
+
+
+class OptimizationService:
+    """Cached, single-flight optimizations on a shared process pool."""
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers or settings.OPTIMIZATION_WORKERS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self.stats = {'computed': 0, 'cache_hits': 0, 'coalesced': 0, 'failed': 0}
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        # spawn: forking a process that runs an event loop and DB pools is not safe
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+            )
+        return self._executor
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _remember(self, key: str, result: Dict[str, Any]):
+        self._results[key] = (time.monotonic(), result)
+        while len(self._results) > MAX_LOCAL_RESULTS:
+            self._results.pop(next(iter(self._results)))
+
+    def _local_result(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._results.get(key)
+        if entry and time.monotonic() - entry[0] < settings.OPTIMIZATION_CACHE_TTL:
+            return entry[1]
+        self._results.pop(key, None)
+        return None
+
+    async def optimize(self, symbol: str, timeframe: str = '1d', lookback_days: int = 365,
+                       space: Optional[channel_optimizer.SearchSpace] = None) -> Dict[str, Any]:
+        """
+        Optimization result for symbol/timeframe, computing it at most once per key.
+
+        The returned dict has a 'source' field: 'cache', 'coalesced' or 'computed'.
+        """
+        space = space or channel_optimizer.SearchSpace()
+        version = await asyncio.to_thread(data_version, symbol, timeframe, lookback_days)
+        if version is None:
+            raise ValueError(f"No {timeframe} data for {symbol}")
+        key = cache_key(symbol, timeframe, version, space)
+
+        result = self._local_result(key) or await asyncio.to_thread(get_cached_result, key)
+        if result:
+            self.stats['cache_hits'] += 1
+            if key not in self._results:
+                self._remember(key, result)
+            return {**result, 'source': 'cache'}
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats['coalesced'] += 1
+            return {**await asyncio.shield(inflight), 'source': 'coalesced'}
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            result, source = await self._compute_once(key, symbol, timeframe, lookback_days, space, version)
+            self._remember(key, result)
+            future.set_result(result)
+            return {**result, 'source': source}
+        except Exception as e:
+            self.stats['failed'] += 1
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved for requests that had none
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _compute_once(self, key: str, symbol: str, timeframe: str, lookback_days: int,
+                            space: channel_optimizer.SearchSpace, version: str) -> Tuple[Dict[str, Any], str]:
+        """Compute under the cross-worker Redis lock, or wait for the worker that holds it."""
+        lock_key = f"{CACHE_PREFIX}:lock:{key}"
+        token = uuid.uuid4().hex
+        redis_client = get_redis()
+        try:
+            acquired = await asyncio.to_thread(redis_client.set, lock_key, token,
+                                               nx=True, ex=settings.OPTIMIZATION_LOCK_TTL)
+        except Exception as e:
+            logger.warning(f"Optimization lock unavailable, computing locally: {e}")
+            acquired, redis_client = True, None
+
+        if not acquired:
+            deadline = time.monotonic() + settings.OPTIMIZATION_LOCK_TTL
+            while time.monotonic() < deadline:
+                await asyncio.sleep(LOCK_POLL_INTERVAL)
+                result = await asyncio.to_thread(get_cached_result, key)
+                if result:
+                    self.stats['coalesced'] += 1
+                    return result, 'coalesced'
+                if not await asyncio.to_thread(redis_client.exists, lock_key):
+                    break
+            # Holder died or timed out: compute here
+            logger.info(f"Optimization lock for {symbol} {timeframe} released without a result")
+
+        try:
+            result = await self._compute(key, symbol, timeframe, lookback_days, space, version)
+            await asyncio.to_thread(store_cached_result, key, result)
+            return result, 'computed'
+        finally:
+            if acquired and redis_client is not None:
+                try:
+                    await asyncio.to_thread(redis_client.eval, RELEASE_LOCK_SCRIPT, 1, lock_key, token)
+                except Exception as e:
+                    logger.warning(f"Could not release optimization lock: {e}")
+
+    async def _compute(self, key: str, symbol: str, timeframe: str, lookback_days: int,
+                       space: channel_optimizer.SearchSpace, version: str) -> Dict[str, Any]:
+        from src.api.v1.endpoints.websocket import broadcast_optimization_progress
+
+        started = time.perf_counter()
+        close = await asyncio.to_thread(load_closes, symbol, timeframe, lookback_days)
+        candidates = channel_optimizer.candidate_grid(space, max_lookback=close.size)
+        chunks = chunk_candidates(candidates, self.max_workers * 2)
+        progress = {'key': key, 'symbol': symbol, 'timeframe': timeframe, 'total': len(candidates)}
+
+        await broadcast_optimization_progress({**progress, 'status': 'started', 'completed': 0})
+        loop = asyncio.get_running_loop()
+
+        async def run_chunk(chunk):
+            return len(chunk), await loop.run_in_executor(
+                self.executor, channel_optimizer.evaluate_batch, close, chunk)
+
+        scored, completed = [], 0
+        for finished in asyncio.as_completed([run_chunk(chunk) for chunk in chunks]):
+            size, batch = await finished
+            scored.extend(batch)
+            completed += size
+            best = channel_optimizer.best_result(scored)
+            await broadcast_optimization_progress({
+                **progress, 'status': 'running', 'completed': completed,
+                'best_total_return': best['total_return'] if best else None,
+            })
+
+        result = build_result(symbol, timeframe, version, space, close, scored, started)
+        self.stats['computed'] += 1
+        await broadcast_optimization_progress({
+            **progress, 'status': 'completed', 'completed': len(candidates),
+            'best': result['best'], 'compute_s': result['compute_s'],
+        })
+        logger.info(f"Optimized {symbol} {timeframe}: {len(scored)}/{len(candidates)} candidates "
+                    f"in {result['compute_s']}s")
+        return result
+
+
+optimization_service = OptimizationService()
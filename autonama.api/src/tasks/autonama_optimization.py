@@ -2,37 +2,56 @@
 Autonama Optimization Tasks
 
 Celery tasks for running optimization algorithms
+
+Both tasks run the polynomial-channel optimizer in the worker and share the
+API's optimization cache (src.services.optimization_service), so a symbol
+already optimized on the current data is not computed again.
 """
 
 from celery import current_task
 from src.core.celery_app import celery_app
-import time
-import random
+from src.core.channel_optimizer import SearchSpace
+from src.services import optimization_service as service
+
+
+def _search_space(n_trials: int = 10, search_space: dict = None) -> SearchSpace:
+    return SearchSpace(**{'n_trials': n_trials, **(search_space or {})})
+
 
 @celery_app.task(bind=True)
-def run_autonama_optimization(self, **kwargs):
+def run_autonama_optimization(self, symbols: list = None, timeframe: str = '1d', days_back: int = 365,
+                              n_trials: int = 10, n_assets: int = 10, search_space: dict = None, **kwargs):
     """Run optimization for multiple assets"""
     try:
-        # Simulate optimization work
-        total_steps = 10
-        for i in range(total_steps):
+        space = _search_space(n_trials, search_space)
+        symbols = symbols or service.default_symbols(timeframe, n_assets)
+        results, failed = [], []
+
+        for i, symbol in enumerate(symbols):
             self.update_state(
                 state='PROGRESS',
                 meta={
                     'current': i + 1,
-                    'total': total_steps,
-                    'status': f'Optimizing step {i + 1}/{total_steps}'
+                    'total': len(symbols),
+                    'status': f'Optimizing {symbol} ({i + 1}/{len(symbols)})'
                 }
             )
-            time.sleep(1)  # Simulate work
-        
+            try:
+                result = service.optimize_cached(symbol, timeframe, days_back, space)
+                if result['best']:
+                    results.append(result)
+            except Exception as e:
+                failed.append({'symbol': symbol, 'error': str(e)})
+
+        best = [r['best'] for r in results]
         return {
             "status": "completed",
             "message": "Optimization completed successfully",
-            "optimized_assets": random.randint(5, 15),
-            "total_return": round(random.uniform(0.1, 0.25), 3),
-            "sharpe_ratio": round(random.uniform(1.0, 2.0), 2),
-            "max_drawdown": round(random.uniform(0.05, 0.15), 3)
+            "optimized_assets": len(results),
+            "failed_assets": failed,
+            "total_return": round(sum(b['total_return'] for b in best) / len(best), 3) if best else 0.0,
+            "sharpe_ratio": round(sum(b['sharpe_ratio'] for b in best) / len(best), 2) if best else 0.0,
+            "results": results
         }
     except Exception as e:
         return {
@@ -41,32 +60,33 @@ def run_autonama_optimization(self, **kwargs):
         }
 
 @celery_app.task(bind=True)
-def run_single_autonama_optimization(self, symbol: str, **kwargs):
+def run_single_autonama_optimization(self, symbol: str, timeframe: str = '1d', days_back: int = 365,
+                                     n_trials: int = 10, search_space: dict = None, **kwargs):
     """Run optimization for a single asset"""
     try:
-        # Simulate optimization work
-        total_steps = 5
-        for i in range(total_steps):
+        def progress(done, total):
             self.update_state(
                 state='PROGRESS',
                 meta={
-                    'current': i + 1,
-                    'total': total_steps,
-                    'status': f'Optimizing {symbol} step {i + 1}/{total_steps}'
+                    'current': done,
+                    'total': total,
+                    'status': f'Optimizing {symbol} step {done}/{total}'
                 }
             )
-            time.sleep(0.5)  # Simulate work
-        
+
+        result = service.optimize_cached(symbol, timeframe, days_back, _search_space(n_trials, search_space), progress)
+        best = result['best'] or {}
         return {
             "status": "completed",
             "message": f"Single optimization completed for {symbol}",
             "symbol": symbol,
-            "total_return": round(random.uniform(0.05, 0.20), 3),
-            "sharpe_ratio": round(random.uniform(0.8, 1.8), 2),
-            "max_drawdown": round(random.uniform(0.03, 0.12), 3)
+            "total_return": round(best.get('total_return', 0.0), 3),
+            "sharpe_ratio": round(best.get('sharpe_ratio', 0.0), 2),
+            "parameters": {k: best.get(k) for k in ('degree', 'kstd', 'lookback')},
+            "result": result
         }
     except Exception as e:
         return {
             "status": "failed",
             "message": f"Single optimization failed for {symbol}: {str(e)}"
-        } 
\ No newline at end of file
+        }
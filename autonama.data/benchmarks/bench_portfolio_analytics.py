@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Portfolio Analytics Benchmark
+
+Compares, on a synthetic returns matrix with missing bars:
+
+- loop:       the previous per-timestamp, per-symbol .loc loop of
+              calculate_portfolio_metrics
+- vectorised: utils/portfolio_analytics.evaluate_weights for one portfolio
+- batch:      evaluate_weights for --candidates weight vectors in one call,
+              against the same number of single-portfolio calls
+
+Usage:
+    python benchmarks/bench_portfolio_analytics.py
+    python benchmarks/bench_portfolio_analytics.py --days 720 --symbols 100 --candidates 5000
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, DATA_DIR)
+
+from utils import portfolio_analytics
+
+
+def loop_portfolio_returns(pivot_df: pd.DataFrame, symbols, weights) -> np.ndarray:
+    """The previous implementation (without renormalisation)."""
+    portfolio_returns = []
+    for timestamp in pivot_df.index:
+        weighted_return = 0
+        valid_weights = 0
+        for symbol, weight in zip(symbols, weights):
+            if symbol in pivot_df.columns and not pd.isna(pivot_df.loc[timestamp, symbol]):
+                weighted_return += pivot_df.loc[timestamp, symbol] * weight
+                valid_weights += weight
+        if valid_weights > 0:
+            portfolio_returns.append(weighted_return)
+    return np.array(portfolio_returns)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Portfolio analytics benchmark")
+    parser.add_argument("--days", type=int, default=720)
+    parser.add_argument("--symbols", type=int, default=50)
+    parser.add_argument("--candidates", type=int, default=2000)
+    parser.add_argument("--missing", type=float, default=0.05, help="Fraction of missing bars")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    symbols = [f"SYM{i}USDT" for i in range(args.symbols)]
+    values = rng.normal(0.001, 0.03, (args.days, args.symbols))
+    values[rng.random(values.shape) < args.missing] = np.nan
+    returns = pd.DataFrame(values, index=pd.date_range('2024-01-01', periods=args.days), columns=symbols)
+    weights = rng.random(args.symbols)
+    weights /= weights.sum()
+    candidates = rng.random((args.candidates, args.symbols))
+
+    _, loop_time = timed(loop_portfolio_returns, returns, symbols, weights)
+    _, vector_time = timed(portfolio_analytics.evaluate_weights, returns, weights)
+    print(f"One portfolio, {args.days} days x {args.symbols} symbols:")
+    print(f"  loop        {loop_time * 1000:10.1f} ms")
+    print(f"  vectorised  {vector_time * 1000:10.1f} ms  ({loop_time / vector_time:.0f}x)")
+
+    _, batch_time = timed(portfolio_analytics.evaluate_weights, returns, candidates)
+    start = time.perf_counter()
+    for row in candidates:
+        portfolio_analytics.evaluate_weights(returns, row)
+    single_time = time.perf_counter() - start
+    print(f"{args.candidates} candidate portfolios:")
+    print(f"  single calls {single_time:9.2f} s")
+    print(f"  one batch    {batch_time:9.2f} s  ({single_time / batch_time:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Volume Profile Benchmark
+
+Compares the previous per-bin mask implementation of calculate_volume_profile
+with utils/volume_profile.py on synthetic candles, for one symbol and for
+--symbols symbols at once (one symbol_profiles() call against a per-symbol
+loop of the old function).
+
+Usage:
+    python benchmarks/bench_volume_profile.py
+    python benchmarks/bench_volume_profile.py --candles 5000 --bins 100 --symbols 500
+"""
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, DATA_DIR)
+
+from utils import volume_profile
+
+
+def mask_volume_profile(df: pd.DataFrame, bins: int = 20):
+    """The previous implementation (full volume of a candle in every bin it touches)."""
+    price_bins = np.linspace(df['low'].min(), df['high'].max(), bins + 1)
+    profile = []
+    for i in range(len(price_bins) - 1):
+        overlapping = df[(df['low'] <= price_bins[i + 1]) & (df['high'] >= price_bins[i])]
+        profile.append({
+            'price_low': float(price_bins[i]),
+            'price_high': float(price_bins[i + 1]),
+            'volume': float(overlapping['volume'].sum())
+        })
+    return {'profile': profile, 'poc': max(profile, key=lambda x: x['volume'])}
+
+
+def check_format(df: pd.DataFrame, bins: int):
+    """The new output keeps the old keys, types and bin edges; only the volumes differ (no double counting)."""
+    old = mask_volume_profile(df, bins)
+    new = volume_profile.profile_from_frame(df, bins)
+    assert old.keys() == new.keys() and old['poc'].keys() == new['poc'].keys()
+    for old_bin, new_bin in zip(old['profile'], new['profile'], strict=True):
+        assert {k: type(v) for k, v in old_bin.items()} == {k: type(v) for k, v in new_bin.items()}
+        assert np.isclose(old_bin['price_low'], new_bin['price_low'])
+        assert np.isclose(old_bin['price_high'], new_bin['price_high'])
+    assert np.isclose(sum(b['volume'] for b in new['profile']), df['volume'].sum())
+
+
+def synthetic_candles(rng, candles: int) -> pd.DataFrame:
+    close = 100 + np.cumsum(rng.normal(0, 1, candles))
+    return pd.DataFrame({
+        'high': close + rng.random(candles) * 3,
+        'low': close - rng.random(candles) * 3,
+        'close': close,
+        'volume': rng.random(candles) * 1000,
+    })
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    fn(*args, **kwargs)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Volume profile benchmark")
+    parser.add_argument("--candles", type=int, default=2000)
+    parser.add_argument("--bins", type=int, default=50)
+    parser.add_argument("--symbols", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    df = synthetic_candles(rng, args.candles)
+    check_format(df, args.bins)
+
+    old = timed(mask_volume_profile, df, args.bins)
+    new = timed(volume_profile.profile_from_frame, df, args.bins)
+    print(f"One symbol, {args.candles} candles, {args.bins} bins:")
+    print(f"  per-bin masks {old * 1000:9.2f} ms")
+    print(f"  single pass   {new * 1000:9.2f} ms  ({old / new:.0f}x)")
+
+    frames = [synthetic_candles(rng, args.candles).assign(symbol=f"SYM{i}") for i in range(args.symbols)]
+    long_df = pd.concat(frames, ignore_index=True)
+    start = time.perf_counter()
+    for frame in frames:
+        mask_volume_profile(frame, args.bins)
+    old = time.perf_counter() - start
+    new = timed(volume_profile.symbol_profiles, long_df, args.bins)
+    print(f"{args.symbols} symbols:")
+    print(f"  per-symbol masks {old:8.2f} s")
+    print(f"  one pass         {new:8.2f} s  ({old / new:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
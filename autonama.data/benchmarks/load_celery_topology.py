@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Celery Topology Load Test
+
+Checks that the 5-minute price updates keep their cadence while a full
+optimization run saturates the workers, for two topologies:
+
+- shared: one prefork worker sized to the cores consuming every task (the
+          previous single default-queue worker)
+- split:  the queues from utils/task_queues.py, an I/O worker on a green
+          thread pool and a prefork CPU worker
+
+Time is compressed by --scale (default 100: the 300s price cadence becomes
+3s). Price updates are I/O-bound stand-ins (sleeping on the network),
+optimization tasks burn CPU. Tasks carry the production task names, so the
+split topology is routed by the real TASK_ROUTES.
+
+Runs without Redis: workers and producer share a kombu filesystem broker in
+a temp directory, and task start times are appended to a file there.
+
+Usage:
+    python benchmarks/load_celery_topology.py
+    python benchmarks/load_celery_topology.py --ticks 20 --optimizations 16 --opt-seconds 600
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import statistics
+import subprocess
+import tempfile
+from typing import Dict, List
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, DATA_DIR)
+
+from celery import Celery
+from kombu import Queue
+
+from utils.task_queues import CPU_COUNT, CPU_QUEUE, IO_QUEUE, QUEUE_PROFILES, celery_routes
+
+PRICE_TASK = 'tasks.current_prices_updater.update_current_prices'
+OPTIMIZATION_TASK = 'tasks.autonama_channels_tasks.optimize_asset'
+PRODUCTION_CADENCE = 300.0
+
+BROKER_DIR = os.getenv('LOAD_TEST_DIR', tempfile.gettempdir())
+TOPOLOGY = os.getenv('LOAD_TEST_TOPOLOGY', 'split')
+
+app = Celery('load_test', broker='filesystem://')
+app.conf.update(
+    broker_transport_options={
+        'data_folder_in': os.path.join(BROKER_DIR, 'broker'),
+        'data_folder_out': os.path.join(BROKER_DIR, 'broker'),
+        'processed_folder': os.path.join(BROKER_DIR, 'processed'),
+        'control_folder': os.path.join(BROKER_DIR, 'control'),
+        'store_processed': False,
+        'polling_interval': 0.05,
+    },
+    task_ignore_result=True,
+    task_serializer='json',
+    accept_content=['json'],
+    worker_hijack_root_logger=False,
+)
+if TOPOLOGY == 'split':
+    app.conf.update(task_queues=(Queue(IO_QUEUE), Queue(CPU_QUEUE)), task_default_queue=CPU_QUEUE,
+                    task_routes=celery_routes())
+else:
+    app.conf.update(task_queues=(Queue('celery'),), task_default_queue='celery')
+
+
+def _record(event: str, **fields):
+    with open(os.path.join(BROKER_DIR, 'events.jsonl'), 'a') as f:
+        f.write(json.dumps({'event': event, 'at': time.time(), **fields}) + '\n')
+
+
+@app.task(name=PRICE_TASK)
+def update_current_prices(scheduled_at: float, io_seconds: float):
+    _record('price_start', scheduled_at=scheduled_at)
+    time.sleep(io_seconds)  # waiting on the exchange API (cooperative under gevent)
+
+
+@app.task(name=OPTIMIZATION_TASK)
+def optimize_asset(cpu_seconds: float):
+    end = time.process_time() + cpu_seconds
+    x = 0.0
+    while time.process_time() < end:
+        for i in range(10000):
+            x += i * 0.5
+    return x
+
+
+def start_workers(topology: str, run_dir: str, io_pool: str) -> List[subprocess.Popen]:
+    env = {**os.environ, 'LOAD_TEST_DIR': run_dir, 'LOAD_TEST_TOPOLOGY': topology, 'PYTHONPATH': DATA_DIR}
+    base = [sys.executable, '-m', 'celery', '-A', 'benchmarks.load_celery_topology', 'worker',
+            '--loglevel=warning', '--without-gossip', '--without-mingle', '--without-heartbeat']
+    if topology == 'shared':
+        commands = [base + ['-n', 'shared@%h', '-Q', 'celery', '--pool=prefork',
+                            f'--concurrency={CPU_COUNT}', '--prefetch-multiplier=1']]
+    else:
+        io, cpu = QUEUE_PROFILES[IO_QUEUE], QUEUE_PROFILES[CPU_QUEUE]
+        commands = [
+            base + ['-n', 'io@%h', '-Q', IO_QUEUE, f'--pool={io_pool}',
+                    f'--concurrency={io.concurrency}', f'--prefetch-multiplier={io.prefetch_multiplier}'],
+            base + ['-n', 'cpu@%h', '-Q', CPU_QUEUE, '--pool=prefork',
+                    f'--concurrency={cpu.concurrency}', f'--prefetch-multiplier={cpu.prefetch_multiplier}'],
+        ]
+    return [subprocess.Popen(cmd, cwd=DATA_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+            for cmd in commands]
+
+
+def run_topology(topology: str, args) -> Dict:
+    """One topology, in a process whose app was configured for it (LOAD_TEST_DIR / LOAD_TEST_TOPOLOGY)."""
+    run_dir = BROKER_DIR
+    cadence = PRODUCTION_CADENCE / args.scale
+    workers = start_workers(topology, run_dir, args.io_pool)
+    try:
+        time.sleep(args.startup)
+        # The nightly run lands first and fills every CPU slot
+        for _ in range(args.optimizations):
+            optimize_asset.delay(args.opt_seconds / args.scale)
+        start = time.time()
+        for i in range(args.ticks):
+            scheduled_at = start + i * cadence
+            time.sleep(max(0.0, scheduled_at - time.time()))
+            update_current_prices.delay(scheduled_at, args.io_seconds / args.scale)
+        deadline = time.time() + cadence * 2 + args.opt_seconds / args.scale * args.optimizations
+        events = []
+        while time.time() < deadline:
+            events = _read_events(run_dir)
+            if len(events) >= args.ticks:
+                break
+            time.sleep(0.1)
+    finally:
+        for worker in workers:
+            worker.terminate()
+        for worker in workers:
+            try:
+                worker.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                worker.kill()
+
+    lateness = [e['at'] - e['scheduled_at'] for e in events]
+    missed = args.ticks - len(events)
+    result = {
+        'topology': topology,
+        'ticks': args.ticks,
+        'missed': missed,
+        'lateness_median_s': round(statistics.median(lateness) * args.scale, 1) if lateness else None,
+        'lateness_max_s': round(max(lateness) * args.scale, 1) if lateness else None,
+    }
+    # On time: every update started within --tolerance of a cadence after its slot
+    result['on_cadence'] = bool(lateness) and missed == 0 and \
+        max(lateness) * args.scale <= args.tolerance * PRODUCTION_CADENCE
+    return result
+
+
+def _read_events(run_dir: str) -> List[Dict]:
+    path = os.path.join(run_dir, 'events.jsonl')
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Celery topology load test')
+    parser.add_argument('--scale', type=float, default=100.0, help='Time compression factor')
+    parser.add_argument('--ticks', type=int, default=8, help='Price updates to schedule')
+    parser.add_argument('--optimizations', type=int, default=CPU_COUNT * 4,
+                        help='Optimization tasks in the full run')
+    parser.add_argument('--opt-seconds', type=float, default=600.0,
+                        help='CPU time per optimization task (production seconds)')
+    parser.add_argument('--io-seconds', type=float, default=20.0,
+                        help='Network wait per price update (production seconds)')
+    parser.add_argument('--io-pool', default=QUEUE_PROFILES[IO_QUEUE].pool,
+                        help='Pool for the I/O worker (gevent, eventlet or threads)')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='Allowed start delay as a fraction of the cadence')
+    parser.add_argument('--startup', type=float, default=4.0, help='Seconds to wait for workers')
+    parser.add_argument('--output', help='Write results as JSON')
+    parser.add_argument('--topology', choices=('shared', 'split'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.topology:
+        print(json.dumps(run_topology(args.topology, args)))
+        return 0
+
+    results = []
+    for topology in ('shared', 'split'):
+        run_dir = tempfile.mkdtemp(prefix=f'celery_load_{topology}_')
+        os.makedirs(os.path.join(run_dir, 'broker'))
+        os.makedirs(os.path.join(run_dir, 'processed'))
+        env = {**os.environ, 'LOAD_TEST_DIR': run_dir, 'LOAD_TEST_TOPOLOGY': topology}
+        try:
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), '--topology', topology] + sys.argv[1:],
+                                 env=env, check=True, capture_output=True, text=True).stdout
+        finally:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        results.append(json.loads(out.strip().splitlines()[-1]))
+
+    print(f"price cadence {PRODUCTION_CADENCE:.0f}s, {args.optimizations} optimizations x "
+          f"{args.opt_seconds:.0f}s CPU, {CPU_COUNT} cores, time scale 1:{args.scale:.0f}")
+    print(f"{'topology':<9} {'missed':>6} {'median late s':>14} {'max late s':>11} {'on cadence':>11}")
+    for r in results:
+        print(f"{r['topology']:<9} {r['missed']:>6} {str(r['lateness_median_s']):>14} "
+              f"{str(r['lateness_max_s']):>11} {str(r['on_cadence']):>11}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+    return 0 if results[-1]['on_cadence'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
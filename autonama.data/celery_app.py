@@ -1,7 +1,15 @@
 from celery import Celery
+from kombu import Queue
 import os
 from dotenv import load_dotenv
 from logging_config import setup_celery_logging, get_task_logger
+from utils.task_metrics import connect_task_signals
+from utils.database import connect_worker_signals
+from utils.task_queues import CPU_QUEUE, IO_QUEUE, QueueTimeLimits, celery_routes, patch_for_green_pool
+from utils.trading_universe import REFRESH_SECONDS as UNIVERSE_REFRESH_SECONDS
+
+# Before anything opens a database connection
+patch_for_green_pool()
 
 load_dotenv()
 
@@ -26,6 +34,10 @@ celery_app = Celery(
     include=[
         'tasks.binance_asset_loader',      # Top 100 crypto assets
         'tasks.current_prices_updater',    # Live price updates
+        'tasks.backtest_ingestion',        # Engine results, on run-completed messages
+        'tasks.analytics_tasks',           # Indicators, correlation and portfolio metrics
+        'tasks.backtest_scanner',          # Channel scans (needs autonama.engine on the path)
+        'tasks.optimization_ingestion',    # Optimization runs, on run-completed messages
         'tasks.maintenance'                # System maintenance
     ]
 )
@@ -40,23 +52,25 @@ celery_app.conf.update(
     task_track_started=True,
     task_time_limit=30 * 60,  # 30 minutes
     task_soft_time_limit=25 * 60,  # 25 minutes
+    # I/O and CPU queues, see utils/task_queues.py for the routes and the
+    # per-queue pool, concurrency, prefetch and time limits
+    task_queues=(Queue(IO_QUEUE), Queue(CPU_QUEUE)),
+    task_default_queue=CPU_QUEUE,
+    task_routes=celery_routes(),
+    task_annotations=(QueueTimeLimits(),),
     worker_prefetch_multiplier=1,
-    worker_max_tasks_per_child=1000,
+    # Prefork children are recycled on memory growth (--max-memory-per-child),
+    # not after a fixed task count that throws away warm caches
     # Beat scheduler configuration - SIMPLIFIED
     beat_schedule_filename=os.path.join(runtime_dir, 'celerybeat-schedule'),
     beat_schedule={
         # CRYPTO-ONLY TASKS
         
-        # Load top 100 Binance assets (every 6 hours)
+        # Refresh the trading universe (top Binance assets by volume), the
+        # one scheduled full-ticker fetch; everything else reads its snapshot
         'load-top-100-binance-assets': {
             'task': 'tasks.binance_asset_loader.load_top_100_binance_assets',
-            'schedule': 21600.0,  # Every 6 hours (6 * 60 * 60 = 21600 seconds)
-        },
-        
-        # Refresh top 100 assets daily
-        'refresh-top-100-assets': {
-            'task': 'tasks.binance_asset_loader.refresh_top_100_assets',
-            'schedule': 86400.0,  # Daily (24 hours)
+            'schedule': float(UNIVERSE_REFRESH_SECONDS),  # UNIVERSE_REFRESH_SECONDS, hourly by default
         },
         
         # Update current prices every 5 minutes
@@ -78,12 +92,24 @@ celery_app.conf.update(
             'task': 'tasks.maintenance.optimize_database',
             'schedule': 604800.0,  # Weekly (7 days)
         },
+        
+        # Backtest results are ingested when the engine reports the run;
+        # this one-shot sweep only catches messages that never arrived
+        'sweep-backtest-results': {
+            'task': 'tasks.backtest_ingestion.monitor_backtest_results_directory',
+            'schedule': 3600.0,  # Hourly
+        },
     },
     # Logging configuration
     worker_hijack_root_logger=False,
     worker_log_color=False,
 )
 
+# Per-task timings (see utils/task_metrics.py)
+connect_task_signals()
+# Database pools: reset in forked children, closed on shutdown (see utils/database.py)
+connect_worker_signals()
+
 # Task execution hooks for logging
 @celery_app.task(bind=True)
 def debug_task(self):
@@ -94,7 +120,7 @@ logger.info("Celery app initialized with crypto-only focus", extra={
     "broker": celery_app.conf.broker_url, 
     "backend": celery_app.conf.result_backend,
     "focus": "crypto-only",
-    "removed": ["optimization", "multi-asset", "analytics", "backtest_ingestion"]
+    "removed": ["optimization", "multi-asset", "analytics"]
 })
 
 if __name__ == '__main__':
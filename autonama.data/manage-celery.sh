@@ -22,10 +22,12 @@ chmod 755 runtime/celery
 
 # Function to show usage
 show_usage() {
-    echo "Usage: $0 {worker|beat|flower|status|stop|restart|logs|clean}"
+    echo "Usage: $0 {worker|worker-io|worker-cpu|beat|flower|status|stop|restart|logs|clean}"
     echo ""
     echo "Commands:"
-    echo "  worker   - Start Celery worker"
+    echo "  worker     - Start a Celery worker for both queues (development)"
+    echo "  worker-io  - Start the I/O queue worker (gevent pool)"
+    echo "  worker-cpu - Start the CPU queue worker (prefork pool, autoscaling)"
     echo "  beat     - Start Celery beat scheduler"
     echo "  flower   - Start Flower monitoring"
     echo "  status   - Show Celery status"
@@ -42,10 +44,19 @@ start_worker() {
     celery -A celery_app worker \
         --loglevel=info \
         --concurrency=4 \
+        -Q io,cpu \
         --pidfile=runtime/celery/worker.pid \
         --logfile=runtime/celery/worker.log
 }
 
+# Function to start a worker for one queue (see utils/task_queues.py)
+start_queue_worker() {
+    echo -e "${GREEN}🚀 Starting Celery $1 worker...${NC}"
+    python -m utils.task_queues "$1" \
+        --pidfile=runtime/celery/worker-$1.pid \
+        --logfile=runtime/celery/worker-$1.log
+}
+
 # Function to start beat
 start_beat() {
     echo -e "${GREEN}🕐 Starting Celery Beat Scheduler...${NC}"
@@ -121,17 +132,19 @@ show_status() {
 stop_processes() {
     echo -e "${YELLOW}🛑 Stopping Celery processes...${NC}"
     
-    # Stop worker
-    if [ -f "runtime/celery/worker.pid" ]; then
-        PID=$(cat runtime/celery/worker.pid 2>/dev/null || echo "")
-        if [ -n "$PID" ] && kill -0 "$PID" 2>/dev/null; then
-            echo "Stopping worker (PID: $PID)..."
-            kill -TERM "$PID" 2>/dev/null || true
-            sleep 2
-            kill -KILL "$PID" 2>/dev/null || true
+    # Stop workers (combined and per-queue)
+    for PIDFILE in runtime/celery/worker.pid runtime/celery/worker-io.pid runtime/celery/worker-cpu.pid; do
+        if [ -f "$PIDFILE" ]; then
+            PID=$(cat "$PIDFILE" 2>/dev/null || echo "")
+            if [ -n "$PID" ] && kill -0 "$PID" 2>/dev/null; then
+                echo "Stopping worker (PID: $PID)..."
+                kill -TERM "$PID" 2>/dev/null || true
+                sleep 2
+                kill -KILL "$PID" 2>/dev/null || true
+            fi
+            rm -f "$PIDFILE"
         fi
-        rm -f runtime/celery/worker.pid
-    fi
+    done
     
     # Stop beat
     if [ -f "runtime/celery/celerybeat.pid" ]; then
@@ -202,6 +215,12 @@ case "${1:-}" in
     worker)
         start_worker
         ;;
+    worker-io)
+        start_queue_worker io
+        ;;
+    worker-cpu)
+        start_queue_worker cpu
+        ;;
     beat)
         start_beat
         ;;
@@ -4,11 +4,17 @@ Optimization Ingestion Worker
 
 This worker processes optimization ingestion tasks from the queue.
 It scans the hotbox folder for latest export data and ingests it into PostgreSQL.
+
+Jobs come from the optimization_ingestion queue on Redis Streams
+(utils/job_queue.py), submitted by the API. Job status and results are
+written back to the queue, where the API reads them, and entries left
+pending by a crashed worker are reclaimed.
 """
 
 import os
 import sys
-import json
+import time
+import socket
 import logging
 import redis
 from datetime import datetime
@@ -18,6 +24,7 @@ from typing import Dict, Any
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from tasks.optimization_ingestion import OptimizationDataIngestion
+from utils.job_queue import JobQueue
 
 # Set up logging
 logging.basicConfig(
@@ -31,6 +38,11 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+RECLAIM_INTERVAL = 60
+RECLAIM_IDLE_MS = int(os.getenv('JOB_RECLAIM_IDLE_MS', '600000'))
+MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '3'))
+
+
 class OptimizationIngestionWorker:
     def __init__(self):
         """Initialize the worker"""
@@ -40,87 +52,81 @@ class OptimizationIngestionWorker:
             db=0,
             decode_responses=True
         )
-        self.queue_name = "optimization_ingestion_queue"
+        self.queue_name = "optimization_ingestion"
+        self.queue = JobQueue(
+            self.redis_client,
+            self.queue_name,
+            maxlen=int(os.getenv('JOB_QUEUE_MAXLEN', '10000')),
+            history_ttl=int(os.getenv('JOB_HISTORY_TTL', '604800'))
+        )
+        self.consumer = f"{socket.gethostname()}-{os.getpid()}"
         self.ingestion = OptimizationDataIngestion()
+        self._last_reclaim = 0.0
         
-    def process_job(self, job_message: Dict[str, Any]) -> Dict[str, Any]:
+    def process_job(self, job: Dict[str, Any]) -> Dict[str, Any]:
         """Process a single job"""
+        task_id = job['job_id']
         try:
-            logger.info(f"Processing job: {job_message['task_id']}")
-            
-            # Update job status to processing
-            self._update_job_status(job_message['task_id'], 'processing')
+            logger.info(f"Processing job: {task_id} (attempt {job['attempts']})")
             
             # Run the ingestion
+            self.queue.progress(job, 0, "Ingesting latest export")
             results = self.ingestion.ingest_latest_data()
             
             # Update job status to completed
-            self._update_job_status(job_message['task_id'], 'completed', results=results)
+            self.queue.complete(job, results)
             
-            logger.info(f"Job {job_message['task_id']} completed successfully")
+            logger.info(f"Job {task_id} completed successfully")
             return {
                 'status': 'success',
-                'task_id': job_message['task_id'],
+                'task_id': task_id,
                 'results': results,
                 'timestamp': datetime.now().isoformat()
             }
             
         except Exception as e:
-            logger.error(f"Error processing job {job_message['task_id']}: {e}")
+            logger.error(f"Error processing job {task_id}: {e}")
             
             # Update job status to failed
-            self._update_job_status(job_message['task_id'], 'failed', error=str(e))
+            self.queue.fail(job, str(e))
             
             return {
                 'status': 'error',
-                'task_id': job_message['task_id'],
+                'task_id': task_id,
                 'error': str(e),
                 'timestamp': datetime.now().isoformat()
             }
     
-    def _update_job_status(self, task_id: str, status: str, results: Dict = None, error: str = None):
-        """Update job status in database"""
-        try:
-            # This would typically update a database table
-            # For now, we'll just log the status
-            logger.info(f"Job {task_id} status updated to: {status}")
-            if results:
-                logger.info(f"Job {task_id} results: {results}")
-            if error:
-                logger.error(f"Job {task_id} error: {error}")
-        except Exception as e:
-            logger.error(f"Error updating job status: {e}")
+    def next_jobs(self):
+        """Jobs reclaimed from crashed workers first (checked every RECLAIM_INTERVAL), then new ones"""
+        if time.monotonic() - self._last_reclaim >= RECLAIM_INTERVAL:
+            self._last_reclaim = time.monotonic()
+            jobs = self.queue.reclaim(self.consumer, RECLAIM_IDLE_MS, MAX_ATTEMPTS)
+            if jobs:
+                return jobs
+        return self.queue.claim(self.consumer, block_ms=1000)
     
     def run(self):
         """Main worker loop"""
         logger.info("Starting Optimization Ingestion Worker")
-        logger.info(f"Listening on queue: {self.queue_name}")
+        logger.info(f"Listening on queue: {self.queue_name} as {self.consumer}")
         
         while True:
             try:
-                # Wait for a job
-                result = self.redis_client.brpop(self.queue_name, timeout=1)
-                
-                if result:
-                    queue_name, job_data = result
-                    job_message = json.loads(job_data)
-                    
-                    logger.info(f"Received job: {job_message['task_id']}")
+                for job in self.next_jobs():
+                    logger.info(f"Received job: {job['job_id']}")
                     
                     # Process the job
-                    result = self.process_job(job_message)
-                    
-                    logger.info(f"Job {job_message['task_id']} processed: {result['status']}")
+                    result = self.process_job(job)
                     
-                else:
-                    # No job available, continue loop
-                    continue
+                    logger.info(f"Job {job['job_id']} processed: {result['status']}")
                     
             except KeyboardInterrupt:
                 logger.info("Worker stopped by user")
                 break
             except Exception as e:
                 logger.error(f"Error in worker loop: {e}")
+                time.sleep(1)
                 continue
 
 def main():
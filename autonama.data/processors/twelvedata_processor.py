@@ -16,6 +16,13 @@ import os
 
 logger = logging.getLogger(__name__)
 
+# Market parameter per asset category
+CATEGORY_MARKETS = {
+    'stock': None,  # No market parameter needed for stocks
+    'forex': 'forex',
+    'commodity': 'commodity'
+}
+
 
 class TwelveDataProcessor:
     """
@@ -44,6 +51,8 @@ class TwelveDataProcessor:
         # Rate limiting (8 requests per minute for free tier, using 6 for safety)
         self.requests_per_minute = 6
         self.request_timestamps = []
+        # Error payload of the last failed request ({'code': 429, ...} when out of credits)
+        self.last_error: Optional[Dict[str, Any]] = None
         
         # API configuration
         self.base_url = "https://api.twelvedata.com"
@@ -70,19 +79,24 @@ class TwelveDataProcessor:
 
         self.request_timestamps.append(datetime.now())
     
-    def _make_request(self, endpoint: str, params: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    def _make_request(self, endpoint: str, params: Dict[str, Any],
+                      rate_limited: bool = True) -> Optional[Dict[str, Any]]:
         """
         Make API request with rate limiting and error handling.
         
         Args:
             endpoint: API endpoint
             params: Request parameters
+            rate_limited: Apply the per-minute request limiter (callers that
+                budget credits themselves, like fetch_time_series_batch, pass False)
             
         Returns:
             API response data or None on error
         """
+        self.last_error = None
         try:
-            self._wait_for_rate_limit()
+            if rate_limited:
+                self._wait_for_rate_limit()
             
             # Add API key to parameters
             params['apikey'] = self.api_key
@@ -98,11 +112,13 @@ class TwelveDataProcessor:
                 # Check for API errors
                 if 'status' in data and data['status'] == 'error':
                     logger.error(f"TwelveData API error: {data.get('message', 'Unknown error')}")
+                    self.last_error = data
                     return None
                 
                 return data
             else:
                 logger.error(f"HTTP error {response.status_code}: {response.text}")
+                self.last_error = {'code': response.status_code, 'message': response.text}
                 return None
                 
         except requests.exceptions.Timeout:
@@ -148,44 +164,110 @@ class TwelveDataProcessor:
                 logger.warning(f"No time series data for {symbol}")
                 return None
             
-            if not isinstance(data['values'], list):
-                logger.warning(f"Invalid time series format for {symbol}")
-                return None
-            
-            # Convert to DataFrame
-            df = pd.DataFrame(data['values'])
-            
-            if df.empty:
-                logger.warning(f"Empty time series data for {symbol}")
-                return None
-            
-            # Process datetime
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            df = df.set_index('datetime')
-            
-            # Convert OHLCV columns to numeric
-            numeric_columns = ['open', 'high', 'low', 'close', 'volume']
-            for col in numeric_columns:
-                if col in df.columns:
-                    df[col] = pd.to_numeric(df[col], errors='coerce')
-            
-            # Sort by datetime
-            df = df.sort_index()
-            
-            # Remove any rows with NaN values
-            df = df.dropna()
-            
-            if df.empty:
-                logger.warning(f"No valid data after cleaning for {symbol}")
-                return None
-            
-            logger.info(f"Successfully fetched {len(df)} rows for {symbol}")
+            df = self._values_to_frame(data['values'], symbol)
+            if df is not None:
+                logger.info(f"Successfully fetched {len(df)} rows for {symbol}")
             return df
             
         except Exception as e:
             logger.error(f"Error fetching time series for {symbol}: {str(e)}")
             return None
     
+    @staticmethod
+    def _values_to_frame(values: Any, symbol: str) -> Optional[pd.DataFrame]:
+        """Time series 'values' list as an OHLCV DataFrame indexed by datetime, oldest first."""
+        if not isinstance(values, list):
+            logger.warning(f"Invalid time series format for {symbol}")
+            return None
+        
+        # Convert to DataFrame
+        df = pd.DataFrame(values)
+        
+        if df.empty:
+            logger.warning(f"Empty time series data for {symbol}")
+            return None
+        
+        # Process datetime
+        df['datetime'] = pd.to_datetime(df['datetime'])
+        df = df.set_index('datetime')
+        
+        # Convert OHLCV columns to numeric
+        numeric_columns = ['open', 'high', 'low', 'close', 'volume']
+        for col in numeric_columns:
+            if col in df.columns:
+                df[col] = pd.to_numeric(df[col], errors='coerce')
+        
+        # Sort by datetime
+        df = df.sort_index()
+        
+        # Remove any rows with NaN values
+        df = df.dropna()
+        
+        if df.empty:
+            logger.warning(f"No valid data after cleaning for {symbol}")
+            return None
+        
+        return df
+    
+    def fetch_time_series_batch(self, symbols: List[str], interval: str = '1day',
+                                outputsize: int = 100, market: str = None) -> Dict[str, Any]:
+        """
+        Fetch time series for several symbols in one request.
+        
+        The time_series endpoint accepts a comma-separated symbol list and
+        charges one credit per symbol. No rate limiting is applied here;
+        callers budget credits (see utils/twelvedata_pipeline.py).
+        
+        Args:
+            symbols: Asset symbols
+            interval: Data interval (1day, 1h, etc.)
+            outputsize: Number of data points per symbol
+            market: Market type (optional)
+            
+        Returns:
+            {'frames': {symbol: DataFrame}, 'errors': {symbol: message}};
+            None when the whole request failed (see last_error)
+        """
+        params = {
+            'symbol': ','.join(symbols),
+            'interval': interval,
+            'outputsize': outputsize,
+        }
+        
+        if market:
+            params['market'] = market
+        
+        data = self._make_request('time_series', params, rate_limited=False)
+        if data is None:
+            return None
+        
+        # A single symbol comes back unwrapped
+        if len(symbols) == 1:
+            data = {symbols[0]: data}
+        
+        frames, errors = {}, {}
+        for symbol in symbols:
+            entry = data.get(symbol)
+            if not isinstance(entry, dict):
+                errors[symbol] = 'Missing from response'
+            elif entry.get('status') == 'error':
+                errors[symbol] = entry.get('message', 'Unknown error')
+            elif 'values' not in entry:
+                errors[symbol] = 'No data received'
+            else:
+                try:
+                    df = self._values_to_frame(entry['values'], symbol)
+                except Exception as e:
+                    logger.error(f"Error parsing time series for {symbol}: {str(e)}")
+                    df = None
+                if df is None:
+                    errors[symbol] = 'No valid data'
+                else:
+                    frames[symbol] = df
+        
+        logger.info(f"Fetched {len(frames)}/{len(symbols)} symbols in one time_series request")
+        return {'frames': frames, 'errors': errors}
+    
     def fetch_quote(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         Fetch real-time quote for a symbol.
@@ -258,12 +340,7 @@ class TwelveDataProcessor:
             logger.info(f"Updating {symbol} in {category}")
             
             # Determine market type for API
-            market_mapping = {
-                'stock': None,  # No market parameter needed for stocks
-                'forex': 'forex', 
-                'commodity': 'commodity'
-            }
-            market = market_mapping.get(category)
+            market = CATEGORY_MARKETS.get(category)
             
             # Fetch time series data
             df = self.fetch_time_series(symbol, "1day", outputsize=100, market=market)
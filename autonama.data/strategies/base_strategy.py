@@ -59,7 +59,11 @@ class BacktestEngine:
             
             if signals.empty:
                 return self._get_zero_metrics()
-            
+
+            # Strategies may return only the signal column; trade at the bar close
+            if 'close' not in signals.columns:
+                signals = signals.join(data['close'])
+
             # Execute trades
             for i, (timestamp, row) in enumerate(signals.iterrows()):
                 price = row['close']
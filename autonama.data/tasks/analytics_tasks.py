@@ -1,8 +1,8 @@
 """
 Advanced Analytics Tasks
 
-This module provides Celery tasks for advanced analytics using DuckDB
-for high-performance analytical processing across multiple asset types.
+This module provides Celery tasks for advanced analytics on the OHLC data
+in TimescaleDB across multiple asset types.
 
 Features:
 - Technical indicator calculations
@@ -19,10 +19,11 @@ from typing import List, Dict, Any, Optional, Union
 import logging
 import numpy as np
 from celery import Task
+from sqlalchemy import text
 
 from celery_app import celery_app
-from processors.duckdb_manager import DuckDBManager
-from utils.database import get_timescale_connection
+from utils.database import get_timescale_connection, get_engine
+from utils import portfolio_analytics, volume_profile, batch_workflows
 from models.asset_models import AssetType
 
 # Configure logging
@@ -43,7 +44,7 @@ def calculate_technical_indicators(
     lookback_days: int = 30
 ) -> Dict[str, Any]:
     """
-    Calculate technical indicators for a symbol using DuckDB
+    Calculate technical indicators for a symbol from TimescaleDB OHLC data
     
     Args:
         symbol: Asset symbol (e.g., 'BTC/USDT', 'AAPL')
@@ -57,8 +58,6 @@ def calculate_technical_indicators(
     start_time = datetime.now()
     
     try:
-        duckdb_manager = DuckDBManager()
-        
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=lookback_days)
@@ -73,22 +72,24 @@ def calculate_technical_indicators(
         }
         
         # Get base OHLC data
-        base_query = f"""
-        SELECT 
-            timestamp,
-            open,
-            high,
-            low,
-            close,
-            volume
-        FROM timescale.trading.ohlc_data 
-        WHERE symbol = '{symbol}'
-        AND timestamp >= '{start_date.isoformat()}'
-        AND timestamp <= '{end_date.isoformat()}'
-        ORDER BY timestamp
-        """
-        
-        df = duckdb_manager.execute_analytics_query(base_query)
+        with get_engine().connect() as conn:
+            rows = conn.execute(text("""
+                SELECT timestamp, open, high, low, close, volume
+                FROM trading.ohlc_data
+                WHERE symbol = :symbol
+                AND timeframe = :timeframe
+                AND timestamp >= :start_date
+                AND timestamp <= :end_date
+                ORDER BY timestamp
+            """), {
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'start_date': start_date,
+                'end_date': end_date
+            }).fetchall()
+        
+        df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
         
         if df.empty:
             raise ValueError(f"No data found for symbol {symbol}")
@@ -146,7 +147,8 @@ def calculate_cross_asset_correlation(
     self, 
     symbols: List[str], 
     lookback_days: int = 30,
-    method: str = 'pearson'
+    method: str = 'pearson',
+    timeframe: str = '1d'
 ) -> Dict[str, Any]:
     """
     Calculate correlation matrix between multiple assets
@@ -155,6 +157,7 @@ def calculate_cross_asset_correlation(
         symbols: List of asset symbols
         lookback_days: Number of days for correlation calculation
         method: Correlation method ('pearson', 'spearman', 'kendall')
+        timeframe: Bar timeframe the returns are computed from
         
     Returns:
         Dict with correlation matrix and statistics
@@ -162,86 +165,31 @@ def calculate_cross_asset_correlation(
     start_time = datetime.now()
     
     try:
-        duckdb_manager = DuckDBManager()
-        
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=lookback_days)
         
-        # Build query for all symbols
-        symbol_conditions = "', '".join(symbols)
-        
-        query = f"""
-        WITH price_data AS (
-            SELECT 
-                symbol,
-                timestamp,
-                close,
-                LAG(close) OVER (PARTITION BY symbol ORDER BY timestamp) as prev_close
-            FROM timescale.trading.ohlc_data 
-            WHERE symbol IN ('{symbol_conditions}')
-            AND timestamp >= '{start_date.isoformat()}'
-            AND timestamp <= '{end_date.isoformat()}'
-        ),
-        returns_data AS (
-            SELECT 
-                symbol,
-                timestamp,
-                close,
-                CASE 
-                    WHEN prev_close IS NOT NULL AND prev_close != 0 
-                    THEN (close - prev_close) / prev_close 
-                    ELSE 0 
-                END as return_pct
-            FROM price_data
-            WHERE prev_close IS NOT NULL
-        )
-        SELECT * FROM returns_data
-        ORDER BY timestamp, symbol
-        """
-        
-        df = duckdb_manager.execute_analytics_query(query)
+        pivot_df = portfolio_analytics.load_returns(get_engine(), symbols, start_date, end_date, timeframe)
         
-        if df.empty:
+        if pivot_df.empty:
             raise ValueError("No data found for correlation calculation")
         
-        # Pivot data for correlation calculation
-        pivot_df = df.pivot(index='timestamp', columns='symbol', values='return_pct')
-        
-        # Calculate correlation matrix
+        # Calculate correlation matrix (symbols without data stay NaN -> None)
         correlation_matrix = pivot_df.corr(method=method)
+        correlation_dict = {
+            symbol1: {
+                symbol2: (None if pd.isna(value) else float(value))
+                for symbol2, value in row.items()
+            }
+            for symbol1, row in correlation_matrix.to_dict(orient='index').items()
+        }
         
-        # Convert to dictionary format
-        correlation_dict = {}
-        for symbol1 in symbols:
-            correlation_dict[symbol1] = {}
-            for symbol2 in symbols:
-                if symbol1 in correlation_matrix.index and symbol2 in correlation_matrix.columns:
-                    correlation_dict[symbol1][symbol2] = float(correlation_matrix.loc[symbol1, symbol2])
-                else:
-                    correlation_dict[symbol1][symbol2] = None
-        
-        # Calculate additional statistics
-        avg_correlation = np.mean([
-            correlation_matrix.loc[s1, s2] 
-            for s1 in correlation_matrix.index 
-            for s2 in correlation_matrix.columns 
-            if s1 != s2 and not np.isnan(correlation_matrix.loc[s1, s2])
-        ])
-        
-        max_correlation = np.max([
-            correlation_matrix.loc[s1, s2] 
-            for s1 in correlation_matrix.index 
-            for s2 in correlation_matrix.columns 
-            if s1 != s2 and not np.isnan(correlation_matrix.loc[s1, s2])
-        ])
-        
-        min_correlation = np.min([
-            correlation_matrix.loc[s1, s2] 
-            for s1 in correlation_matrix.index 
-            for s2 in correlation_matrix.columns 
-            if s1 != s2 and not np.isnan(correlation_matrix.loc[s1, s2])
-        ])
+        # Statistics over the distinct off-diagonal pairs
+        values = correlation_matrix.to_numpy()
+        pairs = values[np.triu_indices_from(values, k=1)]
+        pairs = pairs[~np.isnan(pairs)]
+        if pairs.size == 0:
+            raise ValueError("Not enough overlapping data for correlation calculation")
         
         end_time = datetime.now()
         
@@ -255,10 +203,10 @@ def calculate_cross_asset_correlation(
             'duration_seconds': (end_time - start_time).total_seconds(),
             'correlation_matrix': correlation_dict,
             'statistics': {
-                'average_correlation': float(avg_correlation),
-                'max_correlation': float(max_correlation),
-                'min_correlation': float(min_correlation),
-                'data_points': len(df)
+                'average_correlation': float(pairs.mean()),
+                'max_correlation': float(pairs.max()),
+                'min_correlation': float(pairs.min()),
+                'data_points': int(pivot_df.count().sum())
             },
             'success': True
         }
@@ -281,98 +229,45 @@ def calculate_cross_asset_correlation(
 def calculate_portfolio_metrics(
     self, 
     portfolio: Dict[str, float], 
-    lookback_days: int = 30
+    lookback_days: int = 30,
+    timeframe: str = '1d',
+    confidence: float = 0.95
 ) -> Dict[str, Any]:
     """
-    Calculate portfolio performance metrics
+    Calculate portfolio performance and risk metrics
+    
+    Weights are normalised to a gross exposure of 1; on days where some
+    assets have no bar, the weights of the assets that do are renormalised
+    (see utils/portfolio_analytics.py).
     
     Args:
         portfolio: Dict of {symbol: weight} for portfolio composition
         lookback_days: Number of days for performance calculation
+        timeframe: Bar timeframe the returns are computed from
+        confidence: VaR / CVaR confidence level
         
     Returns:
-        Dict with portfolio metrics
+        Dict with portfolio metrics and risk decomposition
     """
     start_time = datetime.now()
     
     try:
-        duckdb_manager = DuckDBManager()
-        
         symbols = list(portfolio.keys())
-        weights = list(portfolio.values())
-        
-        # Normalize weights
-        total_weight = sum(weights)
-        if total_weight != 1.0:
-            weights = [w / total_weight for w in weights]
-            logger.info(f"Normalized portfolio weights to sum to 1.0")
+        weights = np.array(list(portfolio.values()), dtype=np.float64)
         
         # Calculate date range
         end_date = datetime.now()
         start_date = end_date - timedelta(days=lookback_days)
         
-        # Get price data for all symbols
-        symbol_conditions = "', '".join(symbols)
-        
-        query = f"""
-        WITH price_data AS (
-            SELECT 
-                symbol,
-                timestamp,
-                close,
-                LAG(close) OVER (PARTITION BY symbol ORDER BY timestamp) as prev_close
-            FROM timescale.trading.ohlc_data 
-            WHERE symbol IN ('{symbol_conditions}')
-            AND timestamp >= '{start_date.isoformat()}'
-            AND timestamp <= '{end_date.isoformat()}'
-        ),
-        returns_data AS (
-            SELECT 
-                symbol,
-                timestamp,
-                close,
-                CASE 
-                    WHEN prev_close IS NOT NULL AND prev_close != 0 
-                    THEN (close - prev_close) / prev_close 
-                    ELSE 0 
-                END as return_pct
-            FROM price_data
-            WHERE prev_close IS NOT NULL
-        )
-        SELECT * FROM returns_data
-        ORDER BY timestamp, symbol
-        """
-        
-        df = duckdb_manager.execute_analytics_query(query)
+        returns = portfolio_analytics.load_returns(get_engine(), symbols, start_date, end_date, timeframe)
         
-        if df.empty:
+        if returns.empty:
             raise ValueError("No data found for portfolio calculation")
         
-        # Pivot data
-        pivot_df = df.pivot(index='timestamp', columns='symbol', values='return_pct')
-        
-        # Calculate weighted portfolio returns
-        portfolio_returns = []
-        for timestamp in pivot_df.index:
-            weighted_return = 0
-            valid_weights = 0
-            
-            for symbol, weight in zip(symbols, weights):
-                if symbol in pivot_df.columns and not pd.isna(pivot_df.loc[timestamp, symbol]):
-                    weighted_return += pivot_df.loc[timestamp, symbol] * weight
-                    valid_weights += weight
-            
-            if valid_weights > 0:
-                portfolio_returns.append(weighted_return)
-        
-        portfolio_returns = np.array(portfolio_returns)
-        
-        # Calculate metrics
-        total_return = np.prod(1 + portfolio_returns) - 1
-        annualized_return = (1 + total_return) ** (365 / lookback_days) - 1
-        volatility = np.std(portfolio_returns) * np.sqrt(365)  # Annualized
-        sharpe_ratio = annualized_return / volatility if volatility > 0 else 0
-        max_drawdown = calculate_max_drawdown(portfolio_returns)
+        metrics = portfolio_analytics.evaluate_weights(
+            returns, weights, years=lookback_days / 365, confidence=confidence)
+        risk = portfolio_analytics.risk_decomposition(returns, weights, symbols, confidence=confidence)
+        portfolio_returns = portfolio_analytics.portfolio_returns(returns, weights)
         
         end_time = datetime.now()
         
@@ -384,13 +279,14 @@ def calculate_portfolio_metrics(
             'end_time': end_time.isoformat(),
             'duration_seconds': (end_time - start_time).total_seconds(),
             'metrics': {
-                'total_return': float(total_return),
-                'annualized_return': float(annualized_return),
-                'volatility': float(volatility),
-                'sharpe_ratio': float(sharpe_ratio),
-                'max_drawdown': float(max_drawdown),
-                'data_points': len(portfolio_returns)
+                'total_return': float(metrics['total_return'][0]),
+                'annualized_return': float(metrics['annualized_return'][0]),
+                'volatility': float(metrics['volatility'][0]),
+                'sharpe_ratio': float(metrics['sharpe_ratio'][0]),
+                'max_drawdown': float(metrics['max_drawdown'][0]),
+                'data_points': int(metrics['data_points'][0])
             },
+            'risk': risk,
             'daily_returns': portfolio_returns.tolist(),
             'success': True
         }
@@ -409,6 +305,102 @@ def calculate_portfolio_metrics(
             'end_time': datetime.now().isoformat()
         }
 
+@celery_app.task(bind=True, base=AnalyticsTask)
+def evaluate_portfolio_candidates(
+    self,
+    symbols: List[str],
+    candidate_weights: List[List[float]],
+    lookback_days: int = 30,
+    timeframe: str = '1d',
+    rank_by: str = 'sharpe_ratio',
+    top_n: int = 10
+) -> Dict[str, Any]:
+    """
+    Score many candidate allocations over the same symbols in one call
+    
+    The returns are loaded once and every candidate is evaluated with the
+    same matrix operations as calculate_portfolio_metrics, so allocation
+    search can submit thousands of weight vectors per task.
+    
+    Args:
+        symbols: Asset symbols, in the column order of the weight vectors
+        candidate_weights: List of weight vectors (one weight per symbol)
+        lookback_days: Number of days for performance calculation
+        timeframe: Bar timeframe the returns are computed from
+        rank_by: Metric to rank candidates by (volatility, var and cvar rank lowest first)
+        top_n: Number of best candidates to return with their weights
+        
+    Returns:
+        Dict with the top candidates and summary statistics of all candidates
+    """
+    start_time = datetime.now()
+    
+    try:
+        weights = np.asarray(candidate_weights, dtype=np.float64)
+        if weights.ndim != 2 or weights.shape[1] != len(symbols):
+            raise ValueError(f"candidate_weights must be a list of {len(symbols)}-element weight vectors")
+        
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=lookback_days)
+        
+        returns = portfolio_analytics.load_returns(get_engine(), symbols, start_date, end_date, timeframe)
+        
+        if returns.empty:
+            raise ValueError("No data found for portfolio calculation")
+        
+        metrics = portfolio_analytics.evaluate_weights(returns, weights, years=lookback_days / 365)
+        if rank_by not in metrics:
+            raise ValueError(f"Unknown ranking metric: {rank_by}")
+        
+        # Higher is better, except for losses (VaR / CVaR are positive losses)
+        score = -metrics[rank_by] if rank_by in ('var', 'cvar', 'volatility') else metrics[rank_by]
+        order = np.argsort(-np.nan_to_num(score, nan=-np.inf))[:top_n]
+        top = [
+            {
+                'index': int(i),
+                'weights': dict(zip(symbols, portfolio_analytics.normalize_weights(weights[i]).tolist())),
+                'metrics': {key: float(values[i]) for key, values in metrics.items()}
+            }
+            for i in order
+        ]
+        
+        end_time = datetime.now()
+        
+        results = {
+            'task_id': self.request.id,
+            'symbols': symbols,
+            'lookback_days': lookback_days,
+            'candidates': len(weights),
+            'rank_by': rank_by,
+            'start_time': start_time.isoformat(),
+            'end_time': end_time.isoformat(),
+            'duration_seconds': (end_time - start_time).total_seconds(),
+            'top_candidates': top,
+            'summary': {
+                key: {
+                    'min': float(np.nanmin(values)),
+                    'median': float(np.nanmedian(values)),
+                    'max': float(np.nanmax(values))
+                }
+                for key, values in metrics.items() if key != 'data_points'
+            },
+            'success': True
+        }
+        
+        logger.info(f"Evaluated {len(weights)} candidate portfolios over {len(symbols)} assets")
+        return results
+        
+    except Exception as e:
+        logger.error(f"Portfolio candidate evaluation failed: {e}", exc_info=True)
+        return {
+            'task_id': self.request.id,
+            'symbols': symbols,
+            'error': str(e),
+            'success': False,
+            'start_time': start_time.isoformat(),
+            'end_time': datetime.now().isoformat()
+        }
+
 # Helper functions for technical indicators
 def calculate_rsi(df: pd.DataFrame, period: int = 14) -> Dict[str, Any]:
     """Calculate RSI indicator"""
@@ -485,34 +477,9 @@ def calculate_ema(df: pd.DataFrame, periods: List[int] = [12, 26, 50]) -> Dict[s
     
     return ema_data
 
-def calculate_volume_profile(df: pd.DataFrame, bins: int = 20) -> Dict[str, Any]:
-    """Calculate Volume Profile"""
-    price_min = df['low'].min()
-    price_max = df['high'].max()
-    price_bins = np.linspace(price_min, price_max, bins + 1)
-    
-    volume_profile = []
-    for i in range(len(price_bins) - 1):
-        bin_low = price_bins[i]
-        bin_high = price_bins[i + 1]
-        
-        # Find candles that overlap with this price bin
-        overlapping = df[
-            (df['low'] <= bin_high) & (df['high'] >= bin_low)
-        ]
-        
-        total_volume = overlapping['volume'].sum()
-        
-        volume_profile.append({
-            'price_low': float(bin_low),
-            'price_high': float(bin_high),
-            'volume': float(total_volume)
-        })
-    
-    return {
-        'profile': volume_profile,
-        'poc': max(volume_profile, key=lambda x: x['volume'])  # Point of Control
-    }
+def calculate_volume_profile(df: pd.DataFrame, bins: int = 20, mode: str = 'range') -> Dict[str, Any]:
+    """Calculate Volume Profile (each candle's volume spread over its high-low range)"""
+    return volume_profile.profile_from_frame(df, bins=bins, mode=mode)
 
 def calculate_max_drawdown(returns: np.ndarray) -> float:
     """Calculate maximum drawdown"""
@@ -532,27 +499,77 @@ def store_indicator_results(symbol: str, indicators: Dict[str, Any]):
 
 # Batch processing tasks
 @celery_app.task(bind=True)
-def batch_calculate_indicators(self, symbols: List[str], indicators: List[str]) -> Dict[str, Any]:
-    """Calculate indicators for multiple symbols in batch"""
-    start_time = datetime.now()
-    results = {}
-    
-    for symbol in symbols:
+def calculate_indicators_chunk(self, symbols: List[str], indicators: List[str]) -> List[Dict[str, Any]]:
+    """Calculate indicators for one chunk of a batch, symbol by symbol in this worker"""
+    results = []
+    for index, symbol in enumerate(symbols):
+        self.update_state(state='PROGRESS', meta={'current': index, 'total': len(symbols), 'symbol': symbol})
         try:
-            result = calculate_technical_indicators.delay(symbol, indicators).get(timeout=120)
-            results[symbol] = result
+            results.append(calculate_technical_indicators(symbol, indicators))
         except Exception as e:
             logger.error(f"Failed to calculate indicators for {symbol}: {e}")
-            results[symbol] = {'error': str(e), 'success': False}
+            results.append({'symbol': symbol, 'error': str(e), 'success': False})
+    return results
+
+@celery_app.task(bind=True)
+def aggregate_indicator_batch(
+    self,
+    chunk_results: List[List[Dict[str, Any]]],
+    indicators: List[str],
+    start_time: str,
+    batch_task_id: Optional[str] = None
+) -> Dict[str, Any]:
+    """Chord callback of batch_calculate_indicators: collect the chunk results"""
+    results = {}
+    for chunk in chunk_results:
+        for result in chunk:
+            results[result['symbol']] = result
     
     end_time = datetime.now()
+    failed = sum(1 for result in results.values() if not result.get('success'))
+    logger.info(f"Indicator batch {batch_task_id}: {len(results) - failed}/{len(results)} symbols calculated")
     
     return {
-        'task_id': self.request.id,
-        'start_time': start_time.isoformat(),
+        'task_id': batch_task_id,
+        'start_time': start_time,
         'end_time': end_time.isoformat(),
-        'duration_seconds': (end_time - start_time).total_seconds(),
-        'symbols_processed': len(symbols),
+        'duration_seconds': (end_time - datetime.fromisoformat(start_time)).total_seconds(),
+        'symbols_processed': len(results),
+        'symbols_failed': failed,
         'indicators': indicators,
         'results': results
     }
+
+@celery_app.task(bind=True)
+def batch_calculate_indicators(
+    self,
+    symbols: List[str],
+    indicators: List[str],
+    max_concurrency: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    Calculate indicators for multiple symbols in batch
+    
+    Returns once the work is queued: the symbols run as at most
+    max_concurrency chunk subtasks under a chord whose callback,
+    aggregate_indicator_batch, collects the results (its result is
+    callback_id). batch_workflows.progress(batch_id, total) reports progress.
+    """
+    start_time = datetime.now()
+    
+    batch = batch_workflows.launch(
+        calculate_indicators_chunk,
+        symbols,
+        aggregate_indicator_batch.s(indicators=indicators, start_time=start_time.isoformat(),
+                                    batch_task_id=self.request.id),
+        chunk_kwargs={'indicators': indicators},
+        max_chunks=max_concurrency
+    )
+    
+    return {
+        'task_id': self.request.id,
+        'start_time': start_time.isoformat(),
+        'symbols_queued': len(symbols),
+        'indicators': indicators,
+        **batch
+    }
@@ -1,11 +1,16 @@
 import os
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from celery import shared_task
 from typing import Dict, List, Optional
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from redis.exceptions import WatchError
+
+from utils import db_pool
+from utils.database import get_redis
+from utils.redis_keyspace import namespaced_key
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +23,118 @@ DB_CONFIG = {
     'password': 'postgres'
 }
 
+# Where the engine's backtest results directory is mounted in this container
+RESULTS_DIR = os.getenv('BACKTEST_RESULTS_DIR', '/app/results')
+
+# Ingestion ledger: results file name -> claim / completion record
+LEDGER_KEY = namespaced_key('app', 'ingest_ledger', 'backtest_results')
+
+# A 'running' claim older than this belongs to a worker that died mid-ingestion
+CLAIM_TIMEOUT_SECONDS = int(os.getenv('INGEST_CLAIM_TIMEOUT_SECONDS', '1800'))
+
+
+def _is_stale(entry) -> bool:
+    """True for a 'running' ledger entry claimed more than CLAIM_TIMEOUT_SECONDS ago."""
+    if entry is None:
+        return False
+    try:
+        record = json.loads(entry)
+        claimed_at = datetime.fromisoformat(record['claimed_at'])
+    except (ValueError, KeyError, TypeError):
+        return False
+    return (record.get('status') == 'running'
+            and datetime.now() - claimed_at > timedelta(seconds=CLAIM_TIMEOUT_SECONDS))
+
+
+def _claim(redis_client, name: str, claim: Dict) -> bool:
+    """
+    Claim a file in the ingestion ledger. A stale 'running' claim is taken
+    over inside a WATCH transaction, so only one task wins it.
+    """
+    if redis_client.hsetnx(LEDGER_KEY, name, json.dumps(claim)):
+        return True
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(LEDGER_KEY)
+            if not _is_stale(pipe.hget(LEDGER_KEY, name)):
+                return False
+            pipe.multi()
+            pipe.hset(LEDGER_KEY, name, json.dumps(claim))
+            pipe.execute()
+        except WatchError:
+            return False
+    logger.warning(f"Took over stale ingestion claim on {name}")
+    return True
+
+
+def _store_results(results_file_path: str) -> Dict:
+    """Read one results file and upsert its alerts into trading.alerts."""
+    # Check if file exists
+    if not os.path.exists(results_file_path):
+        raise FileNotFoundError(f"Results file not found: {results_file_path}")
+    
+    # Load results from JSON file
+    with open(results_file_path, 'r') as f:
+        results = json.load(f)
+    
+    if not results:
+        logger.warning("No results found in file")
+        return {
+            'status': 'warning',
+            'message': 'No results found in file',
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    # Store results in database
+    stored_count = 0
+    error_count = 0
+    
+    with db_pool.postgres_connection(DB_CONFIG) as conn:
+        with conn.cursor() as cursor:
+            for result in results:
+                try:
+                    # Insert alert
+                    cursor.execute("""
+                        INSERT INTO trading.alerts 
+                        (symbol, interval, signal, current_price, upper_band, lower_band, 
+                         potential_return, created_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (symbol, interval, created_at::date) 
+                        DO UPDATE SET
+                            signal = EXCLUDED.signal,
+                            current_price = EXCLUDED.current_price,
+                            upper_band = EXCLUDED.upper_band,
+                            lower_band = EXCLUDED.lower_band,
+                            potential_return = EXCLUDED.potential_return,
+                            updated_at = NOW()
+                    """, (
+                        result['symbol'],
+                        result['interval'],
+                        result['signal'],
+                        result['current_price'],
+                        result['upper_band'],
+                        result['lower_band'],
+                        result['potential_return'],
+                        result['timestamp']
+                    ))
+                    stored_count += 1
+                    
+                except Exception as e:
+                    error_count += 1
+                    logger.error(f"Error storing result for {result.get('symbol', 'unknown')}: {e}")
+            
+            conn.commit()
+    
+    logger.info(f"Ingestion complete: {stored_count} stored, {error_count} errors")
+    
+    return {
+        'status': 'success',
+        'stored_count': stored_count,
+        'error_count': error_count,
+        'total_processed': len(results),
+        'timestamp': datetime.now().isoformat()
+    }
+
 @shared_task(bind=True)
 def ingest_backtest_results(self, results_file_path: str):
     """
@@ -28,72 +145,7 @@ def ingest_backtest_results(self, results_file_path: str):
     """
     try:
         logger.info(f"Starting ingestion of backtest results from {results_file_path}")
-        
-        # Check if file exists
-        if not os.path.exists(results_file_path):
-            raise FileNotFoundError(f"Results file not found: {results_file_path}")
-        
-        # Load results from JSON file
-        with open(results_file_path, 'r') as f:
-            results = json.load(f)
-        
-        if not results:
-            logger.warning("No results found in file")
-            return {
-                'status': 'warning',
-                'message': 'No results found in file',
-                'timestamp': datetime.now().isoformat()
-            }
-        
-        # Store results in database
-        stored_count = 0
-        error_count = 0
-        
-        with psycopg2.connect(**DB_CONFIG) as conn:
-            with conn.cursor() as cursor:
-                for result in results:
-                    try:
-                        # Insert alert
-                        cursor.execute("""
-                            INSERT INTO trading.alerts 
-                            (symbol, interval, signal, current_price, upper_band, lower_band, 
-                             potential_return, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (symbol, interval, created_at::date) 
-                            DO UPDATE SET
-                                signal = EXCLUDED.signal,
-                                current_price = EXCLUDED.current_price,
-                                upper_band = EXCLUDED.upper_band,
-                                lower_band = EXCLUDED.lower_band,
-                                potential_return = EXCLUDED.potential_return,
-                                updated_at = NOW()
-                        """, (
-                            result['symbol'],
-                            result['interval'],
-                            result['signal'],
-                            result['current_price'],
-                            result['upper_band'],
-                            result['lower_band'],
-                            result['potential_return'],
-                            result['timestamp']
-                        ))
-                        stored_count += 1
-                        
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"Error storing result for {result.get('symbol', 'unknown')}: {e}")
-                
-                conn.commit()
-        
-        logger.info(f"Ingestion complete: {stored_count} stored, {error_count} errors")
-        
-        return {
-            'status': 'success',
-            'stored_count': stored_count,
-            'error_count': error_count,
-            'total_processed': len(results),
-            'timestamp': datetime.now().isoformat()
-        }
+        return _store_results(results_file_path)
         
     except Exception as e:
         logger.error(f"Error in backtest ingestion: {e}")
@@ -175,53 +227,113 @@ def ingest_backtest_results_from_directory(self, directory_path: str, pattern: s
         }
 
 @shared_task(bind=True)
-def monitor_backtest_results_directory(self, directory_path: str, pattern: str = "backtest_results_*.json"):
+def ingest_completed_run(self, file_name: str, directory_path: Optional[str] = None):
+    """
+    Ingest a backtest results file as soon as the engine reports the run
+    completed (autonama.engine/run_ledger.py sends this message).
+    
+    The file is claimed in the ingestion ledger first, so a repeated message
+    or a sweep never reads it twice. A failed ingestion releases its claim
+    and is picked up again by the next sweep; a claim left 'running' by a
+    worker that died is taken over once it is older than CLAIM_TIMEOUT_SECONDS.
+    
+    Args:
+        file_name: Results file name (resolved against directory_path)
+        directory_path: Directory holding the file (default: BACKTEST_RESULTS_DIR)
+    """
+    name = os.path.basename(file_name)
+    file_path = os.path.join(directory_path or RESULTS_DIR, name)
+    redis_client = get_redis()
+    
+    claim = {'status': 'running', 'task_id': self.request.id, 'claimed_at': datetime.now().isoformat()}
+    if not _claim(redis_client, name, claim):
+        logger.info(f"{name} is already ingested or being ingested")
+        return {
+            'status': 'skipped',
+            'file': name,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    try:
+        logger.info(f"Run completed, ingesting {file_path}")
+        result = _store_results(file_path)
+    except Exception as e:
+        logger.error(f"Error ingesting {file_path}: {e}")
+        redis_client.hdel(LEDGER_KEY, name)
+        return {
+            'status': 'error',
+            'file': name,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    redis_client.hset(LEDGER_KEY, name, json.dumps({
+        'status': 'done',
+        'stored_count': result.get('stored_count', 0),
+        'ingested_at': datetime.now().isoformat()
+    }))
+    return {**result, 'file': name}
+
+@shared_task(bind=True)
+def monitor_backtest_results_directory(self, directory_path: Optional[str] = None,
+                                       pattern: str = "backtest_results_*.json",
+                                       min_age_seconds: int = 5):
     """
-    Monitor a directory for new backtest result files and ingest them automatically
+    Queue ingestion of result files that are not in the ingestion ledger yet
+    
+    Runs once and returns instead of looping: new runs are ingested by
+    ingest_completed_run when the engine reports them, and this sweep only
+    catches files whose message never arrived (broker down, engine run
+    without AUTONAMA_INGEST_BROKER_URL) and files whose 'running' claim is
+    older than CLAIM_TIMEOUT_SECONDS. It lists the directory once and checks
+    all names against the ledger with one HMGET; no file is opened.
     
     Args:
-        directory_path: Directory to monitor
+        directory_path: Directory to check (default: BACKTEST_RESULTS_DIR)
         pattern: File pattern to match
+        min_age_seconds: Skip files modified more recently than this (still being written)
     """
     try:
         import glob
         import time
         
-        logger.info(f"Starting monitoring of directory: {directory_path}")
+        directory_path = directory_path or RESULTS_DIR
+        names = sorted(os.path.basename(path) for path in glob.glob(os.path.join(directory_path, pattern)))
+        if not names:
+            return {
+                'status': 'success',
+                'queued': 0,
+                'timestamp': datetime.now().isoformat()
+            }
         
-        # Get list of existing files
-        file_pattern = os.path.join(directory_path, pattern)
-        existing_files = set(glob.glob(file_pattern))
+        known = get_redis().hmget(LEDGER_KEY, names)
+        cutoff = time.time() - min_age_seconds
+        queued = []
+        stale = 0
+        for name, entry in zip(names, known):
+            if _is_stale(entry):
+                stale += 1
+            elif entry is not None:
+                continue
+            if os.path.getmtime(os.path.join(directory_path, name)) > cutoff:
+                continue
+            ingest_completed_run.delay(name, directory_path)
+            queued.append(name)
+        
+        if queued:
+            logger.info(f"Queued {len(queued)} unrecorded result files for ingestion ({stale} stale claims)")
         
-        # Check for new files every 5 minutes
-        while True:
-            current_files = set(glob.glob(file_pattern))
-            new_files = current_files - existing_files
-            
-            if new_files:
-                logger.info(f"Found {len(new_files)} new result files")
-                
-                for file_path in new_files:
-                    try:
-                        # Wait a bit to ensure file is completely written
-                        time.sleep(5)
-                        
-                        # Ingest the new file
-                        result = ingest_backtest_results(file_path)
-                        logger.info(f"Ingested {file_path}: {result}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error ingesting {file_path}: {e}")
-                
-                # Update existing files set
-                existing_files = current_files
-            
-            # Sleep for 5 minutes before next check
-            time.sleep(300)
+        return {
+            'status': 'success',
+            'queued': len(queued),
+            'files': queued,
+            'stale_claims': stale,
+            'already_ingested': sum(entry is not None for entry in known) - stale,
+            'timestamp': datetime.now().isoformat()
+        }
         
     except Exception as e:
-        logger.error(f"Error in directory monitoring: {e}")
-        self.retry(countdown=300, max_retries=3)  # Retry after 5 minutes, max 3 times
+        logger.error(f"Error checking {directory_path} for new results: {e}")
         return {
             'status': 'error',
             'error': str(e),
@@ -239,7 +351,7 @@ def cleanup_old_alerts(self, days_to_keep: int = 30):
     try:
         logger.info(f"Cleaning up alerts older than {days_to_keep} days")
         
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with db_pool.postgres_connection(DB_CONFIG) as conn:
             with conn.cursor() as cursor:
                 cursor.execute("""
                     DELETE FROM trading.alerts 
@@ -269,7 +381,7 @@ def cleanup_old_alerts(self, days_to_keep: int = 30):
 def get_ingestion_status(self):
     """Get status of recent ingestion activities"""
     try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with db_pool.postgres_connection(DB_CONFIG) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get recent alerts count
                 cursor.execute("""
@@ -304,11 +416,16 @@ def get_ingestion_status(self):
         } 
 import json
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from celery import shared_task
 from typing import Dict, List, Optional
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from redis.exceptions import WatchError
+
+from utils import db_pool
+from utils.database import get_redis
+from utils.redis_keyspace import namespaced_key
 
 logger = logging.getLogger(__name__)
 
@@ -321,6 +438,118 @@ DB_CONFIG = {
     'password': 'postgres'
 }
 
+# Where the engine's backtest results directory is mounted in this container
+RESULTS_DIR = os.getenv('BACKTEST_RESULTS_DIR', '/app/results')
+
+# Ingestion ledger: results file name -> claim / completion record
+LEDGER_KEY = namespaced_key('app', 'ingest_ledger', 'backtest_results')
+
+# A 'running' claim older than this belongs to a worker that died mid-ingestion
+CLAIM_TIMEOUT_SECONDS = int(os.getenv('INGEST_CLAIM_TIMEOUT_SECONDS', '1800'))
+
+
+def _is_stale(entry) -> bool:
+    """True for a 'running' ledger entry claimed more than CLAIM_TIMEOUT_SECONDS ago."""
+    if entry is None:
+        return False
+    try:
+        record = json.loads(entry)
+        claimed_at = datetime.fromisoformat(record['claimed_at'])
+    except (ValueError, KeyError, TypeError):
+        return False
+    return (record.get('status') == 'running'
+            and datetime.now() - claimed_at > timedelta(seconds=CLAIM_TIMEOUT_SECONDS))
+
+
+def _claim(redis_client, name: str, claim: Dict) -> bool:
+    """
+    Claim a file in the ingestion ledger. A stale 'running' claim is taken
+    over inside a WATCH transaction, so only one task wins it.
+    """
+    if redis_client.hsetnx(LEDGER_KEY, name, json.dumps(claim)):
+        return True
+    with redis_client.pipeline() as pipe:
+        try:
+            pipe.watch(LEDGER_KEY)
+            if not _is_stale(pipe.hget(LEDGER_KEY, name)):
+                return False
+            pipe.multi()
+            pipe.hset(LEDGER_KEY, name, json.dumps(claim))
+            pipe.execute()
+        except WatchError:
+            return False
+    logger.warning(f"Took over stale ingestion claim on {name}")
+    return True
+
+
+def _store_results(results_file_path: str) -> Dict:
+    """Read one results file and upsert its alerts into trading.alerts."""
+    # Check if file exists
+    if not os.path.exists(results_file_path):
+        raise FileNotFoundError(f"Results file not found: {results_file_path}")
+    
+    # Load results from JSON file
+    with open(results_file_path, 'r') as f:
+        results = json.load(f)
+    
+    if not results:
+        logger.warning("No results found in file")
+        return {
+            'status': 'warning',
+            'message': 'No results found in file',
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    # Store results in database
+    stored_count = 0
+    error_count = 0
+    
+    with db_pool.postgres_connection(DB_CONFIG) as conn:
+        with conn.cursor() as cursor:
+            for result in results:
+                try:
+                    # Insert alert
+                    cursor.execute("""
+                        INSERT INTO trading.alerts 
+                        (symbol, interval, signal, current_price, upper_band, lower_band, 
+                         potential_return, created_at)
+                        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+                        ON CONFLICT (symbol, interval, created_at::date) 
+                        DO UPDATE SET
+                            signal = EXCLUDED.signal,
+                            current_price = EXCLUDED.current_price,
+                            upper_band = EXCLUDED.upper_band,
+                            lower_band = EXCLUDED.lower_band,
+                            potential_return = EXCLUDED.potential_return,
+                            updated_at = NOW()
+                    """, (
+                        result['symbol'],
+                        result['interval'],
+                        result['signal'],
+                        result['current_price'],
+                        result['upper_band'],
+                        result['lower_band'],
+                        result['potential_return'],
+                        result['timestamp']
+                    ))
+                    stored_count += 1
+                    
+                except Exception as e:
+                    error_count += 1
+                    logger.error(f"Error storing result for {result.get('symbol', 'unknown')}: {e}")
+            
+            conn.commit()
+    
+    logger.info(f"Ingestion complete: {stored_count} stored, {error_count} errors")
+    
+    return {
+        'status': 'success',
+        'stored_count': stored_count,
+        'error_count': error_count,
+        'total_processed': len(results),
+        'timestamp': datetime.now().isoformat()
+    }
+
 @shared_task(bind=True)
 def ingest_backtest_results(self, results_file_path: str):
     """
@@ -331,72 +560,7 @@ def ingest_backtest_results(self, results_file_path: str):
     """
     try:
         logger.info(f"Starting ingestion of backtest results from {results_file_path}")
-        
-        # Check if file exists
-        if not os.path.exists(results_file_path):
-            raise FileNotFoundError(f"Results file not found: {results_file_path}")
-        
-        # Load results from JSON file
-        with open(results_file_path, 'r') as f:
-            results = json.load(f)
-        
-        if not results:
-            logger.warning("No results found in file")
-            return {
-                'status': 'warning',
-                'message': 'No results found in file',
-                'timestamp': datetime.now().isoformat()
-            }
-        
-        # Store results in database
-        stored_count = 0
-        error_count = 0
-        
-        with psycopg2.connect(**DB_CONFIG) as conn:
-            with conn.cursor() as cursor:
-                for result in results:
-                    try:
-                        # Insert alert
-                        cursor.execute("""
-                            INSERT INTO trading.alerts 
-                            (symbol, interval, signal, current_price, upper_band, lower_band, 
-                             potential_return, created_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (symbol, interval, created_at::date) 
-                            DO UPDATE SET
-                                signal = EXCLUDED.signal,
-                                current_price = EXCLUDED.current_price,
-                                upper_band = EXCLUDED.upper_band,
-                                lower_band = EXCLUDED.lower_band,
-                                potential_return = EXCLUDED.potential_return,
-                                updated_at = NOW()
-                        """, (
-                            result['symbol'],
-                            result['interval'],
-                            result['signal'],
-                            result['current_price'],
-                            result['upper_band'],
-                            result['lower_band'],
-                            result['potential_return'],
-                            result['timestamp']
-                        ))
-                        stored_count += 1
-                        
-                    except Exception as e:
-                        error_count += 1
-                        logger.error(f"Error storing result for {result.get('symbol', 'unknown')}: {e}")
-                
-                conn.commit()
-        
-        logger.info(f"Ingestion complete: {stored_count} stored, {error_count} errors")
-        
-        return {
-            'status': 'success',
-            'stored_count': stored_count,
-            'error_count': error_count,
-            'total_processed': len(results),
-            'timestamp': datetime.now().isoformat()
-        }
+        return _store_results(results_file_path)
         
     except Exception as e:
         logger.error(f"Error in backtest ingestion: {e}")
@@ -478,53 +642,113 @@ def ingest_backtest_results_from_directory(self, directory_path: str, pattern: s
         }
 
 @shared_task(bind=True)
-def monitor_backtest_results_directory(self, directory_path: str, pattern: str = "backtest_results_*.json"):
+def ingest_completed_run(self, file_name: str, directory_path: Optional[str] = None):
+    """
+    Ingest a backtest results file as soon as the engine reports the run
+    completed (autonama.engine/run_ledger.py sends this message).
+    
+    The file is claimed in the ingestion ledger first, so a repeated message
+    or a sweep never reads it twice. A failed ingestion releases its claim
+    and is picked up again by the next sweep; a claim left 'running' by a
+    worker that died is taken over once it is older than CLAIM_TIMEOUT_SECONDS.
+    
+    Args:
+        file_name: Results file name (resolved against directory_path)
+        directory_path: Directory holding the file (default: BACKTEST_RESULTS_DIR)
+    """
+    name = os.path.basename(file_name)
+    file_path = os.path.join(directory_path or RESULTS_DIR, name)
+    redis_client = get_redis()
+    
+    claim = {'status': 'running', 'task_id': self.request.id, 'claimed_at': datetime.now().isoformat()}
+    if not _claim(redis_client, name, claim):
+        logger.info(f"{name} is already ingested or being ingested")
+        return {
+            'status': 'skipped',
+            'file': name,
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    try:
+        logger.info(f"Run completed, ingesting {file_path}")
+        result = _store_results(file_path)
+    except Exception as e:
+        logger.error(f"Error ingesting {file_path}: {e}")
+        redis_client.hdel(LEDGER_KEY, name)
+        return {
+            'status': 'error',
+            'file': name,
+            'error': str(e),
+            'timestamp': datetime.now().isoformat()
+        }
+    
+    redis_client.hset(LEDGER_KEY, name, json.dumps({
+        'status': 'done',
+        'stored_count': result.get('stored_count', 0),
+        'ingested_at': datetime.now().isoformat()
+    }))
+    return {**result, 'file': name}
+
+@shared_task(bind=True)
+def monitor_backtest_results_directory(self, directory_path: Optional[str] = None,
+                                       pattern: str = "backtest_results_*.json",
+                                       min_age_seconds: int = 5):
     """
-    Monitor a directory for new backtest result files and ingest them automatically
+    Queue ingestion of result files that are not in the ingestion ledger yet
+    
+    Runs once and returns instead of looping: new runs are ingested by
+    ingest_completed_run when the engine reports them, and this sweep only
+    catches files whose message never arrived (broker down, engine run
+    without AUTONAMA_INGEST_BROKER_URL) and files whose 'running' claim is
+    older than CLAIM_TIMEOUT_SECONDS. It lists the directory once and checks
+    all names against the ledger with one HMGET; no file is opened.
     
     Args:
-        directory_path: Directory to monitor
+        directory_path: Directory to check (default: BACKTEST_RESULTS_DIR)
         pattern: File pattern to match
+        min_age_seconds: Skip files modified more recently than this (still being written)
     """
     try:
         import glob
         import time
         
-        logger.info(f"Starting monitoring of directory: {directory_path}")
+        directory_path = directory_path or RESULTS_DIR
+        names = sorted(os.path.basename(path) for path in glob.glob(os.path.join(directory_path, pattern)))
+        if not names:
+            return {
+                'status': 'success',
+                'queued': 0,
+                'timestamp': datetime.now().isoformat()
+            }
         
-        # Get list of existing files
-        file_pattern = os.path.join(directory_path, pattern)
-        existing_files = set(glob.glob(file_pattern))
+        known = get_redis().hmget(LEDGER_KEY, names)
+        cutoff = time.time() - min_age_seconds
+        queued = []
+        stale = 0
+        for name, entry in zip(names, known):
+            if _is_stale(entry):
+                stale += 1
+            elif entry is not None:
+                continue
+            if os.path.getmtime(os.path.join(directory_path, name)) > cutoff:
+                continue
+            ingest_completed_run.delay(name, directory_path)
+            queued.append(name)
+        
+        if queued:
+            logger.info(f"Queued {len(queued)} unrecorded result files for ingestion ({stale} stale claims)")
         
-        # Check for new files every 5 minutes
-        while True:
-            current_files = set(glob.glob(file_pattern))
-            new_files = current_files - existing_files
-            
-            if new_files:
-                logger.info(f"Found {len(new_files)} new result files")
-                
-                for file_path in new_files:
-                    try:
-                        # Wait a bit to ensure file is completely written
-                        time.sleep(5)
-                        
-                        # Ingest the new file
-                        result = ingest_backtest_results(file_path)
-                        logger.info(f"Ingested {file_path}: {result}")
-                        
-                    except Exception as e:
-                        logger.error(f"Error ingesting {file_path}: {e}")
-                
-                # Update existing files set
-                existing_files = current_files
-            
-            # Sleep for 5 minutes before next check
-            time.sleep(300)
+        return {
+            'status': 'success',
+            'queued': len(queued),
+            'files': queued,
+            'stale_claims': stale,
+            'already_ingested': sum(entry is not None for entry in known) - stale,
+            'timestamp': datetime.now().isoformat()
+        }
         
     except Exception as e:
-        logger.error(f"Error in directory monitoring: {e}")
-        self.retry(countdown=300, max_retries=3)  # Retry after 5 minutes, max 3 times
+        logger.error(f"Error checking {directory_path} for new results: {e}")
         return {
             'status': 'error',
             'error': str(e),
@@ -542,7 +766,7 @@ def cleanup_old_alerts(self, days_to_keep: int = 30):
     try:
         logger.info(f"Cleaning up alerts older than {days_to_keep} days")
         
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with db_pool.postgres_connection(DB_CONFIG) as conn:
             with conn.cursor() as cursor:
                 cursor.execute("""
                     DELETE FROM trading.alerts 
@@ -572,7 +796,7 @@ def cleanup_old_alerts(self, days_to_keep: int = 30):
 def get_ingestion_status(self):
     """Get status of recent ingestion activities"""
     try:
-        with psycopg2.connect(**DB_CONFIG) as conn:
+        with db_pool.postgres_connection(DB_CONFIG) as conn:
             with conn.cursor(cursor_factory=RealDictCursor) as cursor:
                 # Get recent alerts count
                 cursor.execute("""
@@ -6,18 +6,28 @@ from celery import shared_task
 import pandas as pd
 import numpy as np
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 
 # Add the engine directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'autonama.engine'))
 
-from backtest_engine import BacktestEngine
+from utils import batch_workflows
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+# The engine is not part of the data service image; without it the worker
+# still starts and these tasks fail with a clear error
+try:
+    from backtest_engine import BacktestEngine
+    BACKTEST_ENGINE_AVAILABLE = True
+except ImportError as e:
+    BACKTEST_ENGINE_AVAILABLE = False
+    logger.warning(f"Backtest engine not available: {e}")
+
 # Database configuration
 DB_CONFIG = {
     'host': 'postgres',
@@ -33,6 +43,12 @@ BINANCE_CONFIG = {
     'api_secret': 'your_api_secret_here'  # Replace with your actual API secret
 }
 
+def get_backtest_engine():
+    """BacktestEngine on the scanner's database and Binance settings"""
+    if not BACKTEST_ENGINE_AVAILABLE:
+        raise RuntimeError("backtest_engine is not importable; autonama.engine must be on the path")
+    return BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+
 @shared_task(bind=True)
 def run_daily_backtest_scan(self):
     """
@@ -42,7 +58,7 @@ def run_daily_backtest_scan(self):
         logger.info("Starting daily backtest scan...")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         # Run the daily scan
         results = engine.run_daily_scan()
@@ -99,7 +115,7 @@ def scan_single_asset(self, symbol: str, interval: str = '1d', degree: int = 4,
         logger.info(f"Starting scan for {symbol}")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         # Scan the asset
         result = engine.scan_asset(symbol, interval, degree, kstd, days)
@@ -116,46 +132,111 @@ def scan_single_asset(self, symbol: str, interval: str = '1d', degree: int = 4,
         self.retry(countdown=60, max_retries=2)  # Retry after 1 minute, max 2 times
         return None
 
+def _alert_fields(result: Dict) -> Dict:
+    """The JSON-safe part of a scan_asset result (no price or band series)"""
+    timestamp = result.get('timestamp')
+    return {
+        'symbol': result['symbol'],
+        'interval': result['interval'],
+        'signal': result['signal'],
+        'current_price': float(result['current_price'] or 0.0),
+        'upper_band': float(result['upper_band']) if result.get('upper_band') is not None else None,
+        'lower_band': float(result['lower_band']) if result.get('lower_band') is not None else None,
+        'potential_return': float(result['potential_return'] or 0.0),
+        'timestamp': timestamp.isoformat() if timestamp is not None else None,
+        'error': result.get('error')
+    }
+
+@shared_task(bind=True)
+def scan_asset_chunk(self, symbols: List[str], interval: str = '1d', degree: int = 4, kstd: float = 2.0, days: int = 720):
+    """
+    Scan one chunk of a scan_multiple_assets batch (threads for the data fetches, as in scan_all_assets)
+    """
+    engine = get_backtest_engine()
+    results = []
+    
+    with ThreadPoolExecutor(max_workers=min(10, max(1, len(symbols)))) as executor:
+        futures = {
+            executor.submit(engine.scan_asset, symbol, interval, degree, kstd, days): symbol
+            for symbol in symbols
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            symbol = futures[future]
+            try:
+                result = future.result()
+                if result:
+                    results.append(_alert_fields(result))
+            except Exception as e:
+                logger.error(f"Error scanning {symbol}: {e}")
+            self.update_state(state='PROGRESS', meta={'current': done, 'total': len(symbols)})
+    
+    return results
+
+@shared_task(bind=True)
+def store_scan_results(self, chunk_results: List[List[Dict]], batch_task_id: str = None):
+    """
+    Chord callback of scan_multiple_assets: store the alerts of all chunks at once
+    """
+    results = [result for chunk in chunk_results for result in chunk]
+    alerts = [result for result in results if not result.get('error')]
+    
+    if alerts:
+        engine = get_backtest_engine()
+        engine.store_alerts(alerts)
+    
+    # Log summary
+    buy_signals = [r for r in results if r['signal'] == 'BUY']
+    sell_signals = [r for r in results if r['signal'] == 'SELL']
+    
+    logger.info(f"Multi-asset scan complete:")
+    logger.info(f"Total assets scanned: {len(results)}")
+    logger.info(f"BUY signals: {len(buy_signals)}")
+    logger.info(f"SELL signals: {len(sell_signals)}")
+    
+    return {
+        'status': 'success',
+        'task_id': batch_task_id,
+        'total_scanned': len(results),
+        'failed': len(results) - len(alerts),
+        'buy_signals': len(buy_signals),
+        'sell_signals': len(sell_signals),
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }
+
 @shared_task(bind=True)
-def scan_multiple_assets(self, symbols: List[str], interval: str = '1d', degree: int = 4, kstd: float = 2.0, days: int = 720):
+def scan_multiple_assets(self, symbols: List[str], interval: str = '1d', degree: int = 4, kstd: float = 2.0, days: int = 720,
+                         max_concurrency: Optional[int] = None):
     """
     Scan multiple assets in parallel
     
+    Returns once the scan is queued: the symbols run as at most
+    max_concurrency scan_asset_chunk subtasks under a chord, and
+    store_scan_results stores the alerts (its result is callback_id).
+    batch_workflows.progress(batch_id, total) reports progress.
+    
     Args:
         symbols: List of trading symbols
         interval: Time interval
         degree: Polynomial degree for regression
         kstd: Standard deviation multiplier for bands
         days: Number of days to analyze
+        max_concurrency: Maximum number of chunks (worker slots) used at once
     """
     try:
         logger.info(f"Starting scan for {len(symbols)} assets")
         
-        # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
-        
-        # Scan all assets
-        results = engine.scan_all_assets(symbols, interval, degree, kstd, days)
-        
-        # Store alerts
-        if results:
-            engine.store_alerts(results)
-        
-        # Log summary
-        buy_signals = [r for r in results if r['signal'] == 'BUY']
-        sell_signals = [r for r in results if r['signal'] == 'SELL']
-        
-        logger.info(f"Multi-asset scan complete:")
-        logger.info(f"Total assets scanned: {len(results)}")
-        logger.info(f"BUY signals: {len(buy_signals)}")
-        logger.info(f"SELL signals: {len(sell_signals)}")
+        batch = batch_workflows.launch(
+            scan_asset_chunk,
+            symbols,
+            store_scan_results.s(batch_task_id=self.request.id),
+            chunk_kwargs={'interval': interval, 'degree': degree, 'kstd': kstd, 'days': days},
+            max_chunks=max_concurrency
+        )
         
         return {
-            'status': 'success',
-            'total_scanned': len(results),
-            'buy_signals': len(buy_signals),
-            'sell_signals': len(sell_signals),
-            'results': results,
+            'status': 'queued',
+            **batch,
             'timestamp': datetime.now().isoformat()
         }
         
@@ -181,7 +262,7 @@ def get_current_alerts(self, signal_type: str = None, min_potential_return: floa
         logger.info("Fetching current alerts...")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         # Get alerts
         alerts = engine.get_alerts(signal_type, min_potential_return)
@@ -217,7 +298,7 @@ def update_historical_data(self, symbols: List[str] = None, interval: str = '1d'
         logger.info("Starting historical data update...")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         if symbols is None:
             symbols = engine.get_top_100_assets()
@@ -268,18 +349,28 @@ from celery import shared_task
 import pandas as pd
 import numpy as np
 import warnings
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import Dict, List, Optional, Tuple
 
 # Add the engine directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'autonama.engine'))
 
-from backtest_engine import BacktestEngine
+from utils import batch_workflows
 
 # Suppress warnings
 warnings.filterwarnings('ignore')
 
 logger = logging.getLogger(__name__)
 
+# The engine is not part of the data service image; without it the worker
+# still starts and these tasks fail with a clear error
+try:
+    from backtest_engine import BacktestEngine
+    BACKTEST_ENGINE_AVAILABLE = True
+except ImportError as e:
+    BACKTEST_ENGINE_AVAILABLE = False
+    logger.warning(f"Backtest engine not available: {e}")
+
 # Database configuration
 DB_CONFIG = {
     'host': 'postgres',
@@ -295,6 +386,12 @@ BINANCE_CONFIG = {
     'api_secret': 'your_api_secret_here'  # Replace with your actual API secret
 }
 
+def get_backtest_engine():
+    """BacktestEngine on the scanner's database and Binance settings"""
+    if not BACKTEST_ENGINE_AVAILABLE:
+        raise RuntimeError("backtest_engine is not importable; autonama.engine must be on the path")
+    return BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+
 @shared_task(bind=True)
 def run_daily_backtest_scan(self):
     """
@@ -304,7 +401,7 @@ def run_daily_backtest_scan(self):
         logger.info("Starting daily backtest scan...")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         # Run the daily scan
         results = engine.run_daily_scan()
@@ -361,7 +458,7 @@ def scan_single_asset(self, symbol: str, interval: str = '1d', degree: int = 4,
         logger.info(f"Starting scan for {symbol}")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         # Scan the asset
         result = engine.scan_asset(symbol, interval, degree, kstd, days)
@@ -378,46 +475,111 @@ def scan_single_asset(self, symbol: str, interval: str = '1d', degree: int = 4,
         self.retry(countdown=60, max_retries=2)  # Retry after 1 minute, max 2 times
         return None
 
+def _alert_fields(result: Dict) -> Dict:
+    """The JSON-safe part of a scan_asset result (no price or band series)"""
+    timestamp = result.get('timestamp')
+    return {
+        'symbol': result['symbol'],
+        'interval': result['interval'],
+        'signal': result['signal'],
+        'current_price': float(result['current_price'] or 0.0),
+        'upper_band': float(result['upper_band']) if result.get('upper_band') is not None else None,
+        'lower_band': float(result['lower_band']) if result.get('lower_band') is not None else None,
+        'potential_return': float(result['potential_return'] or 0.0),
+        'timestamp': timestamp.isoformat() if timestamp is not None else None,
+        'error': result.get('error')
+    }
+
+@shared_task(bind=True)
+def scan_asset_chunk(self, symbols: List[str], interval: str = '1d', degree: int = 4, kstd: float = 2.0, days: int = 720):
+    """
+    Scan one chunk of a scan_multiple_assets batch (threads for the data fetches, as in scan_all_assets)
+    """
+    engine = get_backtest_engine()
+    results = []
+    
+    with ThreadPoolExecutor(max_workers=min(10, max(1, len(symbols)))) as executor:
+        futures = {
+            executor.submit(engine.scan_asset, symbol, interval, degree, kstd, days): symbol
+            for symbol in symbols
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            symbol = futures[future]
+            try:
+                result = future.result()
+                if result:
+                    results.append(_alert_fields(result))
+            except Exception as e:
+                logger.error(f"Error scanning {symbol}: {e}")
+            self.update_state(state='PROGRESS', meta={'current': done, 'total': len(symbols)})
+    
+    return results
+
+@shared_task(bind=True)
+def store_scan_results(self, chunk_results: List[List[Dict]], batch_task_id: str = None):
+    """
+    Chord callback of scan_multiple_assets: store the alerts of all chunks at once
+    """
+    results = [result for chunk in chunk_results for result in chunk]
+    alerts = [result for result in results if not result.get('error')]
+    
+    if alerts:
+        engine = get_backtest_engine()
+        engine.store_alerts(alerts)
+    
+    # Log summary
+    buy_signals = [r for r in results if r['signal'] == 'BUY']
+    sell_signals = [r for r in results if r['signal'] == 'SELL']
+    
+    logger.info(f"Multi-asset scan complete:")
+    logger.info(f"Total assets scanned: {len(results)}")
+    logger.info(f"BUY signals: {len(buy_signals)}")
+    logger.info(f"SELL signals: {len(sell_signals)}")
+    
+    return {
+        'status': 'success',
+        'task_id': batch_task_id,
+        'total_scanned': len(results),
+        'failed': len(results) - len(alerts),
+        'buy_signals': len(buy_signals),
+        'sell_signals': len(sell_signals),
+        'results': results,
+        'timestamp': datetime.now().isoformat()
+    }
+
 @shared_task(bind=True)
-def scan_multiple_assets(self, symbols: List[str], interval: str = '1d', degree: int = 4, kstd: float = 2.0, days: int = 720):
+def scan_multiple_assets(self, symbols: List[str], interval: str = '1d', degree: int = 4, kstd: float = 2.0, days: int = 720,
+                         max_concurrency: Optional[int] = None):
     """
     Scan multiple assets in parallel
     
+    Returns once the scan is queued: the symbols run as at most
+    max_concurrency scan_asset_chunk subtasks under a chord, and
+    store_scan_results stores the alerts (its result is callback_id).
+    batch_workflows.progress(batch_id, total) reports progress.
+    
     Args:
         symbols: List of trading symbols
         interval: Time interval
         degree: Polynomial degree for regression
         kstd: Standard deviation multiplier for bands
         days: Number of days to analyze
+        max_concurrency: Maximum number of chunks (worker slots) used at once
     """
     try:
         logger.info(f"Starting scan for {len(symbols)} assets")
         
-        # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
-        
-        # Scan all assets
-        results = engine.scan_all_assets(symbols, interval, degree, kstd, days)
-        
-        # Store alerts
-        if results:
-            engine.store_alerts(results)
-        
-        # Log summary
-        buy_signals = [r for r in results if r['signal'] == 'BUY']
-        sell_signals = [r for r in results if r['signal'] == 'SELL']
-        
-        logger.info(f"Multi-asset scan complete:")
-        logger.info(f"Total assets scanned: {len(results)}")
-        logger.info(f"BUY signals: {len(buy_signals)}")
-        logger.info(f"SELL signals: {len(sell_signals)}")
+        batch = batch_workflows.launch(
+            scan_asset_chunk,
+            symbols,
+            store_scan_results.s(batch_task_id=self.request.id),
+            chunk_kwargs={'interval': interval, 'degree': degree, 'kstd': kstd, 'days': days},
+            max_chunks=max_concurrency
+        )
         
         return {
-            'status': 'success',
-            'total_scanned': len(results),
-            'buy_signals': len(buy_signals),
-            'sell_signals': len(sell_signals),
-            'results': results,
+            'status': 'queued',
+            **batch,
             'timestamp': datetime.now().isoformat()
         }
         
@@ -443,7 +605,7 @@ def get_current_alerts(self, signal_type: str = None, min_potential_return: floa
         logger.info("Fetching current alerts...")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         # Get alerts
         alerts = engine.get_alerts(signal_type, min_potential_return)
@@ -479,7 +641,7 @@ def update_historical_data(self, symbols: List[str] = None, interval: str = '1d'
         logger.info("Starting historical data update...")
         
         # Initialize the backtesting engine
-        engine = BacktestEngine(DB_CONFIG, BINANCE_CONFIG)
+        engine = get_backtest_engine()
         
         if symbols is None:
             symbols = engine.get_top_100_assets()
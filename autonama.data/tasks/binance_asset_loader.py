@@ -3,6 +3,10 @@ Binance Asset Loader Tasks
 
 This module provides Celery tasks for loading the top 100 Binance assets
 by 24h volume into PostgreSQL/TimescaleDB.
+
+The ranking is the deployment's trading universe (utils/trading_universe.py):
+load_top_100_binance_assets is the only scheduled caller of the full Binance
+ticker; every other top-100 lookup reads the snapshot it publishes.
 """
 
 import ccxt
@@ -11,13 +15,30 @@ from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 from celery import Task
 from celery.exceptions import Retry
+from sqlalchemy import text
 
 from celery_app import celery_app
-from utils.database import get_timescale_connection
+from utils.database import get_engine, redis_client
 from utils.error_handler import handle_processor_error
+from utils.task_metrics import task_metrics
+from utils.trading_universe import UniverseClient, UniverseStore, refresh, REFRESH_SECONDS
 
 logger = logging.getLogger(__name__)
 
+
+def fetch_binance_tickers() -> Dict[str, Any]:
+    """The full 24h ticker of every Binance market (ccxt format)."""
+    exchange = ccxt.binance({
+        'timeout': 30000,
+        'enableRateLimit': True,
+    })
+    with task_metrics.span('load_top_100.fetch_tickers'):
+        return exchange.fetch_tickers()
+
+# Snapshot reader for the data tasks (see get_top_100_crypto_assets); fetches
+# the tickers itself only when no snapshot was ever published or it went stale
+universe = UniverseClient(UniverseStore(redis_client, get_engine()), fetch_tickers=fetch_binance_tickers)
+
 class BinanceAssetLoaderTask(Task):
     """Base task class for Binance asset loading with error handling"""
     
@@ -27,16 +48,17 @@ class BinanceAssetLoaderTask(Task):
     retry_jitter = True
 
 @celery_app.task(bind=True, base=BinanceAssetLoaderTask)
-def load_top_100_binance_assets(self) -> Dict[str, Any]:
+def load_top_100_binance_assets(self, force: bool = False) -> Dict[str, Any]:
     """
     Load the top 100 Binance assets by 24h volume into PostgreSQL.
     
     This task:
-    1. Fetches all USDT pairs from Binance
-    2. Sorts by 24h volume
-    3. Takes the top 100
-    4. Stores asset metadata in PostgreSQL
-    5. Triggers data ingestion for these assets
+    1. Fetches all tickers from Binance, unless the trading universe was
+       refreshed less than UNIVERSE_REFRESH_SECONDS ago (or force is set)
+    2. Ranks the USDT pairs by 24h quote volume
+    3. Publishes the ranking as a new trading universe snapshot (Redis and
+       trading.universe_snapshots)
+    4. Stores metadata for the top 100 in PostgreSQL (one batch)
     
     Returns:
         Dict with loading results and statistics
@@ -46,80 +68,49 @@ def load_top_100_binance_assets(self) -> Dict[str, Any]:
     try:
         logger.info("Starting top 100 Binance assets loading...")
         
-        # Initialize Binance exchange
-        exchange = ccxt.binance({
-            'timeout': 30000,
-            'enableRateLimit': True,
-        })
-        
-        # Get 24hr ticker for all symbols
-        logger.info("Fetching all tickers from Binance...")
-        tickers = exchange.fetch_tickers()
-        
-        # Filter for USDT pairs and sort by volume
-        usdt_pairs = []
-        for symbol, ticker in tickers.items():
-            if symbol.endswith('/USDT') and symbol != 'USDT/USDT':
-                volume_usd = float(ticker.get('quoteVolume', 0))
-                if volume_usd > 0:  # Only include pairs with volume
-                    usdt_pairs.append({
-                        'symbol': symbol,
-                        'volume': volume_usd,
-                        'price': float(ticker.get('last', 0) or 0),
-                        'change_24h': float(ticker.get('change', 0) or 0),
-                        'change_percent_24h': float(ticker.get('percentage', 0) or 0),
-                        'high_24h': float(ticker.get('high', 0) or 0),
-                        'low_24h': float(ticker.get('low', 0) or 0),
-                        'bid': float(ticker.get('bid', 0) or 0),
-                        'ask': float(ticker.get('ask', 0) or 0)
-                    })
-        
-        # Sort by volume and get top 100
-        usdt_pairs.sort(key=lambda x: x['volume'], reverse=True)
-        top_100_assets = usdt_pairs[:100]
+        snapshot, fetched = refresh(fetch_binance_tickers, universe.store, REFRESH_SECONDS, force=force)
+        if snapshot is None:
+            raise RuntimeError("No trading universe available and the ticker refresh produced none")
+        if not fetched:
+            logger.info(f"Trading universe version {snapshot.version} is current; skipping the ticker fetch")
+        top_100_assets = snapshot.assets[:100]
         
         logger.info(f"Found {len(top_100_assets)} top assets by volume")
         
-        # Store asset metadata in PostgreSQL
+        # Store asset metadata in PostgreSQL (one batch)
         stored_count = 0
         failed_count = 0
         
-        for asset in top_100_assets:
-            try:
-                # Parse symbol to get base and quote currencies
-                symbol = asset['symbol']
-                base_currency = symbol.split('/')[0]
-                quote_currency = symbol.split('/')[1]
-                
-                # Store in PostgreSQL
-                with get_timescale_connection() as conn:
-                    with conn.cursor() as cursor:
-                        # Insert or update asset metadata
-                        cursor.execute("""
-                            INSERT INTO trading.asset_metadata 
-                            (symbol, name, asset_type, exchange, base_currency, quote_currency, 
-                             created_at, updated_at)
-                            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
-                            ON CONFLICT (symbol) DO UPDATE SET
-                                name = EXCLUDED.name,
-                                updated_at = EXCLUDED.updated_at
-                        """, (
-                            symbol,
-                            f"{base_currency} / {quote_currency}",
-                            'crypto',
-                            'binance',
-                            base_currency,
-                            quote_currency,
-                            datetime.utcnow(),
-                            datetime.utcnow()
-                        ))
-                        
-                        conn.commit()
-                        stored_count += 1
-                        
-            except Exception as e:
-                logger.error(f"Failed to store asset {asset['symbol']}: {e}")
-                failed_count += 1
+        now = datetime.utcnow()
+        metadata_rows = [
+            {
+                'symbol': asset.pair,
+                'name': f"{asset.base} / {asset.quote}",
+                'asset_type': 'crypto',
+                'exchange': 'binance',
+                'base_currency': asset.base,
+                'quote_currency': asset.quote,
+                'created_at': now,
+                'updated_at': now
+            }
+            for asset in top_100_assets
+        ]
+        try:
+            with task_metrics.span('load_top_100.store_assets'), get_engine().begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO trading.asset_metadata 
+                    (symbol, name, asset_type, exchange, base_currency, quote_currency, 
+                     created_at, updated_at)
+                    VALUES (:symbol, :name, :asset_type, :exchange, :base_currency, :quote_currency,
+                            :created_at, :updated_at)
+                    ON CONFLICT (symbol) DO UPDATE SET
+                        name = EXCLUDED.name,
+                        updated_at = EXCLUDED.updated_at
+                """), metadata_rows)
+            stored_count = len(metadata_rows)
+        except Exception as e:
+            logger.error(f"Failed to store asset metadata: {e}")
+            failed_count = len(metadata_rows)
         
         end_time = datetime.now()
         duration = (end_time - start_time).total_seconds()
@@ -129,17 +120,19 @@ def load_top_100_binance_assets(self) -> Dict[str, Any]:
             'start_time': start_time.isoformat(),
             'end_time': end_time.isoformat(),
             'duration_seconds': duration,
+            'universe_version': snapshot.version,
+            'tickers_fetched': fetched,
             'assets_processed': len(top_100_assets),
             'assets_stored': stored_count,
             'assets_failed': failed_count,
             'top_assets': [
                 {
-                    'symbol': asset['symbol'],
-                    'volume': asset['volume'],
-                    'price': asset['price'],
-                    'rank': idx + 1
+                    'symbol': asset.pair,
+                    'volume': asset.volume_24h,
+                    'price': asset.price,
+                    'rank': asset.rank
                 }
-                for idx, asset in enumerate(top_100_assets[:10])  # Top 10 for summary
+                for asset in top_100_assets[:10]  # Top 10 for summary
             ],
             'success': True
         }
@@ -165,16 +158,14 @@ def load_top_100_binance_assets(self) -> Dict[str, Any]:
 @celery_app.task(bind=True, base=BinanceAssetLoaderTask)
 def refresh_top_100_assets(self) -> Dict[str, Any]:
     """
-    Refresh the top 100 assets list and update their data.
-    
-    This task runs periodically to ensure we're always tracking
-    the most relevant assets by volume.
+    Refresh the top 100 assets list now, regardless of the age of the
+    current trading universe.
     """
     try:
         logger.info("Refreshing top 100 Binance assets...")
         
         # Load top 100 assets
-        load_result = load_top_100_binance_assets.apply().get()
+        load_result = load_top_100_binance_assets.apply(kwargs={'force': True}).get()
         
         return {
             'task_id': self.request.id,
@@ -198,37 +189,30 @@ def refresh_top_100_assets(self) -> Dict[str, Any]:
 @celery_app.task(bind=True)
 def get_current_top_100_assets(self) -> Dict[str, Any]:
     """
-    Get the current list of top 100 assets from PostgreSQL.
+    Get the current list of top 100 assets from the trading universe.
     
     Returns:
         Dict with current top 100 assets and their metadata
     """
     try:
-        with get_timescale_connection() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("""
-                    SELECT symbol, name, current_price, price_change_24h, 
-                           price_change_percent_24h, volume_24h, updated_at
-                    FROM trading.asset_metadata 
-                    WHERE asset_type = 'crypto' AND exchange = 'binance'
-                    ORDER BY volume_24h DESC 
-                    LIMIT 100
-                """)
-                
-                assets = []
-                for row in cursor.fetchall():
-                    assets.append({
-                        'symbol': row[0],
-                        'name': row[1],
-                        'current_price': float(row[2]) if row[2] else 0,
-                        'price_change_24h': float(row[3]) if row[3] else 0,
-                        'price_change_percent_24h': float(row[4]) if row[4] else 0,
-                        'volume_24h': float(row[5]) if row[5] else 0,
-                        'updated_at': row[6].isoformat() if row[6] else None
-                    })
+        snapshot = universe.snapshot()
+        updated_at = datetime.utcfromtimestamp(snapshot.version).isoformat() if snapshot else None
+        
+        assets = []
+        for asset in (snapshot.assets[:100] if snapshot else ()):
+            assets.append({
+                'symbol': asset.pair,
+                'name': f"{asset.base} / {asset.quote}",
+                'rank': asset.rank,
+                'current_price': asset.price,
+                'price_change_percent_24h': asset.change_percent_24h,
+                'volume_24h': asset.volume_24h,
+                'updated_at': updated_at
+            })
         
         return {
             'task_id': self.request.id,
+            'universe_version': snapshot.version if snapshot else None,
             'assets': assets,
             'total_count': len(assets),
             'success': True
@@ -246,4 +230,3 @@ def get_current_top_100_assets(self) -> Dict[str, Any]:
                 'operation': 'get_current_top_100_assets'
             }
         ) 
-
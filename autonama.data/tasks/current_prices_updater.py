@@ -15,42 +15,15 @@ from sqlalchemy.orm import sessionmaker
 import os
 
 from celery_app import celery_app
-from utils.database import get_timescale_connection
+from utils.database import get_engine
 from utils.error_handler import handle_processor_error
+from tasks.binance_asset_loader import universe
 
 logger = logging.getLogger(__name__)
 
 def get_top_100_crypto_assets() -> List[str]:
-    """Get top 100 crypto assets by 24h volume from Binance."""
-    try:
-        exchange = ccxt.binance({
-            'timeout': 30000,
-            'enableRateLimit': True,
-        })
-        tickers = exchange.fetch_tickers()
-        usdt_pairs = []
-        for symbol, ticker in tickers.items():
-            if symbol.endswith('/USDT') and symbol != 'USDT/USDT':
-                volume_usd = float(ticker.get('quoteVolume', 0))
-                if volume_usd > 0:
-                    usdt_pairs.append({
-                        'symbol': symbol,
-                        'volume': volume_usd,
-                        'price': float(ticker.get('last', 0) or 0),
-                        'change_24h': float(ticker.get('change', 0) or 0),
-                        'change_percent_24h': float(ticker.get('percentage', 0) or 0),
-                        'high_24h': float(ticker.get('high', 0) or 0),
-                        'low_24h': float(ticker.get('low', 0) or 0),
-                        'bid': float(ticker.get('bid', 0) or 0),
-                        'ask': float(ticker.get('ask', 0) or 0)
-                    })
-        usdt_pairs.sort(key=lambda x: x['volume'], reverse=True)
-        top_100_symbols = [pair['symbol'] for pair in usdt_pairs[:100]]
-        logger.info(f"Found {len(top_100_symbols)} top crypto assets by volume")
-        return top_100_symbols
-    except Exception as e:
-        logger.error(f"Error getting top 100 crypto assets: {e}")
-        return ['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'BNB/USDT', 'SOL/USDT']
+    """Get top 100 crypto assets by 24h volume from the trading universe."""
+    return universe.symbols(100, pairs=True, fallback=['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'BNB/USDT', 'SOL/USDT'])
 
 @celery_app.task(bind=True)
 def update_current_prices(self):
@@ -67,38 +40,38 @@ def update_current_prices(self):
             'enableRateLimit': True,
         })
         
-        # Get database connection
-        engine = get_timescale_connection()
+        # Shared pooled engine: one connection per write below, not per symbol
+        engine = get_engine()
         
-        # First, ensure all top 100 assets exist in asset_metadata table
-        with engine as conn:
-            for symbol in symbols:
-                try:
-                    base_currency = symbol.split('/')[0]
-                    quote_currency = symbol.split('/')[1]
-                    
-                    # Insert asset metadata if it doesn't exist
-                    conn.execute(text("""
-                        INSERT INTO trading.asset_metadata 
-                        (symbol, name, asset_type, exchange, base_currency, quote_currency, created_at, updated_at)
-                        VALUES (:symbol, :name, :asset_type, :exchange, :base_currency, :quote_currency, :created_at, :updated_at)
-                        ON CONFLICT (symbol) DO NOTHING
-                    """), {
-                        'symbol': symbol,
-                        'name': f"{base_currency} / {quote_currency}",
-                        'asset_type': 'crypto',
-                        'exchange': 'binance',
-                        'base_currency': base_currency,
-                        'quote_currency': quote_currency,
-                        'created_at': datetime.utcnow(),
-                        'updated_at': datetime.utcnow()
-                    })
-                    conn.commit()
-                except Exception as e:
-                    logger.warning(f"Failed to ensure asset metadata for {symbol}: {e}")
+        # First, ensure all top 100 assets exist in asset_metadata table (one batch)
+        now = datetime.utcnow()
+        metadata_rows = []
+        for symbol in symbols:
+            base_currency, quote_currency = symbol.split('/')[:2]
+            metadata_rows.append({
+                'symbol': symbol,
+                'name': f"{base_currency} / {quote_currency}",
+                'asset_type': 'crypto',
+                'exchange': 'binance',
+                'base_currency': base_currency,
+                'quote_currency': quote_currency,
+                'created_at': now,
+                'updated_at': now
+            })
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO trading.asset_metadata 
+                    (symbol, name, asset_type, exchange, base_currency, quote_currency, created_at, updated_at)
+                    VALUES (:symbol, :name, :asset_type, :exchange, :base_currency, :quote_currency, :created_at, :updated_at)
+                    ON CONFLICT (symbol) DO NOTHING
+                """), metadata_rows)
+        except Exception as e:
+            logger.warning(f"Failed to ensure asset metadata: {e}")
         
         success_count = 0
         failed_count = 0
+        price_rows = []
         
         for symbol in symbols:
             try:
@@ -122,9 +95,25 @@ def update_current_prices(self):
                         'source': 'binance'
                     }
                     
-                    # Insert or update current price
-                    with engine as conn:
-                        query = """
+                    price_rows.append(price_data)
+                    logger.debug(f"Fetched current price for {symbol}: ${price_data['price']:.4f}")
+                else:
+                    logger.warning(f"No valid ticker data for {symbol}")
+                    failed_count += 1
+                    
+            except Exception as e:
+                logger.error(f"Error updating current price for {symbol}: {e}")
+                failed_count += 1
+                
+            # Rate limiting
+            import time
+            time.sleep(0.1)
+        
+        # Insert or update all current prices in one batch
+        if price_rows:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text("""
                         INSERT INTO trading.current_prices (
                             symbol, price, bid, ask, spread, volume_24h, 
                             change_24h, change_percent_24h, high_24h, low_24h, 
@@ -145,24 +134,11 @@ def update_current_prices(self):
                             low_24h = EXCLUDED.low_24h,
                             timestamp = EXCLUDED.timestamp,
                             source = EXCLUDED.source
-                        """
-                        
-                        conn.execute(text(query), price_data)
-                        conn.commit()
-                        
-                        success_count += 1
-                        logger.debug(f"Updated current price for {symbol}: ${price_data['price']:.4f}")
-                else:
-                    logger.warning(f"No valid ticker data for {symbol}")
-                    failed_count += 1
-                    
+                    """), price_rows)
+                success_count = len(price_rows)
             except Exception as e:
-                logger.error(f"Error updating current price for {symbol}: {e}")
-                failed_count += 1
-                
-            # Rate limiting
-            import time
-            time.sleep(0.1)
+                logger.error(f"Error storing current prices: {e}")
+                failed_count += len(price_rows)
         
         logger.info(f"Current prices update completed: {success_count} successful, {failed_count} failed")
         return {
@@ -184,6 +160,7 @@ def update_current_prices(self):
 def force_update_current_prices(self):
     """Force update current prices for all assets."""
     return update_current_prices.apply().get() 
+"""
 Current Prices Updater
 
 This module handles updating current prices from Binance and storing them
@@ -200,42 +177,15 @@ from sqlalchemy.orm import sessionmaker
 import os
 
 from celery_app import celery_app
-from utils.database import get_timescale_connection
+from utils.database import get_engine
 from utils.error_handler import handle_processor_error
+from tasks.binance_asset_loader import universe
 
 logger = logging.getLogger(__name__)
 
 def get_top_100_crypto_assets() -> List[str]:
-    """Get top 100 crypto assets by 24h volume from Binance."""
-    try:
-        exchange = ccxt.binance({
-            'timeout': 30000,
-            'enableRateLimit': True,
-        })
-        tickers = exchange.fetch_tickers()
-        usdt_pairs = []
-        for symbol, ticker in tickers.items():
-            if symbol.endswith('/USDT') and symbol != 'USDT/USDT':
-                volume_usd = float(ticker.get('quoteVolume', 0))
-                if volume_usd > 0:
-                    usdt_pairs.append({
-                        'symbol': symbol,
-                        'volume': volume_usd,
-                        'price': float(ticker.get('last', 0) or 0),
-                        'change_24h': float(ticker.get('change', 0) or 0),
-                        'change_percent_24h': float(ticker.get('percentage', 0) or 0),
-                        'high_24h': float(ticker.get('high', 0) or 0),
-                        'low_24h': float(ticker.get('low', 0) or 0),
-                        'bid': float(ticker.get('bid', 0) or 0),
-                        'ask': float(ticker.get('ask', 0) or 0)
-                    })
-        usdt_pairs.sort(key=lambda x: x['volume'], reverse=True)
-        top_100_symbols = [pair['symbol'] for pair in usdt_pairs[:100]]
-        logger.info(f"Found {len(top_100_symbols)} top crypto assets by volume")
-        return top_100_symbols
-    except Exception as e:
-        logger.error(f"Error getting top 100 crypto assets: {e}")
-        return ['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'BNB/USDT', 'SOL/USDT']
+    """Get top 100 crypto assets by 24h volume from the trading universe."""
+    return universe.symbols(100, pairs=True, fallback=['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'BNB/USDT', 'SOL/USDT'])
 
 @celery_app.task(bind=True)
 def update_current_prices(self):
@@ -252,38 +202,38 @@ def update_current_prices(self):
             'enableRateLimit': True,
         })
         
-        # Get database connection
-        engine = get_timescale_connection()
+        # Shared pooled engine: one connection per write below, not per symbol
+        engine = get_engine()
         
-        # First, ensure all top 100 assets exist in asset_metadata table
-        with engine as conn:
-            for symbol in symbols:
-                try:
-                    base_currency = symbol.split('/')[0]
-                    quote_currency = symbol.split('/')[1]
-                    
-                    # Insert asset metadata if it doesn't exist
-                    conn.execute(text("""
-                        INSERT INTO trading.asset_metadata 
-                        (symbol, name, asset_type, exchange, base_currency, quote_currency, created_at, updated_at)
-                        VALUES (:symbol, :name, :asset_type, :exchange, :base_currency, :quote_currency, :created_at, :updated_at)
-                        ON CONFLICT (symbol) DO NOTHING
-                    """), {
-                        'symbol': symbol,
-                        'name': f"{base_currency} / {quote_currency}",
-                        'asset_type': 'crypto',
-                        'exchange': 'binance',
-                        'base_currency': base_currency,
-                        'quote_currency': quote_currency,
-                        'created_at': datetime.utcnow(),
-                        'updated_at': datetime.utcnow()
-                    })
-                    conn.commit()
-                except Exception as e:
-                    logger.warning(f"Failed to ensure asset metadata for {symbol}: {e}")
+        # First, ensure all top 100 assets exist in asset_metadata table (one batch)
+        now = datetime.utcnow()
+        metadata_rows = []
+        for symbol in symbols:
+            base_currency, quote_currency = symbol.split('/')[:2]
+            metadata_rows.append({
+                'symbol': symbol,
+                'name': f"{base_currency} / {quote_currency}",
+                'asset_type': 'crypto',
+                'exchange': 'binance',
+                'base_currency': base_currency,
+                'quote_currency': quote_currency,
+                'created_at': now,
+                'updated_at': now
+            })
+        try:
+            with engine.begin() as conn:
+                conn.execute(text("""
+                    INSERT INTO trading.asset_metadata 
+                    (symbol, name, asset_type, exchange, base_currency, quote_currency, created_at, updated_at)
+                    VALUES (:symbol, :name, :asset_type, :exchange, :base_currency, :quote_currency, :created_at, :updated_at)
+                    ON CONFLICT (symbol) DO NOTHING
+                """), metadata_rows)
+        except Exception as e:
+            logger.warning(f"Failed to ensure asset metadata: {e}")
         
         success_count = 0
         failed_count = 0
+        price_rows = []
         
         for symbol in symbols:
             try:
@@ -307,9 +257,25 @@ def update_current_prices(self):
                         'source': 'binance'
                     }
                     
-                    # Insert or update current price
-                    with engine as conn:
-                        query = """
+                    price_rows.append(price_data)
+                    logger.debug(f"Fetched current price for {symbol}: ${price_data['price']:.4f}")
+                else:
+                    logger.warning(f"No valid ticker data for {symbol}")
+                    failed_count += 1
+                    
+            except Exception as e:
+                logger.error(f"Error updating current price for {symbol}: {e}")
+                failed_count += 1
+                
+            # Rate limiting
+            import time
+            time.sleep(0.1)
+        
+        # Insert or update all current prices in one batch
+        if price_rows:
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text("""
                         INSERT INTO trading.current_prices (
                             symbol, price, bid, ask, spread, volume_24h, 
                             change_24h, change_percent_24h, high_24h, low_24h, 
@@ -330,24 +296,11 @@ def update_current_prices(self):
                             low_24h = EXCLUDED.low_24h,
                             timestamp = EXCLUDED.timestamp,
                             source = EXCLUDED.source
-                        """
-                        
-                        conn.execute(text(query), price_data)
-                        conn.commit()
-                        
-                        success_count += 1
-                        logger.debug(f"Updated current price for {symbol}: ${price_data['price']:.4f}")
-                else:
-                    logger.warning(f"No valid ticker data for {symbol}")
-                    failed_count += 1
-                    
+                    """), price_rows)
+                success_count = len(price_rows)
             except Exception as e:
-                logger.error(f"Error updating current price for {symbol}: {e}")
-                failed_count += 1
-                
-            # Rate limiting
-            import time
-            time.sleep(0.1)
+                logger.error(f"Error storing current prices: {e}")
+                failed_count += len(price_rows)
         
         logger.info(f"Current prices update completed: {success_count} successful, {failed_count} failed")
         return {
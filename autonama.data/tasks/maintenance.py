@@ -2,6 +2,8 @@ from celery_app import celery_app
 import logging
 from datetime import datetime, timedelta
 from utils.database import db_manager
+from utils.redis_keyspace import KeyspaceSweeper
+from utils.task_metrics import task_metrics
 
 logger = logging.getLogger(__name__)
 
@@ -41,7 +43,7 @@ def cleanup_old_data():
         try:
             for query in cleanup_queries:
                 try:
-                    with db_manager.postgres_engine.connect() as conn:
+                    with task_metrics.span('cleanup.postgres'), db_manager.postgres_engine.connect() as conn:
                         result = conn.execute(query)
                         cleaned_records += result.rowcount
                         conn.commit()
@@ -56,30 +58,18 @@ def cleanup_old_data():
         except Exception as e:
             logger.warning(f"PostgreSQL cleanup failed: {str(e)}")
         
-        # Try Redis cleanup
+        # Try Redis cleanup (SCAN-based, never blocks the broker)
         redis_keys_cleaned = 0
+        redis_sweep = {}
         try:
-            redis_client = db_manager.get_redis_client()
-            
-            # Get all keys and clean expired ones
-            all_keys = redis_client.keys('*')
-            expired_keys = []
-            
-            for key in all_keys:
-                try:
-                    ttl = redis_client.ttl(key)
-                    if ttl == -1:  # No expiration set
-                        # Set expiration for old keys
-                        redis_client.expire(key, 86400)  # 24 hours
-                    elif ttl == -2:  # Key doesn't exist
-                        expired_keys.append(key)
-                except Exception as e:
-                    logger.warning(f"Error checking key {key}: {e}")
-                    continue
+            sweeper = KeyspaceSweeper(db_manager.get_redis_client())
+            with task_metrics.span('cleanup.redis_sweep'):
+                redis_sweep = sweeper.sweep()
             
-            if expired_keys:
-                redis_client.delete(*expired_keys)
-                redis_keys_cleaned = len(expired_keys)
+            redis_keys_cleaned = sum(
+                ns.get('unlinked', 0) + ns.get('expired_set', 0)
+                for ns in redis_sweep.values()
+            )
             
             logger.info(f"Redis cleanup completed: {redis_keys_cleaned} keys cleaned")
             
@@ -97,6 +87,7 @@ def cleanup_old_data():
             'status': 'completed',
             'database_records_cleaned': cleaned_records,
             'redis_keys_cleaned': redis_keys_cleaned,
+            'redis_sweep': redis_sweep,
             'postgres_available': postgres_available,
             'total_cleaned': total_cleaned
         }
@@ -195,13 +186,15 @@ def health_check():
             'duckdb': False,
             'disk_space': None,
             'memory_usage': None,
+            'redis_keyspace': None,
+            'task_metrics': None,
             'errors': []
         }
         
         # Check PostgreSQL connection with better error handling
         try:
             # Try to import and use database manager
-            with db_manager.postgres_engine.connect() as conn:
+            with task_metrics.span('health.postgres'), db_manager.postgres_engine.connect() as conn:
                 conn.execute("SELECT 1")
             health_status['postgres'] = True
             logger.info("PostgreSQL health check passed")
@@ -214,7 +207,8 @@ def health_check():
         # Check Redis connection
         try:
             redis_client = db_manager.get_redis_client()
-            redis_client.ping()
+            with task_metrics.span('health.redis'):
+                redis_client.ping()
             health_status['redis'] = True
             logger.info("Redis health check passed")
         except Exception as e:
@@ -223,6 +217,17 @@ def health_check():
             health_status['errors'].append(error_msg)
             health_status['redis'] = False
         
+        # Per-namespace Redis key counts and memory
+        if health_status['redis']:
+            try:
+                sweeper = KeyspaceSweeper(db_manager.get_redis_client())
+                with task_metrics.span('health.redis_keyspace'):
+                    health_status['redis_keyspace'] = sweeper.namespace_stats()
+            except Exception as e:
+                error_msg = f"Redis keyspace stats failed: {str(e)}"
+                logger.warning(error_msg)
+                health_status['errors'].append(error_msg)
+        
         # Check DuckDB connection with lock handling
         try:
             # Use a more cautious approach for DuckDB
@@ -292,6 +297,9 @@ def health_check():
             logger.warning(error_msg)
             health_status['errors'].append(error_msg)
         
+        # Stage timings of the tasks this worker process has run
+        health_status['task_metrics'] = task_metrics.summary(include_symbols=False)
+        
         # Try to cache health status (but don't fail if Redis is down)
         try:
             if health_status['redis']:
@@ -17,6 +17,8 @@ import psycopg2
 from psycopg2.extras import RealDictCursor, execute_values
 import pandas as pd
 
+from utils import db_pool, export_bundle
+
 logger = logging.getLogger(__name__)
 
 # Database configuration
@@ -33,28 +35,30 @@ class OptimizationDataIngestion:
         """Initialize the ingestion system"""
         self.db_config = db_config or DB_CONFIG
         self.connection = None
-        self.hotbox_dir = "../autonama.ingestion/hotbox/export_results"  # Local path
+        # Local path; set OPTIMIZATION_RESULTS_DIR to the engine's export_results mount
+        self.hotbox_dir = os.getenv('OPTIMIZATION_RESULTS_DIR', "../autonama.ingestion/hotbox/export_results")
         
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = psycopg2.connect(
-                host=self.db_config['host'],
-                port=self.db_config['port'],
-                database=self.db_config['database'],
-                user=self.db_config['user'],
-                password=self.db_config['password']
-            )
+            # Borrowed from the process-wide pool; close_database() hands it back
+            self.connection = db_pool.acquire_postgres(self.pg_config)
             logger.info("Database connection established")
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
+    @property
+    def pg_config(self) -> Dict:
+        """psycopg2 connection parameters (the pool key)"""
+        return {key: self.db_config[key] for key in ('host', 'port', 'database', 'user', 'password')}
+    
     def close_database(self):
-        """Close database connection"""
+        """Return the database connection to the pool"""
         if self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
+            db_pool.release_postgres(self.pg_config, self.connection)
+            self.connection = None
+            logger.info("Database connection released")
     
     def get_latest_export_files(self) -> Dict[str, str]:
         """
@@ -66,6 +70,12 @@ class OptimizationDataIngestion:
         try:
             files = {}
             
+            # Find latest results bundle (replaces the per-type JSON files)
+            results_file = export_bundle.find_results_file(self.hotbox_dir)
+            if results_file:
+                files['results'] = results_file
+                logger.info(f"Found latest results bundle: {files['results']}")
+            
             # Find latest alerts file
             alerts_pattern = os.path.join(self.hotbox_dir, "alerts_*.json")
             alerts_files = glob.glob(alerts_pattern)
@@ -363,6 +373,31 @@ class OptimizationDataIngestion:
             self.connection.rollback()
             raise
     
+    def load_results_bundle(self, filepath: str) -> Dict[str, Any]:
+        """
+        Load alerts, analytics and summary from a results bundle
+        
+        Alerts only read the columns they need; the summary comes from the
+        file footer, so nothing is re-aggregated here.
+        """
+        footer = export_bundle.read_footer(filepath)
+        summary = footer.get('summary', {})
+        
+        alerts = export_bundle.read_results(filepath, columns=export_bundle.ALERT_COLUMNS).to_pylist()
+        for alert in alerts:
+            alert['timestamp'] = alert['analysis_date'] or footer.get('timestamp')
+        
+        return {
+            'alerts': alerts,
+            'analytics': export_bundle.read_results(filepath).to_pylist(),
+            'summary': {
+                'timestamp': footer.get('timestamp'),
+                'total_assets_analyzed': summary.get('total_assets'),
+                'analysis_summary': summary,
+                'optimization_enabled': footer.get('metadata', {}).get('optimization_enabled', True)
+            }
+        }
+    
     def load_json_file(self, filepath: str) -> Any:
         """Load JSON file"""
         try:
@@ -372,10 +407,13 @@ class OptimizationDataIngestion:
             logger.error(f"Error loading JSON file {filepath}: {e}")
             raise
     
-    def ingest_latest_data(self) -> Dict:
+    def ingest_latest_data(self, results_file: Optional[str] = None) -> Dict:
         """
         Ingest the latest optimization data
         
+        Args:
+            results_file: Results bundle to ingest (default: the newest one in the hotbox)
+        
         Returns:
             Dictionary with ingestion results
         """
@@ -387,12 +425,22 @@ class OptimizationDataIngestion:
             self.create_tables_if_not_exist()
             
             # Get latest export files
-            files = self.get_latest_export_files()
+            files = {'results': results_file} if results_file else self.get_latest_export_files()
             if not files:
                 return {'error': 'No export files found'}
             
             results = {}
             
+            # Runs exported as a results bundle
+            if 'results' in files:
+                bundle = self.load_results_bundle(files['results'])
+                results['alerts_ingested'] = self.ingest_alerts(bundle['alerts'])
+                results['analytics_ingested'] = self.ingest_asset_analytics(bundle['analytics'])
+                results['summary_ingested'] = self.ingest_optimization_summary(bundle['summary'])
+                self.close_database()
+                logger.info("Optimization data ingestion completed successfully")
+                return results
+            
             # Ingest alerts
             if 'alerts' in files:
                 alerts_data = self.load_json_file(files['alerts'])
@@ -428,7 +476,7 @@ class OptimizationDataIngestion:
             raise
 
 @shared_task(bind=True)
-def ingest_optimization_data(self):
+def ingest_optimization_data(self, manifest_name: Optional[str] = None):
     """
     Celery task to ingest optimization data from hotbox export
     
@@ -438,6 +486,11 @@ def ingest_optimization_data(self):
     3. Ingests analytics for detailed asset analysis
     4. Ingests summary data for dashboard overview
     5. Ingests plots data for chart generation
+    
+    Args:
+        manifest_name: Manifest of a completed run, relative to the hotbox
+            (autonama.engine/run_ledger.py sends it when the run completes);
+            its run folder's results bundle is ingested instead of the newest one
     """
     try:
         logger.info("Starting optimization data ingestion task")
@@ -445,8 +498,15 @@ def ingest_optimization_data(self):
         # Initialize ingestion system
         ingestion = OptimizationDataIngestion()
         
+        results_file = None
+        if manifest_name:
+            run_folder = os.path.dirname(os.path.join(ingestion.hotbox_dir, manifest_name))
+            results_file = export_bundle.find_results_file(run_folder)
+            if not results_file:
+                raise FileNotFoundError(f"No results bundle next to {manifest_name}")
+        
         # Ingest latest data
-        results = ingestion.ingest_latest_data()
+        results = ingestion.ingest_latest_data(results_file)
         
         logger.info(f"Optimization data ingestion completed: {results}")
         
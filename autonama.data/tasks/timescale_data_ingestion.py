@@ -23,6 +23,7 @@ import time
 import os
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
+from tasks.binance_asset_loader import universe
 
 logger = logging.getLogger(__name__)
 
@@ -590,39 +591,8 @@ def update_market_data_timescale_first(self, categories: Optional[List[str]] = N
         raise
 
 def get_top_100_crypto_assets() -> List[str]:
-    """Get top 100 crypto assets by 24h volume from Binance."""
-    try:
-        exchange = ccxt.binance({
-            'timeout': 30000,
-            'enableRateLimit': True,
-        })
-        
-        # Get 24hr ticker for all symbols
-        tickers = exchange.fetch_tickers()
-        
-        # Filter for USDT pairs and sort by volume
-        usdt_pairs = []
-        for symbol, ticker in tickers.items():
-            if symbol.endswith('/USDT') and symbol != 'USDT/USDT':
-                volume_usd = float(ticker.get('quoteVolume', 0))
-                if volume_usd > 0:  # Only include pairs with volume
-                    usdt_pairs.append({
-                        'symbol': symbol,
-                        'volume': volume_usd,
-                        'price': float(ticker.get('last', 0))
-                    })
-        
-        # Sort by volume and return top 100
-        usdt_pairs.sort(key=lambda x: x['volume'], reverse=True)
-        top_100_symbols = [pair['symbol'] for pair in usdt_pairs[:100]]
-        
-        logger.info(f"Found {len(top_100_symbols)} top crypto assets by volume")
-        return top_100_symbols
-        
-    except Exception as e:
-        logger.error(f"Error getting top 100 crypto assets: {e}")
-        # Fallback to default symbols
-        return ['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'BNB/USDT', 'SOL/USDT']
+    """Get top 100 crypto assets by 24h volume from the trading universe."""
+    return universe.symbols(100, pairs=True, fallback=['BTC/USDT', 'ETH/USDT', 'ADA/USDT', 'BNB/USDT', 'SOL/USDT'])
 
 def update_crypto_data_timescale(force_update: bool = False) -> Dict[str, int]:
     """Update crypto data using TimescaleDB-first approach."""
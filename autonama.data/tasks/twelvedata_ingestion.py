@@ -2,20 +2,20 @@
 TwelveData Data Ingestion Tasks for TimescaleDB
 
 This module implements TwelveData data ingestion tasks for stocks, forex, and commodities
-using the TimescaleDB-first architecture.
+using the TimescaleDB-first architecture. Symbols are fetched in multi-symbol requests
+paced by the plan's per-minute credits (utils/twelvedata_pipeline.py).
 """
 
 from celery import current_task
 from celery_app import celery_app
-import pandas as pd
-from datetime import datetime, timedelta
 from typing import List, Dict, Any, Optional
 import logging
-import time
-import os
 
-from processors.twelvedata_processor import TwelveDataProcessor, STOCK_SYMBOLS, FOREX_SYMBOLS, COMMODITY_SYMBOLS
-from tasks.timescale_data_ingestion import timescale_manager, duckdb_engine
+from processors.twelvedata_processor import (
+    TwelveDataProcessor, CATEGORY_MARKETS, STOCK_SYMBOLS, FOREX_SYMBOLS, COMMODITY_SYMBOLS,
+)
+from utils import twelvedata_pipeline
+from utils.database import get_engine, redis_client
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,39 @@ except Exception as e:
     logger.error(f"Failed to initialize TwelveData processor: {e}")
     twelvedata_processor = None
 
+# Per-minute credit allowance shared by every worker through Redis
+credit_budget = twelvedata_pipeline.CreditBudget(redis_client)
+
+
+def _update_category(category: str, symbols: List[str], force_update: bool) -> Dict[str, Any]:
+    """Batched update of one asset category (see utils/twelvedata_pipeline.py)."""
+    if not twelvedata_processor:
+        raise Exception("TwelveData processor not initialized")
+    
+    logger.info(f"Starting {category} data update for {len(symbols)} symbols")
+    
+    def progress(done: int, total: int, batch: List[str]):
+        current_task.update_state(
+            state='PROGRESS',
+            meta={
+                'current': done,
+                'total': total,
+                'symbols': batch,
+                'status': f'Fetching {len(batch)} {category} symbols (request {done + 1}/{total})'
+            }
+        )
+    
+    result = twelvedata_pipeline.ingest(
+        twelvedata_processor, get_engine(), symbols, category, credit_budget,
+        force_update=force_update, market=CATEGORY_MARKETS.get(category), progress=progress,
+    )
+    summary = result.to_dict()
+    
+    logger.info(f"{category.capitalize()} data update completed: {summary['success_count']} success, "
+                f"{summary['failed_count']} failed, {summary['total_records']} total records")
+    
+    return summary
+
 
 @celery_app.task(bind=True)
 def update_stock_data_timescale(self, symbols: Optional[List[str]] = None, force_update: bool = False):
@@ -38,85 +71,8 @@ def update_stock_data_timescale(self, symbols: Optional[List[str]] = None, force
         force_update: Whether to force update even if data is recent
     """
     try:
-        if not twelvedata_processor:
-            raise Exception("TwelveData processor not initialized")
-        
-        # Use default symbols if none provided
-        if symbols is None:
-            symbols = STOCK_SYMBOLS[:10]  # Start with first 10 for testing
-        
-        logger.info(f"Starting stock data update for {len(symbols)} symbols")
-        
-        success_count = 0
-        failed_count = 0
-        total_records = 0
-        
-        for i, symbol in enumerate(symbols, 1):
-            try:
-                # Update task progress
-                current_task.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i,
-                        'total': len(symbols),
-                        'symbol': symbol,
-                        'status': f'Processing stock {symbol}'
-                    }
-                )
-                
-                logger.info(f"Processing stock {symbol} ({i}/{len(symbols)})")
-                
-                # Check if we need to update (unless forced)
-                if not force_update:
-                    latest_timestamp = timescale_manager.get_latest_timestamp(symbol, 'twelvedata', '1d')
-                    if latest_timestamp and (datetime.utcnow() - latest_timestamp).total_seconds() < 86400:  # 24 hours
-                        logger.info(f"Skipping {symbol} - data is recent")
-                        continue
-                
-                # Fetch data from TwelveData
-                result = twelvedata_processor.update_symbol_data(symbol, 'stock', force_update)
-                
-                if result['success'] and result['data']:
-                    # Store in TimescaleDB
-                    inserted_count = timescale_manager.insert_ohlc_data(
-                        result['data'], symbol, 'twelvedata', '1d'
-                    )
-                    
-                    if inserted_count > 0:
-                        logger.info(f"✅ {symbol}: {inserted_count} records stored in TimescaleDB")
-                        success_count += 1
-                        total_records += inserted_count
-                        
-                        # Calculate technical indicators using DuckDB
-                        indicators = duckdb_engine.calculate_technical_indicators(symbol)
-                        if indicators:
-                            duckdb_engine.store_indicators_to_timescale(symbol, indicators, '1d')
-                            logger.info(f"Calculated and stored indicators for {symbol}")
-                    else:
-                        logger.warning(f"❌ {symbol}: No data inserted")
-                        failed_count += 1
-                else:
-                    logger.warning(f"❌ {symbol}: {result.get('error', 'Unknown error')}")
-                    failed_count += 1
-                
-                # Rate limiting delay
-                time.sleep(0.2)
-                
-            except Exception as e:
-                logger.error(f"Error processing stock {symbol}: {e}")
-                failed_count += 1
-        
-        logger.info(f"Stock data update completed: {success_count} success, {failed_count} failed, {total_records} total records")
-        
-        return {
-            'status': 'completed',
-            'category': 'stocks',
-            'symbols_processed': len(symbols),
-            'success_count': success_count,
-            'failed_count': failed_count,
-            'total_records': total_records,
-            'force_update': force_update
-        }
+        summary = _update_category('stock', symbols or STOCK_SYMBOLS, force_update)
+        return {'status': 'completed', 'category': 'stocks', **summary, 'force_update': force_update}
         
     except Exception as e:
         logger.error(f"Critical error in stock data update: {e}")
@@ -133,85 +89,8 @@ def update_forex_data_timescale(self, symbols: Optional[List[str]] = None, force
         force_update: Whether to force update even if data is recent
     """
     try:
-        if not twelvedata_processor:
-            raise Exception("TwelveData processor not initialized")
-        
-        # Use default symbols if none provided
-        if symbols is None:
-            symbols = FOREX_SYMBOLS[:10]  # Start with first 10 for testing
-        
-        logger.info(f"Starting forex data update for {len(symbols)} pairs")
-        
-        success_count = 0
-        failed_count = 0
-        total_records = 0
-        
-        for i, symbol in enumerate(symbols, 1):
-            try:
-                # Update task progress
-                current_task.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i,
-                        'total': len(symbols),
-                        'symbol': symbol,
-                        'status': f'Processing forex {symbol}'
-                    }
-                )
-                
-                logger.info(f"Processing forex {symbol} ({i}/{len(symbols)})")
-                
-                # Check if we need to update (unless forced)
-                if not force_update:
-                    latest_timestamp = timescale_manager.get_latest_timestamp(symbol, 'twelvedata', '1d')
-                    if latest_timestamp and (datetime.utcnow() - latest_timestamp).total_seconds() < 86400:  # 24 hours
-                        logger.info(f"Skipping {symbol} - data is recent")
-                        continue
-                
-                # Fetch data from TwelveData
-                result = twelvedata_processor.update_symbol_data(symbol, 'forex', force_update)
-                
-                if result['success'] and result['data']:
-                    # Store in TimescaleDB
-                    inserted_count = timescale_manager.insert_ohlc_data(
-                        result['data'], symbol, 'twelvedata', '1d'
-                    )
-                    
-                    if inserted_count > 0:
-                        logger.info(f"✅ {symbol}: {inserted_count} records stored in TimescaleDB")
-                        success_count += 1
-                        total_records += inserted_count
-                        
-                        # Calculate technical indicators using DuckDB
-                        indicators = duckdb_engine.calculate_technical_indicators(symbol)
-                        if indicators:
-                            duckdb_engine.store_indicators_to_timescale(symbol, indicators, '1d')
-                            logger.info(f"Calculated and stored indicators for {symbol}")
-                    else:
-                        logger.warning(f"❌ {symbol}: No data inserted")
-                        failed_count += 1
-                else:
-                    logger.warning(f"❌ {symbol}: {result.get('error', 'Unknown error')}")
-                    failed_count += 1
-                
-                # Rate limiting delay
-                time.sleep(0.2)
-                
-            except Exception as e:
-                logger.error(f"Error processing forex {symbol}: {e}")
-                failed_count += 1
-        
-        logger.info(f"Forex data update completed: {success_count} success, {failed_count} failed, {total_records} total records")
-        
-        return {
-            'status': 'completed',
-            'category': 'forex',
-            'symbols_processed': len(symbols),
-            'success_count': success_count,
-            'failed_count': failed_count,
-            'total_records': total_records,
-            'force_update': force_update
-        }
+        summary = _update_category('forex', symbols or FOREX_SYMBOLS, force_update)
+        return {'status': 'completed', 'category': 'forex', **summary, 'force_update': force_update}
         
     except Exception as e:
         logger.error(f"Critical error in forex data update: {e}")
@@ -228,85 +107,8 @@ def update_commodity_data_timescale(self, symbols: Optional[List[str]] = None, f
         force_update: Whether to force update even if data is recent
     """
     try:
-        if not twelvedata_processor:
-            raise Exception("TwelveData processor not initialized")
-        
-        # Use default symbols if none provided
-        if symbols is None:
-            symbols = COMMODITY_SYMBOLS[:10]  # Start with first 10 for testing
-        
-        logger.info(f"Starting commodity data update for {len(symbols)} symbols")
-        
-        success_count = 0
-        failed_count = 0
-        total_records = 0
-        
-        for i, symbol in enumerate(symbols, 1):
-            try:
-                # Update task progress
-                current_task.update_state(
-                    state='PROGRESS',
-                    meta={
-                        'current': i,
-                        'total': len(symbols),
-                        'symbol': symbol,
-                        'status': f'Processing commodity {symbol}'
-                    }
-                )
-                
-                logger.info(f"Processing commodity {symbol} ({i}/{len(symbols)})")
-                
-                # Check if we need to update (unless forced)
-                if not force_update:
-                    latest_timestamp = timescale_manager.get_latest_timestamp(symbol, 'twelvedata', '1d')
-                    if latest_timestamp and (datetime.utcnow() - latest_timestamp).total_seconds() < 86400:  # 24 hours
-                        logger.info(f"Skipping {symbol} - data is recent")
-                        continue
-                
-                # Fetch data from TwelveData
-                result = twelvedata_processor.update_symbol_data(symbol, 'commodity', force_update)
-                
-                if result['success'] and result['data']:
-                    # Store in TimescaleDB
-                    inserted_count = timescale_manager.insert_ohlc_data(
-                        result['data'], symbol, 'twelvedata', '1d'
-                    )
-                    
-                    if inserted_count > 0:
-                        logger.info(f"✅ {symbol}: {inserted_count} records stored in TimescaleDB")
-                        success_count += 1
-                        total_records += inserted_count
-                        
-                        # Calculate technical indicators using DuckDB
-                        indicators = duckdb_engine.calculate_technical_indicators(symbol)
-                        if indicators:
-                            duckdb_engine.store_indicators_to_timescale(symbol, indicators, '1d')
-                            logger.info(f"Calculated and stored indicators for {symbol}")
-                    else:
-                        logger.warning(f"❌ {symbol}: No data inserted")
-                        failed_count += 1
-                else:
-                    logger.warning(f"❌ {symbol}: {result.get('error', 'Unknown error')}")
-                    failed_count += 1
-                
-                # Rate limiting delay
-                time.sleep(0.2)
-                
-            except Exception as e:
-                logger.error(f"Error processing commodity {symbol}: {e}")
-                failed_count += 1
-        
-        logger.info(f"Commodity data update completed: {success_count} success, {failed_count} failed, {total_records} total records")
-        
-        return {
-            'status': 'completed',
-            'category': 'commodities',
-            'symbols_processed': len(symbols),
-            'success_count': success_count,
-            'failed_count': failed_count,
-            'total_records': total_records,
-            'force_update': force_update
-        }
+        summary = _update_category('commodity', symbols or COMMODITY_SYMBOLS, force_update)
+        return {'status': 'completed', 'category': 'commodities', **summary, 'force_update': force_update}
         
     except Exception as e:
         logger.error(f"Critical error in commodity data update: {e}")
@@ -35,6 +35,10 @@ def test_health_check():
             memory = result['memory_usage']
             print(f"   Memory Usage: {memory['percent']}%")
         
+        if result.get('redis_keyspace'):
+            for name, stats in result['redis_keyspace'].items():
+                print(f"   Redis [{name}]: {stats.get('keys', 0)} keys, ~{stats.get('memory_bytes_estimated', 0)} bytes")
+        
         if result.get('errors'):
             print(f"   Errors: {len(result['errors'])}")
             for error in result['errors']:
@@ -58,6 +62,8 @@ def test_cleanup_task():
         print(f"   Status: {result.get('status', 'N/A')}")
         print(f"   Database records cleaned: {result.get('database_records_cleaned', 0)}")
         print(f"   Redis keys cleaned: {result.get('redis_keys_cleaned', 0)}")
+        for name, stats in result.get('redis_sweep', {}).items():
+            print(f"   Redis sweep [{name}]: {stats}")
         print(f"   PostgreSQL available: {'✅' if result.get('postgres_available') else '❌'}")
         
         if result.get('error'):
@@ -0,0 +1,110 @@
+"""
+Batch Workflows
+
+Fan-out for batch tasks (one task over many symbols) that never waits on
+its own subtasks from inside a worker:
+
+- the symbols are split into at most max_chunks contiguous chunks; each
+  chunk is one subtask that works through its symbols in-process, so a
+  batch holds at most max_chunks worker slots at any time and other tasks
+  on the queue are picked up in between
+- the chunks are the header of a chord; its callback receives the list of
+  chunk results, aggregates them and stores the outcome
+- launch() returns as soon as the chord is sent. The chunk group is saved
+  in the result backend under its batch id, and progress(batch_id) derives
+  the batch's progress from the chunk states (chunks publish PROGRESS with
+  current/total while they run)
+
+Batch wall time is then about N / min(workers, max_chunks) times the
+per-symbol time instead of N times, without a worker blocked on .get().
+"""
+
+import os
+import math
+import logging
+from typing import Any, Dict, List, Optional, Sequence
+
+from celery import chord, group, current_app
+from celery.result import GroupResult
+
+from utils.task_queues import CPU_QUEUE, QUEUE_PROFILES
+
+logger = logging.getLogger(__name__)
+
+# Default cap on concurrently running chunks of one batch: all cpu slots but one
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY',
+                                      str(max(1, QUEUE_PROFILES[CPU_QUEUE].concurrency - 1))))
+
+
+def chunked(items: Sequence[Any], max_chunks: int = BATCH_MAX_CONCURRENCY,
+            min_chunk_size: int = 1) -> List[List[Any]]:
+    """Split items, in order, into at most max_chunks chunks of near-equal size."""
+    items = list(items)
+    if not items:
+        return []
+    count = max(1, min(max_chunks, math.ceil(len(items) / max(1, min_chunk_size))))
+    size, extra = divmod(len(items), count)
+    chunks, start = [], 0
+    for i in range(count):
+        end = start + size + (1 if i < extra else 0)
+        chunks.append(items[start:end])
+        start = end
+    return chunks
+
+
+def launch(chunk_task, items: Sequence[Any], callback, chunk_kwargs: Optional[Dict[str, Any]] = None,
+           max_chunks: Optional[int] = None, min_chunk_size: int = 1) -> Dict[str, Any]:
+    """
+    Run chunk_task(chunk, **chunk_kwargs) over items as a chord with callback
+    (a signature; it receives the list of chunk results as its first argument).
+    """
+    chunks = chunked(items, max_chunks or BATCH_MAX_CONCURRENCY, min_chunk_size)
+    header = group(chunk_task.s(chunk, **(chunk_kwargs or {})) for chunk in chunks)
+    result = chord(header)(callback)
+    if result.parent is not None:
+        result.parent.save()
+    logger.info(f"Launched batch {result.parent.id if result.parent else None}: "
+                f"{len(items)} items in {len(chunks)} chunks")
+    return {
+        'batch_id': result.parent.id if result.parent else None,
+        'callback_id': result.id,
+        'chunks': len(chunks),
+        'total': len(items)
+    }
+
+
+def progress(batch_id: str, total: Optional[int] = None, app=None) -> Optional[Dict[str, Any]]:
+    """
+    Progress of a launched batch from its chunk states, or None when the
+    batch is unknown (never saved or expired from the result backend).
+
+    Chunks that have not started yet do not report their size; pass the
+    batch's total (returned by launch) for an exact percentage.
+    """
+    result = GroupResult.restore(batch_id, app=app or current_app)
+    if result is None:
+        return None
+    done = reported = chunks_done = chunks_failed = 0
+    for child in result.results:
+        state = child.state
+        if state == 'SUCCESS':
+            size = len(child.result or [])
+            done += size
+            reported += size
+            chunks_done += 1
+        elif state == 'PROGRESS' and isinstance(child.info, dict):
+            done += int(child.info.get('current', 0))
+            reported += int(child.info.get('total', 0))
+        elif state in ('FAILURE', 'REVOKED'):
+            chunks_failed += 1
+    total = total if total is not None else reported
+    return {
+        'batch_id': batch_id,
+        'chunks': len(result.results),
+        'chunks_done': chunks_done,
+        'chunks_failed': chunks_failed,
+        'current': done,
+        'total': total,
+        'percent': round(100.0 * done / total, 1) if total else 0.0,
+        'ready': chunks_done + chunks_failed == len(result.results)
+    }
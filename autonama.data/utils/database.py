@@ -6,6 +6,8 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker, scoped_session
 from typing import Optional, Generator, Any, Dict
 from dotenv import load_dotenv
+from utils.redis_keyspace import namespaced_key, NAMESPACES
+from utils import db_pool
 
 load_dotenv()
 
@@ -17,8 +19,22 @@ POSTGRES_DB = os.getenv('POSTGRES_DB', 'autonama')
 POSTGRES_PORT = os.getenv('POSTGRES_PORT', '15432')
 DATABASE_URL = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}:{POSTGRES_PORT}/{POSTGRES_DB}"
 
+# Pool sizing per worker process; every connection gets a server-side statement timeout
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))
+
 # Create database engine
-engine = create_engine(DATABASE_URL, pool_pre_ping=True, echo=False)
+engine = create_engine(
+    DATABASE_URL,
+    pool_pre_ping=True,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_timeout=30,
+    connect_args={'options': f"-c statement_timeout={db_pool.PG_STATEMENT_TIMEOUT_MS}"},
+    echo=False
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # DuckDB connection
@@ -45,6 +61,26 @@ def get_timescale_connection():
     """Get a database session"""
     return SessionLocal()
 
+def get_engine():
+    """Pooled SQLAlchemy engine (use engine.begin() for one pooled connection per unit of work)"""
+    return engine
+
+def _on_worker_process_init(**kwargs):
+    # A forked pool child must not reuse the parent's sockets; drop them without closing
+    engine.dispose(close=False)
+
+def _on_worker_shutdown(**kwargs):
+    engine.dispose()
+    db_pool.close_all()
+
+def connect_worker_signals():
+    """Reset connection pools in forked worker processes and close them on shutdown. Safe to call more than once."""
+    from celery.signals import worker_process_init, worker_process_shutdown, worker_shutdown
+    worker_process_init.connect(_on_worker_process_init, weak=False, dispatch_uid='autonama_db_process_init')
+    worker_process_shutdown.connect(_on_worker_shutdown, weak=False, dispatch_uid='autonama_db_process_shutdown')
+    # Solo/threads/gevent pools have no child processes
+    worker_shutdown.connect(_on_worker_shutdown, weak=False, dispatch_uid='autonama_db_worker_shutdown')
+
 def get_duckdb() -> Optional[Any]:
     """Get DuckDB connection - REMOVED: No longer needed"""
     # DuckDB removed - all calculations done locally
@@ -76,19 +112,26 @@ class DatabaseManager:
         # DuckDB removed - all calculations done locally
         pass
     
+    def get_redis_client(self):
+        """Get Redis client"""
+        return self.redis_client
+    
     def cache_data(self, key: str, data: Any, expire: int = 3600):
-        """Cache data in Redis"""
+        """Cache data in Redis under the 'cache' namespace"""
         import json
         if isinstance(data, pd.DataFrame):
             data = data.to_json()
         elif not isinstance(data, str):
             data = json.dumps(data)
         
-        self.redis_client.setex(key, expire, data)
+        max_ttl = NAMESPACES['cache'].policy.max_ttl
+        if max_ttl is not None:
+            expire = min(expire, max_ttl)
+        self.redis_client.setex(namespaced_key('cache', key), expire, data)
     
     def get_cached_data(self, key: str) -> Optional[Any]:
         """Get cached data from Redis"""
-        data = self.redis_client.get(key)
+        data = self.redis_client.get(namespaced_key('cache', key))
         if data:
             try:
                 import json
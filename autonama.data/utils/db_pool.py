@@ -0,0 +1,259 @@
+"""
+Database Connections
+
+Copy of autonama.engine/db_pool.py for the data service image, which is
+built from autonama.data only. Keep the two files identical.
+
+Reusable connections for the engine stores and the ingestion systems, so a
+connection is set up once per thread (SQLite) or per pool slot (PostgreSQL)
+instead of once per store, read or symbol.
+
+SQLite (engine stores such as crypto_data.db):
+- sqlite_connection(path) returns this thread's persistent connection to
+  the file, opened once in WAL mode (readers no longer block the writer),
+  synchronous=NORMAL, with a busy timeout instead of immediate "database
+  is locked" errors
+- connections keep a larger prepared-statement cache; sqlite3 caches the
+  compiled statements per connection, which only pays off once the
+  connection is reused
+- sqlite_transaction(path) commits or rolls back on that connection
+
+PostgreSQL (ingestion):
+- postgres_connection(db_config) borrows a connection from a psycopg2
+  ThreadedConnectionPool per configuration and commits / rolls back and
+  returns it on exit; acquire_postgres()/release_postgres() do the same for
+  objects that hold a connection across method calls
+- borrowers block when the pool is exhausted instead of failing, connections
+  idle for longer than PRE_PING_IDLE are pinged before being handed out,
+  and every session gets a server-side statement_timeout
+
+close_all() closes everything this process opened; Celery workers call it
+from worker_process_shutdown (see autonama.data/utils/database.py), and
+connections are never reused across a fork.
+
+Usage:
+    with sqlite_transaction(self.db_path) as conn:
+        conn.executemany("INSERT ...", rows)
+
+    with postgres_connection(db_config) as conn:
+        with conn.cursor() as cursor:
+            cursor.execute("...")
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import logging
+import weakref
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# SQLite
+SQLITE_BUSY_TIMEOUT = float(os.getenv('AUTONAMA_SQLITE_BUSY_TIMEOUT', '30'))
+SQLITE_STATEMENT_CACHE = 256
+
+# PostgreSQL
+PG_POOL_MIN = int(os.getenv('AUTONAMA_PG_POOL_MIN', '1'))
+PG_POOL_MAX = int(os.getenv('AUTONAMA_PG_POOL_MAX', '8'))
+PG_STATEMENT_TIMEOUT_MS = int(os.getenv('AUTONAMA_PG_STATEMENT_TIMEOUT_MS', '300000'))
+# Ping connections that have been idle for longer than this before reuse (seconds)
+PRE_PING_IDLE = 30.0
+
+
+class _SQLiteConnection(sqlite3.Connection):
+    """sqlite3.Connection that can be weakly referenced."""
+
+
+_local = threading.local()
+_lock = threading.Lock()
+# Open SQLite connections of this process, for close_all(); connections of
+# finished threads drop out when the thread's locals are collected
+_sqlite_connections: 'weakref.WeakSet[_SQLiteConnection]' = weakref.WeakSet()
+# Bumped by close_all() so threads reopen instead of using a closed connection
+_generation = 0
+_pg_pools: Dict[Tuple, '_PostgresPool'] = {}
+_pool_pid = os.getpid()
+
+
+def _check_fork():
+    """Forget connections inherited from a parent process (they belong to it)."""
+    global _pool_pid, _generation
+    if os.getpid() != _pool_pid:
+        with _lock:
+            _pool_pid = os.getpid()
+            _sqlite_connections.clear()
+            _pg_pools.clear()
+            _generation += 1
+
+
+# SQLite
+
+def _open_sqlite(path: str) -> sqlite3.Connection:
+    # Only the owning thread uses the connection; close_all() may close it from another
+    conn = sqlite3.connect(path, timeout=SQLITE_BUSY_TIMEOUT, cached_statements=SQLITE_STATEMENT_CACHE,
+                           check_same_thread=False, factory=_SQLiteConnection)
+    if path != ':memory:':
+        conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA foreign_keys=ON")
+    with _lock:
+        _sqlite_connections.add(conn)
+    return conn
+
+
+def sqlite_connection(path: str) -> sqlite3.Connection:
+    """This thread's persistent connection to a SQLite file (do not close it)."""
+    _check_fork()
+    if getattr(_local, 'generation', None) != _generation:
+        _local.sqlite = {}
+        _local.generation = _generation
+    connections = _local.sqlite
+    key = os.path.abspath(path) if path != ':memory:' else path
+    conn = connections.get(key)
+    if conn is None:
+        conn = connections[key] = _open_sqlite(path)
+    return conn
+
+
+@contextmanager
+def sqlite_transaction(path: str) -> Iterator[sqlite3.Connection]:
+    """Commit on success, roll back on error; the connection stays open."""
+    conn = sqlite_connection(path)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+
+
+# PostgreSQL
+
+class _PostgresPool:
+    """ThreadedConnectionPool that blocks when exhausted and pre-pings idle connections."""
+
+    def __init__(self, db_config: Dict[str, Any], minconn: int, maxconn: int):
+        from psycopg2.pool import ThreadedConnectionPool
+
+        options = f"-c statement_timeout={PG_STATEMENT_TIMEOUT_MS}"
+        if db_config.get('options'):
+            options = f"{db_config['options']} {options}"
+        params = {**db_config, 'options': options, 'keepalives': 1, 'keepalives_idle': 30}
+        self.pool = ThreadedConnectionPool(minconn, maxconn, **params)
+        self.slots = threading.BoundedSemaphore(maxconn)
+        self.returned_at: Dict[int, float] = {}
+
+    def getconn(self):
+        self.slots.acquire()
+        try:
+            conn = self.pool.getconn()
+            if conn.closed or self._stale(conn):
+                self.pool.putconn(conn, close=True)
+                conn = self.pool.getconn()
+            return conn
+        except Exception:
+            self.slots.release()
+            raise
+
+    def _stale(self, conn) -> bool:
+        idle = time.monotonic() - self.returned_at.get(id(conn), time.monotonic())
+        if idle < PRE_PING_IDLE:
+            return False
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return False
+        except Exception:
+            return True
+
+    def putconn(self, conn, close: bool = False):
+        try:
+            self.returned_at[id(conn)] = time.monotonic()
+            self.pool.putconn(conn, close=close or bool(conn.closed))
+        finally:
+            self.slots.release()
+
+    def closeall(self):
+        self.pool.closeall()
+
+
+def _pool_key(db_config: Dict[str, Any]) -> Tuple:
+    return tuple(sorted((key, str(value)) for key, value in db_config.items()))
+
+
+def postgres_pool(db_config: Dict[str, Any], minconn: int = PG_POOL_MIN, maxconn: int = PG_POOL_MAX) -> _PostgresPool:
+    """The process-wide pool for a connection configuration (psycopg2.connect kwargs)."""
+    _check_fork()
+    key = _pool_key(db_config)
+    with _lock:
+        pool = _pg_pools.get(key)
+        if pool is None:
+            pool = _pg_pools[key] = _PostgresPool(db_config, minconn, maxconn)
+            logger.info(f"PostgreSQL pool for {db_config.get('host')}/{db_config.get('database')} "
+                        f"({minconn}-{maxconn} connections)")
+    return pool
+
+
+def acquire_postgres(db_config: Dict[str, Any]):
+    """Borrow a pooled connection; hand it back with release_postgres()."""
+    return postgres_pool(db_config).getconn()
+
+
+def release_postgres(db_config: Dict[str, Any], conn, close: bool = False):
+    """Return a borrowed connection, rolling back anything left uncommitted."""
+    if conn is None:
+        return
+    pool = _pg_pools.get(_pool_key(db_config))
+    if pool is None:
+        conn.close()
+        return
+    if not conn.closed:
+        try:
+            conn.rollback()
+        except Exception:
+            close = True
+    pool.putconn(conn, close=close)
+
+
+@contextmanager
+def postgres_connection(db_config: Dict[str, Any]):
+    """Pooled connection: commit on success, roll back on error, then return it to the pool."""
+    conn = acquire_postgres(db_config)
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        release_postgres(db_config, conn)
+
+
+# Lifecycle
+
+@atexit.register
+def close_all():
+    """Close every pool and SQLite connection opened by this process."""
+    global _generation
+    with _lock:
+        pools = list(_pg_pools.values())
+        _pg_pools.clear()
+        connections = list(_sqlite_connections)
+        _sqlite_connections.clear()
+        _generation += 1
+    for pool in pools:
+        try:
+            pool.closeall()
+        except Exception as e:
+            logger.warning(f"Error closing PostgreSQL pool: {e}")
+    for conn in connections:
+        try:
+            conn.close()
+        except Exception:
+            pass
@@ -0,0 +1,201 @@
+"""
+Optimization Export Bundle
+
+Copy of autonama.engine/export_bundle.py for the data service image, which
+is built from autonama.data only. Keep the four files identical.
+
+One columnar artifact per optimization run instead of four pretty-printed
+JSON copies of the same results:
+
+- results_<timestamp>.parquet: one row per asset, zstd-compressed, with the
+  summary aggregates stored in the file footer (key b'autonama.summary')
+- the run manifest records the file's sha256, size, row count and columns
+
+Readers project the columns they need (read_results(columns=[...])) and
+memory-map the file; read_summary only touches the footer.
+"""
+
+import os
+import json
+import glob
+import hashlib
+from typing import Dict, List, Optional, Any
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+BUNDLE_FORMAT_VERSION = 1
+SUMMARY_METADATA_KEY = b'autonama.summary'
+COMPRESSION = 'zstd'
+COMPRESSION_LEVEL = 9
+
+# Column order and types of the results table
+RESULT_SCHEMA = pa.schema([
+    ('symbol', pa.string()),
+    ('signal', pa.string()),
+    ('interval', pa.string()),
+    ('current_price', pa.float64()),
+    ('lower_band', pa.float64()),
+    ('upper_band', pa.float64()),
+    ('potential_return', pa.float64()),
+    ('total_return', pa.float64()),
+    ('signal_strength', pa.float64()),
+    ('risk_level', pa.string()),
+    ('sharpe_ratio', pa.float64()),
+    ('max_drawdown', pa.float64()),
+    ('degree', pa.int64()),
+    ('kstd', pa.float64()),
+    ('lookback', pa.int64()),
+    ('optimized_degree', pa.int64()),
+    ('optimized_kstd', pa.float64()),
+    ('optimized_lookback', pa.int64()),
+    ('optimization_improvement', pa.float64()),
+    ('data_points', pa.int64()),
+    ('total_available', pa.int64()),
+    ('analysis_date', pa.string()),
+    ('last_candle', pa.string()),
+    ('data_fingerprint', pa.string()),
+    # Walk-forward metrics (walkforward.WalkForwardResult.summary); null when not run
+    ('oos_return', pa.float64()),
+    ('oos_sharpe_ratio', pa.float64()),
+    ('oos_max_drawdown', pa.float64()),
+    ('is_return', pa.float64()),
+    ('wf_efficiency', pa.float64()),
+    ('wf_positive_folds', pa.float64()),
+    ('wf_folds', pa.int64()),
+    ('wf_trades', pa.int64()),
+    ('wf_degree', pa.int64()),
+    ('wf_kstd', pa.float64()),
+    ('wf_lookback', pa.int64()),
+])
+
+# Columns used by the alert consumers
+ALERT_COLUMNS = [
+    'symbol', 'signal', 'current_price', 'potential_return', 'signal_strength',
+    'risk_level', 'interval', 'optimized_degree', 'optimized_kstd', 'optimized_lookback',
+    'total_return', 'sharpe_ratio', 'max_drawdown', 'data_points', 'total_available',
+    'analysis_date',
+]
+
+# Columns kept for the top BUY/SELL lists in the summary
+TOP_SIGNAL_COLUMNS = ['symbol', 'signal', 'current_price', 'potential_return', 'total_return', 'risk_level']
+
+
+def results_table(results: List[Dict[str, Any]]) -> pa.Table:
+    """Build the results table column by column. NaN becomes null."""
+    defaults = {'signal': 'HOLD', 'risk_level': 'MEDIUM', 'interval': '1d'}
+    columns = []
+    for field in RESULT_SCHEMA:
+        default = defaults.get(field.name)
+        values = [r.get(field.name, default) for r in results]
+        if pa.types.is_string(field.type):
+            values = [None if v is None else str(v) for v in values]
+            columns.append(pa.array(values, type=field.type))
+        else:
+            columns.append(pa.array(values, type=field.type, from_pandas=True))
+    return pa.Table.from_arrays(columns, schema=RESULT_SCHEMA)
+
+
+def _mean_or_zero(column: pa.ChunkedArray) -> float:
+    """Mean with nulls counted as 0, matching the old `r.get(...) or 0` sums."""
+    if len(column) == 0:
+        return 0.0
+    return float(pc.mean(pc.fill_null(column, 0.0)).as_py())
+
+
+def _top_signals(table: pa.Table, signal: str, limit: int) -> List[Dict]:
+    subset = table.filter(pc.equal(table['signal'], signal))
+    if subset.num_rows == 0:
+        return []
+    subset = subset.select(TOP_SIGNAL_COLUMNS).sort_by([('potential_return', 'descending')])
+    return subset.slice(0, limit).to_pylist()
+
+
+def summary_aggregates(table: pa.Table, top_n: int = 10) -> Dict[str, Any]:
+    """Signal counts, averages and top BUY/SELL lists in one pass per column."""
+    counts = {row['values']: row['counts'] for row in pc.value_counts(table['signal']).to_pylist()}
+    return {
+        'total_assets': table.num_rows,
+        'buy_signals': counts.get('BUY', 0),
+        'sell_signals': counts.get('SELL', 0),
+        'hold_signals': counts.get('HOLD', 0),
+        'avg_potential_return': _mean_or_zero(table['potential_return']),
+        'avg_total_return': _mean_or_zero(table['total_return']),
+        'assets_optimized': table.num_rows - table['optimized_degree'].null_count,
+        'avg_optimization_improvement': _mean_or_zero(table['optimization_improvement']),
+        'top_buy_signals': _top_signals(table, 'BUY', top_n),
+        'top_sell_signals': _top_signals(table, 'SELL', top_n),
+    }
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_bundle(results: List[Dict[str, Any]], out_dir: str, timestamp: str,
+                 metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Write results_<timestamp>.parquet into out_dir.
+
+    Returns the manifest entry for the file: path, checksum, size, rows,
+    columns and the summary aggregates.
+    """
+    table = results_table(results)
+    summary = summary_aggregates(table)
+    footer = {
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'timestamp': timestamp,
+        'metadata': metadata or {},
+        'summary': summary,
+    }
+    table = table.replace_schema_metadata({
+        SUMMARY_METADATA_KEY: json.dumps(footer, default=str).encode('utf-8')
+    })
+
+    path = os.path.join(out_dir, f"results_{timestamp}.parquet")
+    pq.write_table(table, path, compression=COMPRESSION, compression_level=COMPRESSION_LEVEL)
+
+    return {
+        'format': 'parquet',
+        'format_version': BUNDLE_FORMAT_VERSION,
+        'compression': COMPRESSION,
+        'file': os.path.basename(path),
+        'path': path,
+        'sha256': file_sha256(path),
+        'bytes': os.path.getsize(path),
+        'rows': table.num_rows,
+        'columns': table.column_names,
+        'summary': summary,
+    }
+
+
+def find_results_file(directory: str) -> Optional[str]:
+    """Most recent results_*.parquet in directory or its run subfolders."""
+    candidates = glob.glob(os.path.join(directory, 'results_*.parquet'))
+    candidates += glob.glob(os.path.join(directory, '*', 'results_*.parquet'))
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def read_results(path: str, columns: Optional[List[str]] = None, filters=None) -> pa.Table:
+    """Read (a projection of) the results table, memory-mapped."""
+    return pq.read_table(path, columns=columns, filters=filters, memory_map=True)
+
+
+def read_footer(path: str) -> Dict[str, Any]:
+    """Format version, timestamp, metadata and summary, from the footer only."""
+    metadata = pq.read_schema(path, memory_map=True).metadata or {}
+    raw = metadata.get(SUMMARY_METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def read_summary(path: str) -> Dict[str, Any]:
+    return read_footer(path).get('summary', {})
+
+
+def verify_checksum(path: str, expected_sha256: str) -> bool:
+    return file_sha256(path) == expected_sha256
@@ -0,0 +1,266 @@
+"""
+Job Queue
+
+Copy of autonama.api/src/core/job_queue.py for the data service image,
+which is built from autonama.data only. Keep the two files identical.
+
+Durable job queue on Redis Streams, shared by the API (producers) and the
+job workers (consumers).
+
+- One stream per priority lane (jobs:<queue>:<lane>), consumed through a
+  consumer group; workers always drain the interactive lane before the
+  batch lane, so a single-asset request from the UI does not wait behind a
+  nightly full-universe run
+- Streams are capped with XADD MAXLEN ~ (approximate trimming, O(1))
+- Job state lives in one hash per job (jobs:status:<id>): status lookups
+  are a single HGETALL, and finished jobs expire after history_ttl
+- jobs:<queue>:history is a sorted set of finished job ids, trimmed by age
+  and length, for history listings
+- reclaim() moves entries left pending by a crashed worker (XAUTOCLAIM) to
+  a live one, and fails jobs that have used up max_attempts; progress()
+  doubles as a heartbeat, so long jobs should report progress more often
+  than the reclaim idle time
+
+The Redis client must be created with decode_responses=True.
+"""
+
+import json
+import time
+import uuid
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+# Highest priority first
+LANES = ('interactive', 'batch')
+
+STATUS_PENDING = 'pending'
+STATUS_RUNNING = 'running'
+STATUS_COMPLETED = 'completed'
+STATUS_FAILED = 'failed'
+
+_JSON_FIELDS = ('payload', 'result')
+
+
+class JobQueue:
+    """Priority lanes of one named queue, e.g. JobQueue(redis_client, 'optimization')."""
+
+    def __init__(self, redis_client, queue: str, group: str = 'workers', lanes: Sequence[str] = LANES,
+                 maxlen: int = 10000, history_ttl: int = 7 * 86400, max_history: int = 1000):
+        self.redis = redis_client
+        self.queue = queue
+        self.group = group
+        self.lanes = tuple(lanes)
+        self.maxlen = maxlen
+        self.history_ttl = history_ttl
+        self.max_history = max_history
+        self._groups_ready = False
+
+    # Keys
+
+    def stream_key(self, lane: str) -> str:
+        return f"jobs:{self.queue}:{lane}"
+
+    @staticmethod
+    def status_key(job_id: str) -> str:
+        return f"jobs:status:{job_id}"
+
+    @property
+    def history_key(self) -> str:
+        return f"jobs:{self.queue}:history"
+
+    # Producers
+
+    def submit(self, job_type: str, payload: Optional[Dict[str, Any]] = None, lane: str = 'batch',
+               job_id: Optional[str] = None) -> str:
+        """Queue a job and return its id."""
+        if lane not in self.lanes:
+            raise ValueError(f"Unknown lane '{lane}' (expected one of {self.lanes})")
+        job_id = job_id or str(uuid.uuid4())
+        status_key = self.status_key(job_id)
+
+        pipe = self.redis.pipeline(transaction=True)
+        pipe.hset(status_key, mapping={
+            'job_id': job_id,
+            'queue': self.queue,
+            'lane': lane,
+            'job_type': job_type,
+            'status': STATUS_PENDING,
+            'payload': json.dumps(payload or {}, default=str),
+            'attempts': 0,
+            'progress': 0,
+            'created_at': datetime.utcnow().isoformat(),
+        })
+        pipe.expire(status_key, self.history_ttl)
+        pipe.xadd(self.stream_key(lane), {'job_id': job_id}, maxlen=self.maxlen, approximate=True)
+        pipe.execute()
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Current state of a job, or None if unknown or expired."""
+        return self._decode(self.redis.hgetall(self.status_key(job_id)))
+
+    def history(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recently finished jobs, newest first."""
+        job_ids = self.redis.zrevrange(self.history_key, 0, limit - 1)
+        pipe = self.redis.pipeline(transaction=False)
+        for job_id in job_ids:
+            pipe.hgetall(self.status_key(job_id))
+        return [job for job in map(self._decode, pipe.execute()) if job]
+
+    def stats(self) -> Dict[str, Any]:
+        """Length and pending (claimed, unacknowledged) count per lane."""
+        self.ensure_groups()
+        pipe = self.redis.pipeline(transaction=False)
+        for lane in self.lanes:
+            pipe.xlen(self.stream_key(lane))
+            pipe.xpending(self.stream_key(lane), self.group)
+        replies = pipe.execute()
+        lanes = {}
+        for i, lane in enumerate(self.lanes):
+            lanes[lane] = {'length': replies[2 * i], 'pending': replies[2 * i + 1]['pending']}
+        return {'queue': self.queue, 'lanes': lanes, 'history': self.redis.zcard(self.history_key)}
+
+    # Consumers
+
+    def ensure_groups(self):
+        """Create the consumer group on every lane (idempotent)."""
+        if self._groups_ready:
+            return
+        for lane in self.lanes:
+            try:
+                self.redis.xgroup_create(self.stream_key(lane), self.group, id='0', mkstream=True)
+            except Exception as e:
+                if 'BUSYGROUP' not in str(e):
+                    raise
+        self._groups_ready = True
+
+    def claim(self, consumer: str, count: int = 1, block_ms: int = 5000) -> List[Dict[str, Any]]:
+        """
+        Next jobs for this consumer, highest lane first.
+
+        Lanes are polled without blocking in priority order; only when all
+        are empty does the call block on every lane at once.
+        """
+        self.ensure_groups()
+        for lane in self.lanes:
+            reply = self.redis.xreadgroup(self.group, consumer, {self.stream_key(lane): '>'}, count=count)
+            if reply:
+                return self._start(consumer, reply)
+        reply = self.redis.xreadgroup(self.group, consumer, {self.stream_key(lane): '>' for lane in self.lanes},
+                                      count=count, block=block_ms)
+        return self._start(consumer, reply or [])
+
+    def reclaim(self, consumer: str, min_idle_ms: int = 10 * 60 * 1000, max_attempts: int = 3) -> List[Dict[str, Any]]:
+        """
+        Take over entries another consumer claimed but never acknowledged.
+
+        Jobs that already ran max_attempts times are failed instead of being
+        returned.
+        """
+        self.ensure_groups()
+        jobs = []
+        for lane in self.lanes:
+            stream = self.stream_key(lane)
+            start_id = '0-0'
+            while True:
+                reply = self.redis.xautoclaim(stream, self.group, consumer, min_idle_time=min_idle_ms,
+                                              start_id=start_id, count=100)
+                start_id, messages = reply[0], reply[1]
+                for message_id, fields in messages:
+                    if not fields:
+                        # Entry trimmed from the stream while pending
+                        self.redis.xack(stream, self.group, message_id)
+                        continue
+                    job = self.status(fields['job_id'])
+                    if job is None:
+                        self.redis.xack(stream, self.group, message_id)
+                        continue
+                    job.update(message_id=message_id, stream=stream)
+                    if int(job.get('attempts', 0)) >= max_attempts:
+                        logger.warning(f"Job {job['job_id']} failed after {job['attempts']} attempts")
+                        self.fail(job, f"Abandoned after {job['attempts']} attempts")
+                        continue
+                    logger.info(f"Reclaimed job {job['job_id']} from {stream}")
+                    jobs.extend(self._start(consumer, [(stream, [(message_id, fields)])]))
+                if start_id in ('0-0', b'0-0'):
+                    break
+        return jobs
+
+    def progress(self, job: Dict[str, Any], progress: float, message: Optional[str] = None):
+        """Record progress and reset the entry's idle time, so reclaim() leaves a live job alone."""
+        mapping = {'progress': round(progress, 2), 'updated_at': datetime.utcnow().isoformat()}
+        if message:
+            mapping['message'] = message
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.hset(self.status_key(job['job_id']), mapping=mapping)
+        if job.get('message_id'):
+            pipe.xclaim(job['stream'], self.group, job['consumer'], 0, [job['message_id']], justid=True)
+        pipe.execute()
+
+    def complete(self, job: Dict[str, Any], result: Any = None):
+        self._finish(job, {'status': STATUS_COMPLETED, 'progress': 100,
+                           'result': json.dumps(result, default=str)})
+
+    def fail(self, job: Dict[str, Any], error: str):
+        self._finish(job, {'status': STATUS_FAILED, 'error': error})
+
+    # Internals
+
+    def _start(self, consumer: str, reply) -> List[Dict[str, Any]]:
+        """Mark claimed stream entries as running and return their jobs, highest lane first."""
+        entries = []
+        for stream, messages in reply:
+            for message_id, fields in messages:
+                entries.append((stream, message_id, fields['job_id']))
+        if not entries:
+            return []
+        lane_order = {self.stream_key(lane): i for i, lane in enumerate(self.lanes)}
+        entries.sort(key=lambda entry: lane_order.get(entry[0], len(lane_order)))
+
+        pipe = self.redis.pipeline(transaction=False)
+        now = datetime.utcnow().isoformat()
+        for _, _, job_id in entries:
+            status_key = self.status_key(job_id)
+            pipe.hset(status_key, mapping={'status': STATUS_RUNNING, 'consumer': consumer, 'started_at': now})
+            pipe.hincrby(status_key, 'attempts', 1)
+            pipe.hgetall(status_key)
+        replies = pipe.execute()
+
+        jobs = []
+        for i, (stream, message_id, _) in enumerate(entries):
+            job = self._decode(replies[3 * i + 2])
+            if job:
+                job.update(message_id=message_id, stream=stream)
+                jobs.append(job)
+        return jobs
+
+    def _finish(self, job: Dict[str, Any], fields: Dict[str, Any]):
+        now = time.time()
+        status_key = self.status_key(job['job_id'])
+        pipe = self.redis.pipeline(transaction=True)
+        if job.get('message_id'):
+            pipe.xack(job['stream'], self.group, job['message_id'])
+        pipe.hset(status_key, mapping={**fields, 'finished_at': datetime.utcnow().isoformat()})
+        pipe.expire(status_key, self.history_ttl)
+        pipe.zadd(self.history_key, {job['job_id']: now})
+        pipe.zremrangebyscore(self.history_key, '-inf', now - self.history_ttl)
+        pipe.zremrangebyrank(self.history_key, 0, -(self.max_history + 1))
+        pipe.execute()
+
+    @staticmethod
+    def _decode(raw: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        if not raw:
+            return None
+        job = dict(raw)
+        for field in _JSON_FIELDS:
+            if job.get(field):
+                job[field] = json.loads(job[field])
+        for field in ('attempts',):
+            if field in job:
+                job[field] = int(job[field])
+        if 'progress' in job:
+            job['progress'] = float(job['progress'])
+        return job
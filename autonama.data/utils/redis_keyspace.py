@@ -0,0 +1,250 @@
+"""
+Redis Keyspace Management
+
+The Redis instance used by the data service is shared with the Celery broker
+queues and the result backend, so keyspace maintenance must never run a
+blocking command (KEYS, FLUSHDB, DEL on large values) against it.
+
+This module provides:
+- namespaced key prefixes for caches, Celery results and application state
+- per-namespace TTL policies
+- a cursor-based SCAN sweeper that applies the policies with pipelined
+  TTL/EXPIRE/UNLINK batches
+- per-namespace key-count and memory statistics for health checks
+"""
+
+import os
+import time
+import logging
+from fnmatch import fnmatchcase
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Separator between namespace prefix and the rest of the key
+KEY_SEPARATOR = ':'
+
+
+@dataclass(frozen=True)
+class TTLPolicy:
+    """TTL policy applied to every key of a namespace."""
+    # TTL applied to keys that have no expiry (None leaves them persistent)
+    default_ttl: Optional[int] = None
+    # Upper bound for remaining TTL; longer expiries are clamped to this value
+    max_ttl: Optional[int] = None
+    # 'expire' sets default_ttl on persistent keys, 'unlink' removes them
+    on_persistent: str = 'expire'
+
+
+@dataclass(frozen=True)
+class KeyNamespace:
+    """A family of Redis keys sharing a prefix and a TTL policy."""
+    name: str
+    patterns: Tuple[str, ...]
+    policy: TTLPolicy = field(default_factory=TTLPolicy)
+    # Protected namespaces are reported in stats but never modified
+    protected: bool = False
+    description: str = ''
+
+
+# Namespaces, most specific first. Keys are attributed to the first match.
+NAMESPACES: Dict[str, KeyNamespace] = {
+    'broker': KeyNamespace(
+        name='broker',
+        patterns=('celery', '_kombu.*', 'unacked*', 'celery.*'),
+        protected=True,
+        description='Celery broker queues and kombu bindings',
+    ),
+    'jobs': KeyNamespace(
+        name='jobs',
+        patterns=('jobs:*',),
+        protected=True,
+        description='Job queue streams, status hashes and history (self-trimming, see utils/job_queue.py)',
+    ),
+    'celery_results': KeyNamespace(
+        name='celery_results',
+        patterns=('celery-task-meta-*', 'celery-taskset-meta-*'),
+        policy=TTLPolicy(
+            default_ttl=int(os.getenv('REDIS_RESULTS_TTL', '86400')),
+            max_ttl=int(os.getenv('REDIS_RESULTS_MAX_TTL', '259200')),
+        ),
+        description='Celery result backend entries',
+    ),
+    'cache': KeyNamespace(
+        name='cache',
+        patterns=('cache:*',),
+        policy=TTLPolicy(
+            default_ttl=int(os.getenv('REDIS_CACHE_TTL', '3600')),
+            max_ttl=int(os.getenv('REDIS_CACHE_MAX_TTL', '86400')),
+        ),
+        description='Derived data caches (market data, indicators, health)',
+    ),
+    'app': KeyNamespace(
+        name='app',
+        patterns=('app:*',),
+        policy=TTLPolicy(),
+        description='Long-lived application state',
+    ),
+    'legacy': KeyNamespace(
+        name='legacy',
+        patterns=('market_data:*', 'indicators:*', 'system_health', 'available_symbols'),
+        policy=TTLPolicy(default_ttl=3600, max_ttl=86400, on_persistent='unlink'),
+        description='Un-prefixed cache keys written before namespacing',
+    ),
+}
+
+
+def namespaced_key(namespace: str, *parts: Any) -> str:
+    """Build a key inside one of the prefixed namespaces (cache, app)."""
+    if namespace not in ('cache', 'app'):
+        raise ValueError(f"Namespace '{namespace}' does not use a key prefix")
+    return KEY_SEPARATOR.join([namespace] + [str(part) for part in parts])
+
+
+def _to_str(key: Any) -> str:
+    return key.decode('utf-8', 'replace') if isinstance(key, bytes) else key
+
+
+def classify_key(key: str, namespaces: Optional[Dict[str, KeyNamespace]] = None) -> Optional[str]:
+    """Name of the first namespace with a pattern matching key, or None."""
+    for name, namespace in (namespaces or NAMESPACES).items():
+        if any(fnmatchcase(key, pattern) for pattern in namespace.patterns):
+            return name
+    return None
+
+
+class KeyspaceSweeper:
+    """
+    Applies namespace TTL policies using SCAN and pipelined batches.
+
+    Every Redis call issued here is O(batch) at most: SCAN with a bounded
+    COUNT, then one non-transactional pipeline per batch. A short pause
+    between batches keeps the broker responsive during long sweeps.
+    """
+
+    def __init__(self, redis_client, scan_count: int = 500,
+                 pause_seconds: float = 0.01, max_keys: Optional[int] = None,
+                 namespaces: Optional[Dict[str, KeyNamespace]] = None):
+        self.redis_client = redis_client
+        self.scan_count = scan_count
+        self.pause_seconds = pause_seconds
+        self.max_keys = max_keys
+        self.namespaces = namespaces or NAMESPACES
+
+    def _scan_batches(self, pattern: Optional[str]):
+        """Yield lists of keys matching pattern (all keys for None), one list per SCAN page."""
+        cursor = 0
+        scanned = 0
+        while True:
+            cursor, keys = self.redis_client.scan(cursor=cursor, match=pattern, count=self.scan_count)
+            if keys:
+                yield [_to_str(key) for key in keys]
+                scanned += len(keys)
+            if cursor == 0 or (self.max_keys is not None and scanned >= self.max_keys):
+                break
+            if self.pause_seconds:
+                time.sleep(self.pause_seconds)
+
+    def _plan(self, namespace: KeyNamespace, keys: List[str], ttls: List[int]) -> Tuple[List[Tuple[str, int]], List[str]]:
+        """Decide which keys to expire and which to unlink."""
+        policy = namespace.policy
+        to_expire = []
+        to_unlink = []
+        for key, ttl in zip(keys, ttls):
+            if ttl == -2:
+                # Expired between SCAN and TTL
+                continue
+            if ttl == -1:
+                if policy.on_persistent == 'unlink':
+                    to_unlink.append(key)
+                elif policy.default_ttl is not None:
+                    to_expire.append((key, policy.default_ttl))
+            elif policy.max_ttl is not None and ttl > policy.max_ttl:
+                to_expire.append((key, policy.max_ttl))
+        return to_expire, to_unlink
+
+    def sweep_namespace(self, namespace: KeyNamespace) -> Dict[str, int]:
+        """Apply a namespace's TTL policy to all of its keys."""
+        stats = {'scanned': 0, 'expired_set': 0, 'unlinked': 0}
+        if namespace.protected:
+            return stats
+
+        for pattern in namespace.patterns:
+            for keys in self._scan_batches(pattern):
+                pipe = self.redis_client.pipeline(transaction=False)
+                for key in keys:
+                    pipe.ttl(key)
+                ttls = pipe.execute()
+
+                to_expire, to_unlink = self._plan(namespace, keys, ttls)
+                if to_expire or to_unlink:
+                    pipe = self.redis_client.pipeline(transaction=False)
+                    for key, ttl in to_expire:
+                        pipe.expire(key, ttl)
+                    if to_unlink:
+                        pipe.unlink(*to_unlink)
+                    pipe.execute()
+
+                stats['scanned'] += len(keys)
+                stats['expired_set'] += len(to_expire)
+                stats['unlinked'] += len(to_unlink)
+        return stats
+
+    def sweep(self) -> Dict[str, Dict[str, int]]:
+        """Sweep every non-protected namespace."""
+        results = {}
+        for name, namespace in self.namespaces.items():
+            if namespace.protected:
+                continue
+            try:
+                results[name] = self.sweep_namespace(namespace)
+            except Exception as e:
+                logger.warning(f"Keyspace sweep failed for namespace {name}: {e}")
+                results[name] = {'error': str(e)}
+        return results
+
+    def namespace_stats(self, memory_sample_size: int = 200) -> Dict[str, Dict[str, Any]]:
+        """
+        Count keys per namespace and estimate their memory usage.
+
+        One SCAN over the keyspace; each key is attributed to the first
+        namespace that matches it (keys matching none are counted under
+        'other'). Key counts are exact; memory is measured with MEMORY USAGE
+        (default sampling) on up to memory_sample_size keys per namespace and
+        extrapolated. Protected namespaces (broker queues, job streams) are
+        counted but never measured.
+        """
+        counts = {name: 0 for name in self.namespaces}
+        sampled_bytes = {name: 0 for name in self.namespaces}
+        sampled_keys = {name: 0 for name in self.namespaces}
+        other = 0
+        for keys in self._scan_batches(None):
+            sample = []
+            for key in keys:
+                name = classify_key(key, self.namespaces)
+                if name is None:
+                    other += 1
+                    continue
+                counts[name] += 1
+                if not self.namespaces[name].protected and sampled_keys[name] < memory_sample_size:
+                    sampled_keys[name] += 1
+                    sample.append((name, key))
+            if sample:
+                pipe = self.redis_client.pipeline(transaction=False)
+                for _, key in sample:
+                    pipe.memory_usage(key)
+                for (name, _), usage in zip(sample, pipe.execute()):
+                    sampled_bytes[name] += usage or 0
+
+        stats = {}
+        for name, namespace in self.namespaces.items():
+            measured = sampled_keys[name]
+            stats[name] = {
+                'keys': counts[name],
+                'memory_bytes_estimated': int(sampled_bytes[name] / measured * counts[name]) if measured else 0,
+                'memory_sampled_keys': measured,
+                'protected': namespace.protected,
+            }
+        stats['other'] = {'keys': other}
+        return stats
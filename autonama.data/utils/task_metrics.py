@@ -0,0 +1,69 @@
+"""
+Celery Task Metrics
+
+Per-process stage timings for Celery workers, built on utils.instrumentation.
+
+- task_metrics: the worker process's RunMetrics; tasks open
+  task_metrics.span('<task>.<stage>') around their own stages
+- connect_task_signals: times every task end to end (task.<name>) and counts
+  outcomes via Celery's task_prerun/task_postrun signals
+- Optional Prometheus textfile export: when CELERY_METRICS_DIR is set each
+  worker process writes celery_<host>_<pid>.prom there at most every
+  CELERY_METRICS_INTERVAL seconds, for node_exporter's textfile collector
+"""
+
+import os
+import time
+import socket
+import logging
+from typing import Dict
+
+from celery.signals import task_prerun, task_postrun
+
+from utils.instrumentation import RunMetrics
+
+logger = logging.getLogger(__name__)
+
+task_metrics = RunMetrics('celery')
+
+METRICS_DIR = os.getenv('CELERY_METRICS_DIR')
+METRICS_INTERVAL = float(os.getenv('CELERY_METRICS_INTERVAL', '30'))
+
+_task_started: Dict[str, float] = {}
+_last_export = 0.0
+
+
+def _export_textfile():
+    """Write this process's metrics to CELERY_METRICS_DIR, throttled."""
+    global _last_export
+    now = time.monotonic()
+    if not METRICS_DIR or now - _last_export < METRICS_INTERVAL:
+        return
+    _last_export = now
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        host = socket.gethostname()
+        pid = os.getpid()
+        path = os.path.join(METRICS_DIR, f"celery_{host}_{pid}.prom")
+        task_metrics.write_prometheus(path, prefix='autonama_celery',
+                                      labels={'host': host, 'pid': str(pid)})
+    except Exception as e:
+        logger.warning(f"Could not export task metrics: {e}")
+
+
+def _on_task_prerun(task_id=None, **kwargs):
+    _task_started[task_id] = time.perf_counter()
+
+
+def _on_task_postrun(task_id=None, task=None, state=None, **kwargs):
+    started = _task_started.pop(task_id, None)
+    if started is not None and task is not None:
+        task_metrics.record(f"task.{task.name}", time.perf_counter() - started)
+    task_metrics.incr(f"tasks_{(state or 'unknown').lower()}")
+    _export_textfile()
+
+
+def connect_task_signals():
+    """Time every task run by this worker. Safe to call more than once."""
+    task_prerun.connect(_on_task_prerun, weak=False, dispatch_uid='autonama_task_metrics_prerun')
+    task_postrun.connect(_on_task_postrun, weak=False, dispatch_uid='autonama_task_metrics_postrun')
@@ -0,0 +1,154 @@
+"""
+Celery Task Queues
+
+Workload-aware queue topology for the data service's Celery app.
+
+- io:  network- and database-bound tasks (price updates, exchange and
+       TwelveData loaders, maintenance). Run on a green-thread pool (gevent)
+       with high concurrency, so a task waiting on an HTTP response or a
+       query does not hold a process slot
+- cpu: indicator, backtest and optimization work. Run on a prefork pool
+       sized to the cores, autoscaling down when idle, with prefetch 1 so a
+       long task never holds a second one hostage
+
+Tasks are routed by module (TASK_ROUTES); time limits are applied per queue
+through QueueTimeLimits unless a task sets its own. Worker pool, concurrency,
+autoscale and prefetch are command-line settings, so each queue's worker is
+started with worker_argv(queue):
+
+    python -m utils.task_queues io
+    python -m utils.task_queues cpu
+"""
+
+import os
+import sys
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Dict, List, Optional, Tuple
+
+IO_QUEUE = 'io'
+CPU_QUEUE = 'cpu'
+
+CPU_COUNT = os.cpu_count() or 1
+
+
+@dataclass(frozen=True)
+class QueueProfile:
+    """Worker settings and task limits for one queue."""
+    pool: str
+    concurrency: int
+    prefetch_multiplier: int
+    soft_time_limit: int
+    time_limit: int
+    # (max, min) processes; prefork only
+    autoscale: Optional[Tuple[int, int]] = None
+    # Recycle a prefork child once its resident memory exceeds this (KiB)
+    max_memory_per_child: Optional[int] = None
+
+
+QUEUE_PROFILES: Dict[str, QueueProfile] = {
+    IO_QUEUE: QueueProfile(
+        pool=os.getenv('CELERY_IO_POOL', 'gevent'),
+        concurrency=int(os.getenv('CELERY_IO_CONCURRENCY', '100')),
+        prefetch_multiplier=int(os.getenv('CELERY_IO_PREFETCH', '4')),
+        soft_time_limit=10 * 60,
+        time_limit=12 * 60,
+    ),
+    CPU_QUEUE: QueueProfile(
+        pool='prefork',
+        concurrency=int(os.getenv('CELERY_CPU_CONCURRENCY', str(CPU_COUNT))),
+        prefetch_multiplier=1,
+        soft_time_limit=55 * 60,
+        time_limit=60 * 60,
+        autoscale=(int(os.getenv('CELERY_CPU_CONCURRENCY', str(CPU_COUNT))),
+                   int(os.getenv('CELERY_CPU_MIN_CONCURRENCY', '1'))),
+        max_memory_per_child=int(os.getenv('CELERY_CPU_MAX_MEMORY_KB', str(2 * 1024 * 1024))),
+    ),
+}
+
+# Task name patterns per queue; unmatched tasks go to the cpu queue
+TASK_ROUTES: Dict[str, Tuple[str, ...]] = {
+    IO_QUEUE: (
+        'tasks.current_prices_updater.*',
+        'tasks.binance_asset_loader.*',
+        'tasks.twelvedata_ingestion.*',
+        'tasks.multi_asset_ingestion.*',
+        'tasks.data_ingestion.*',
+        'tasks.timescale_data_ingestion.*',
+        'tasks.maintenance.*',
+    ),
+    CPU_QUEUE: (
+        'tasks.indicators.*',
+        'tasks.analytics_tasks.*',
+        'tasks.autonama_channels_tasks.*',
+        'tasks.backtest_ingestion.*',
+        'tasks.backtest_scanner.*',
+        'tasks.optimization_ingestion.*',
+    ),
+}
+
+
+def queue_for(task_name: str) -> str:
+    for queue, patterns in TASK_ROUTES.items():
+        if any(fnmatch(task_name, pattern) for pattern in patterns):
+            return queue
+    return CPU_QUEUE
+
+
+def celery_routes() -> Dict[str, Dict[str, str]]:
+    """task_routes setting (glob patterns are supported by Celery)."""
+    return {pattern: {'queue': queue} for queue, patterns in TASK_ROUTES.items() for pattern in patterns}
+
+
+class QueueTimeLimits:
+    """task_annotations entry applying the queue's time limits to tasks without their own."""
+
+    def annotate(self, task):
+        profile = QUEUE_PROFILES[queue_for(task.name)]
+        limits = {}
+        if task.soft_time_limit is None:
+            limits['soft_time_limit'] = profile.soft_time_limit
+        if task.time_limit is None:
+            limits['time_limit'] = profile.time_limit
+        return limits or None
+
+
+def patch_for_green_pool():
+    """
+    Make psycopg2 cooperative when the worker runs a gevent pool.
+
+    celery -P gevent monkey-patches the standard library before the app is
+    imported, but psycopg2 talks to the socket from C and would block every
+    greenlet of the worker for the duration of a query.
+    """
+    try:
+        from gevent import monkey
+    except ImportError:
+        return
+    if monkey.is_module_patched('socket'):
+        from psycogreen.gevent import patch_psycopg
+        patch_psycopg()
+
+
+def worker_argv(queue: str, app: str = 'celery_app', loglevel: str = 'info') -> List[str]:
+    """celery worker command line for one queue."""
+    profile = QUEUE_PROFILES[queue]
+    argv = ['celery', '-A', app, 'worker', f'--loglevel={loglevel}',
+            '-Q', queue, '-n', f'{queue}@%h',
+            f'--pool={profile.pool}',
+            f'--prefetch-multiplier={profile.prefetch_multiplier}']
+    if profile.autoscale:
+        argv.append(f'--autoscale={profile.autoscale[0]},{profile.autoscale[1]}')
+    else:
+        argv.append(f'--concurrency={profile.concurrency}')
+    if profile.max_memory_per_child:
+        argv.append(f'--max-memory-per-child={profile.max_memory_per_child}')
+    return argv
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 2 or sys.argv[1] not in QUEUE_PROFILES:
+        print(f"Usage: python -m utils.task_queues {{{'|'.join(QUEUE_PROFILES)}}} [extra celery args]")
+        sys.exit(1)
+    argv = worker_argv(sys.argv[1]) + sys.argv[2:]
+    os.execvp(argv[0], argv)
@@ -0,0 +1,405 @@
+"""
+TwelveData Pipeline
+
+Batched, credit-aware ingestion of daily TwelveData bars into
+trading.ohlc_data, used by the stock, forex and commodity tasks in
+tasks/twelvedata_ingestion.py.
+
+- latest_timestamps(): the newest stored bar of every symbol in one
+  GROUP BY query, used to skip fresh symbols and to size each request
+- plan_requests(): packs the symbols that need data into multi-symbol
+  time_series requests (the endpoint takes a comma-separated list and
+  charges one credit per symbol), grouping symbols that need a similar
+  number of bars
+- CreditBudget: the plan's per-minute credit allowance, shared by every
+  worker through a Redis counter per minute (in-process when Redis is not
+  available); a request waits only when its credits do not fit the
+  current minute
+- write_bars(): only bars newer than the stored ones, all symbols of a
+  request in one executemany INSERT
+- refresh_indicators(): SMA 20/50, RSI 14 and Bollinger bands for the
+  symbols that received new bars only, from one query and one upsert
+
+Usage:
+    budget = CreditBudget(redis_client)
+    result = ingest(processor, engine, symbols, 'stock', budget)
+"""
+
+import os
+import time
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from utils.redis_keyspace import namespaced_key
+
+logger = logging.getLogger(__name__)
+
+EXCHANGE = 'twelvedata'
+TIMEFRAME = '1d'
+INTERVAL = '1day'
+
+# Credits per minute of the TwelveData plan (free tier: 8)
+CREDITS_PER_MINUTE = int(os.getenv('TWELVEDATA_CREDITS_PER_MINUTE', '8'))
+# Symbols per time_series request (the API accepts up to 120)
+MAX_BATCH_SYMBOLS = int(os.getenv('TWELVEDATA_MAX_BATCH_SYMBOLS', '120'))
+
+# Symbols whose last bar is younger than this are skipped unless forced
+RECENT_SECONDS = 86400
+# Bars requested for a symbol without stored data (and on forced updates)
+DEFAULT_OUTPUTSIZE = 100
+# Requests ask for one of these sizes, so symbols with similar gaps share a request
+OUTPUTSIZE_STEPS = (10, 30, DEFAULT_OUTPUTSIZE, 500, 5000)
+
+# Bars read per symbol when recomputing indicators (covers the 50-bar SMA)
+INDICATOR_LOOKBACK = 60
+
+_LATEST_QUERY = text("""
+    SELECT symbol, MAX(timestamp) AS latest_timestamp
+    FROM trading.ohlc_data
+    WHERE symbol IN :symbols
+    AND exchange = :exchange
+    AND timeframe = :timeframe
+    GROUP BY symbol
+""").bindparams(bindparam('symbols', expanding=True))
+
+_INSERT_BARS = text("""
+    INSERT INTO trading.ohlc_data
+    (symbol, exchange, timeframe, timestamp, open, high, low, close, volume, created_at)
+    VALUES (:symbol, :exchange, :timeframe, :timestamp, :open, :high, :low, :close, :volume, :created_at)
+""")
+
+_RECENT_BARS_QUERY = text("""
+    SELECT symbol, timestamp, close
+    FROM (
+        SELECT symbol, timestamp, close,
+               ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY timestamp DESC) AS rn
+        FROM trading.ohlc_data
+        WHERE symbol IN :symbols
+        AND exchange = :exchange
+        AND timeframe = :timeframe
+    ) recent
+    WHERE rn <= :lookback
+    ORDER BY symbol, timestamp
+""").bindparams(bindparam('symbols', expanding=True))
+
+_UPSERT_INDICATOR = text("""
+    INSERT INTO analytics.indicators
+    (symbol, timeframe, timestamp, indicator_name, indicator_value, created_at)
+    VALUES (:symbol, :timeframe, :timestamp, :indicator_name, :indicator_value, :created_at)
+    ON CONFLICT (symbol, timeframe, timestamp, indicator_name)
+    DO UPDATE SET
+        indicator_value = EXCLUDED.indicator_value,
+        created_at = EXCLUDED.created_at
+""")
+
+
+def latest_timestamps(engine, symbols: Sequence[str], exchange: str = EXCHANGE,
+                      timeframe: str = TIMEFRAME) -> Dict[str, datetime]:
+    """Newest stored bar per symbol; symbols without data are absent."""
+    if not symbols:
+        return {}
+    with engine.connect() as conn:
+        rows = conn.execute(_LATEST_QUERY, {
+            'symbols': list(symbols),
+            'exchange': exchange,
+            'timeframe': timeframe,
+        }).fetchall()
+    return {symbol: latest for symbol, latest in rows if latest is not None}
+
+
+def _naive_utc(value) -> pd.Timestamp:
+    stamp = pd.Timestamp(value)
+    return stamp.tz_convert(None) if stamp.tzinfo is not None else stamp
+
+
+def outputsize_for(latest: Optional[datetime], now: datetime, force_update: bool = False) -> int:
+    """Bars to request for a symbol: enough to cover the gap since its last stored bar."""
+    if latest is None or force_update:
+        return DEFAULT_OUTPUTSIZE
+    missing = (pd.Timestamp(now) - _naive_utc(latest)).days + 2
+    return next((step for step in OUTPUTSIZE_STEPS if step >= missing), OUTPUTSIZE_STEPS[-1])
+
+
+@dataclass
+class Request:
+    symbols: List[str]
+    outputsize: int
+
+    @property
+    def credits(self) -> int:
+        return len(self.symbols)
+
+
+def plan_requests(outputsizes: Dict[str, int], max_symbols: int) -> List[Request]:
+    """Pack symbols into requests of at most max_symbols, one outputsize per request."""
+    by_size: Dict[int, List[str]] = {}
+    for symbol, size in outputsizes.items():
+        by_size.setdefault(size, []).append(symbol)
+    requests = []
+    for size in sorted(by_size):
+        symbols = by_size[size]
+        for start in range(0, len(symbols), max_symbols):
+            requests.append(Request(symbols[start:start + max_symbols], size))
+    return requests
+
+
+class CreditBudget:
+    """
+    Per-minute credit allowance.
+
+    With a Redis client the minute's spend is one counter
+    (app:twelvedata:credits:<minute>) shared by every worker; without one,
+    or when Redis fails, spending is tracked in this process only.
+    """
+
+    def __init__(self, redis_client=None, credits_per_minute: int = CREDITS_PER_MINUTE,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.redis_client = redis_client
+        self.credits_per_minute = credits_per_minute
+        self.clock = clock
+        self.sleep = sleep
+        self._local: Dict[int, int] = {}
+        self.waited = 0.0
+
+    def _key(self, minute: int) -> str:
+        return namespaced_key('app', 'twelvedata', 'credits', minute)
+
+    def _spend(self, minute: int, credits: int) -> bool:
+        """Spend credits in this minute if they fit."""
+        if self.redis_client is not None:
+            try:
+                key = self._key(minute)
+                pipe = self.redis_client.pipeline()
+                pipe.incrby(key, credits)
+                pipe.expire(key, 120)
+                spent = pipe.execute()[0]
+                if spent <= self.credits_per_minute:
+                    return True
+                self.redis_client.decrby(key, credits)
+                return False
+            except Exception as e:
+                logger.warning(f"Credit counter unavailable, budgeting in process: {e}")
+                self.redis_client = None
+        self._local = {m: spent for m, spent in self._local.items() if m >= minute}
+        if self._local.get(minute, 0) + credits <= self.credits_per_minute:
+            self._local[minute] = self._local.get(minute, 0) + credits
+            return True
+        return False
+
+    def acquire(self, credits: int):
+        """Block until `credits` fit the current minute, then spend them."""
+        if credits > self.credits_per_minute:
+            raise ValueError(f"A request of {credits} credits never fits {self.credits_per_minute} credits per minute")
+        while True:
+            now = self.clock()
+            minute = int(now // 60)
+            if self._spend(minute, credits):
+                return
+            wait = (minute + 1) * 60 - now + 0.1
+            logger.info(f"TwelveData credit budget used up, waiting {wait:.1f}s")
+            self.waited += wait
+            self.sleep(wait)
+
+    def exhaust(self):
+        """Mark the current minute as used up (the API answered 429)."""
+        minute = int(self.clock() // 60)
+        if self.redis_client is not None:
+            try:
+                key = self._key(minute)
+                self.redis_client.set(key, self.credits_per_minute, ex=120)
+                return
+            except Exception:
+                self.redis_client = None
+        self._local[minute] = self.credits_per_minute
+
+
+def bars_to_rows(symbol: str, df: pd.DataFrame, after: Optional[datetime], created_at: datetime,
+                 exchange: str = EXCHANGE, timeframe: str = TIMEFRAME) -> List[Dict[str, Any]]:
+    """Rows of the bars newer than `after` (all bars when None)."""
+    if after is not None:
+        df = df[df.index > _naive_utc(after)]
+    volume = df['volume'] if 'volume' in df.columns else pd.Series(0.0, index=df.index)
+    return [
+        {
+            'symbol': symbol,
+            'exchange': exchange,
+            'timeframe': timeframe,
+            'timestamp': timestamp.to_pydatetime(),
+            'open': float(o),
+            'high': float(h),
+            'low': float(l),
+            'close': float(c),
+            'volume': float(v),
+            'created_at': created_at,
+        }
+        for timestamp, o, h, l, c, v in zip(df.index, df['open'], df['high'], df['low'], df['close'], volume)
+    ]
+
+
+def write_bars(engine, rows: List[Dict[str, Any]]) -> int:
+    """Insert bar rows (any number of symbols) in one statement."""
+    if not rows:
+        return 0
+    with engine.begin() as conn:
+        conn.execute(_INSERT_BARS, rows)
+    return len(rows)
+
+
+def latest_indicators(close: np.ndarray) -> Dict[str, float]:
+    """SMA 20/50, RSI 14 (simple averages) and Bollinger bands (20, 2) at the last bar."""
+    close = np.asarray(close, dtype=np.float64)
+    indicators: Dict[str, float] = {}
+    if not len(close):
+        return indicators
+    last20 = close[-20:]
+    indicators['sma_20'] = float(last20.mean())
+    indicators['sma_50'] = float(close[-50:].mean())
+    changes = np.diff(close)[-14:]
+    if len(changes):
+        avg_gain = np.clip(changes, 0, None).mean()
+        avg_loss = np.clip(-changes, 0, None).mean()
+        if avg_loss > 0:
+            indicators['rsi'] = float(100 - 100 / (1 + avg_gain / avg_loss))
+    if len(last20) > 1:
+        std = float(last20.std(ddof=1))
+        indicators['bb_upper'] = indicators['sma_20'] + 2 * std
+        indicators['bb_middle'] = indicators['sma_20']
+        indicators['bb_lower'] = indicators['sma_20'] - 2 * std
+    return indicators
+
+
+def refresh_indicators(engine, symbols: Sequence[str], exchange: str = EXCHANGE,
+                       timeframe: str = TIMEFRAME) -> int:
+    """Recompute and store the latest indicators of symbols; returns the number of symbols stored."""
+    if not symbols:
+        return 0
+    with engine.connect() as conn:
+        rows = conn.execute(_RECENT_BARS_QUERY, {
+            'symbols': list(symbols),
+            'exchange': exchange,
+            'timeframe': timeframe,
+            'lookback': INDICATOR_LOOKBACK,
+        }).fetchall()
+    if not rows:
+        return 0
+    frame = pd.DataFrame(rows, columns=['symbol', 'timestamp', 'close'])
+    created_at = datetime.utcnow()
+    records = []
+    for symbol, group in frame.groupby('symbol', sort=False):
+        for name, value in latest_indicators(group['close'].to_numpy(dtype=np.float64)).items():
+            records.append({
+                'symbol': symbol,
+                'timeframe': timeframe,
+                'timestamp': created_at,
+                'indicator_name': name,
+                'indicator_value': value,
+                'created_at': created_at,
+            })
+    if records:
+        with engine.begin() as conn:
+            conn.execute(_UPSERT_INDICATOR, records)
+    return frame['symbol'].nunique()
+
+
+@dataclass
+class IngestResult:
+    category: str
+    symbols: int
+    skipped: List[str] = field(default_factory=list)
+    updated: Dict[str, int] = field(default_factory=dict)
+    unchanged: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    requests: int = 0
+    credits: int = 0
+    indicators: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'symbols_processed': self.symbols,
+            'success_count': len(self.updated),
+            'failed_count': len(self.failed),
+            'skipped_count': len(self.skipped),
+            'unchanged_count': len(self.unchanged),
+            'total_records': sum(self.updated.values()),
+            'requests': self.requests,
+            'credits_used': self.credits,
+            'indicators_refreshed': self.indicators,
+            'errors': self.failed,
+        }
+
+
+def ingest(processor, engine, symbols: Sequence[str], category: str, budget: CreditBudget,
+           force_update: bool = False, market: Optional[str] = None,
+           max_symbols: int = MAX_BATCH_SYMBOLS, retries: int = 2,
+           progress: Optional[Callable[[int, int, List[str]], None]] = None) -> IngestResult:
+    """
+    Bring daily bars of symbols up to date with as few requests as the credit budget allows.
+
+    progress(done_requests, total_requests, symbols) is called before each request.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    result = IngestResult(category=category, symbols=len(symbols))
+    now = datetime.utcnow()
+    latest = latest_timestamps(engine, symbols)
+
+    outputsizes = {}
+    for symbol in symbols:
+        last = latest.get(symbol)
+        if not force_update and last is not None and (pd.Timestamp(now) - _naive_utc(last)).total_seconds() < RECENT_SECONDS:
+            result.skipped.append(symbol)
+        else:
+            outputsizes[symbol] = outputsize_for(last, now, force_update)
+
+    requests = plan_requests(outputsizes, max(1, min(max_symbols, budget.credits_per_minute)))
+    logger.info(f"TwelveData {category}: {len(outputsizes)} symbols to fetch in {len(requests)} requests, "
+                f"{len(result.skipped)} recent")
+
+    for i, request in enumerate(requests):
+        if progress:
+            progress(i, len(requests), request.symbols)
+        response = None
+        for _ in range(retries + 1):
+            budget.acquire(request.credits)
+            result.requests += 1
+            result.credits += request.credits
+            response = processor.fetch_time_series_batch(request.symbols, INTERVAL, request.outputsize, market)
+            if response is not None or (processor.last_error or {}).get('code') != 429:
+                break
+            budget.exhaust()
+        if response is None:
+            message = (processor.last_error or {}).get('message', 'Request failed')
+            result.failed.update({symbol: message for symbol in request.symbols})
+            continue
+
+        result.failed.update(response['errors'])
+        created_at = datetime.utcnow()
+        rows, counts = [], {}
+        for symbol, df in response['frames'].items():
+            symbol_rows = bars_to_rows(symbol, df, latest.get(symbol), created_at)
+            if symbol_rows:
+                counts[symbol] = len(symbol_rows)
+                rows.extend(symbol_rows)
+            else:
+                result.unchanged.append(symbol)
+        try:
+            write_bars(engine, rows)
+            result.updated.update(counts)
+        except Exception as e:
+            logger.error(f"Failed to store {len(rows)} bars for {', '.join(counts)}: {e}")
+            result.failed.update({symbol: f"Store failed: {e}" for symbol in counts})
+
+    try:
+        result.indicators = refresh_indicators(engine, list(result.updated))
+    except Exception as e:
+        logger.error(f"Failed to refresh indicators for {category}: {e}")
+
+    logger.info(f"TwelveData {category}: {len(result.updated)} updated, {len(result.unchanged)} unchanged, "
+                f"{len(result.skipped)} skipped, {len(result.failed)} failed; "
+                f"{result.requests} requests, {result.credits} credits, {budget.waited:.0f}s waiting for credits")
+    return result
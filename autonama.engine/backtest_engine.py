@@ -16,6 +16,9 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import json
 from typing import Dict, List, Optional, Tuple
+import channel_kernel
+import db_pool
+import trading_universe
 import asyncio
 import aiohttp
 
@@ -50,32 +53,13 @@ class BacktestEngine:
         os.makedirs(self.cache_dir, exist_ok=True)
         
     def get_db_connection(self):
-        """Get PostgreSQL connection"""
-        return psycopg2.connect(**self.db_config)
+        """Pooled PostgreSQL connection (context manager: commits, then returns it to the pool)"""
+        return db_pool.postgres_connection(self.db_config)
     
     def get_top_100_assets(self) -> List[str]:
-        """Get top 100 USDT pairs from Binance by volume"""
-        try:
-            tickers = self.client.get_ticker()
-            usdt_pairs = []
-            
-            for ticker in tickers:
-                if ticker['symbol'].endswith('USDT') and ticker['symbol'] != 'USDTUSDT':
-                    volume_usd = float(ticker['quoteVolume'])
-                    usdt_pairs.append({
-                        'symbol': ticker['symbol'],
-                        'volume': volume_usd,
-                        'price': float(ticker['lastPrice'])
-                    })
-            
-            # Sort by volume and return top 100
-            usdt_pairs.sort(key=lambda x: x['volume'], reverse=True)
-            return [pair['symbol'] for pair in usdt_pairs[:100]]
-            
-        except Exception as e:
-            logger.error(f"Error fetching top 100 assets: {e}")
-            # Return core movers as fallback
-            return ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'ADAUSDT', 'XRPUSDT']
+        """Get top 100 USDT pairs by volume from the shared trading universe"""
+        universe = trading_universe.shared_client(fetch_tickers=self.client.get_ticker)
+        return universe.symbols(100, fallback=['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'ADAUSDT', 'XRPUSDT'])
     
     def fetch_historical_data(self, symbol: str, interval: str = '1d', days: int = 720) -> pd.DataFrame:
         """
@@ -187,19 +171,13 @@ class BacktestEngine:
         except Exception as e:
             logger.error(f"Error storing data for {symbol}: {e}")
     
-    def preprocess_data(self, data: pd.DataFrame, window: int = 5) -> pd.DataFrame:
+    def preprocess_data(self, data: pd.Series, window: int = 5) -> pd.Series:
         """Preprocess data for analysis"""
-        # Remove duplicates
-        data = data[~data.index.duplicated(keep='first')]
-        # Forward fill and backward fill
-        data = data.ffill().bfill()
-        
-        if len(data) < window:
-            return data
-        
-        # Apply rolling mean for smoothing
-        data = data.rolling(window=window, min_periods=1).mean()
-        return data
+        values, keep = channel_kernel.preprocess_close(
+            data.to_numpy(dtype=np.float64), window=window, zscore_threshold=None,
+            keys=data.index.to_numpy()
+        )
+        return pd.Series(values, index=data.index[keep], name=data.name)
     
     def calculate_polynomial_regression(self, data: pd.Series, degree: int = 4, kstd: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
         """
@@ -213,29 +191,11 @@ class BacktestEngine:
         Returns:
             Tuple of (regression_line, upper_band, lower_band)
         """
-        if len(data) < degree + 1:
+        fit = channel_kernel.fit_channel(data.to_numpy(dtype=np.float64), degree, kstd)
+        if fit is None:
             return None, None, None
         
-        try:
-            X = np.arange(len(data))
-            y = data.values
-            
-            with warnings.catch_warnings():
-                warnings.simplefilter('ignore', np.RankWarning)
-                coefficients = np.polyfit(X, y, degree)
-            
-            polynomial = np.poly1d(coefficients)
-            regression_line = polynomial(X)
-            std_dev = np.std(y - regression_line)
-            
-            upper_band = regression_line + kstd * std_dev
-            lower_band = regression_line - kstd * std_dev
-            
-            return regression_line, upper_band, lower_band
-            
-        except Exception as e:
-            logger.error(f"Error in polynomial regression: {e}")
-            return None, None, None
+        return fit.regression_line, fit.upper_band, fit.lower_band
     
     def generate_signal(self, current_price: float, upper_band: float, lower_band: float) -> Tuple[str, float]:
         """
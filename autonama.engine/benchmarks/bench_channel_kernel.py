@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Channel kernel benchmark
+
+Compares the legacy pandas/np.polyfit channel pipeline (as it existed in
+crypto_engine.py before channel_kernel was introduced) with the shared
+NumPy kernel. Reports per-call latency and peak allocations for
+preprocessing, band fitting and validation.
+
+Usage:
+    python benchmarks/bench_channel_kernel.py [--sizes 200 720 5000] [--repeat 200] [--json out.json]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import warnings
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import channel_kernel
+
+
+def legacy_preprocess(data: pd.Series, window: int = 5) -> pd.Series:
+    data = data[~data.index.duplicated(keep='first')]
+    data = data.ffill().bfill()
+    mean = data.mean()
+    std = data.std()
+    z_scores = np.abs((data - mean) / std)
+    data = data[z_scores < 3]
+    data = data.ffill().bfill()
+    return data.rolling(window=window, min_periods=1).mean()
+
+
+def legacy_channel(close_data: pd.Series, degree: int = 2, kstd: float = 2.0):
+    close_data = legacy_preprocess(close_data)
+    if close_data.isnull().any() or (close_data <= 0).any():
+        return None
+    X = np.arange(len(close_data))
+    y = close_data.values
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        coefficients = np.polyfit(X, y, degree)
+    if np.any(np.abs(coefficients) > 1e6):
+        return None
+    regression_line = np.poly1d(coefficients)(X)
+    if np.any(regression_line <= 0) or np.any(regression_line > 1e8):
+        return None
+    std_dev = np.std(y - regression_line)
+    if std_dev == 0 or not np.isfinite(std_dev) or std_dev > np.mean(y) * 0.5:
+        return None
+    upper_band = regression_line + kstd * std_dev
+    lower_band = regression_line - kstd * std_dev
+    current_price = close_data.iloc[-1]
+    upper_band = np.minimum(np.maximum(upper_band, current_price * 0.2), current_price * 1.5)
+    lower_band = np.minimum(np.maximum(lower_band, current_price * 0.2), current_price * 1.5)
+    lower_band = np.minimum(lower_band, upper_band * 0.95)
+    if np.any(upper_band <= 0) or np.any(lower_band <= 0):
+        return None
+    if np.any(upper_band < lower_band):
+        return None
+    if np.any(upper_band > 1e6) or np.any(lower_band > 1e6):
+        return None
+    indicators = pd.DataFrame({
+        'Close': close_data, 'regression_line': regression_line,
+        'upper_band': upper_band, 'lower_band': lower_band
+    }, index=close_data.index)
+    entries = np.ascontiguousarray(indicators['Close'].values < indicators['lower_band'].values)
+    exits = np.ascontiguousarray(indicators['Close'].values > indicators['upper_band'].values)
+    if np.any(indicators['Close'] <= 0):
+        return None
+    if np.any(indicators['upper_band'] <= 0) or np.any(indicators['lower_band'] <= 0):
+        return None
+    if np.any(indicators['Close'] > 1e6) or np.any(indicators['upper_band'] > 1e6) or np.any(indicators['lower_band'] > 1e6):
+        return None
+    if indicators['Close'].max() / indicators['Close'].min() > 100:
+        return None
+    return indicators, entries, exits
+
+
+def kernel_channel(close_data: pd.Series, degree: int = 2, kstd: float = 2.0):
+    y, keep = channel_kernel.preprocess_close(
+        close_data.to_numpy(dtype=np.float64), keys=close_data.index.to_numpy()
+    )
+    fit = channel_kernel.fit_channel(y, degree, kstd)
+    if fit is None or fit.std_dev == 0 or fit.std_dev > y.mean() * 0.5:
+        return None
+    channel_kernel.clamp_bands(fit.upper_band, fit.lower_band, float(y[-1]))
+    if channel_kernel.check_channel(channel_kernel.channel_summary(y, fit)) is not None:
+        return None
+    entries, exits = channel_kernel.band_signals(y, fit.upper_band, fit.lower_band)
+    return fit, entries, exits
+
+
+def synthetic_close(n: int, seed: int = 7) -> pd.Series:
+    rng = np.random.default_rng(seed)
+    prices = 100.0 * np.exp(np.cumsum(rng.normal(0.0005, 0.02, n)))
+    index = pd.date_range('2022-01-01', periods=n, freq='h')
+    return pd.Series(prices, index=index, name='close')
+
+
+def measure(func, data, repeat: int):
+    func(data)  # warm-up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(data)
+    latency_us = (time.perf_counter() - start) / repeat * 1e6
+
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latency_us, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the polynomial channel kernel")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[200, 720, 5000])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--degree', type=int, default=2)
+    parser.add_argument('--json', help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'n':>6} {'impl':>8} {'latency_us':>12} {'peak_kib':>10}")
+    for n in args.sizes:
+        data = synthetic_close(n)
+        for name, func in (('legacy', legacy_channel), ('kernel', kernel_channel)):
+            latency_us, peak = measure(lambda d: func(d, args.degree), data, args.repeat)
+            rows.append({'n': n, 'impl': name, 'latency_us': round(latency_us, 1), 'peak_bytes': peak})
+            print(f"{n:>6} {name:>8} {latency_us:>12.1f} {peak / 1024:>10.1f}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
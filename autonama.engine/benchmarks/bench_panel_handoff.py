@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Panel handoff benchmark
+
+Compares two ways of feeding a synthetic universe to a process pool that
+runs the channel fit on every symbol:
+
+- pickled: each task carries its symbol's DataFrame (what a process pool
+  over per-symbol frames does)
+- shared:  the universe is stacked once into SharedPanels and tasks carry
+  only the symbol name (shared_panels.map_symbols)
+
+Reports wall time, bytes serialised to the workers and per-worker private
+memory (USS: pages not shared with other processes) for each worker count.
+
+Usage:
+    python benchmarks/bench_panel_handoff.py [--symbols 200] [--bars 10000] [--workers 1 2 4] [--json out.json]
+"""
+
+import os
+import sys
+import json
+import time
+import pickle
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import channel_kernel
+import fixtures
+from shared_panels import SharedPanels, map_symbols
+
+LOOKBACK = 500
+
+
+def _private_kb() -> int:
+    """Private_Clean + Private_Dirty of this process, in KiB (Linux)."""
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            return sum(int(line.split()[1]) for line in f if line.startswith(('Private_Clean', 'Private_Dirty')))
+    except OSError:
+        return 0
+
+
+def _fit(close: np.ndarray) -> float:
+    # Touch the whole series like the engine does (preprocessing, full-length stats)
+    values, _ = channel_kernel.preprocess_close(close, zscore_threshold=3.0)
+    fit = channel_kernel.fit_channel(values[-LOOKBACK:], 2, 2.0)
+    return float(fit.upper_band[-1]) if fit is not None else float('nan')
+
+
+def scan_frame(symbol, df):
+    return symbol, (_fit(df['close'].to_numpy(dtype=np.float64)), os.getpid(), _private_kb())
+
+
+def scan_panel(panels, symbol):
+    return _fit(panels.view(symbol, 'close')), os.getpid(), _private_kb()
+
+
+def summarise(name, workers, seconds, sent_bytes, results):
+    per_worker = {}
+    for _, pid, kb in results.values():
+        per_worker[pid] = max(per_worker.get(pid, 0), kb)
+    return {
+        'mode': name,
+        'workers': workers,
+        'seconds': round(seconds, 3),
+        'sent_mb': round(sent_bytes / 1e6, 2),
+        'worker_private_mb_max': round(max(per_worker.values()) / 1024, 1),
+        'worker_private_mb_total': round(sum(per_worker.values()) / 1024, 1),
+    }
+
+
+def run(args):
+    universe = fixtures.generate_universe(args.symbols, '15m', args.bars)
+    rows = []
+    for workers in args.workers:
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pickled = dict(pool.map(scan_frame, universe.keys(), universe.values(), chunksize=8))
+        seconds = time.perf_counter() - start
+        sent = sum(len(pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)) for df in universe.values())
+        rows.append(summarise('pickled', workers, seconds, sent, pickled))
+
+        start = time.perf_counter()
+        with SharedPanels.create(universe) as panels:
+            shared = map_symbols(scan_panel, panels, workers=workers)
+            handle_bytes = len(pickle.dumps(panels.handle)) * workers
+        seconds = time.perf_counter() - start
+        sent = handle_bytes + sum(len(pickle.dumps(s)) for s in universe)
+        rows.append(summarise('shared', workers, seconds, sent, shared))
+
+        same = all(np.isclose(pickled[s][0], shared[s][0], equal_nan=True) for s in universe)
+        if not same:
+            raise SystemExit('pickled and shared results differ')
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Shared panel handoff benchmark')
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--bars', type=int, default=10000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--json', help='Write results to this file')
+    args = parser.parse_args()
+
+    rows = run(args)
+    print(f"{args.symbols} symbols x {args.bars} bars "
+          f"({args.symbols * args.bars * 8 * 5 / 1e6:.0f} MB of OHLCV float64)")
+    print(f"{'mode':<8} {'workers':>7} {'seconds':>8} {'sent MB':>8} {'USS max MB':>11} {'USS total MB':>13}")
+    for r in rows:
+        print(f"{r['mode']:<8} {r['workers']:>7} {r['seconds']:>8.2f} {r['sent_mb']:>8.2f} "
+              f"{r['worker_private_mb_max']:>11.1f} {r['worker_private_mb_total']:>13.1f}")
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(rows, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
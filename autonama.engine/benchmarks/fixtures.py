@@ -0,0 +1,116 @@
+"""
+Synthetic market data fixtures for offline benchmarks.
+
+Prices follow a geometric Brownian motion whose drift and volatility switch
+between regimes (calm, trending, crash, recovery) at random points, which
+gives the polynomial channels realistic curvature and outliers. Everything is
+seeded so repeated runs produce identical inputs.
+"""
+
+from datetime import datetime
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+INTERVAL_MINUTES = {'15m': 15, '1h': 60, '4h': 240, '1d': 1440}
+
+# (annualised drift, annualised volatility)
+REGIMES = np.array([
+    [0.05, 0.45],   # calm
+    [0.80, 0.70],   # trending up
+    [-1.50, 1.20],  # crash
+    [0.40, 0.90],   # recovery
+])
+
+# Average regime length in bars, per interval
+REGIME_LENGTH = {'15m': 2000, '1h': 600, '4h': 200, '1d': 90}
+
+
+def symbol_names(n_symbols: int) -> List[str]:
+    return [f"SYN{i:04d}USDT" for i in range(n_symbols)]
+
+
+def generate_ohlcv(n_bars: int, interval: str = '1d', seed: int = 0,
+                   start_price: float = None, end: datetime = None) -> pd.DataFrame:
+    """Generate one OHLCV frame indexed by bar open time."""
+    rng = np.random.default_rng(seed)
+    minutes = INTERVAL_MINUTES[interval]
+    dt = minutes / (365.0 * 24 * 60)
+
+    # Regime path: geometric durations, uniform regime choice
+    regime_ids = np.empty(n_bars, dtype=np.int64)
+    pos = 0
+    while pos < n_bars:
+        length = int(rng.geometric(1.0 / REGIME_LENGTH.get(interval, 200)))
+        regime_ids[pos:pos + length] = rng.integers(len(REGIMES))
+        pos += length
+    drift = REGIMES[regime_ids, 0]
+    vol = REGIMES[regime_ids, 1]
+
+    shocks = rng.standard_normal(n_bars)
+    log_returns = (drift - 0.5 * vol ** 2) * dt + vol * np.sqrt(dt) * shocks
+    if start_price is None:
+        start_price = float(np.exp(rng.uniform(np.log(0.01), np.log(50000))))
+    close = start_price * np.exp(np.cumsum(log_returns))
+
+    open_ = np.empty(n_bars)
+    open_[0] = start_price
+    open_[1:] = close[:-1]
+    wick = np.abs(rng.standard_normal((2, n_bars))) * vol * np.sqrt(dt) * 0.5
+    high = np.maximum(open_, close) * (1.0 + wick[0])
+    low = np.minimum(open_, close) * (1.0 - wick[1])
+    volume = np.exp(rng.normal(10.0, 1.0, n_bars)) * (1.0 + 20.0 * np.abs(log_returns))
+
+    end = pd.Timestamp(end or datetime(2025, 1, 1)).floor(f"{minutes}min")
+    index = pd.date_range(end=end, periods=n_bars, freq=f"{minutes}min", name='timestamp')
+    return pd.DataFrame({
+        'open': open_, 'high': high, 'low': low, 'close': close, 'volume': volume
+    }, index=index)
+
+
+def generate_universe(n_symbols: int, interval: str = '1d', n_bars: int = 720,
+                      seed: int = 42) -> Dict[str, pd.DataFrame]:
+    """Generate n_symbols independent OHLCV frames."""
+    return {
+        symbol: generate_ohlcv(n_bars, interval, seed=seed + i)
+        for i, symbol in enumerate(symbol_names(n_symbols))
+    }
+
+
+def generate_analysis_results(n_symbols: int, seed: int = 42) -> Dict:
+    """Results payload shaped like the engine's analysis export, for ingestion benchmarks."""
+    rng = np.random.default_rng(seed)
+    analyses = []
+    for symbol in symbol_names(n_symbols):
+        price = float(np.exp(rng.uniform(np.log(0.01), np.log(50000))))
+        lower, upper = price * rng.uniform(0.8, 0.98), price * rng.uniform(1.02, 1.2)
+        analyses.append({
+            'symbol': symbol,
+            'signal_analysis': {
+                'signal': str(rng.choice(['BUY', 'SELL', 'HOLD'])),
+                'current_price': price,
+                'upper_band': upper,
+                'lower_band': lower,
+                'potential_return': float((upper - price) / price * 100),
+                'signal_strength': float(rng.uniform(0, 1)),
+                'risk_level': str(rng.choice(['LOW', 'MEDIUM', 'HIGH'])),
+                'confirmations': ['rsi', 'band_touch'][:int(rng.integers(0, 3))],
+            },
+            'technical_indicators': {'rsi': float(rng.uniform(0, 100))},
+            'polynomial_regression': {'degree': int(rng.integers(1, 5)), 'kstd': float(rng.uniform(1, 3))},
+            'current_price': price,
+            'price_change_24h': float(rng.normal(0, 3)),
+            'volatility': float(rng.uniform(0.1, 2.0)),
+            'trend': str(rng.choice(['UP', 'DOWN', 'SIDEWAYS'])),
+            'support_level': lower,
+            'resistance_level': upper,
+            'volume_ratio': float(rng.uniform(0.2, 3.0)),
+            'data_points': 720,
+            'analysis_period_days': 720,
+        })
+    return {
+        'analysis_date': datetime(2025, 1, 1).isoformat(),
+        'total_assets': n_symbols,
+        'individual_analyses': analyses,
+    }
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the engine, strategy and storage hot paths.
+
+Runs entirely on synthetic OHLCV fixtures (see fixtures.py); no Binance or
+Postgres access is needed unless --postgres-dsn is given. Each case is timed
+over several repeats and profiled for peak Python allocations with
+tracemalloc. Results are written as JSON and can be compared against a stored
+baseline; the comparison exits non-zero when a case regresses beyond the
+tolerance.
+
+Usage:
+    python benchmarks/run_benchmarks.py --profile quick
+    python benchmarks/run_benchmarks.py --profile standard --output bench.json
+    python benchmarks/run_benchmarks.py --profile quick --compare benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --cases channel.* --save-baseline benchmarks/baseline.json
+"""
+
+import os
+import sys
+import json
+import time
+import fnmatch
+import logging
+import argparse
+import platform
+import tempfile
+import tracemalloc
+from datetime import datetime
+from statistics import median
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ENGINE_DIR = os.path.dirname(BENCH_DIR)
+DATA_DIR = os.path.join(os.path.dirname(ENGINE_DIR), 'autonama.data')
+sys.path.insert(0, ENGINE_DIR)
+sys.path.insert(1, DATA_DIR)
+
+import fixtures
+
+SCHEMA_VERSION = 1
+
+# Universe size, bars per interval and optimiser budget for each profile
+PROFILES = {
+    'quick': {'symbols': 10, 'bars': {'1d': 720, '1h': 2000, '15m': 3000},
+              'optimize_symbols': 2, 'optuna_trials': 10, 'repeat': 3},
+    'standard': {'symbols': 100, 'bars': {'1d': 720, '1h': 4000, '15m': 6000},
+                 'optimize_symbols': 5, 'optuna_trials': 30, 'repeat': 3},
+    'full': {'symbols': 1000, 'bars': {'1d': 1000, '1h': 8760, '15m': 10000},
+             'optimize_symbols': 10, 'optuna_trials': 100, 'repeat': 1},
+}
+
+
+class SkipBenchmark(Exception):
+    """Raised by a case when its dependencies or services are unavailable."""
+
+
+class BenchContext:
+    """Shared state for one benchmark run: fixtures, scratch directory and options."""
+
+    def __init__(self, profile: Dict, workdir: str, postgres_dsn: Optional[str] = None):
+        self.profile = profile
+        self.workdir = workdir
+        self.postgres_dsn = postgres_dsn
+        self._universes = {}
+        self._engine = None
+
+    def universe(self, interval: str) -> Dict[str, pd.DataFrame]:
+        if interval not in self._universes:
+            self._universes[interval] = fixtures.generate_universe(
+                self.profile['symbols'], interval, self.profile['bars'][interval]
+            )
+        return self._universes[interval]
+
+    def crypto_engine(self):
+        """CryptoEngine wired to a scratch SQLite file and no exchange client."""
+        if self._engine is None:
+            try:
+                from crypto_engine import CryptoEngine
+                from instrumentation import RunMetrics
+            except ImportError as e:
+                raise SkipBenchmark(f"crypto_engine unavailable: {e}")
+            engine = CryptoEngine.__new__(CryptoEngine)
+            engine.config = {'analysis_settings': {}, 'backtest_settings': {}}
+            engine.metrics = RunMetrics('benchmark')
+            engine.numba_enabled = False
+            engine.client = None
+            engine.bt_fees = 0.0015
+            engine.bt_slippage = 0.0005
+            engine.bt_order_delay_bars = 0
+            engine.output_dir = os.path.join(self.workdir, 'results')
+            engine.cache_dir = os.path.join(self.workdir, 'cache')
+            engine.db_path = os.path.join(self.workdir, 'crypto_data.db')
+            engine.all_symbols = fixtures.symbol_names(self.profile['symbols'])
+            engine.init_database()
+            self._engine = engine
+        return self._engine
+
+
+# name -> (interval or None, factory). A factory does its untimed setup and
+# returns (run, items) where run() is the timed body.
+CASES: Dict[str, Tuple[Optional[str], Callable]] = {}
+
+
+def benchmark(name: str, intervals=(None,)):
+    def register(factory):
+        for interval in intervals:
+            case_name = f"{name}[{interval}]" if interval else name
+            CASES[case_name] = (interval, factory)
+        return factory
+    return register
+
+
+@benchmark('channel.calculate_polynomial_regression', intervals=('1d', '1h', '15m'))
+def bench_polynomial_regression(ctx: BenchContext, interval: str):
+    engine = ctx.crypto_engine()
+    closes = [df['close'] for df in ctx.universe(interval).values()]
+
+    def run():
+        for close in closes:
+            engine.calculate_polynomial_regression(close, 2, 2.0)
+    return run, len(closes)
+
+
+@benchmark('channel.optimize_parameters', intervals=('1d',))
+def bench_optimize_parameters(ctx: BenchContext, interval: str):
+    engine = ctx.crypto_engine()
+    try:
+        import optuna
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+    except ImportError as e:
+        raise SkipBenchmark(f"optuna unavailable: {e}")
+    closes = [df['close'] for df in ctx.universe(interval).values()][:ctx.profile['optimize_symbols']]
+    trials = ctx.profile['optuna_trials']
+
+    def run():
+        for close in closes:
+            engine.optimize_parameters(close, n_trials=trials)
+    return run, len(closes) * trials
+
+
+@benchmark('channel.walk_forward', intervals=('1d', '1h'))
+def bench_walk_forward(ctx: BenchContext, interval: str):
+    import walkforward
+    settings = walkforward.WalkForwardSettings()
+    closes = [df['close'] for df in ctx.universe(interval).values()]
+
+    def run():
+        for close in closes:
+            walkforward.walk_forward(close, settings)
+    return run, len(closes)
+
+
+@benchmark('strategy.autonama_channels_backtest', intervals=('1d', '1h'))
+def bench_strategy_backtest(ctx: BenchContext, interval: str):
+    try:
+        from strategies.autonama_channels import AutonamaChannelsStrategy
+        from strategies.base_strategy import BacktestEngine
+    except ImportError as e:
+        raise SkipBenchmark(f"strategies unavailable: {e}")
+    strategy = AutonamaChannelsStrategy()
+    strategy.configure({})
+    frames = list(ctx.universe(interval).values())
+
+    def run():
+        for df in frames:
+            BacktestEngine().run_backtest(strategy, df)
+    return run, len(frames)
+
+
+@benchmark('strategy.compute_signal_and_insights', intervals=('1d', '1h'))
+def bench_signal_and_insights(ctx: BenchContext, interval: str):
+    try:
+        from strategies.autonama_channels_core import AutonamaChannelsCore
+    except ImportError as e:
+        raise SkipBenchmark(f"autonama_channels_core unavailable: {e}")
+    core = AutonamaChannelsCore(degree=2, kstd=2.0)
+    universe = ctx.universe(interval)
+
+    def run():
+        for symbol, df in universe.items():
+            core.compute_signal_and_insights(symbol, df)
+    return run, len(universe)
+
+
+@benchmark('store.sqlite_write', intervals=('1d', '1h'))
+def bench_sqlite_write(ctx: BenchContext, interval: str):
+    import sqlite3
+    engine = ctx.crypto_engine()
+    conn = sqlite3.connect(engine.db_path)
+    conn.execute("DELETE FROM crypto_historical_data WHERE interval = ?", (interval,))
+    conn.commit()
+    conn.close()
+    universe = ctx.universe(interval)
+
+    def run():
+        for symbol, df in universe.items():
+            engine.store_historical_data(symbol, interval, df)
+    return run, sum(len(df) for df in universe.values())
+
+
+@benchmark('store.sqlite_read', intervals=('1d', '1h'))
+def bench_sqlite_read(ctx: BenchContext, interval: str):
+    engine = ctx.crypto_engine()
+    universe = ctx.universe(interval)
+    for symbol, df in universe.items():
+        engine.store_historical_data(symbol, interval, df)
+    # Fixtures end on a fixed date, so read back everything
+    days = (datetime.now() - datetime(2000, 1, 1)).days
+
+    def run():
+        for symbol in universe:
+            engine.get_historical_data_from_db(symbol, interval, days=days)
+    return run, len(universe)
+
+
+def _timescale_manager(ctx: BenchContext):
+    """TimescaleDBManager on --postgres-dsn, or on SQLite with a 'trading' schema attached."""
+    if ctx.postgres_dsn:
+        os.environ['DATABASE_URL'] = ctx.postgres_dsn
+    else:
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(ctx.workdir, 'timescale_standin.db')}"
+    try:
+        from tasks.timescale_data_ingestion import TimescaleDBManager
+        from sqlalchemy import event, text
+    except ImportError as e:
+        raise SkipBenchmark(f"timescale_data_ingestion unavailable: {e}")
+
+    manager = TimescaleDBManager()
+    if manager.engine.dialect.name == 'sqlite':
+        schema_path = os.path.join(ctx.workdir, 'timescale_trading.db')
+
+        @event.listens_for(manager.engine, 'connect')
+        def attach_trading_schema(dbapi_conn, _record):
+            dbapi_conn.execute(f"ATTACH DATABASE '{schema_path}' AS trading")
+
+        manager.engine.dispose()
+    else:
+        with manager.engine.begin() as conn:
+            conn.execute(text("CREATE SCHEMA IF NOT EXISTS trading"))
+
+    with manager.engine.begin() as conn:
+        conn.execute(text("""
+            CREATE TABLE IF NOT EXISTS trading.ohlc_data (
+                symbol VARCHAR(50), exchange VARCHAR(50), timeframe VARCHAR(10),
+                timestamp TIMESTAMP, open DOUBLE PRECISION, high DOUBLE PRECISION,
+                low DOUBLE PRECISION, close DOUBLE PRECISION, volume DOUBLE PRECISION,
+                created_at TIMESTAMP
+            )
+        """))
+        conn.execute(text("DELETE FROM trading.ohlc_data"))
+    return manager
+
+
+@benchmark('store.timescale_insert_ohlc', intervals=('1h',))
+def bench_timescale_insert(ctx: BenchContext, interval: str):
+    manager = _timescale_manager(ctx)
+    payloads = {
+        symbol: df.reset_index().to_dict('records')
+        for symbol, df in ctx.universe(interval).items()
+    }
+
+    def run():
+        for symbol, records in payloads.items():
+            manager.insert_ohlc_data(records, symbol, timeframe=interval)
+    return run, sum(len(records) for records in payloads.values())
+
+
+def _ingestion_system(ctx: BenchContext):
+    if not ctx.postgres_dsn:
+        raise SkipBenchmark("requires --postgres-dsn")
+    try:
+        import psycopg2
+        from ingestion_system import IngestionSystem
+    except ImportError as e:
+        raise SkipBenchmark(f"ingestion_system unavailable: {e}")
+    system = IngestionSystem({}, results_dir=ctx.workdir)
+    system.connection = psycopg2.connect(ctx.postgres_dsn)
+    with system.connection.cursor() as cursor:
+        cursor.execute("CREATE SCHEMA IF NOT EXISTS trading")
+    system.connection.commit()
+    system.create_tables_if_not_exist()
+    with system.connection.cursor() as cursor:
+        cursor.execute("TRUNCATE trading.alerts, trading.asset_analytics")
+    system.connection.commit()
+    return system
+
+
+@benchmark('ingest.alerts_upsert')
+def bench_alerts_upsert(ctx: BenchContext, interval: str):
+    system = _ingestion_system(ctx)
+    results = fixtures.generate_analysis_results(ctx.profile['symbols'])
+
+    def run():
+        system.ingest_alerts(results)
+    return run, len(results['individual_analyses'])
+
+
+@benchmark('ingest.asset_analytics_upsert')
+def bench_asset_analytics_upsert(ctx: BenchContext, interval: str):
+    system = _ingestion_system(ctx)
+    results = fixtures.generate_analysis_results(ctx.profile['symbols'])
+
+    def run():
+        system.ingest_asset_analytics(results)
+    return run, len(results['individual_analyses'])
+
+
+def _check_result_table():
+    """Row dicts round-trip: ints stay ints, mixed int/float stays float, missing keys are None."""
+    from result_table import ResultTable
+    rows = list(ResultTable.from_records([{'a': 1, 'p': 0}, {'a': 2.5, 'p': 3.2}, {'b': 1}]))
+    assert rows[0] == {'a': 1.0, 'p': 0.0, 'b': None} and rows[1]['a'] == 2.5 and rows[2]['a'] is None
+    rows = list(ResultTable.from_records([{'n': 3}, {'n': 5}, {}]))
+    assert [r['n'] for r in rows] == [3, 5, None] and isinstance(rows[0]['n'], int)
+
+
+@benchmark('results.table_rows')
+def bench_result_table_rows(ctx: BenchContext, interval: str):
+    from result_table import ResultTable
+    _check_result_table()
+    records = [{'symbol': a['symbol'], **a['signal_analysis'], 'data_points': a['data_points']}
+               for a in fixtures.generate_analysis_results(ctx.profile['symbols'])['individual_analyses']]
+
+    def run():
+        table = ResultTable.from_records(records)
+        table.records()
+        table.summary()
+    return run, len(records)
+
+
+def calibrate(rounds: int = 5) -> float:
+    """Fixed NumPy/pandas workload used to normalise timings across machines."""
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal(200_000)
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        series = pd.Series(data)
+        series.rolling(20).mean().sum()
+        np.sort(data)
+        np.polynomial.polynomial.polyfit(np.linspace(-1, 1, data.size), data, 4)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_case(ctx: BenchContext, name: str, repeat: int) -> Dict:
+    interval, factory = CASES[name]
+    try:
+        timings = []
+        items = 0
+        for _ in range(repeat):
+            run, items = factory(ctx, interval)
+            start = time.perf_counter()
+            run()
+            timings.append(time.perf_counter() - start)
+
+        run, _ = factory(ctx, interval)
+        tracemalloc.start()
+        run()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    except SkipBenchmark as e:
+        return {'status': 'skipped', 'reason': str(e)}
+    except Exception as e:
+        return {'status': 'error', 'reason': f"{type(e).__name__}: {e}"}
+
+    median_s = median(timings)
+    return {
+        'status': 'ok',
+        'items': items,
+        'repeat': repeat,
+        'median_s': round(median_s, 6),
+        'min_s': round(min(timings), 6),
+        'max_s': round(max(timings), 6),
+        'per_item_us': round(median_s / items * 1e6, 2) if items else None,
+        'peak_bytes': peak,
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float, memory_tolerance: float) -> int:
+    """Print a comparison table; return the number of regressions."""
+    scale = 1.0
+    base_cal = baseline.get('meta', {}).get('calibration_s')
+    cur_cal = current.get('meta', {}).get('calibration_s')
+    if base_cal and cur_cal:
+        scale = cur_cal / base_cal
+
+    regressions = 0
+    print(f"\nComparison against baseline (machine speed factor {scale:.2f})")
+    print(f"{'case':<48} {'base_ms':>10} {'now_ms':>10} {'time':>7} {'mem':>7}")
+    for name, cur in current['results'].items():
+        base = baseline.get('results', {}).get(name)
+        if not base or base.get('status') != 'ok' or cur.get('status') != 'ok':
+            continue
+        time_ratio = cur['median_s'] / (base['median_s'] * scale) if base['median_s'] else 1.0
+        mem_ratio = cur['peak_bytes'] / base['peak_bytes'] if base['peak_bytes'] else 1.0
+        flag = ''
+        if time_ratio > 1 + tolerance or mem_ratio > 1 + memory_tolerance:
+            flag = '  REGRESSION'
+            regressions += 1
+        print(f"{name:<48} {base['median_s'] * 1e3:>10.2f} {cur['median_s'] * 1e3:>10.2f} "
+              f"{time_ratio:>6.2f}x {mem_ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline engine/strategy/storage benchmarks")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default='quick')
+    parser.add_argument('--symbols', type=int, help="Override universe size (10-1000)")
+    parser.add_argument('--repeat', type=int, help="Override timed repeats per case")
+    parser.add_argument('--cases', nargs='+', default=['*'], help="Glob patterns of cases to run")
+    parser.add_argument('--postgres-dsn', help="Run Timescale/ingestion cases against this Postgres")
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--compare', help="Baseline JSON to compare against")
+    parser.add_argument('--save-baseline', help="Write results JSON as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed slowdown (0.25 = 25%%)")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25)
+    parser.add_argument('--list', action='store_true', help="List cases and exit")
+    parser.add_argument('--verbose', action='store_true', help="Keep engine logging enabled")
+    args = parser.parse_args()
+
+    if args.list:
+        for name in CASES:
+            print(name)
+        return 0
+
+    profile = dict(PROFILES[args.profile])
+    if args.symbols:
+        profile['symbols'] = args.symbols
+    repeat = args.repeat or profile['repeat']
+    selected = [name for name in CASES if any(fnmatch.fnmatch(name, pattern) for pattern in args.cases)]
+
+    # Resolve output paths before moving into the scratch directory
+    output = os.path.abspath(args.output) if args.output else None
+    save_baseline = os.path.abspath(args.save_baseline) if args.save_baseline else None
+    baseline_path = os.path.abspath(args.compare) if args.compare else None
+
+    with tempfile.TemporaryDirectory(prefix='autonama_bench_') as workdir:
+        # Engines open log files relative to the working directory at import time
+        os.chdir(workdir)
+        if not args.verbose:
+            logging.disable(logging.CRITICAL)
+
+        ctx = BenchContext(profile, workdir, args.postgres_dsn)
+        report = {
+            'schema': SCHEMA_VERSION,
+            'meta': {
+                'timestamp': datetime.utcnow().isoformat(),
+                'profile': args.profile,
+                'symbols': profile['symbols'],
+                'bars': profile['bars'],
+                'python': platform.python_version(),
+                'numpy': np.__version__,
+                'pandas': pd.__version__,
+                'machine': platform.machine(),
+                'calibration_s': round(calibrate(), 6),
+            },
+            'results': {},
+        }
+
+        print(f"{'case':<48} {'status':>8} {'median_ms':>10} {'per_item_us':>12} {'peak_mib':>9}")
+        for name in selected:
+            result = run_case(ctx, name, repeat)
+            report['results'][name] = result
+            if result['status'] == 'ok':
+                print(f"{name:<48} {'ok':>8} {result['median_s'] * 1e3:>10.2f} "
+                      f"{result['per_item_us'] or 0:>12.1f} {result['peak_bytes'] / 2**20:>9.2f}")
+            else:
+                print(f"{name:<48} {result['status']:>8}  {result['reason']}")
+
+    for path in (output, save_baseline):
+        if path:
+            with open(path, 'w') as f:
+                json.dump(report, f, indent=2)
+
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance, args.memory_tolerance)
+        if regressions:
+            print(f"\n{regressions} case(s) regressed beyond tolerance")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+"""
+Coverage Catalog
+
+Catalog of what the engine's SQLite store holds per (symbol, interval), and
+a planner that turns it into the fewest exchange requests.
+
+Catalog: first/last candle and row count come from crypto_series_stats
+(maintained by triggers, see data_versions.py); crypto_coverage adds the
+list of gaps inside each series. read_catalog() returns both for every
+series of an interval in one query, so status checks and update planning
+for the whole universe never load candles.
+
+Gaps are kept current on every write: record_write() runs in the same
+transaction as the candle upsert, reads only the stored open times between
+the neighbours of the written range, finds gaps there by diffing the open
+times (np.diff against the interval length) and replaces the gaps of that
+window. A series written for the first time is scanned once by install().
+
+A gap the exchange itself has no candles for (listing date, exchange
+outages) is marked confirmed once a fetch covering it returned nothing for
+it, and is not requested again; history_from records how far back the
+exchange was asked, so a recently listed symbol is not backfilled forever.
+
+plan_updates() returns, per symbol, the missing history, the unconfirmed
+gaps and the tail since the last candle (the last stored candle is always
+fetched again, since it may have been stored while still forming), then
+coalesces ranges whose combined request count is not larger than fetching
+them separately (Binance returns up to 1000 candles per request).
+
+Intervals without a fixed length ('1M') are tracked without gaps.
+"""
+
+import json
+import sqlite3
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+import db_pool
+from timeframes import interval_seconds
+
+logger = logging.getLogger(__name__)
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+# Candles per Binance klines request
+BARS_PER_REQUEST = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crypto_coverage (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    gaps TEXT NOT NULL DEFAULT '[]',
+    missing_bars INTEGER NOT NULL DEFAULT 0,
+    history_from DATETIME,
+    updated_at DATETIME,
+    PRIMARY KEY (symbol, interval)
+)
+"""
+
+_CATALOG_QUERY = """
+    SELECT s.symbol, s.first_timestamp, s.last_timestamp, s.row_count,
+           c.gaps, c.missing_bars, c.history_from
+    FROM crypto_series_stats s
+    LEFT JOIN crypto_coverage c ON c.symbol = s.symbol AND c.interval = s.interval
+    WHERE s.interval = ? AND s.row_count > 0
+"""
+
+
+@dataclass
+class Gap:
+    """Missing candles first..last (open times, inclusive)."""
+    first: datetime
+    last: datetime
+    bars: int
+    confirmed: bool = False
+
+    def to_list(self) -> list:
+        return [self.first.strftime(TIME_FORMAT), self.last.strftime(TIME_FORMAT), self.bars, self.confirmed]
+
+    @classmethod
+    def from_list(cls, item: list) -> 'Gap':
+        return cls(_parse(item[0]), _parse(item[1]), int(item[2]), bool(item[3]))
+
+
+@dataclass
+class SeriesCoverage:
+    symbol: str
+    interval: str
+    first_timestamp: datetime
+    last_timestamp: datetime
+    row_count: int
+    gaps: List[Gap] = field(default_factory=list)
+    history_from: Optional[datetime] = None
+
+    @property
+    def missing_bars(self) -> int:
+        return sum(gap.bars for gap in self.gaps)
+
+    @property
+    def open_gaps(self) -> List[Gap]:
+        """Gaps not yet confirmed to be missing on the exchange."""
+        return [gap for gap in self.gaps if not gap.confirmed]
+
+
+@dataclass
+class FetchRange:
+    """Candles to request: open times start..end inclusive."""
+    symbol: str
+    interval: str
+    start: datetime
+    end: datetime
+    bars: int
+    reasons: Tuple[str, ...]
+
+    @property
+    def requests(self) -> int:
+        return -(-self.bars // BARS_PER_REQUEST)
+
+
+def _parse(value) -> datetime:
+    return value if isinstance(value, datetime) else datetime.strptime(str(value)[:19], TIME_FORMAT)
+
+
+def _step(interval: str) -> Optional[int]:
+    try:
+        return interval_seconds(interval)
+    except ValueError:
+        return None
+
+
+def _to_seconds(timestamps: Iterable) -> np.ndarray:
+    return pd.to_datetime(pd.Index(list(timestamps))).as_unit('s').asi8
+
+
+def _from_seconds(seconds: int) -> datetime:
+    return datetime.utcfromtimestamp(int(seconds))
+
+
+def find_gaps(timestamps, step: int) -> List[Gap]:
+    """Gaps in a series of candle open times (any order, duplicates allowed)."""
+    seconds = np.unique(_to_seconds(timestamps))
+    if len(seconds) < 2:
+        return []
+    diffs = np.diff(seconds)
+    missing = diffs // step - 1
+    at = np.flatnonzero(missing >= 1)
+    firsts = seconds[at] + step
+    lasts = firsts + (missing[at] - 1) * step
+    return [Gap(_from_seconds(first), _from_seconds(last), int(bars))
+            for first, last, bars in zip(firsts, lasts, missing[at])]
+
+
+# Catalog maintenance
+
+def _load_gaps(conn: sqlite3.Connection, symbol: str, interval: str) -> List[Gap]:
+    row = conn.execute("SELECT gaps FROM crypto_coverage WHERE symbol = ? AND interval = ?",
+                       (symbol, interval)).fetchone()
+    return [Gap.from_list(item) for item in json.loads(row[0])] if row else []
+
+
+def _save_gaps(conn: sqlite3.Connection, symbol: str, interval: str, gaps: List[Gap]):
+    gaps = sorted(gaps, key=lambda gap: gap.first)
+    conn.execute("""
+        INSERT INTO crypto_coverage (symbol, interval, gaps, missing_bars, updated_at)
+        VALUES (?, ?, ?, ?, CURRENT_TIMESTAMP)
+        ON CONFLICT (symbol, interval) DO UPDATE SET
+            gaps = excluded.gaps, missing_bars = excluded.missing_bars, updated_at = excluded.updated_at
+    """, (symbol, interval, json.dumps([gap.to_list() for gap in gaps]), sum(gap.bars for gap in gaps)))
+
+
+def _series_gaps(conn: sqlite3.Connection, symbol: str, interval: str, step: int,
+                 lo: Optional[str] = None, hi: Optional[str] = None) -> List[Gap]:
+    query = "SELECT timestamp FROM crypto_historical_data WHERE symbol = ? AND interval = ?"
+    params: list = [symbol, interval]
+    if lo is not None:
+        query += " AND timestamp >= ?"
+        params.append(lo)
+    if hi is not None:
+        query += " AND timestamp <= ?"
+        params.append(hi)
+    return find_gaps([row[0] for row in conn.execute(query, params)], step)
+
+
+def record_write(conn: sqlite3.Connection, symbol: str, interval: str, timestamps: Sequence[str]):
+    """
+    Update a series' gaps after candles at `timestamps` were written.
+
+    Call inside the write's transaction. Only the open times between the
+    stored neighbours of the written range are read.
+    """
+    if not len(timestamps):
+        return
+    step = _step(interval)
+    if step is None:
+        _save_gaps(conn, symbol, interval, [])
+        return
+    lo, hi = min(timestamps), max(timestamps)
+    before = conn.execute("SELECT MAX(timestamp) FROM crypto_historical_data "
+                          "WHERE symbol = ? AND interval = ? AND timestamp < ?", (symbol, interval, lo)).fetchone()[0]
+    after = conn.execute("SELECT MIN(timestamp) FROM crypto_historical_data "
+                         "WHERE symbol = ? AND interval = ? AND timestamp > ?", (symbol, interval, hi)).fetchone()[0]
+    window_lo, window_hi = before or lo, after or hi
+    found = _series_gaps(conn, symbol, interval, step, window_lo, window_hi)
+
+    lo_dt, hi_dt = _parse(window_lo), _parse(window_hi)
+    existing = _load_gaps(conn, symbol, interval)
+    confirmed = {(gap.first, gap.last) for gap in existing if gap.confirmed}
+    kept = [gap for gap in existing if gap.last < lo_dt or gap.first > hi_dt]
+    for gap in found:
+        gap.confirmed = (gap.first, gap.last) in confirmed
+    _save_gaps(conn, symbol, interval, kept + found)
+
+
+def rebuild(conn: sqlite3.Connection, symbol: str, interval: str):
+    """Recompute a series' gaps from all its candles (after deletes or repairs)."""
+    step = _step(interval)
+    _save_gaps(conn, symbol, interval, _series_gaps(conn, symbol, interval, step) if step else [])
+
+
+def install(conn: sqlite3.Connection):
+    """Create the coverage table and scan every series that has no coverage row yet."""
+    conn.execute(_SCHEMA)
+    if conn.in_transaction:
+        conn.commit()
+    missing = conn.execute("""
+        SELECT s.symbol, s.interval FROM crypto_series_stats s
+        LEFT JOIN crypto_coverage c ON c.symbol = s.symbol AND c.interval = s.interval
+        WHERE c.symbol IS NULL AND s.row_count > 0
+    """).fetchall()
+    if not missing:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        for symbol, interval in missing:
+            rebuild(conn, symbol, interval)
+    logger.info(f"Built coverage for {len(missing)} series")
+
+
+def mark_fetched(db_path: str, ranges: Sequence[FetchRange]):
+    """
+    Record fetches that succeeded: gaps inside a fetched range that are still
+    missing become confirmed, and history_from moves back to the range start.
+    """
+    with db_pool.sqlite_transaction(db_path) as conn:
+        for (symbol, interval), group in _by_series(ranges).items():
+            gaps = _load_gaps(conn, symbol, interval)
+            for gap in gaps:
+                if any(r.start <= gap.first and gap.last <= r.end for r in group):
+                    gap.confirmed = True
+            _save_gaps(conn, symbol, interval, gaps)
+            start = min(r.start for r in group).strftime(TIME_FORMAT)
+            conn.execute("""
+                UPDATE crypto_coverage SET history_from = MIN(COALESCE(history_from, ?), ?)
+                WHERE symbol = ? AND interval = ?
+            """, (start, start, symbol, interval))
+
+
+def _by_series(ranges: Sequence[FetchRange]) -> Dict[Tuple[str, str], List[FetchRange]]:
+    grouped: Dict[Tuple[str, str], List[FetchRange]] = {}
+    for r in ranges:
+        grouped.setdefault((r.symbol, r.interval), []).append(r)
+    return grouped
+
+
+def read_catalog(db_path: str, interval: str) -> Dict[str, SeriesCoverage]:
+    """Coverage of every stored series of an interval, keyed by symbol (one query)."""
+    rows = db_pool.sqlite_connection(db_path).execute(_CATALOG_QUERY, (interval,)).fetchall()
+    catalog = {}
+    for symbol, first, last, count, gaps, _missing, history_from in rows:
+        catalog[symbol] = SeriesCoverage(
+            symbol=symbol,
+            interval=interval,
+            first_timestamp=_parse(first),
+            last_timestamp=_parse(last),
+            row_count=count,
+            gaps=[Gap.from_list(item) for item in json.loads(gaps)] if gaps else [],
+            history_from=_parse(history_from) if history_from else None,
+        )
+    return catalog
+
+
+# Planning
+
+def current_open(interval: str, now: Optional[datetime] = None) -> datetime:
+    """Open time of the candle forming at `now` (UTC)."""
+    now = now or datetime.utcnow()
+    step = _step(interval)
+    if step is None:
+        return now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    anchor = 4 * 86400 if interval.endswith('w') else 0
+    seconds = int((now - datetime(1970, 1, 1)).total_seconds())
+    return _from_seconds((seconds - anchor) // step * step + anchor)
+
+
+def _bars(start: datetime, end: datetime, step: Optional[int]) -> int:
+    if step is None:
+        return max(1, (end.year - start.year) * 12 + end.month - start.month + 1)
+    return int((end - start).total_seconds() // step) + 1
+
+
+def coalesce(ranges: List[FetchRange], step: Optional[int]) -> List[FetchRange]:
+    """Merge neighbouring ranges of one series when that does not add requests."""
+    merged: List[FetchRange] = []
+    for r in sorted(ranges, key=lambda r: r.start):
+        if merged:
+            prev = merged[-1]
+            end = max(prev.end, r.end)
+            combined = FetchRange(r.symbol, r.interval, prev.start, end, _bars(prev.start, end, step),
+                                  tuple(dict.fromkeys(prev.reasons + r.reasons)))
+            if r.start <= prev.end or combined.requests <= prev.requests + r.requests:
+                merged[-1] = combined
+                continue
+        merged.append(r)
+    return merged
+
+
+def plan_symbol(symbol: str, interval: str, series: Optional[SeriesCoverage], history_start: datetime,
+                forming: datetime) -> List[FetchRange]:
+    """Ranges one series needs, coalesced."""
+    step = _step(interval)
+    if series is None:
+        return [FetchRange(symbol, interval, history_start, forming, _bars(history_start, forming, step), ('new',))]
+
+    ranges = []
+    delta = timedelta(seconds=step) if step else timedelta(days=31)
+    history_checked = series.history_from is not None and series.history_from <= history_start
+    if series.first_timestamp - delta >= history_start and not history_checked:
+        end = series.first_timestamp - delta
+        ranges.append(FetchRange(symbol, interval, history_start, end, _bars(history_start, end, step), ('history',)))
+    for gap in series.open_gaps:
+        if gap.last >= history_start:
+            start = max(gap.first, history_start)
+            ranges.append(FetchRange(symbol, interval, start, gap.last, _bars(start, gap.last, step), ('gap',)))
+    if series.last_timestamp < forming:
+        start = series.last_timestamp
+        ranges.append(FetchRange(symbol, interval, start, forming, _bars(start, forming, step), ('tail',)))
+    return coalesce(ranges, step)
+
+
+def plan_updates(catalog: Dict[str, SeriesCoverage], symbols: Sequence[str], interval: str,
+                 days: int, now: Optional[datetime] = None) -> Dict[str, List[FetchRange]]:
+    """Fetch ranges per symbol that needs any; symbols that are complete are absent."""
+    now = now or datetime.utcnow()
+    forming = current_open(interval, now)
+    history_start = current_open(interval, now - timedelta(days=days))
+    plan = {}
+    for symbol in symbols:
+        ranges = plan_symbol(symbol, interval, catalog.get(symbol), history_start, forming)
+        if ranges:
+            plan[symbol] = ranges
+    return plan
@@ -14,10 +14,12 @@ import plotly.express as px
 from plotly.subplots import make_subplots
 import json
 import os
-import sqlite3
 from datetime import datetime, timedelta
 import time
 from crypto_engine import CryptoEngine
+import export_bundle
+import db_pool
+import data_versions
 
 # Page configuration
 st.set_page_config(
@@ -55,140 +57,144 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+@st.cache_resource
 def load_engine():
-    """Load crypto engine without caching to avoid serialization issues"""
+    """Load the crypto engine once per process (shared, never serialized)"""
     try:
         engine = CryptoEngine("config.json")
         return engine, None
     except Exception as e:
         return None, str(e)
 
+@st.cache_data(max_entries=16)
+def _latest_analysis_results(db_path, results_version):
+    """Latest analysis results; results_version is only part of the cache key"""
+    return db_pool.sqlite_connection(db_path).execute("""
+        SELECT symbol, signal, current_price, potential_return, created_at
+        FROM crypto_analysis_results
+        ORDER BY created_at DESC
+        LIMIT 10
+    """).fetchall()
+
 def get_database_info(engine):
-    """Get database information without caching"""
+    """Get database information from the write-maintained table stats"""
     try:
-        conn = sqlite3.connect(engine.db_path)
-        
-        # Get table info
-        cursor = conn.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        # Get record counts
-        counts = {}
-        for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            counts[table] = cursor.fetchone()[0]
-        
-        # Get latest analysis
-        if 'crypto_analysis_results' in tables:
-            cursor.execute("""
-                SELECT symbol, signal, current_price, potential_return, created_at
-                FROM crypto_analysis_results
-                ORDER BY created_at DESC
-                LIMIT 10
-            """)
-            latest_results = cursor.fetchall()
-        else:
-            latest_results = []
-        
-        conn.close()
+        counts = data_versions.table_counts(engine.db_path)
+        tables = list(counts)
+        latest_results = _latest_analysis_results(
+            engine.db_path, data_versions.table_version(engine.db_path, 'crypto_analysis_results'))
         return tables, counts, latest_results
     except Exception as e:
         return [], {}, []
 
-def create_price_chart(engine, symbol, days=365):
-    """Create price chart with regression bands"""
+@st.cache_data(max_entries=512, show_spinner=False)
+def _price_chart_payload(_engine, db_path, symbol, interval, days, last_timestamp, version, degree, kstd):
+    """
+    Plotly figure (as a dict) with regression bands for one series.
+
+    last_timestamp and version come from crypto_series_stats and are only
+    part of the cache key: a new or revised candle changes them, so charts
+    are rebuilt exactly when data lands and served from cache otherwise.
+    """
+    conn = db_pool.sqlite_connection(db_path)
+    rows = conn.execute("""
+        SELECT timestamp, open, high, low, close, volume
+        FROM crypto_historical_data
+        WHERE symbol = ? AND interval = ?
+        ORDER BY timestamp DESC
+        LIMIT ?
+    """, (symbol, interval, days)).fetchall()
+    
+    if not rows:
+        return None
+    
+    df = pd.DataFrame(rows, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df.set_index('timestamp', inplace=True)
+    df = df.sort_index()
+    
+    # Calculate regression bands
+    close_data = df['close']
+    processed_data = _engine.preprocess_data(close_data)
+    
+    pf, indicators, entries, exits = _engine.calculate_polynomial_regression(processed_data, degree, kstd)
+    
+    if indicators is None:
+        return None
+    
+    # Create plot
+    fig = go.Figure()
+    
+    # Price line
+    fig.add_trace(go.Scatter(
+        x=df.index,
+        y=df['close'],
+        mode='lines',
+        name='Price',
+        line=dict(color='#2c3e50', width=2)
+    ))
+    
+    # Regression line
+    fig.add_trace(go.Scatter(
+        x=indicators.index,
+        y=indicators['regression_line'],
+        mode='lines',
+        name='Regression',
+        line=dict(color='#3498db', width=2, dash='dash')
+    ))
+    
+    # Upper band
+    fig.add_trace(go.Scatter(
+        x=indicators.index,
+        y=indicators['upper_band'],
+        mode='lines',
+        name='Upper Band',
+        line=dict(color='#e74c3c', width=1),
+        fill='tonexty',
+        fillcolor='rgba(231, 76, 60, 0.1)'
+    ))
+    
+    # Lower band
+    fig.add_trace(go.Scatter(
+        x=indicators.index,
+        y=indicators['lower_band'],
+        mode='lines',
+        name='Lower Band',
+        line=dict(color='#27ae60', width=1),
+        fill='tonexty',
+        fillcolor='rgba(39, 174, 96, 0.1)'
+    ))
+    
+    # Current price marker
+    current_price = df['close'].iloc[-1]
+    fig.add_trace(go.Scatter(
+        x=[df.index[-1]],
+        y=[current_price],
+        mode='markers',
+        name='Current Price',
+        marker=dict(color='#f39c12', size=10, symbol='diamond')
+    ))
+    
+    fig.update_layout(
+        title=f'{symbol} Price Analysis',
+        xaxis_title='Date',
+        yaxis_title='Price (USDT)',
+        height=500,
+        showlegend=True
+    )
+    
+    # A plain dict pickles cheaply and st.plotly_chart renders it without rebuilding the figure
+    return fig.to_dict()
+
+def create_price_chart(engine, symbol, days=365, interval='1d', degree=4, kstd=2.0):
+    """Create price chart with regression bands (cached until the series changes)"""
     try:
-        # Get historical data from database
-        conn = sqlite3.connect(engine.db_path)
-        query = """
-            SELECT timestamp, open, high, low, close, volume
-            FROM crypto_historical_data
-            WHERE symbol = ? AND interval = '1d'
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """
-        df = pd.read_sql_query(query, conn, params=(symbol, days))
-        conn.close()
-        
-        if df.empty:
-            return None
-        
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df.set_index('timestamp', inplace=True)
-        df = df.sort_index()
-        
-        # Calculate regression bands
-        close_data = df['close']
-        processed_data = engine.preprocess_data(close_data)
-        
-        pf, indicators, entries, exits = engine.calculate_polynomial_regression(processed_data)
-        
-        if indicators is None:
+        series = data_versions.series_version(engine.db_path, symbol, interval)
+        if series is None:
             return None
-        
-        # Create plot
-        fig = go.Figure()
-        
-        # Price line
-        fig.add_trace(go.Scatter(
-            x=df.index,
-            y=df['close'],
-            mode='lines',
-            name='Price',
-            line=dict(color='#2c3e50', width=2)
-        ))
-        
-        # Regression line
-        fig.add_trace(go.Scatter(
-            x=indicators.index,
-            y=indicators['regression_line'],
-            mode='lines',
-            name='Regression',
-            line=dict(color='#3498db', width=2, dash='dash')
-        ))
-        
-        # Upper band
-        fig.add_trace(go.Scatter(
-            x=indicators.index,
-            y=indicators['upper_band'],
-            mode='lines',
-            name='Upper Band',
-            line=dict(color='#e74c3c', width=1),
-            fill='tonexty',
-            fillcolor='rgba(231, 76, 60, 0.1)'
-        ))
-        
-        # Lower band
-        fig.add_trace(go.Scatter(
-            x=indicators.index,
-            y=indicators['lower_band'],
-            mode='lines',
-            name='Lower Band',
-            line=dict(color='#27ae60', width=1),
-            fill='tonexty',
-            fillcolor='rgba(39, 174, 96, 0.1)'
-        ))
-        
-        # Current price marker
-        current_price = df['close'].iloc[-1]
-        fig.add_trace(go.Scatter(
-            x=[df.index[-1]],
-            y=[current_price],
-            mode='markers',
-            name='Current Price',
-            marker=dict(color='#f39c12', size=10, symbol='diamond')
-        ))
-        
-        fig.update_layout(
-            title=f'{symbol} Price Analysis',
-            xaxis_title='Date',
-            yaxis_title='Price (USDT)',
-            height=500,
-            showlegend=True
-        )
-        
-        return fig
+        last_timestamp, version = series
+        return _price_chart_payload(engine, engine.db_path, symbol, interval, days,
+                                    last_timestamp, version, degree, kstd)
         
     except Exception as e:
         st.error(f"Error creating chart for {symbol}: {e}")
@@ -303,6 +309,14 @@ def main():
                 # Define subdirectories to check
                 subdirs = ['alerts', 'analytics', 'summary', 'plots']
                 
+                # Runs exported as a results bundle: one table plus a precomputed summary
+                results_file = export_bundle.find_results_file(export_dir)
+                if results_file:
+                    all_results = export_bundle.read_results(results_file).to_pylist()
+                    all_summaries.append(export_bundle.read_summary(results_file))
+                    loaded_files.append(os.path.basename(results_file))
+                    subdirs = []
+                
                 for subdir in subdirs:
                     subdir_path = os.path.join(export_dir, subdir)
                     if os.path.exists(subdir_path):
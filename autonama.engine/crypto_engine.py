@@ -36,7 +36,6 @@ import pickle
 import logging
 import warnings
 import pandas as pd
-import sqlite3
 import json
 from datetime import datetime, timedelta
 from concurrent.futures import ThreadPoolExecutor, as_completed
@@ -46,6 +45,16 @@ from typing import Dict, List, Optional, Tuple, Any
 import optuna
 from tqdm import tqdm
 import os
+import channel_kernel
+import timeframes
+import fingerprints
+import db_pool
+import data_versions
+import coverage_catalog
+import walkforward
+import trading_universe
+from instrumentation import RunMetrics
+from result_table import ResultTable, json_default
 
 # Optional acceleration for the backtest loop
 try:
@@ -115,6 +124,10 @@ class CryptoEngine:
             config_file: Path to configuration file
         """
         self.config = self.load_config(config_file)
+        # Per-stage timings and counters for the current run
+        self.metrics = RunMetrics('crypto_engine')
+        # Skipped / recomputed assets of the current incremental run
+        self.incremental_report = fingerprints.IncrementalReport()
         # Control whether to use numba-accelerated backtester
         # Default to False for maximum stability on Windows unless explicitly enabled
         self.numba_enabled = bool(
@@ -191,7 +204,7 @@ class CryptoEngine:
     def init_database(self):
         """Initialize SQLite database for crypto data"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = db_pool.sqlite_connection(self.db_path)
             cursor = conn.cursor()
             
             # Create historical data table
@@ -231,6 +244,43 @@ class CryptoEngine:
                 )
             """)
             
+            # Input fingerprint and result of the latest analysis per asset and parameter set
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS crypto_analysis_fingerprints (
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    params_hash TEXT NOT NULL,
+                    fingerprint TEXT NOT NULL,
+                    last_candle TEXT,
+                    window_rows INTEGER,
+                    analysis_seconds REAL,
+                    result TEXT NOT NULL,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (symbol, interval, params_hash)
+                )
+            """)
+            
+            # Out-of-sample metrics of walk-forward runs, next to the analysis results
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS crypto_walk_forward_results (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    interval TEXT NOT NULL,
+                    folds INTEGER,
+                    train_bars INTEGER,
+                    test_bars INTEGER,
+                    oos_return REAL,
+                    oos_sharpe_ratio REAL,
+                    oos_max_drawdown REAL,
+                    is_return REAL,
+                    efficiency REAL,
+                    positive_folds REAL,
+                    trades INTEGER,
+                    fold_details TEXT,
+                    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
             # Create optimization results table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS crypto_optimization_results (
@@ -247,7 +297,11 @@ class CryptoEngine:
             """)
             
             conn.commit()
-            conn.close()
+            
+            # Row counts and per-series versions maintained on write (read by the dashboard)
+            data_versions.install(conn)
+            # Gap list per series, maintained by store_historical_data (read by update_all_data)
+            coverage_catalog.install(conn)
             logger.info("Database initialized successfully")
             
         except Exception as e:
@@ -255,24 +309,11 @@ class CryptoEngine:
             raise
     
     def get_top_100_assets(self) -> List[str]:
-        """Get top 100 crypto assets by volume from Binance"""
-        try:
-            # Get 24hr ticker for all symbols
-            tickers = self.client.get_ticker()
-            
-            # Filter USDT pairs and sort by volume
-            usdt_pairs = [t for t in tickers if t['symbol'].endswith('USDT')]
-            sorted_pairs = sorted(usdt_pairs, key=lambda x: float(x['quoteVolume']), reverse=True)
-            
-            # Get top 100 symbols
-            top_100 = [pair['symbol'] for pair in sorted_pairs[:100]]
-            
-            logger.info(f"Retrieved top 100 assets by volume")
-            return top_100
-            
-        except Exception as e:
-            logger.error(f"Error getting top 100 assets: {e}")
-            return self.all_symbols[:100]  # Fallback to predefined list
+        """Get top 100 USDT pairs by volume from the shared trading universe"""
+        # Reads the published snapshot (local cache, Redis or file); the full
+        # ticker is only fetched here when none is available or it went stale
+        universe = trading_universe.shared_client(fetch_tickers=self.client.get_ticker)
+        return universe.symbols(100, fallback=self.all_symbols[:100])
     
     def fetch_historical_data(self, symbol: str, interval: str = '1d', days: int = 1000) -> pd.DataFrame:
         """Fetch historical data from Binance with caching - maximum data available"""
@@ -306,7 +347,22 @@ class CryptoEngine:
             except Exception as e:
                 logger.warning(f"Failed to load cache for {symbol}: {e}")
         
-        # Fetch from Binance with maximum data
+        df = self.fetch_range(symbol, interval, start_time, end_time)
+        if df is None or df.empty:
+            return pd.DataFrame()
+        
+        # Cache the data
+        try:
+            with open(cache_filename, 'wb') as f:
+                pickle.dump(df, f)
+        except Exception as e:
+            logger.warning(f"Failed to cache data for {symbol}: {e}")
+        
+        logger.debug(f"Fetched {len(df)} records for {symbol} (max data available)")
+        return df
+    
+    def fetch_range(self, symbol: str, interval: str, start_time: datetime, end_time: datetime) -> Optional[pd.DataFrame]:
+        """Fetch candles opening between start_time and end_time (UTC) from Binance; None if every attempt failed"""
         retries = 3
         for attempt in range(retries):
             try:
@@ -315,7 +371,7 @@ class CryptoEngine:
                 klines = self.client.get_historical_klines(symbol, interval, start_str, end_str)
                 
                 if not klines:
-                    logger.warning(f"No data available for {symbol}")
+                    logger.warning(f"No data available for {symbol} from {start_str} to {end_str}")
                     return pd.DataFrame()
                 
                 df = pd.DataFrame(klines, columns=[
@@ -326,17 +382,7 @@ class CryptoEngine:
                 
                 df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
                 df.set_index('timestamp', inplace=True)
-                df = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
-                
-                # Cache the data
-                try:
-                    with open(cache_filename, 'wb') as f:
-                        pickle.dump(df, f)
-                except Exception as e:
-                    logger.warning(f"Failed to cache data for {symbol}: {e}")
-                
-                logger.debug(f"Fetched {len(df)} records for {symbol} (max data available)")
-                return df
+                return df[['open', 'high', 'low', 'close', 'volume']].astype(float)
                 
             except (BinanceAPIException, BinanceRequestException) as e:
                 logger.error(f"Binance API error for {symbol} - {interval}: {e}")
@@ -350,13 +396,11 @@ class CryptoEngine:
                 time.sleep(5)
         
         logger.error(f"Failed to fetch data for {symbol} after {retries} attempts")
-        return pd.DataFrame()
+        return None
     
-    def store_historical_data(self, symbol: str, interval: str, df: pd.DataFrame):
-        """Store historical data in local database"""
+    def store_historical_data(self, symbol: str, interval: str, df: pd.DataFrame) -> bool:
+        """Store historical data in local database and update the series' coverage"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            
             # Prepare data for insertion
             data_to_insert = []
             for timestamp, row in df.iterrows():
@@ -368,25 +412,28 @@ class CryptoEngine:
                 ))
             
             # Insert data
-            cursor = conn.cursor()
-            cursor.executemany("""
-                INSERT OR REPLACE INTO crypto_historical_data 
-                (symbol, interval, timestamp, open, high, low, close, volume)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, data_to_insert)
+            with db_pool.sqlite_transaction(self.db_path) as conn:
+                conn.executemany("""
+                    INSERT INTO crypto_historical_data 
+                    (symbol, interval, timestamp, open, high, low, close, volume)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (symbol, interval, timestamp) DO UPDATE SET
+                        open = excluded.open, high = excluded.high, low = excluded.low,
+                        close = excluded.close, volume = excluded.volume
+                """, data_to_insert)
+                coverage_catalog.record_write(conn, symbol, interval, [row[2] for row in data_to_insert])
             
-            conn.commit()
-            conn.close()
             logger.debug(f"Stored {len(data_to_insert)} records for {symbol}")
+            return True
             
         except Exception as e:
             logger.error(f"Error storing historical data for {symbol}: {e}")
+            return False
     
     def get_historical_data_from_db(self, symbol: str, interval: str, days: int = 720) -> pd.DataFrame:
         """Get historical data from local database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row
+            conn = db_pool.sqlite_connection(self.db_path)
             
             end_time = datetime.now()
             start_time = end_time - timedelta(days=days)
@@ -399,10 +446,7 @@ class CryptoEngine:
             """
             # Ensure we compare using the same string format as stored in DB
             start_time_str = start_time.strftime('%Y-%m-%d %H:%M:%S')
-            cursor = conn.cursor()
-            cursor.execute(query, (symbol, interval, start_time_str))
-            rows = cursor.fetchall()
-            conn.close()
+            rows = conn.execute(query, (symbol, interval, start_time_str)).fetchall()
             
             if not rows:
                 logger.debug(f"No data found for {symbol} in database")
@@ -425,161 +469,57 @@ class CryptoEngine:
     
     def preprocess_data(self, data: pd.Series, window: int = 5) -> pd.Series:
         """Preprocess data by removing outliers and smoothing"""
-        # Remove duplicates
-        data = data[~data.index.duplicated(keep='first')]
-        
-        # Handle missing values
-        data = data.ffill().bfill()
-        
-        # Remove outliers using Z-score
-        mean = data.mean()
-        std = data.std()
-        z_scores = np.abs((data - mean) / std)
-        data = data[z_scores < 3]
-        
-        # Fill missing values after outlier removal
-        data = data.ffill().bfill()
-        
-        # Apply smoothing using a rolling average
-        data = data.rolling(window=window, min_periods=1).mean()
-        
-        return data
+        values, keep = channel_kernel.preprocess_close(
+            data.to_numpy(dtype=np.float64), window=window, zscore_threshold=3.0,
+            keys=data.index.to_numpy()
+        )
+        return pd.Series(values, index=data.index[keep], name=data.name)
     
     def calculate_polynomial_regression(self, close_data: pd.Series, degree: int = 4, kstd: float = 2.0) -> Tuple:
-        """Calculate polynomial regression and trading signals using VectorBTPro"""
-        close_data = self.preprocess_data(close_data)
+        """Calculate polynomial regression bands and backtest the band-crossing strategy"""
+        with self.metrics.span('preprocess'):
+            close_data = self.preprocess_data(close_data)
         
         if len(close_data) < 50:
             logger.warning(f"Insufficient data for analysis: {len(close_data)} points")
             return None, None, None, None
         
-        # Validate input data
-        if close_data.isnull().any() or (close_data <= 0).any():
-            logger.warning("Invalid data detected: null values or non-positive prices")
-            return None, None, None, None
-        
-        # Use a simpler approach without normalization to avoid overflow issues
-        X = np.arange(len(close_data))
-        y = close_data.values
+        y = close_data.to_numpy(dtype=np.float64)
         
         # Ensure degree within 1-4 as specified
         degree = max(1, min(int(degree), 4))
         
-        try:
-            with warnings.catch_warnings():
-                warnings.simplefilter('ignore', RuntimeWarning)
-                warnings.simplefilter('ignore', UserWarning)
-                coefficients = np.polyfit(X, y, degree)
-        except Exception as e:
-            logger.warning(f"Polyfit failed for degree {degree}: {e}")
-            return None, None, None, None
-        
-        # Check for extreme coefficients that could cause overflow
-        if np.any(np.abs(coefficients) > 1e6):
-            logger.warning("Extreme polynomial coefficients detected, trying lower degree")
-            try:
-                coefficients = np.polyfit(X, y, min(degree, 2))
-                if np.any(np.abs(coefficients) > 1e6):
-                    logger.warning("Still extreme coefficients, skipping")
-                    return None, None, None, None
-            except Exception as e:
-                logger.warning(f"Lower degree polyfit also failed: {e}")
-                return None, None, None, None
-        
-        polynomial = np.poly1d(coefficients)
-        regression_line = polynomial(X)
-        
-        # Validate regression line
-        if np.any(regression_line <= 0) or np.any(regression_line > 1e8):
-            logger.warning("Invalid regression line values")
+        fit = channel_kernel.fit_channel(y, degree, kstd)
+        if fit is None:
+            logger.warning(f"Polynomial fit failed for degree {degree}")
             return None, None, None, None
         
-        # Calculate residuals and standard deviation
-        residuals = y - regression_line
-        std_dev = np.std(residuals)
-        
         # Validate standard deviation
-        if std_dev == 0 or not np.isfinite(std_dev) or std_dev > np.mean(y) * 0.5:
+        if fit.std_dev == 0 or fit.std_dev > np.mean(y) * 0.5:
             logger.warning("Invalid standard deviation calculated")
             return None, None, None, None
         
-        # Calculate bands with more conservative approach
-        upper_band = regression_line + kstd * std_dev
-        lower_band = regression_line - kstd * std_dev
-        
-        # Validate bands to prevent extreme values
-        current_price = close_data.iloc[-1]
-        
-        # More conservative bounds to prevent overflow
-        max_multiplier = 1.5  # Maximum 150% of current price
-        min_multiplier = 0.2  # Minimum 20% of current price
-        
-        # Ensure bands are within reasonable bounds
-        upper_band = np.maximum(upper_band, current_price * min_multiplier)
-        upper_band = np.minimum(upper_band, current_price * max_multiplier)
+        # Bound the bands to 20%-150% of the current price
+        channel_kernel.clamp_bands(fit.upper_band, fit.lower_band, float(y[-1]))
         
-        lower_band = np.maximum(lower_band, current_price * min_multiplier)
-        lower_band = np.minimum(lower_band, current_price * max_multiplier)
-        
-        # Ensure lower band is not higher than upper band
-        lower_band = np.minimum(lower_band, upper_band * 0.95)
-        
-        # Final validation of bands
-        if np.any(upper_band <= 0) or np.any(lower_band <= 0):
-            logger.warning("Invalid band values (non-positive)")
-            return None, None, None, None
-        
-        if np.any(upper_band < lower_band):
-            logger.warning("Upper band is lower than lower band")
-            return None, None, None, None
-        
-        # Check for extreme values that could cause overflow
-        if np.any(upper_band > 1e6) or np.any(lower_band > 1e6):
-            logger.warning("Extreme band values detected")
+        # Single min/max summary covers every value-range check
+        reason = channel_kernel.check_channel(channel_kernel.channel_summary(y, fit))
+        if reason is not None:
+            logger.warning(f"Invalid channel: {reason}")
             return None, None, None, None
         
         indicators = pd.DataFrame({
-            'Close': close_data,
-            'regression_line': regression_line,
-            'upper_band': upper_band,
-            'lower_band': lower_band
+            'Close': y,
+            'regression_line': fit.regression_line,
+            'upper_band': fit.upper_band,
+            'lower_band': fit.lower_band
         }, index=close_data.index)
-
-        # Ensure clean boolean masks and contiguous arrays to avoid numpy flags overflow
-        entries = np.ascontiguousarray(
-            (indicators['Close'].values < indicators['lower_band'].values), dtype=np.bool_
-        )
-        exits = np.ascontiguousarray(
-            (indicators['Close'].values > indicators['upper_band'].values), dtype=np.bool_
-        )
-        
-        # entries/exits are numpy arrays; validate lengths instead of DataFrame emptiness
-        if entries.size == 0 or exits.size == 0:
-            return None, None, None, None
         
-        # Additional validation before creating portfolio
-        if np.any(indicators['Close'] <= 0):
-            logger.warning("Non-positive close prices detected")
-            return None, None, None, None
-        
-        if np.any(indicators['upper_band'] <= 0) or np.any(indicators['lower_band'] <= 0):
-            logger.warning("Non-positive band values detected")
-            return None, None, None, None
-        
-        # Additional validation for extreme values that could cause overflow
-        if np.any(indicators['Close'] > 1e6) or np.any(indicators['upper_band'] > 1e6) or np.any(indicators['lower_band'] > 1e6):
-            logger.warning("Extreme price values detected (> 1e6)")
-            return None, None, None, None
-        
-        # Check for reasonable price ranges
-        price_range = indicators['Close'].max() / indicators['Close'].min()
-        if price_range > 100:  # If price varies by more than 100x, it's likely problematic
-            logger.warning(f"Extreme price range detected: {price_range:.2f}")
-            return None, None, None, None
+        entries, exits = channel_kernel.band_signals(y, fit.upper_band, fit.lower_band)
         
         # Validate signal quality
-        entry_count = entries.sum()
-        exit_count = exits.sum()
+        entry_count = int(entries.sum())
+        exit_count = int(exits.sum())
         total_periods = len(entries)
         
         # More lenient signal validation
@@ -601,7 +541,7 @@ class CryptoEngine:
         
         # Build portfolio using minimal custom backtester only
         # Use contiguous float64 close array to match contiguous boolean masks
-        close_arr = np.ascontiguousarray(indicators['Close'].values, dtype=np.float64)
+        close_arr = y
         # Optionally delay orders to avoid lookahead bias
         if self.bt_order_delay_bars > 0:
             entries_exec = np.roll(entries, self.bt_order_delay_bars)
@@ -653,14 +593,17 @@ class CryptoEngine:
                 cash = units * sell_price
                 equity[-1] = cash
 
-        eq = pd.Series(equity, index=indicators.index)
-        total_return_pct = (eq.iloc[-1] / init_cash - 1.0) * 100.0 if len(eq) > 0 else 0.0
-        rets = eq.pct_change().replace([np.inf, -np.inf], np.nan).fillna(0.0)
+        init_cash = 100_000.0
+        total_return_pct = (equity[-1] / init_cash - 1.0) * 100.0 if equity.size > 0 else 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rets = np.diff(equity) / equity[:-1]
+        rets = np.where(np.isfinite(rets), rets, 0.0)
+        # pct_change() yields a leading 0 after fillna; keep it so mean/std match
+        rets = np.concatenate(([0.0], rets))
         r_mean = float(rets.mean())
-        r_std = float(rets.std())
+        r_std = float(rets.std(ddof=1)) if rets.size > 1 else 0.0
         sharpe = (r_mean / r_std * np.sqrt(252.0)) if r_std > 0 else 0.0
-        dd = (eq / eq.cummax() - 1.0)
-        max_dd = float(dd.min() * 100.0) if len(dd) > 0 else 0.0
+        max_dd = float((equity / np.maximum.accumulate(equity) - 1.0).min() * 100.0) if equity.size > 0 else 0.0
 
         class CustomPortfolio:
             def stats(self_inner):
@@ -778,6 +721,8 @@ class CryptoEngine:
         try:
             study = optuna.create_study(direction='minimize')
             study.optimize(objective, n_trials=n_trials)
+            self.metrics.incr('optuna_trials', len(study.trials))
+            self.metrics.incr('optuna_trials_rejected', sum(1 for t in study.trials if t.value == float('inf')))
             
             # Check if optimization found valid parameters
             if study.best_value == float('inf'):
@@ -831,13 +776,15 @@ class CryptoEngine:
                 lookback = asset_params['lookback']
             
             # Fetch data with lookback
-            df = self.fetch_historical_data(symbol, interval, days)
+            with self.metrics.span('fetch', symbol):
+                df = self.fetch_historical_data(symbol, interval, days)
             if df.empty:
                 logger.warning(f"No data available for {symbol}")
                 return None
             
             # Store data in database
-            self.store_historical_data(symbol, interval, df)
+            with self.metrics.span('store', symbol):
+                self.store_historical_data(symbol, interval, df)
             
             # Apply lookback to close data
             close_data = df['close'].tail(lookback)
@@ -846,7 +793,8 @@ class CryptoEngine:
             if optimize:
                 logger.info(f"Optimizing parameters for {symbol}")
                 try:
-                    degree, kstd, optimized_lookback = self.optimize_parameters(close_data, n_trials=100)
+                    with self.metrics.span('optimize', symbol):
+                        degree, kstd, optimized_lookback = self.optimize_parameters(close_data, n_trials=100)
                     # optimized_lookback==0 means use full dataset
                     if optimized_lookback == 0:
                         close_data = df['close']
@@ -863,11 +811,13 @@ class CryptoEngine:
                 logger.info(f"Using provided/default parameters for {symbol}: degree={degree}, kstd={kstd}, lookback={lookback}")
             
             # Calculate regression and signals
-            pf, indicators, entries, exits = self.calculate_polynomial_regression(close_data, degree, kstd)
+            with self.metrics.span('backtest', symbol):
+                pf, indicators, entries, exits = self.calculate_polynomial_regression(close_data, degree, kstd)
             
             if pf is None:
                 logger.warning(f"Failed to create portfolio for {symbol}")
                 # Try with default parameters as fallback
+                self.metrics.incr('backtest_fallbacks', symbol=symbol)
                 pf, indicators, entries, exits = self.calculate_polynomial_regression(close_data, 2, 2.0)
                 if pf is None:
                     # Try with very conservative parameters as final fallback
@@ -939,27 +889,241 @@ class CryptoEngine:
                             max_drawdown: float, degree: int, kstd: float):
         """Store analysis result in database"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO crypto_analysis_results
-                (symbol, interval, current_price, lower_band, upper_band, signal,
-                 potential_return, total_return, sharpe_ratio, max_drawdown, degree, kstd)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (symbol, interval, current_price, lower_band, upper_band, signal,
-                  potential_return, total_return, sharpe_ratio, max_drawdown, degree, kstd))
-            
-            conn.commit()
-            conn.close()
+            with db_pool.sqlite_transaction(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO crypto_analysis_results
+                    (symbol, interval, current_price, lower_band, upper_band, signal,
+                     potential_return, total_return, sharpe_ratio, max_drawdown, degree, kstd)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (symbol, interval, current_price, lower_band, upper_band, signal,
+                      potential_return, total_return, sharpe_ratio, max_drawdown, degree, kstd))
             
         except Exception as e:
             logger.error(f"Error storing analysis result for {symbol}: {e}")
     
+    def analysis_params(self, symbol: str, optimize: bool, use_lookback: bool,
+                        walk_forward: bool = False) -> Dict:
+        """Everything besides the data that determines an analysis result (fingerprinted)"""
+        params = {
+            'asset_params': self.get_asset_parameters(symbol),
+            'optimize': optimize,
+            'use_lookback': use_lookback,
+            'n_trials': 100,
+            'fees': self.bt_fees,
+            'slippage': self.bt_slippage,
+            'order_delay_bars': self.bt_order_delay_bars,
+            'numba': self.numba_enabled,
+        }
+        if walk_forward:
+            params['walk_forward'] = self.walk_forward_settings().as_dict()
+        return params
+    
+    def walk_forward_settings(self) -> walkforward.WalkForwardSettings:
+        return walkforward.WalkForwardSettings.from_config(self.config.get('walk_forward_settings'))
+    
+    def walk_forward_asset(self, symbol: str, interval: str, close_data: pd.Series) -> Optional[Dict]:
+        """Walk-forward (out-of-sample) metrics of one asset, stored next to its analysis result"""
+        settings = self.walk_forward_settings()
+        wf = walkforward.walk_forward(close_data, settings, self.bt_fees, self.bt_slippage, self.bt_order_delay_bars)
+        if wf is None:
+            logger.info(f"Not enough data for a {settings.folds}-fold walk-forward of {symbol} - {interval} "
+                        f"({len(close_data)} candles)")
+            return None
+        self.store_walk_forward_result(symbol, interval, wf)
+        return wf.summary()
+    
+    def store_walk_forward_result(self, symbol: str, interval: str, wf: walkforward.WalkForwardResult):
+        """Store walk-forward metrics in database"""
+        try:
+            folds = [fold.__dict__ for fold in wf.folds]
+            with db_pool.sqlite_transaction(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO crypto_walk_forward_results
+                    (symbol, interval, folds, train_bars, test_bars, oos_return, oos_sharpe_ratio,
+                     oos_max_drawdown, is_return, efficiency, positive_folds, trades, fold_details)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, (symbol, interval, len(wf.folds), wf.train_bars, wf.test_bars, wf.oos_return,
+                      wf.oos_sharpe, wf.oos_max_drawdown, wf.is_return, wf.efficiency, wf.positive_folds,
+                      wf.trades, json.dumps(folds, default=json_default)))
+        except Exception as e:
+            logger.error(f"Error storing walk-forward result for {symbol}: {e}")
+    
+    def get_reusable_result(self, symbol: str, interval: str, fp: Dict) -> Optional[Dict]:
+        """Stored result whose input fingerprint matches fp, with its analysis time"""
+        try:
+            row = db_pool.sqlite_connection(self.db_path).execute("""
+                SELECT result, analysis_seconds FROM crypto_analysis_fingerprints
+                WHERE symbol = ? AND interval = ? AND params_hash = ? AND fingerprint = ?
+            """, (symbol, interval, fp['params_hash'], fp['fingerprint'])).fetchone()
+            if row is None:
+                return None
+            result = json.loads(row[0])
+            result['analysis_seconds'] = round(row[1] or 0.0, 3)
+            return result
+        except Exception as e:
+            logger.warning(f"Error reading stored fingerprint for {symbol} - {interval}: {e}")
+            return None
+    
+    def store_fingerprint(self, result: Dict, fp: Dict, seconds: float):
+        """Keep the input fingerprint and result for later incremental runs"""
+        try:
+            with db_pool.sqlite_transaction(self.db_path) as conn:
+                conn.execute("""
+                    INSERT INTO crypto_analysis_fingerprints
+                    (symbol, interval, params_hash, fingerprint, last_candle, window_rows, analysis_seconds, result, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (symbol, interval, params_hash) DO UPDATE SET
+                        fingerprint = excluded.fingerprint, last_candle = excluded.last_candle,
+                        window_rows = excluded.window_rows, analysis_seconds = excluded.analysis_seconds,
+                        result = excluded.result, updated_at = excluded.updated_at
+                """, (result['symbol'], result['interval'], fp['params_hash'], fp['fingerprint'],
+                      fp['last_candle'], fp['rows'], seconds, json.dumps(result, default=json_default)))
+        except Exception as e:
+            logger.warning(f"Error storing fingerprint for {result.get('symbol')}: {e}")
+    
+    def analyze_frame(self, symbol: str, interval: str, df: pd.DataFrame,
+                      optimize: bool = True, use_lookback: bool = True,
+                      incremental: bool = False, walk_forward: bool = False) -> Optional[Dict]:
+        """Channel analysis of one symbol's OHLCV frame at one interval (None if no valid channel)
+
+        With incremental, a stored result whose input fingerprint (analysed
+        window and parameters) matches is returned instead of recomputing.
+        With walk_forward, out-of-sample metrics over the whole frame are
+        added to the result (see walkforward.py)
+        """
+        started = time.perf_counter()
+        # Get asset-specific parameters
+        asset_params = self.get_asset_parameters(symbol)
+        degree = asset_params['degree']
+        kstd = asset_params['std']
+        lookback = asset_params['lookback']
+        
+        # Apply lookback to close data
+        if use_lookback and lookback > 0:
+            # Use only the last X candles
+            close_data = df['close'].tail(lookback)
+            logger.info(f"Using last {lookback} candles for {symbol} (lookback mode)")
+        else:
+            # Use all available data from start
+            close_data = df['close']
+            logger.info(f"Using all {len(close_data)} candles for {symbol} (full data mode)")
+        
+        # Input fingerprint: analysed window plus parameters
+        fp = fingerprints.fingerprint(close_data, self.analysis_params(symbol, optimize, use_lookback, walk_forward))
+        if incremental:
+            prior = self.get_reusable_result(symbol, interval, fp)
+            if prior is not None:
+                self.incremental_report.skip(prior.get('analysis_seconds'))
+                self.metrics.incr('assets_skipped')
+                prior['reused'] = True
+                logger.info(f"Reusing result for {symbol} - {interval}: no new candle since {fp['last_candle']}")
+                return prior
+        
+        # Optimize parameters for ALL assets (not just major coins)
+        if optimize:
+            logger.info(f"Optimizing parameters for {symbol}")
+            try:
+                with self.metrics.span('optimize'):
+                    degree, kstd, optimized_lookback = self.optimize_parameters(close_data, n_trials=100)
+                logger.info(f"Best parameters for {symbol}: degree={degree}, kstd={kstd}, lookback={optimized_lookback}")
+                # Use optimized lookback if it's different from the original
+                if optimized_lookback != lookback:
+                    logger.info(f"Using optimized lookback: {optimized_lookback} instead of {lookback}")
+                    lookback = optimized_lookback
+                    # Re-apply lookback with optimized value
+                    if use_lookback and lookback > 0:
+                        close_data = df['close'].tail(lookback)
+                        logger.info(f"Using last {lookback} candles for {symbol} (optimized lookback)")
+            except Exception as e:
+                logger.warning(f"Optimization failed for {symbol}: {e}")
+                # Use default parameters
+                degree = asset_params['degree']
+                kstd = asset_params['std']
+                lookback = asset_params['lookback']
+        
+        # Calculate regression and signals
+        with self.metrics.span('backtest'):
+            pf, indicators, entries, exits = self.calculate_polynomial_regression(close_data, degree, kstd)
+        
+        if pf is None:
+            logger.warning(f"Failed to create portfolio for {symbol}")
+            # Try with default parameters as fallback
+            self.metrics.incr('backtest_fallbacks')
+            pf, indicators, entries, exits = self.calculate_polynomial_regression(close_data, 2, 2.0)
+            if pf is None:
+                logger.error(f"Failed to create portfolio for {symbol} even with default parameters")
+                return None
+            else:
+                degree, kstd = 2, 2.0  # Use default parameters
+                logger.info(f"Using default parameters for {symbol}: degree={degree}, kstd={kstd}")
+        
+        # Get portfolio statistics
+        stats = pf.stats()
+        
+        # Generate signal
+        with self.metrics.span('signal'):
+            signal, lower_band, upper_band, potential_return = self.generate_signal(indicators)
+        
+        # Get current price
+        current_price = close_data.iloc[-1]
+        
+        # Store analysis result
+        with self.metrics.span('store_result'):
+            self.store_analysis_result(
+                symbol, interval, current_price, lower_band, upper_band,
+                signal, potential_return, stats['Total Return [%]'],
+                stats['Sharpe Ratio'], stats['Max Drawdown [%]'], degree, kstd
+            )
+        
+        result = {
+            'symbol': symbol,
+            'interval': interval,
+            'current_price': current_price,
+            'lower_band': lower_band,
+            'upper_band': upper_band,
+            'signal': signal,
+            'potential_return': potential_return,
+            'total_return': stats['Total Return [%]'],
+            'sharpe_ratio': stats['Sharpe Ratio'],
+            'max_drawdown': stats['Max Drawdown [%]'],
+            'degree': degree,
+            'kstd': kstd,
+            'lookback': lookback,
+            'use_lookback': use_lookback,
+            'data_points': len(close_data),
+            'total_available': len(df['close']),
+            'analysis_date': datetime.now().isoformat(),
+            'last_candle': fp['last_candle'],
+            'data_fingerprint': fp['fingerprint']
+        }
+        
+        if walk_forward:
+            with self.metrics.span('walk_forward'):
+                oos = self.walk_forward_asset(symbol, interval, df['close'])
+            if oos:
+                result.update(oos)
+        
+        seconds = time.perf_counter() - started
+        self.store_fingerprint(result, fp, seconds)
+        result['analysis_seconds'] = round(seconds, 3)
+        result['reused'] = False
+        if incremental:
+            self.incremental_report.recompute(seconds)
+        
+        logger.info(f"Analysis complete for {symbol} - {interval}: {signal} signal, {potential_return:.2f}% potential")
+        return result
+    
     def analyze_all_assets(self, symbols: List[str] = None, interval: str = '1d', 
                           days: int = 720, optimize_all_assets: bool = True,
-                          use_lookback: bool = True) -> List[Dict]:
-        """Analyze all crypto assets with comprehensive data collection and optimization for all assets"""
+                          use_lookback: bool = True, incremental: bool = False,
+                          walk_forward: bool = False) -> ResultTable:
+        """Analyze all crypto assets with comprehensive data collection and optimization for all assets
+
+        With incremental, assets whose input fingerprint is unchanged reuse their stored result.
+        With walk_forward, each result also carries out-of-sample metrics.
+        Returns a ResultTable (columnar, and a sequence of the per-asset result dicts)
+        """
+        self.incremental_report = fingerprints.IncrementalReport()
         try:
             # Get top 100 assets if no symbols specified
             if symbols is None:
@@ -974,120 +1138,39 @@ class CryptoEngine:
             
             # Process all symbols with progress bar (Windows-safe rendering)
             is_windows = (os.name == 'nt')
-            for symbol in tqdm(
+            for symbol in self.metrics.iter_symbols(tqdm(
                 symbols,
                 desc="Analyzing assets",
                 ascii=is_windows,
                 dynamic_ncols=True,
                 mininterval=0.2,
                 unit="asset"
-            ):
+            )):
                 try:
                     logger.info(f"Analyzing {symbol} - {interval}")
                     
-                    # Get asset-specific parameters
-                    asset_params = self.get_asset_parameters(symbol)
-                    degree = asset_params['degree']
-                    kstd = asset_params['std']
-                    lookback = asset_params['lookback']
-                    
                     # Fetch maximum data available
-                    df = self.fetch_historical_data(symbol, interval, days)
+                    with self.metrics.span('fetch'):
+                        df = self.fetch_historical_data(symbol, interval, days)
                     if df.empty:
                         logger.warning(f"No data available for {symbol}")
                         failed_symbols.append(symbol)
                         continue
                     
                     # Store data in database
-                    self.store_historical_data(symbol, interval, df)
-                    
-                    # Apply lookback to close data
-                    if use_lookback and lookback > 0:
-                        # Use only the last X candles
-                        close_data = df['close'].tail(lookback)
-                        logger.info(f"Using last {lookback} candles for {symbol} (lookback mode)")
-                    else:
-                        # Use all available data from start
-                        close_data = df['close']
-                        logger.info(f"Using all {len(close_data)} candles for {symbol} (full data mode)")
-                    
-                    # Optimize parameters for ALL assets (not just major coins)
-                    if optimize_all_assets:
-                        logger.info(f"Optimizing parameters for {symbol}")
-                        try:
-                            degree, kstd, optimized_lookback = self.optimize_parameters(close_data, n_trials=100)
-                            logger.info(f"Best parameters for {symbol}: degree={degree}, kstd={kstd}, lookback={optimized_lookback}")
-                            # Use optimized lookback if it's different from the original
-                            if optimized_lookback != lookback:
-                                logger.info(f"Using optimized lookback: {optimized_lookback} instead of {lookback}")
-                                lookback = optimized_lookback
-                                # Re-apply lookback with optimized value
-                                if use_lookback and lookback > 0:
-                                    close_data = df['close'].tail(lookback)
-                                    logger.info(f"Using last {lookback} candles for {symbol} (optimized lookback)")
-                        except Exception as e:
-                            logger.warning(f"Optimization failed for {symbol}: {e}")
-                            # Use default parameters
-                            degree = asset_params['degree']
-                            kstd = asset_params['std']
-                            lookback = asset_params['lookback']
-                    
-                    # Calculate regression and signals
-                    pf, indicators, entries, exits = self.calculate_polynomial_regression(close_data, degree, kstd)
-                    
-                    if pf is None:
-                        logger.warning(f"Failed to create portfolio for {symbol}")
-                        # Try with default parameters as fallback
-                        pf, indicators, entries, exits = self.calculate_polynomial_regression(close_data, 2, 2.0)
-                        if pf is None:
-                            logger.error(f"Failed to create portfolio for {symbol} even with default parameters")
-                            failed_symbols.append(symbol)
-                            continue
-                        else:
-                            degree, kstd = 2, 2.0  # Use default parameters
-                            logger.info(f"Using default parameters for {symbol}: degree={degree}, kstd={kstd}")
-                    
-                    # Get portfolio statistics
-                    stats = pf.stats()
-                    
-                    # Generate signal
-                    signal, lower_band, upper_band, potential_return = self.generate_signal(indicators)
-                    
-                    # Get current price
-                    current_price = close_data.iloc[-1]
-                    
-                    # Store analysis result
-                    self.store_analysis_result(
-                        symbol, interval, current_price, lower_band, upper_band,
-                        signal, potential_return, stats['Total Return [%]'],
-                        stats['Sharpe Ratio'], stats['Max Drawdown [%]'], degree, kstd
-                    )
-                    
-                    result = {
-                        'symbol': symbol,
-                        'interval': interval,
-                        'current_price': current_price,
-                        'lower_band': lower_band,
-                        'upper_band': upper_band,
-                        'signal': signal,
-                        'potential_return': potential_return,
-                        'total_return': stats['Total Return [%]'],
-                        'sharpe_ratio': stats['Sharpe Ratio'],
-                        'max_drawdown': stats['Max Drawdown [%]'],
-                        'degree': degree,
-                        'kstd': kstd,
-                        'lookback': lookback,
-                        'use_lookback': use_lookback,
-                        'data_points': len(close_data),
-                        'total_available': len(df['close']),
-                        'analysis_date': datetime.now().isoformat()
-                    }
+                    with self.metrics.span('store'):
+                        self.store_historical_data(symbol, interval, df)
                     
+                    result = self.analyze_frame(symbol, interval, df, optimize_all_assets, use_lookback,
+                                                incremental, walk_forward)
+                    if result is None:
+                        failed_symbols.append(symbol)
+                        continue
                     results.append(result)
-                    logger.info(f"Analysis complete for {symbol}: {signal} signal, {potential_return:.2f}% potential")
                     
                 except Exception as e:
                     logger.error(f"Error analyzing {symbol}: {e}")
+                    self.metrics.incr('symbols_failed')
                     failed_symbols.append(symbol)
                     continue
             
@@ -1095,11 +1178,100 @@ class CryptoEngine:
             if failed_symbols:
                 logger.warning(f"Failed symbols: {failed_symbols}")
             
-            return results
+            return ResultTable.from_records(results)
             
         except Exception as e:
             logger.error(f"Error in analyze_all_assets: {e}")
-            return []
+            return ResultTable.from_records([])
+    
+    def analyze_timeframes(self, symbols: List[str] = None, intervals: List[str] = None,
+                           days: int = 720, optimize_all_assets: bool = True,
+                           use_lookback: bool = True, incremental: bool = False,
+                           walk_forward: bool = False) -> ResultTable:
+        """Analyze all assets on several intervals with one fetch per symbol
+
+        Each symbol is fetched once at the finest interval; coarser bars are
+        resampled from it locally and every interval is analyzed in the same
+        pass. Intervals that are not whole multiples of the finest one are
+        fetched on their own.
+
+        Returns a ResultTable with one row per (symbol, interval)
+        """
+        self.incremental_report = fingerprints.IncrementalReport()
+        try:
+            if symbols is None:
+                symbols = self.get_top_100_assets()
+                logger.info(f"Using top 100 assets by volume: {len(symbols)} symbols")
+            if not intervals:
+                intervals = self.config.get('analysis_settings', {}).get('timeframes', ['1d'])
+            intervals = timeframes.sort_intervals(intervals)
+            source = intervals[0]
+            
+            logger.info(f"Starting multi-timeframe analysis of {len(symbols)} crypto assets")
+            logger.info(f"Intervals: {intervals} (fetching {source}), Days: {days}, "
+                        f"Optimize All Assets: {optimize_all_assets}, Use Lookback: {use_lookback}")
+            
+            results = []
+            failed = []
+            
+            is_windows = (os.name == 'nt')
+            for symbol in self.metrics.iter_symbols(tqdm(
+                symbols,
+                desc="Analyzing assets",
+                ascii=is_windows,
+                dynamic_ncols=True,
+                mininterval=0.2,
+                unit="asset"
+            )):
+                try:
+                    with self.metrics.span('fetch'):
+                        df = self.fetch_historical_data(symbol, source, days)
+                    if df.empty:
+                        logger.warning(f"No data available for {symbol}")
+                        failed.extend((symbol, interval) for interval in intervals)
+                        continue
+                    
+                    with self.metrics.span('store'):
+                        self.store_historical_data(symbol, source, df)
+                    
+                    with self.metrics.span('resample'):
+                        frames = timeframes.derive_timeframes(df, source, intervals)
+                    
+                    for interval in intervals:
+                        frame = frames.get(interval)
+                        if frame is None:
+                            # Not a multiple of the source interval
+                            with self.metrics.span('fetch'):
+                                frame = self.fetch_historical_data(symbol, interval, days)
+                        if frame.empty:
+                            failed.append((symbol, interval))
+                            continue
+                        try:
+                            result = self.analyze_frame(symbol, interval, frame, optimize_all_assets,
+                                                        use_lookback, incremental, walk_forward)
+                        except Exception as e:
+                            logger.error(f"Error analyzing {symbol} - {interval}: {e}")
+                            result = None
+                        if result is None:
+                            failed.append((symbol, interval))
+                            continue
+                        results.append(result)
+                    
+                except Exception as e:
+                    logger.error(f"Error analyzing {symbol}: {e}")
+                    self.metrics.incr('symbols_failed')
+                    failed.extend((symbol, interval) for interval in intervals)
+                    continue
+            
+            logger.info(f"Analysis complete: {len(results)} successful, {len(failed)} failed (symbol, interval) pairs")
+            if failed:
+                logger.warning(f"Failed: {failed}")
+            
+            return ResultTable.from_records(results)
+            
+        except Exception as e:
+            logger.error(f"Error in analyze_timeframes: {e}")
+            return ResultTable.from_records([])
     
     def save_results_to_csv(self, results: List[Dict], filename: str = None) -> str:
         """Save results to CSV file"""
@@ -1114,8 +1286,7 @@ class CryptoEngine:
         filepath = os.path.join(self.output_dir, filename)
         
         try:
-            df = pd.DataFrame(results)
-            df.to_csv(filepath, index=False)
+            ResultTable.coerce(results).to_csv(filepath)
             logger.info(f"Results saved to CSV: {filepath}")
             return filepath
         except Exception as e:
@@ -1135,28 +1306,8 @@ class CryptoEngine:
         filepath = os.path.join(self.output_dir, filename)
         
         try:
-            # Convert numpy types to native Python types for JSON serialization
-            def convert_numpy(obj):
-                if isinstance(obj, (np.integer, np.int64, np.int32)):
-                    return int(obj)
-                elif isinstance(obj, (np.floating, np.float64, np.float32)):
-                    return float(obj)
-                elif isinstance(obj, np.ndarray):
-                    return obj.tolist()
-                elif hasattr(obj, 'item'):  # Handle numpy scalars
-                    return obj.item()
-                return obj
-            
-            # Convert results
-            json_results = []
-            for result in results:
-                json_result = {}
-                for key, value in result.items():
-                    json_result[key] = convert_numpy(value)
-                json_results.append(json_result)
-            
-            with open(filepath, 'w') as f:
-                json.dump(json_results, f, indent=2, default=str)
+            # Written column-wise from the result table, no per-value conversion
+            ResultTable.coerce(results).to_json(filepath)
             
             logger.info(f"Results saved to JSON: {filepath}")
             return filepath
@@ -1165,62 +1316,62 @@ class CryptoEngine:
             return ""
     
     def get_analysis_summary(self, results: List[Dict]) -> Dict:
-        """Get summary statistics from analysis results"""
+        """Get summary statistics from analysis results (vectorised over the result table)"""
         if not results:
             return {}
         
-        buy_signals = [r for r in results if r.get('signal') == 'BUY']
-        sell_signals = [r for r in results if r.get('signal') == 'SELL']
-        hold_signals = [r for r in results if r.get('signal') == 'HOLD']
-        
-        avg_potential_return = sum([r.get('potential_return', 0) or 0 for r in results]) / len(results)
-        avg_total_return = sum([r.get('total_return', 0) for r in results]) / len(results)
-        
-        summary = {
-            'total_assets': len(results),
-            'buy_signals': len(buy_signals),
-            'sell_signals': len(sell_signals),
-            'hold_signals': len(hold_signals),
-            'avg_potential_return': avg_potential_return,
-            'avg_total_return': avg_total_return,
-            'top_buy_signals': sorted(buy_signals, key=lambda x: x.get('potential_return', 0) or 0, reverse=True)[:5],
-            'top_sell_signals': sorted(sell_signals, key=lambda x: x.get('potential_return', 0) or 0, reverse=True)[:5]
-        }
-        
-        return summary
+        return ResultTable.coerce(results).summary(top_n=5)
     
     def run_complete_analysis(self, symbols: List[str] = None, interval: str = '1d', 
                             days: int = 720, optimize_all_assets: bool = True,
-                            output_format: str = 'both', update_data_first: bool = False) -> Dict:
-        """Run complete crypto analysis"""
+                            output_format: str = 'both', update_data_first: bool = False,
+                            intervals: List[str] = None, incremental: bool = False,
+                            walk_forward: bool = False) -> Dict:
+        """Run complete crypto analysis
+
+        With intervals (e.g. analysis_settings.timeframes) every interval is
+        analyzed in one multi-timeframe pass instead of the single interval.
+        With incremental, assets with no new candle and unchanged parameters
+        reuse their previous result. With walk_forward, every result also
+        gets out-of-sample metrics from a rolling walk-forward evaluation.
+        """
         start_time = datetime.now()
         
         logger.info("Starting Crypto Engine Analysis")
         logger.info(f"Symbols: {len(symbols) if symbols else 'all'}")
-        logger.info(f"Interval: {interval}")
+        logger.info(f"Interval: {', '.join(intervals) if intervals else interval}")
         logger.info(f"Days: {days}")
         logger.info(f"Optimize all assets: {optimize_all_assets}")
         logger.info(f"Update data first: {update_data_first}")
+        logger.info(f"Incremental: {incremental}")
+        logger.info(f"Walk-forward: {walk_forward}")
         
         # Ensure data is downloaded and stored before analysis if requested
         if update_data_first:
             try:
-                self.update_all_data(symbols=symbols, interval=interval, days=days)
+                fetch_interval = timeframes.finest_interval(intervals) if intervals else interval
+                self.update_all_data(symbols=symbols, interval=fetch_interval, days=days)
             except Exception as e:
                 logger.warning(f"Pre-analysis data update encountered an issue: {e}")
         
         # Run analysis
-        results = self.analyze_all_assets(symbols, interval, days, optimize_all_assets)
+        if intervals:
+            results = self.analyze_timeframes(symbols, intervals, days, optimize_all_assets,
+                                              incremental=incremental, walk_forward=walk_forward)
+        else:
+            results = self.analyze_all_assets(symbols, interval, days, optimize_all_assets,
+                                              incremental=incremental, walk_forward=walk_forward)
         
         # Save results
         csv_filepath = ""
         json_filepath = ""
         
-        if output_format in ['csv', 'both']:
-            csv_filepath = self.save_results_to_csv(results)
-        
-        if output_format in ['json', 'both']:
-            json_filepath = self.save_results_to_json(results)
+        with self.metrics.span('export'):
+            if output_format in ['csv', 'both']:
+                csv_filepath = self.save_results_to_csv(results)
+            
+            if output_format in ['json', 'both']:
+                json_filepath = self.save_results_to_json(results)
         
         # Get summary
         summary = self.get_analysis_summary(results)
@@ -1234,7 +1385,9 @@ class CryptoEngine:
             'csv_filepath': csv_filepath,
             'json_filepath': json_filepath,
             'duration': str(duration),
-            'analysis_date': end_time.isoformat()
+            'analysis_date': end_time.isoformat(),
+            'incremental': self.incremental_report.as_dict() if incremental else None,
+            'instrumentation': self.metrics.summary()
         }
         
         # Log summary
@@ -1248,6 +1401,12 @@ class CryptoEngine:
         logger.info(f"HOLD signals: {summary['hold_signals']}")
         logger.info(f"Average potential return: {summary['avg_potential_return']:.2f}%")
         logger.info(f"Average total return: {summary['avg_total_return']:.2f}%")
+        if intervals and len(results):
+            for name, row in results.group_summary('interval').iterrows():
+                logger.info(f"  {name}: {int(row['count'])} assets, "
+                            f"avg potential {row['potential_return']:.2f}%, avg total {row['total_return']:.2f}%")
+        if incremental:
+            self.incremental_report.log(logger)
         
         if csv_filepath:
             logger.info(f"CSV results: {csv_filepath}")
@@ -1257,7 +1416,7 @@ class CryptoEngine:
         return analysis_result 
 
     def update_all_data(self, symbols: List[str] = None, interval: str = '1d', days: int = 1000) -> bool:
-        """Update all data in the database efficiently - only fetch missing data"""
+        """Update all data in the database efficiently - only fetch missing ranges (history, gaps, tail)"""
         try:
             logger.info("Starting efficient data update process...")
             
@@ -1266,77 +1425,60 @@ class CryptoEngine:
                 symbols = self.get_top_100_assets()
                 logger.info(f"Updating data for {len(symbols)} top assets")
             
-            updated_count = 0
+            # One catalog read plans the whole universe
+            with self.metrics.span('plan'):
+                catalog = coverage_catalog.read_catalog(self.db_path, interval)
+                plan = coverage_catalog.plan_updates(catalog, symbols, interval, days)
+            requests = sum(r.requests for ranges in plan.values() for r in ranges)
+            logger.info(f"{len(symbols) - len(plan)} symbols up to date; "
+                        f"{len(plan)} need {sum(len(ranges) for ranges in plan.values())} ranges ({requests} requests)")
+            
+            updated_count = len(symbols) - len(plan)
             failed_symbols = []
             total_new_records = 0
-            total_updated_records = 0
             
             # Update each symbol's data (Windows-safe tqdm)
             is_windows = (os.name == 'nt')
-            for symbol in tqdm(
-                symbols,
+            for symbol in self.metrics.iter_symbols(tqdm(
+                list(plan),
                 desc="Updating data",
                 ascii=is_windows,
                 dynamic_ncols=True,
                 mininterval=0.2,
                 unit="symbol"
-            ):
+            )):
+                fetched = []
+                records = 0
                 try:
-                    logger.info(f"Checking data for {symbol}")
-                    
-                    # Get existing data from database
-                    existing_df = self.get_historical_data_from_db(symbol, interval, days=days)
-                    
-                    # Determine what data we need to fetch
-                    if existing_df.empty:
-                        # No existing data, fetch everything
-                        logger.info(f"No existing data for {symbol}, fetching all {days} days")
-                        df = self.fetch_historical_data(symbol, interval, days)
-                        new_records = len(df) if not df.empty else 0
-                        updated_records = 0
-                    else:
-                        # Check what's missing
-                        latest_existing = existing_df.index.max()
-                        current_time = datetime.now()
-                        
-                        # Calculate how many days we need to fetch
-                        if isinstance(latest_existing, str):
-                            latest_existing = datetime.strptime(latest_existing, '%Y-%m-%d %H:%M:%S')
-                        
-                        days_since_last = (current_time - latest_existing).days
-                        
-                        if days_since_last <= 0:
-                            # Data is up to date (within same day)
-                            logger.info(f"{symbol} data is up to date (last update: {latest_existing})")
-                            updated_count += 1
-                            continue
-                        else:
-                            # Need to fetch missing days
-                            logger.info(f"{symbol} needs {days_since_last} days of updates (last: {latest_existing})")
-                            df = self.fetch_historical_data(symbol, interval, days=days_since_last + 1)
-                            new_records = len(df) if not df.empty else 0
-                            updated_records = 0
-                    
-                    if df.empty:
-                        logger.warning(f"No data available for {symbol}")
-                        failed_symbols.append(symbol)
-                        continue
-                    
-                    # Store in database (INSERT OR REPLACE handles duplicates)
-                    self.store_historical_data(symbol, interval, df)
-                    updated_count += 1
-                    total_new_records += new_records
-                    total_updated_records += updated_records
-                    
-                    logger.info(f"Updated {symbol}: {new_records} new records, {updated_records} updated records")
-                    
+                    for fetch in plan[symbol]:
+                        logger.info(f"{symbol}: fetching {fetch.bars} bars {fetch.start} - {fetch.end} "
+                                    f"({', '.join(fetch.reasons)})")
+                        with self.metrics.span('fetch'):
+                            df = self.fetch_range(symbol, interval, fetch.start, fetch.end)
+                        if df is None:
+                            break
+                        if not df.empty:
+                            with self.metrics.span('store'):
+                                if not self.store_historical_data(symbol, interval, df):
+                                    break
+                            records += len(df)
+                        fetched.append(fetch)
                 except Exception as e:
                     logger.error(f"Failed to update {symbol}: {e}")
+                
+                # Ranges fetched without error: what is still missing there is missing on the exchange
+                if fetched:
+                    coverage_catalog.mark_fetched(self.db_path, fetched)
+                if len(fetched) < len(plan[symbol]) or (symbol not in catalog and records == 0):
+                    logger.warning(f"No data available for {symbol}" if not records else f"Update of {symbol} incomplete")
                     failed_symbols.append(symbol)
                     continue
+                updated_count += 1
+                total_new_records += records
+                logger.info(f"Updated {symbol}: {records} records")
             
             logger.info(f"Data update complete: {updated_count} successful, {len(failed_symbols)} failed")
-            logger.info(f"Total new records: {total_new_records}, Total updated records: {total_updated_records}")
+            logger.info(f"Total records written: {total_new_records}")
             if failed_symbols:
                 logger.warning(f"Failed symbols: {failed_symbols}")
             
@@ -1347,7 +1489,7 @@ class CryptoEngine:
             return False
     
     def get_data_status(self, symbols: List[str] = None, interval: str = '1d') -> Dict:
-        """Get status of data for all symbols"""
+        """Get status of data for all symbols (one coverage catalog read)"""
         try:
             if symbols is None:
                 symbols = self.get_top_100_assets()
@@ -1358,32 +1500,41 @@ class CryptoEngine:
                 'symbols_up_to_date': 0,
                 'symbols_needing_update': 0,
                 'symbols_no_data': 0,
-                'details': {}
+                'symbols_with_gaps': 0,
+                'missing_bars': 0,
+                'details': {},
+                'gaps': {}
             }
             
-            current_time = datetime.now()
+            catalog = coverage_catalog.read_catalog(self.db_path, interval)
+            current_time = datetime.utcnow()
             
             for symbol in symbols:
-                existing_df = self.get_historical_data_from_db(symbol, interval, days=1)
+                series = catalog.get(symbol)
                 
-                if existing_df.empty:
+                if series is None:
                     status['symbols_no_data'] += 1
                     status['details'][symbol] = 'no_data'
+                    continue
+                
+                status['symbols_with_data'] += 1
+                if series.gaps:
+                    status['symbols_with_gaps'] += 1
+                    status['missing_bars'] += series.missing_bars
+                    status['gaps'][symbol] = {
+                        'gaps': len(series.gaps),
+                        'missing_bars': series.missing_bars,
+                        'unconfirmed': len(series.open_gaps)
+                    }
+                
+                days_since_last = (current_time - series.last_timestamp).days
+                
+                if days_since_last <= 0:
+                    status['symbols_up_to_date'] += 1
+                    status['details'][symbol] = 'up_to_date'
                 else:
-                    status['symbols_with_data'] += 1
-                    latest_existing = existing_df.index.max()
-                    
-                    if isinstance(latest_existing, str):
-                        latest_existing = datetime.strptime(latest_existing, '%Y-%m-%d %H:%M:%S')
-                    
-                    days_since_last = (current_time - latest_existing).days
-                    
-                    if days_since_last <= 0:
-                        status['symbols_up_to_date'] += 1
-                        status['details'][symbol] = 'up_to_date'
-                    else:
-                        status['symbols_needing_update'] += 1
-                        status['details'][symbol] = f'needs_update_{days_since_last}_days'
+                    status['symbols_needing_update'] += 1
+                    status['details'][symbol] = f'needs_update_{days_since_last}_days'
             
             return status
             
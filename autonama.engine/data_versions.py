@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Data Versions
+
+Row counts and change versions of the engine's SQLite store, maintained by
+triggers on every write instead of being counted by readers.
+
+- crypto_table_stats: row count and version per table; the version changes
+  on every insert, update and delete
+- crypto_series_stats: per (symbol, interval) candle count, first and last
+  candle timestamp and version of crypto_historical_data
+
+Readers use these as cache keys: a cached chart for (symbol, interval,
+last_timestamp, version, params) stays valid until a candle is added or
+revised, and the dashboard's table counts are one small SELECT.
+
+The triggers count INSERT and DELETE statements. SQLite does not fire delete
+triggers for rows removed by INSERT OR REPLACE (unless recursive_triggers is
+on), so writers to the tracked tables use upserts (INSERT ... ON CONFLICT DO
+UPDATE), which fire the update trigger for existing rows.
+
+install() creates the tables and triggers and, the first time only, counts
+existing rows once.
+"""
+
+import sqlite3
+import logging
+from typing import Dict, Optional, Tuple
+
+import db_pool
+
+logger = logging.getLogger(__name__)
+
+TRACKED_TABLES = (
+    'crypto_historical_data',
+    'crypto_analysis_results',
+    'crypto_analysis_fingerprints',
+    'crypto_optimization_results',
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS crypto_table_stats (
+    table_name TEXT PRIMARY KEY,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    version INTEGER NOT NULL DEFAULT 0,
+    updated_at DATETIME
+);
+CREATE TABLE IF NOT EXISTS crypto_series_stats (
+    symbol TEXT NOT NULL,
+    interval TEXT NOT NULL,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    first_timestamp DATETIME,
+    last_timestamp DATETIME,
+    version INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (symbol, interval)
+);
+"""
+
+_TABLE_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_insert AFTER INSERT ON {table} BEGIN
+    UPDATE crypto_table_stats SET row_count = row_count + 1, version = version + 1,
+        updated_at = CURRENT_TIMESTAMP WHERE table_name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_delete AFTER DELETE ON {table} BEGIN
+    UPDATE crypto_table_stats SET row_count = row_count - 1, version = version + 1,
+        updated_at = CURRENT_TIMESTAMP WHERE table_name = '{table}';
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{table}_stats_update AFTER UPDATE ON {table} BEGIN
+    UPDATE crypto_table_stats SET version = version + 1,
+        updated_at = CURRENT_TIMESTAMP WHERE table_name = '{table}';
+END;
+"""
+
+_SERIES_TRIGGERS = """
+CREATE TRIGGER IF NOT EXISTS trg_series_stats_insert AFTER INSERT ON crypto_historical_data BEGIN
+    INSERT INTO crypto_series_stats (symbol, interval, row_count, first_timestamp, last_timestamp, version)
+    VALUES (NEW.symbol, NEW.interval, 1, NEW.timestamp, NEW.timestamp, 1)
+    ON CONFLICT (symbol, interval) DO UPDATE SET
+        row_count = row_count + 1,
+        first_timestamp = MIN(first_timestamp, excluded.first_timestamp),
+        last_timestamp = MAX(last_timestamp, excluded.last_timestamp),
+        version = version + 1;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_series_stats_update AFTER UPDATE ON crypto_historical_data BEGIN
+    UPDATE crypto_series_stats SET version = version + 1
+    WHERE symbol = NEW.symbol AND interval = NEW.interval;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_series_stats_delete AFTER DELETE ON crypto_historical_data BEGIN
+    UPDATE crypto_series_stats SET
+        row_count = row_count - 1,
+        first_timestamp = (SELECT MIN(timestamp) FROM crypto_historical_data
+                           WHERE symbol = OLD.symbol AND interval = OLD.interval),
+        last_timestamp = (SELECT MAX(timestamp) FROM crypto_historical_data
+                          WHERE symbol = OLD.symbol AND interval = OLD.interval),
+        version = version + 1
+    WHERE symbol = OLD.symbol AND interval = OLD.interval;
+END;
+"""
+
+
+def install(conn: sqlite3.Connection):
+    """Create the stats tables and triggers; count existing rows of tables not tracked yet."""
+    conn.executescript(_SCHEMA)
+    tracked = {row[0] for row in conn.execute("SELECT table_name FROM crypto_table_stats")}
+    # Triggers and the initial counts in one transaction, so no write falls in between
+    if conn.in_transaction:
+        conn.commit()
+    conn.execute("BEGIN IMMEDIATE")
+    with conn:
+        for table in TRACKED_TABLES:
+            for statement in _TABLE_TRIGGERS.format(table=table).split('END;')[:-1]:
+                conn.execute(statement + 'END;')
+            if table not in tracked:
+                conn.execute(f"INSERT INTO crypto_table_stats (table_name, row_count, version, updated_at) "
+                             f"SELECT '{table}', COUNT(*), 0, CURRENT_TIMESTAMP FROM {table}")
+        for statement in _SERIES_TRIGGERS.split('END;')[:-1]:
+            conn.execute(statement + 'END;')
+        if 'crypto_historical_data' not in tracked:
+            conn.execute("DELETE FROM crypto_series_stats")
+            conn.execute("""
+                INSERT INTO crypto_series_stats (symbol, interval, row_count, first_timestamp, last_timestamp, version)
+                SELECT symbol, interval, COUNT(*), MIN(timestamp), MAX(timestamp), 0
+                FROM crypto_historical_data GROUP BY symbol, interval
+            """)
+            logger.info("Counted existing rows for the data version tables")
+
+
+def table_counts(db_path: str) -> Dict[str, int]:
+    """Row count per tracked table."""
+    rows = db_pool.sqlite_connection(db_path).execute(
+        "SELECT table_name, row_count FROM crypto_table_stats ORDER BY table_name").fetchall()
+    return {table: count for table, count in rows}
+
+
+def table_version(db_path: str, table: str) -> int:
+    row = db_pool.sqlite_connection(db_path).execute(
+        "SELECT version FROM crypto_table_stats WHERE table_name = ?", (table,)).fetchone()
+    return row[0] if row else 0
+
+
+def series_version(db_path: str, symbol: str, interval: str) -> Optional[Tuple[str, int]]:
+    """(last candle timestamp, version) of a series, or None when it has no candles."""
+    row = db_pool.sqlite_connection(db_path).execute(
+        "SELECT last_timestamp, version FROM crypto_series_stats WHERE symbol = ? AND interval = ? AND row_count > 0",
+        (symbol, interval)).fetchone()
+    return (row[0], row[1]) if row else None
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Data-Version Fingerprints
+
+Identify the exact input of one asset analysis so an incremental run can
+reuse the previous result when nothing changed.
+
+An input fingerprint is made of:
+- last_candle: open time of the newest bar in the analysed window
+- rows: bars in the analysed window
+- window_hash: BLAKE2b of the window's bar times and close values
+- params_hash: BLAKE2b of the analysis parameters (asset parameters,
+  optimisation settings, backtest costs, FINGERPRINT_VERSION)
+
+A symbol without a new candle (weekend forex/stocks, halted or delisted
+pairs) and unchanged configuration produces the same fingerprint, and its
+stored result is reused instead of re-running the optimiser.
+"""
+
+import json
+import hashlib
+import logging
+from typing import Any, Dict
+
+import numpy as np
+import pandas as pd
+
+# Bump when the analysis itself changes so stored results are not reused
+FINGERPRINT_VERSION = 1
+
+
+def _digest(*chunks: bytes) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        h.update(chunk)
+    return h.hexdigest()
+
+
+def window_fingerprint(close: pd.Series) -> Dict[str, Any]:
+    """last_candle / rows / window_hash of the close series an analysis runs on."""
+    values = np.ascontiguousarray(close.to_numpy(dtype=np.float64))
+    times = pd.DatetimeIndex(close.index).as_unit('ns').asi8 if len(close) else np.empty(0, dtype=np.int64)
+    return {
+        'last_candle': close.index[-1].isoformat() if len(close) else None,
+        'rows': int(len(values)),
+        'window_hash': _digest(np.ascontiguousarray(times).tobytes(), values.tobytes()),
+    }
+
+
+def params_hash(params: Dict[str, Any]) -> str:
+    payload = json.dumps({'version': FINGERPRINT_VERSION, **params}, sort_keys=True, default=str)
+    return _digest(payload.encode())
+
+
+def fingerprint(close: pd.Series, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Full input fingerprint; 'fingerprint' combines the window and the parameters."""
+    window = window_fingerprint(close)
+    p_hash = params_hash(params)
+    return {**window, 'params_hash': p_hash, 'fingerprint': _digest(window['window_hash'].encode(), p_hash.encode())}
+
+
+class IncrementalReport:
+    """Skipped / recomputed counts and time saved for one run."""
+
+    def __init__(self):
+        self.skipped = 0
+        self.recomputed = 0
+        self.saved_seconds = 0.0
+        self.spent_seconds = 0.0
+
+    def skip(self, prior_seconds: float):
+        self.skipped += 1
+        self.saved_seconds += float(prior_seconds or 0.0)
+
+    def recompute(self, seconds: float):
+        self.recomputed += 1
+        self.spent_seconds += seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'assets_skipped': self.skipped,
+            'assets_recomputed': self.recomputed,
+            'seconds_saved': round(self.saved_seconds, 1),
+            'seconds_spent': round(self.spent_seconds, 1),
+        }
+
+    def log(self, logger: logging.Logger):
+        logger.info(f"Incremental: {self.skipped} assets unchanged and reused, {self.recomputed} recomputed; "
+                    f"~{self.saved_seconds:.0f}s saved ({self.spent_seconds:.0f}s spent on recomputation)")
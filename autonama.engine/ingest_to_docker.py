@@ -5,12 +5,18 @@ Autonama Engine to Docker Ingestion Script
 This script takes the latest optimization export data and ingests it into the Docker system
 so the web application can access it for generating pages and analytics.
 
+Runs are found through the run ledger (run_ledger.py) that the optimization
+manifest writer records into, and each run is ingested once; running the
+script again without a new run is a no-op.
+
 Usage:
     python ingest_to_docker.py
+    python ingest_to_docker.py --force   # re-ingest the latest run
 """
 
 import os
 import json
+import argparse
 import shutil
 import glob
 import math
@@ -18,6 +24,9 @@ from datetime import datetime
 from pathlib import Path
 import logging
 
+import export_bundle
+import run_ledger
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -29,6 +38,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Consumer name of this script in the run ledger
+LEDGER_CONSUMER = 'docker'
+
 def clean_nan_values(obj):
     """Recursively clean NaN values from data structures"""
     if isinstance(obj, dict):
@@ -46,6 +58,9 @@ class DockerIngestionManager:
         self.web_dir = self.engine_dir.parent / "autonama.web"
         self.export_dir = self.engine_dir / "export_results"
         self.docker_data_dir = self.web_dir / "public" / "data"
+        self.ledger = run_ledger.RunLedger(str(self.export_dir))
+        # Manifest of the run found by find_latest_optimization_run (None for unrecorded runs)
+        self.run_manifest = None
         
         # Ensure Docker data directory exists
         self.docker_data_dir.mkdir(parents=True, exist_ok=True)
@@ -53,11 +68,16 @@ class DockerIngestionManager:
     def find_latest_optimization_run(self):
         """Find the latest optimization run folder"""
         try:
-            if not self.export_dir.exists():
-                logger.error(f"Export directory not found: {self.export_dir}")
-                return None
-                
-            # Find all optimization run folders
+            # Completed runs are recorded by the manifest writer
+            run = self.ledger.latest('optimization_run')
+            if run and os.path.exists(run['path']):
+                self.run_manifest = run['path']
+                latest_folder = Path(run['path']).parent
+                logger.info(f"Found latest optimization run: {latest_folder.name}")
+                return latest_folder
+            self.run_manifest = None
+            
+            # Runs exported before the ledger existed
             run_folders = list(self.export_dir.glob("optimization_run_*"))
             
             if not run_folders:
@@ -74,8 +94,67 @@ class DockerIngestionManager:
             logger.error(f"Error finding latest optimization run: {e}")
             return None
     
+    def load_bundle_data(self, run_folder, results_file):
+        """Load a run's results bundle, verifying it against the run manifest"""
+        if self.run_manifest:
+            manifest = Path(self.run_manifest)
+        else:
+            # Runs exported before the ledger existed
+            manifests = list(run_folder.glob("manifest_*.json"))
+            manifest = max(manifests, key=lambda x: x.stat().st_mtime) if manifests else None
+        if manifest:
+            with open(manifest, 'r') as f:
+                expected = json.load(f).get('bundle', {}).get('sha256')
+            if expected and not export_bundle.verify_checksum(str(results_file), expected):
+                logger.error(f"Checksum mismatch for {results_file.name}")
+                return None
+        
+        table = export_bundle.read_results(str(results_file))
+        footer = export_bundle.read_footer(str(results_file))
+        summary = footer.get('summary', {})
+        
+        analyses = table.to_pylist()
+        alerts = table.select(export_bundle.ALERT_COLUMNS).to_pylist()
+        for alert in alerts:
+            alert['timestamp'] = alert['analysis_date'] or footer.get('timestamp')
+        logger.info(f"Loaded {len(analyses)} results from {results_file.name}")
+        return {
+            'alerts': alerts,
+            'analytics': {'individual_analyses': analyses},
+            'summary': {
+                'timestamp': footer.get('timestamp'),
+                'total_assets_analyzed': summary.get('total_assets', 0),
+                'optimization_enabled': footer.get('metadata', {}).get('optimization_enabled', True),
+                'analysis_summary': summary,
+                'top_performers': {
+                    'buy_signals': summary.get('top_buy_signals', []),
+                    'sell_signals': summary.get('top_sell_signals', [])
+                },
+                'optimization_stats': {
+                    'assets_optimized': summary.get('assets_optimized', 0),
+                    'avg_optimization_improvement': summary.get('avg_optimization_improvement', 0)
+                }
+            },
+            'results_file': results_file,
+            'metadata': {
+                'run_folder': run_folder.name,
+                'ingestion_time': datetime.now().isoformat(),
+                'source_path': str(run_folder)
+            }
+        }
+    
     def load_export_data(self, run_folder):
         """Load all export data from the optimization run"""
+        # Runs exported as a results bundle
+        results_file = export_bundle.find_results_file(str(run_folder))
+        if results_file:
+            try:
+                return self.load_bundle_data(run_folder, Path(results_file))
+            except Exception as e:
+                logger.error(f"Error loading results bundle: {e}")
+                return None
+        
+        # Older runs exported as separate JSON files
         data = {
             'alerts': [],
             'analytics': {},
@@ -178,8 +257,10 @@ class DockerIngestionManager:
                     }
                     docker_data['assets'].append(asset_info)
             
-            # Clean NaN values
-            docker_data = clean_nan_values(docker_data)
+            # Clean NaN values (bundle data already has nulls instead)
+            if not data.get('results_file'):
+                docker_data = clean_nan_values(docker_data)
+            docker_data['results_file'] = data.get('results_file')
             
             return docker_data
             
@@ -187,53 +268,61 @@ class DockerIngestionManager:
             logger.error(f"Error creating Docker API data: {e}")
             return None
     
+    def write_json(self, path, payload):
+        """Compact JSON; the web routes parse these on every request"""
+        with open(path, 'w') as f:
+            json.dump(payload, f, separators=(',', ':'), default=str)
+    
     def save_to_docker(self, docker_data):
         """Save data to Docker accessible location"""
         try:
-            # Save main data file
-            main_data_file = self.docker_data_dir / "optimization_data.json"
-            with open(main_data_file, 'w') as f:
-                json.dump(docker_data, f, indent=2)
-            logger.info(f"Saved main data to {main_data_file}")
+            results_file = docker_data.pop('results_file', None)
             
-            # Save individual files for API endpoints
+            # Save individual files for API endpoints. The Python API reads
+            # results.parquet and only falls back to the JSON files for runs
+            # without one; the Next.js routes (alerts, analytics,
+            # analytics/[symbol]) read the JSON files.
             api_dir = self.docker_data_dir / "api"
             api_dir.mkdir(exist_ok=True)
             
+            # Columnar results for the Python API (column projection, memory-mapped reads)
+            if results_file:
+                tmp_file = api_dir / "results.parquet.tmp"
+                shutil.copy2(results_file, tmp_file)
+                os.replace(tmp_file, api_dir / "results.parquet")
+                logger.info(f"Saved results table to {api_dir / 'results.parquet'}")
+            
             # Alerts endpoint
             alerts_file = api_dir / "alerts.json"
-            with open(alerts_file, 'w') as f:
-                json.dump(docker_data['alerts'], f, indent=2)
+            self.write_json(alerts_file, docker_data['alerts'])
             logger.info(f"Saved alerts to {alerts_file}")
             
             # Analytics endpoint
             analytics_file = api_dir / "analytics.json"
-            with open(analytics_file, 'w') as f:
-                json.dump(docker_data['analytics'], f, indent=2)
+            self.write_json(analytics_file, docker_data['analytics'])
             logger.info(f"Saved analytics to {analytics_file}")
             
             # Summary endpoint
             summary_file = api_dir / "summary.json"
-            with open(summary_file, 'w') as f:
-                json.dump(docker_data['summary'], f, indent=2)
+            self.write_json(summary_file, docker_data['summary'])
             logger.info(f"Saved summary to {summary_file}")
             
             # Assets endpoint
             assets_file = api_dir / "assets.json"
-            with open(assets_file, 'w') as f:
-                json.dump(docker_data['assets'], f, indent=2)
+            self.write_json(assets_file, docker_data['assets'])
             logger.info(f"Saved assets to {assets_file}")
             
-            # Create individual asset files
+            # Create individual asset files: one list per symbol, a row per interval
             assets_dir = api_dir / "assets"
             assets_dir.mkdir(exist_ok=True)
             
+            per_symbol = {}
             for asset in docker_data['analytics']:
-                asset_file = assets_dir / f"{asset['symbol']}.json"
-                with open(asset_file, 'w') as f:
-                    json.dump(asset, f, indent=2)
+                per_symbol.setdefault(asset['symbol'], []).append(asset)
+            for symbol, rows in per_symbol.items():
+                self.write_json(assets_dir / f"{symbol}.json", rows)
             
-            logger.info(f"Saved {len(docker_data['analytics'])} individual asset files")
+            logger.info(f"Saved {len(per_symbol)} individual asset files")
             
             return True
             
@@ -254,12 +343,12 @@ class DockerIngestionManager:
                 'has_summary': bool(docker_data['summary'])
             },
             'docker_paths': {
-                'main_data': str(self.docker_data_dir / "optimization_data.json"),
                 'api_dir': str(self.docker_data_dir / "api"),
                 'alerts': str(self.docker_data_dir / "api" / "alerts.json"),
                 'analytics': str(self.docker_data_dir / "api" / "analytics.json"),
                 'summary': str(self.docker_data_dir / "api" / "summary.json"),
-                'assets': str(self.docker_data_dir / "api" / "assets.json")
+                'assets': str(self.docker_data_dir / "api" / "assets.json"),
+                'results': str(self.docker_data_dir / "api" / "results.parquet")
             }
         }
         
@@ -270,7 +359,7 @@ class DockerIngestionManager:
         logger.info(f"Created ingestion manifest: {manifest_file}")
         return manifest
     
-    def run_ingestion(self):
+    def run_ingestion(self, force: bool = False):
         """Main ingestion process"""
         logger.info("Starting Docker ingestion process...")
         
@@ -280,6 +369,20 @@ class DockerIngestionManager:
             logger.error("No optimization run found. Please run optimization first.")
             return False
         
+        if self.run_manifest is None:
+            return self.ingest_run(run_folder)
+        
+        # Each recorded run is ingested once
+        if not self.ledger.claim(LEDGER_CONSUMER, self.run_manifest, force=force):
+            logger.info(f"{run_folder.name} is already ingested (use --force to ingest it again)")
+            return True
+        success = self.ingest_run(run_folder)
+        self.ledger.finish(LEDGER_CONSUMER, self.run_manifest,
+                           run_ledger.STATUS_DONE if success else run_ledger.STATUS_FAILED)
+        return success
+    
+    def ingest_run(self, run_folder):
+        """Publish one optimization run to the Docker data directory"""
         # Load export data
         data = self.load_export_data(run_folder)
         if not data:
@@ -308,9 +411,13 @@ class DockerIngestionManager:
 
 def main():
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Ingest the latest optimization run for the Docker web app")
+    parser.add_argument("--force", action="store_true", help="Ingest the latest run even if it was already ingested")
+    args = parser.parse_args()
+    
     try:
         manager = DockerIngestionManager()
-        success = manager.run_ingestion()
+        success = manager.run_ingestion(force=args.force)
         
         if success:
             print("Docker ingestion completed successfully!")
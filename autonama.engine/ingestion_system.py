@@ -18,6 +18,9 @@ from typing import Dict, List, Optional, Any
 import glob
 from psycopg2.extras import RealDictCursor
 
+import db_pool
+import run_ledger
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -30,6 +33,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Consumer name of this system in the run ledger
+LEDGER_CONSUMER = 'postgres'
+
 class IngestionSystem:
     def __init__(self, db_config: Dict, results_dir: str = "results"):
         """
@@ -42,27 +48,30 @@ class IngestionSystem:
         self.db_config = db_config
         self.results_dir = results_dir
         self.connection = None
+        # Result files recorded by the analysis engine, and which ones were ingested
+        self.ledger = run_ledger.RunLedger(results_dir)
         
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = psycopg2.connect(
-                host=self.db_config['host'],
-                port=self.db_config['port'],
-                database=self.db_config['database'],
-                user=self.db_config['user'],
-                password=self.db_config['password']
-            )
+            # Borrowed from the process-wide pool; close_database() hands it back
+            self.connection = db_pool.acquire_postgres(self.pg_config)
             logger.info("Database connection established")
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
+    @property
+    def pg_config(self) -> Dict:
+        """psycopg2 connection parameters (the pool key)"""
+        return {key: self.db_config[key] for key in ('host', 'port', 'database', 'user', 'password')}
+    
     def close_database(self):
-        """Close database connection"""
+        """Return the database connection to the pool"""
         if self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
+            db_pool.release_postgres(self.pg_config, self.connection)
+            self.connection = None
+            logger.info("Database connection released")
     
     def get_latest_results_file(self) -> Optional[str]:
         """
@@ -72,6 +81,13 @@ class IngestionSystem:
             Path to the latest results file, or None if none found
         """
         try:
+            # Recorded by EnhancedLocalEngine.save_results
+            run = self.ledger.latest('enhanced_results')
+            if run and os.path.exists(run['path']):
+                logger.info(f"Found latest results file: {run['path']}")
+                return run['path']
+            
+            # Files written before the ledger existed
             pattern = os.path.join(self.results_dir, "enhanced_analysis_results_*.json")
             files = glob.glob(pattern)
             
@@ -467,13 +483,17 @@ class IngestionSystem:
             logger.error(f"Error during cleanup: {e}")
             self.connection.rollback()
     
-    def ingest_latest_results(self) -> Dict:
+    def ingest_latest_results(self, force: bool = False) -> Dict:
         """
         Ingest the latest analysis results
         
+        Args:
+            force: Ingest the file even if it was already ingested
+        
         Returns:
             Dictionary with ingestion results
         """
+        latest_file = None
         try:
             # Connect to database
             self.connect_database()
@@ -486,15 +506,25 @@ class IngestionSystem:
             if not latest_file:
                 return {'error': 'No results files found'}
             
+            # Each results file is ingested once
+            if not force and self.ledger.status(LEDGER_CONSUMER, latest_file) == run_ledger.STATUS_DONE:
+                logger.info(f"{latest_file} is already ingested")
+                self.close_database()
+                return {'success': True, 'skipped': True, 'file_processed': latest_file,
+                        'timestamp': datetime.now().isoformat()}
+            self.ledger.claim(LEDGER_CONSUMER, latest_file, force=True)
+            
             # Load results
             results = self.load_results(latest_file)
             if not results:
+                self.ledger.finish(LEDGER_CONSUMER, latest_file, run_ledger.STATUS_FAILED, 'Failed to load results')
                 return {'error': 'Failed to load results'}
             
             # Ingest data
             alerts_ingested = self.ingest_alerts(results)
             summary_ingested = self.ingest_analysis_summary(results)
             analytics_ingested = self.ingest_asset_analytics(results)
+            self.ledger.finish(LEDGER_CONSUMER, latest_file)
             
             # Cleanup old data
             self.cleanup_old_data()
@@ -513,6 +543,8 @@ class IngestionSystem:
             
         except Exception as e:
             logger.error(f"Error during ingestion: {e}")
+            if latest_file:
+                self.ledger.finish(LEDGER_CONSUMER, latest_file, run_ledger.STATUS_FAILED, str(e))
             if self.connection:
                 self.close_database()
             return {'error': str(e)}
@@ -525,6 +557,7 @@ def main():
     parser.add_argument('--config', default='config.json', help='Configuration file path')
     parser.add_argument('--results-dir', default='results', help='Results directory path')
     parser.add_argument('--cleanup-days', type=int, default=30, help='Days to keep data')
+    parser.add_argument('--force', action='store_true', help='Ingest the latest file even if it was already ingested')
     
     args = parser.parse_args()
     
@@ -547,10 +580,12 @@ def main():
     
     # Initialize and run ingestion
     ingestion_system = IngestionSystem(db_config, args.results_dir)
-    results = ingestion_system.ingest_latest_results()
+    results = ingestion_system.ingest_latest_results(force=args.force)
     
     if 'error' in results:
         print(f"❌ Ingestion failed: {results['error']}")
+    elif results.get('skipped'):
+        print(f"✅ Already ingested: {results['file_processed']} (use --force to ingest it again)")
     else:
         print(f"✅ Ingestion completed successfully!")
         print(f"📁 File processed: {results['file_processed']}")
@@ -579,6 +614,9 @@ from typing import Dict, List, Optional, Any
 import glob
 from psycopg2.extras import RealDictCursor
 
+import db_pool
+import run_ledger
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -591,6 +629,9 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Consumer name of this system in the run ledger
+LEDGER_CONSUMER = 'postgres'
+
 class IngestionSystem:
     def __init__(self, db_config: Dict, results_dir: str = "results"):
         """
@@ -603,27 +644,30 @@ class IngestionSystem:
         self.db_config = db_config
         self.results_dir = results_dir
         self.connection = None
+        # Result files recorded by the analysis engine, and which ones were ingested
+        self.ledger = run_ledger.RunLedger(results_dir)
         
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = psycopg2.connect(
-                host=self.db_config['host'],
-                port=self.db_config['port'],
-                database=self.db_config['database'],
-                user=self.db_config['user'],
-                password=self.db_config['password']
-            )
+            # Borrowed from the process-wide pool; close_database() hands it back
+            self.connection = db_pool.acquire_postgres(self.pg_config)
             logger.info("Database connection established")
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
+    @property
+    def pg_config(self) -> Dict:
+        """psycopg2 connection parameters (the pool key)"""
+        return {key: self.db_config[key] for key in ('host', 'port', 'database', 'user', 'password')}
+    
     def close_database(self):
-        """Close database connection"""
+        """Return the database connection to the pool"""
         if self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
+            db_pool.release_postgres(self.pg_config, self.connection)
+            self.connection = None
+            logger.info("Database connection released")
     
     def get_latest_results_file(self) -> Optional[str]:
         """
@@ -633,6 +677,13 @@ class IngestionSystem:
             Path to the latest results file, or None if none found
         """
         try:
+            # Recorded by EnhancedLocalEngine.save_results
+            run = self.ledger.latest('enhanced_results')
+            if run and os.path.exists(run['path']):
+                logger.info(f"Found latest results file: {run['path']}")
+                return run['path']
+            
+            # Files written before the ledger existed
             pattern = os.path.join(self.results_dir, "enhanced_analysis_results_*.json")
             files = glob.glob(pattern)
             
@@ -1028,13 +1079,17 @@ class IngestionSystem:
             logger.error(f"Error during cleanup: {e}")
             self.connection.rollback()
     
-    def ingest_latest_results(self) -> Dict:
+    def ingest_latest_results(self, force: bool = False) -> Dict:
         """
         Ingest the latest analysis results
         
+        Args:
+            force: Ingest the file even if it was already ingested
+        
         Returns:
             Dictionary with ingestion results
         """
+        latest_file = None
         try:
             # Connect to database
             self.connect_database()
@@ -1047,15 +1102,25 @@ class IngestionSystem:
             if not latest_file:
                 return {'error': 'No results files found'}
             
+            # Each results file is ingested once
+            if not force and self.ledger.status(LEDGER_CONSUMER, latest_file) == run_ledger.STATUS_DONE:
+                logger.info(f"{latest_file} is already ingested")
+                self.close_database()
+                return {'success': True, 'skipped': True, 'file_processed': latest_file,
+                        'timestamp': datetime.now().isoformat()}
+            self.ledger.claim(LEDGER_CONSUMER, latest_file, force=True)
+            
             # Load results
             results = self.load_results(latest_file)
             if not results:
+                self.ledger.finish(LEDGER_CONSUMER, latest_file, run_ledger.STATUS_FAILED, 'Failed to load results')
                 return {'error': 'Failed to load results'}
             
             # Ingest data
             alerts_ingested = self.ingest_alerts(results)
             summary_ingested = self.ingest_analysis_summary(results)
             analytics_ingested = self.ingest_asset_analytics(results)
+            self.ledger.finish(LEDGER_CONSUMER, latest_file)
             
             # Cleanup old data
             self.cleanup_old_data()
@@ -1074,6 +1139,8 @@ class IngestionSystem:
             
         except Exception as e:
             logger.error(f"Error during ingestion: {e}")
+            if latest_file:
+                self.ledger.finish(LEDGER_CONSUMER, latest_file, run_ledger.STATUS_FAILED, str(e))
             if self.connection:
                 self.close_database()
             return {'error': str(e)}
@@ -1086,6 +1153,7 @@ def main():
     parser.add_argument('--config', default='config.json', help='Configuration file path')
     parser.add_argument('--results-dir', default='results', help='Results directory path')
     parser.add_argument('--cleanup-days', type=int, default=30, help='Days to keep data')
+    parser.add_argument('--force', action='store_true', help='Ingest the latest file even if it was already ingested')
     
     args = parser.parse_args()
     
@@ -1108,10 +1176,12 @@ def main():
     
     # Initialize and run ingestion
     ingestion_system = IngestionSystem(db_config, args.results_dir)
-    results = ingestion_system.ingest_latest_results()
+    results = ingestion_system.ingest_latest_results(force=args.force)
     
     if 'error' in results:
         print(f"❌ Ingestion failed: {results['error']}")
+    elif results.get('skipped'):
+        print(f"✅ Already ingested: {results['file_processed']} (use --force to ingest it again)")
     else:
         print(f"✅ Ingestion completed successfully!")
         print(f"📁 File processed: {results['file_processed']}")
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Run Instrumentation
+
+Lightweight stage timing for engine runs and Celery tasks.
+
+- RunMetrics.span: context manager that times one pipeline stage
+  (fetch, store, preprocess, optimize, backtest, export, ...)
+- RunMetrics.symbol_scope: attributes spans opened inside it to a symbol
+- RunMetrics.summary: per-stage p50/p95/max, per-symbol breakdowns and
+  counters (e.g. Optuna trials), for run manifests
+- RunMetrics.to_prometheus: the same stage histograms in Prometheus text
+  exposition format (per-symbol data is kept out to bound label cardinality)
+- SymbolLogSampler: logging filter that drops per-symbol INFO records while
+  a symbol scope is active, keeping every Nth symbol if sampling is enabled
+
+A span costs two perf_counter calls and a list append, so it is safe inside
+Optuna objectives.
+"""
+
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, List, Optional
+
+import numpy as np
+
+
+class RunMetrics:
+    """Collects stage timings and counters for one run or worker process."""
+
+    def __init__(self, name: str = 'engine'):
+        self.name = name
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._samples: Dict[str, List[float]] = {}
+            self._symbols: Dict[str, Dict[str, float]] = {}
+            self._counters: Dict[str, int] = {}
+            self._symbol_counters: Dict[str, Dict[str, int]] = {}
+            self.symbols_seen = 0
+            self.started_at = time.time()
+
+    @property
+    def active_symbol(self) -> Optional[str]:
+        return getattr(self._local, 'symbol', None)
+
+    @property
+    def active_symbol_index(self) -> int:
+        return getattr(self._local, 'symbol_index', 0)
+
+    @contextmanager
+    def symbol_scope(self, symbol: str):
+        """Attribute spans and counters opened inside this block to symbol."""
+        previous = (self.active_symbol, self.active_symbol_index)
+        with self._lock:
+            index = self.symbols_seen
+            self.symbols_seen += 1
+        self._local.symbol = symbol
+        self._local.symbol_index = index
+        try:
+            yield
+        finally:
+            self._local.symbol, self._local.symbol_index = previous
+
+    def iter_symbols(self, symbols):
+        """Yield symbols, each inside its own symbol_scope (works with continue)."""
+        for symbol in symbols:
+            with self.symbol_scope(symbol):
+                yield symbol
+
+    @contextmanager
+    def span(self, stage: str, symbol: Optional[str] = None):
+        """Time a pipeline stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start, symbol)
+
+    def record(self, stage: str, seconds: float, symbol: Optional[str] = None):
+        symbol = symbol or self.active_symbol
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+            if symbol:
+                stages = self._symbols.setdefault(symbol, {})
+                stages[stage] = stages.get(stage, 0.0) + seconds
+
+    def incr(self, counter: str, value: int = 1, symbol: Optional[str] = None):
+        symbol = symbol or self.active_symbol
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+            if symbol:
+                counters = self._symbol_counters.setdefault(symbol, {})
+                counters[counter] = counters.get(counter, 0) + value
+
+    def stage_stats(self) -> Dict[str, Dict[str, float]]:
+        """count/total/p50/p95/max per stage, in seconds."""
+        with self._lock:
+            samples = {stage: np.asarray(values) for stage, values in self._samples.items()}
+        stats = {}
+        for stage, values in samples.items():
+            p50, p95 = np.percentile(values, [50, 95])
+            stats[stage] = {
+                'count': int(values.size),
+                'total_s': round(float(values.sum()), 6),
+                'p50_s': round(float(p50), 6),
+                'p95_s': round(float(p95), 6),
+                'max_s': round(float(values.max()), 6),
+            }
+        return stats
+
+    def summary(self, include_symbols: bool = True) -> Dict[str, Any]:
+        """Aggregated view for run manifests."""
+        result = {
+            'name': self.name,
+            'wall_time_s': round(time.time() - self.started_at, 3),
+            'stages': self.stage_stats(),
+            'counters': dict(self._counters),
+            'symbols_seen': self.symbols_seen,
+        }
+        if include_symbols:
+            with self._lock:
+                result['symbols'] = {
+                    symbol: {
+                        'stages_s': {stage: round(seconds, 6) for stage, seconds in stages.items()},
+                        'counters': dict(self._symbol_counters.get(symbol, {})),
+                    }
+                    for symbol, stages in self._symbols.items()
+                }
+        return result
+
+    def to_prometheus(self, prefix: str = 'autonama_engine', labels: Optional[Dict[str, str]] = None) -> str:
+        """Stage histograms and counters in Prometheus text exposition format."""
+        extra = ''.join(f',{key}="{value}"' for key, value in (labels or {}).items())
+        lines = [
+            f"# HELP {prefix}_stage_seconds Time spent per pipeline stage",
+            f"# TYPE {prefix}_stage_seconds summary",
+        ]
+        stats = self.stage_stats()
+        for stage, s in stats.items():
+            lines.append(f'{prefix}_stage_seconds{{stage="{stage}"{extra},quantile="0.5"}} {s["p50_s"]}')
+            lines.append(f'{prefix}_stage_seconds{{stage="{stage}"{extra},quantile="0.95"}} {s["p95_s"]}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"{extra}}} {s["total_s"]}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"{extra}}} {s["count"]}')
+        lines.append(f"# HELP {prefix}_stage_seconds_max Slowest observation per pipeline stage")
+        lines.append(f"# TYPE {prefix}_stage_seconds_max gauge")
+        for stage, s in stats.items():
+            lines.append(f'{prefix}_stage_seconds_max{{stage="{stage}"{extra}}} {s["max_s"]}')
+        lines.append(f"# HELP {prefix}_events_total Run event counters")
+        lines.append(f"# TYPE {prefix}_events_total counter")
+        for counter, value in sorted(self._counters.items()):
+            lines.append(f'{prefix}_events_total{{event="{counter}"{extra}}} {value}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str, prefix: str = 'autonama_engine',
+                         labels: Optional[Dict[str, str]] = None) -> str:
+        """Write the exposition atomically (node_exporter textfile collector friendly)."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(self.to_prometheus(prefix, labels))
+        os.replace(tmp_path, path)
+        return path
+
+
+class SymbolLogSampler(logging.Filter):
+    """
+    Drop INFO and below while a symbol scope is active.
+
+    sample_every=0 silences all per-symbol records; sample_every=N keeps the
+    records of every Nth symbol. Warnings, errors and records logged outside
+    a symbol scope always pass.
+    """
+
+    def __init__(self, metrics: RunMetrics, sample_every: int = 0):
+        super().__init__()
+        self.metrics = metrics
+        self.sample_every = sample_every
+        self.dropped = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or self.metrics.active_symbol is None:
+            return True
+        if self.sample_every and self.metrics.active_symbol_index % self.sample_every == 0:
+            return True
+        self.dropped += 1
+        return False
+
+
+@contextmanager
+def sampled_logging(metrics: RunMetrics, sample_every: Optional[int], *loggers: logging.Logger):
+    """Attach a SymbolLogSampler to loggers for the duration of a run (None disables)."""
+    if sample_every is None:
+        yield None
+        return
+    sampler = SymbolLogSampler(metrics, sample_every)
+    for log in loggers:
+        log.addFilter(sampler)
+    try:
+        yield sampler
+    finally:
+        for log in loggers:
+            log.removeFilter(sampler)
+        metrics.incr('log_records_dropped', sampler.dropped)
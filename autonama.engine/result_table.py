@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Result Table
+
+Columnar container for engine result sets (one row per symbol and interval).
+
+The rows live in a single DataFrame with categorical signal / risk_level /
+interval columns, so summaries, groupings and rankings are vectorised passes
+over the columns instead of repeated list comprehensions over dicts, and
+exports go straight from the columns to CSV/JSON without a per-value
+conversion walk.
+
+ResultTable is also a read-only sequence of row dicts (len, indexing,
+iteration), so code written against the previous List[Dict] results keeps
+working unchanged: integer fields stay ints, and a key missing from some
+results comes back as None (not NaN), so `r.get(k, 0) or 0` still gives 0.
+"""
+
+import json
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+SIGNALS = ('BUY', 'SELL', 'HOLD')
+RISK_LEVELS = ('LOW', 'MEDIUM', 'HIGH', 'UNKNOWN')
+
+CATEGORIES = {
+    'signal': SIGNALS,
+    'risk_level': RISK_LEVELS,
+}
+
+# Columns holding only a handful of distinct strings
+CATEGORICAL_COLUMNS = ('interval',)
+
+
+def json_default(obj: Any) -> Any:
+    """json.dump default= hook for NumPy / pandas values (only called for non-JSON types)."""
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).isoformat()
+    if hasattr(obj, 'item'):
+        return obj.item()
+    return str(obj)
+
+
+class ResultTable(Sequence):
+    """Engine results as one typed DataFrame."""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.frame = frame
+        self._records: Optional[List[Dict]] = None
+
+    @classmethod
+    def from_records(cls, records: Iterable[Dict[str, Any]]) -> 'ResultTable':
+        records = list(records)
+        frame = pd.DataFrame.from_records(records)
+        for column in frame.columns:
+            # Integer fields missing from some records were widened to float; keep them integers
+            values = frame[column]
+            if values.dtype == np.float64 and values.hasnans:
+                first = values.first_valid_index()
+                value = records[first].get(column) if first is not None else None
+                is_int = isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_))
+                if is_int and (values.dropna() % 1 == 0).all():
+                    frame[column] = values.astype('Int64')
+        for column, categories in CATEGORIES.items():
+            if column in frame.columns:
+                # Unexpected labels are kept as extra categories rather than dropped to NaN
+                extra = sorted(set(frame[column].dropna().astype(str)) - set(categories))
+                frame[column] = pd.Categorical(frame[column], categories=list(categories) + extra)
+        for column in CATEGORICAL_COLUMNS:
+            if column in frame.columns:
+                frame[column] = frame[column].astype('category')
+        return cls(frame)
+
+    @classmethod
+    def coerce(cls, results: Union['ResultTable', Iterable[Dict[str, Any]]]) -> 'ResultTable':
+        return results if isinstance(results, cls) else cls.from_records(results or [])
+
+    # Sequence of row dicts
+
+    def records(self) -> List[Dict[str, Any]]:
+        """Rows as dicts of native Python values (built once, then cached)."""
+        if self._records is None:
+            self._records = self.rows(range(len(self.frame)))
+        return self._records
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ResultTable(self.frame.iloc[index].reset_index(drop=True))
+        return self.records()[index]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return iter(self.records())
+
+    def __repr__(self) -> str:
+        return f"ResultTable({len(self)} rows, columns={list(self.frame.columns)})"
+
+    # Vectorised aggregates
+
+    def counts(self, column: str) -> Dict[str, int]:
+        """Occurrences of every category of a categorical column (zeros included)."""
+        if column not in self.frame.columns:
+            return {category: 0 for category in CATEGORIES.get(column, ())}
+        values = self.frame[column]
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            return {str(k): int(v) for k, v in values.value_counts().items()}
+        codes = values.cat.codes.to_numpy()
+        counts = np.bincount(codes[codes >= 0], minlength=len(values.cat.categories))
+        return {str(category): int(n) for category, n in zip(values.cat.categories, counts)}
+
+    def mean(self, column: str, missing_as_zero: bool = False) -> float:
+        if column not in self.frame.columns or self.frame.empty:
+            return 0.0
+        values = pd.to_numeric(self.frame[column], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        if missing_as_zero:
+            return float(np.nan_to_num(values, nan=0.0).mean())
+        return float(np.nanmean(values)) if np.isfinite(values).any() else 0.0
+
+    def positions(self, column: str, value: Any) -> np.ndarray:
+        """Row positions where column == value."""
+        if column not in self.frame.columns:
+            return np.empty(0, dtype=np.intp)
+        return np.flatnonzero((self.frame[column] == value).to_numpy())
+
+    def top_positions(self, n: int, by: str = 'potential_return', where: Optional[Dict[str, Any]] = None,
+                      ascending: bool = False) -> np.ndarray:
+        """Positions of the n best rows by a column (missing values ranked as 0), optionally filtered."""
+        if by not in self.frame.columns or self.frame.empty:
+            return np.empty(0, dtype=np.intp)
+        mask = np.ones(len(self.frame), dtype=bool)
+        for column, value in (where or {}).items():
+            mask &= (self.frame[column] == value).to_numpy()
+        candidates = np.flatnonzero(mask)
+        numeric = pd.to_numeric(self.frame[by], errors='coerce').to_numpy(dtype=np.float64, na_value=np.nan)
+        keys = np.nan_to_num(numeric[candidates])
+        # Stable, so ties keep their original order like sorted(..., reverse=True)
+        order = np.argsort(keys if ascending else -keys, kind='stable')
+        return candidates[order[:n]]
+
+    def top(self, n: int, by: str = 'potential_return', where: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        return self.rows(self.top_positions(n, by, where))
+
+    def rows(self, positions: Sequence[int]) -> List[Dict[str, Any]]:
+        """Row dicts at the given positions, without materialising the other rows."""
+        if self._records is not None:
+            return [self._records[i] for i in positions]
+        positions = np.asarray(positions, dtype=np.intp)
+        columns = list(self.frame.columns)
+        # Series.tolist() unboxes to native Python values (categories to their labels)
+        values = [self._column_values(c, positions) for c in columns]
+        return [dict(zip(columns, row)) for row in zip(*values)]
+
+    def _column_values(self, column: str, positions: np.ndarray) -> List[Any]:
+        """Native values of a column at positions, with missing values (NaN / NA) as None."""
+        values = self.frame[column].take(positions)
+        if not values.hasnans:
+            return values.tolist()
+        return values.astype(object).where(values.notna(), None).tolist()
+
+    def group_summary(self, by: str, columns: Sequence[str] = ('potential_return', 'total_return')) -> pd.DataFrame:
+        """Count and mean of numeric columns per group (e.g. per interval or signal)."""
+        present = [c for c in columns if c in self.frame.columns]
+        grouped = self.frame.groupby(by, observed=True)
+        summary = grouped[present].mean()
+        summary.insert(0, 'count', grouped.size())
+        return summary
+
+    def summary(self, top_n: int = 5) -> Dict[str, Any]:
+        """Signal counts, average returns and top BUY/SELL rows."""
+        if self.frame.empty:
+            return {}
+        signals = self.counts('signal')
+        return {
+            'total_assets': len(self.frame),
+            'buy_signals': signals.get('BUY', 0),
+            'sell_signals': signals.get('SELL', 0),
+            'hold_signals': signals.get('HOLD', 0),
+            'avg_potential_return': self.mean('potential_return', missing_as_zero=True),
+            'avg_total_return': self.mean('total_return'),
+            'top_buy_signals': self.top(top_n, where={'signal': 'BUY'}),
+            'top_sell_signals': self.top(top_n, where={'signal': 'SELL'}),
+        }
+
+    # Export
+
+    def to_csv(self, path: str, columns: Optional[Sequence[str]] = None):
+        frame = self.frame if columns is None else self.frame[[c for c in columns if c in self.frame.columns]]
+        frame.to_csv(path, index=False)
+
+    def to_json(self, path: str, columns: Optional[Sequence[str]] = None, indent: int = 2):
+        """Rows as a JSON array, written column-wise by pandas (NaN becomes null)."""
+        frame = self.frame if columns is None else self.frame[[c for c in columns if c in self.frame.columns]]
+        frame.to_json(path, orient='records', indent=indent, double_precision=15,
+                      date_format='iso', default_handler=json_default)
+
+
+def dump_json(obj: Any, path: str, indent: int = 2):
+    """json.dump for nested result structures holding NumPy values, without a conversion walk."""
+    with open(path, 'w') as f:
+        json.dump(obj, f, indent=indent, default=json_default)
@@ -7,6 +7,8 @@ that can be ingested by the Docker system for alerts, analytics, and plots.
 
 Usage:
     python run_complete_optimization.py
+    python run_complete_optimization.py --incremental   # only assets with new candles
+    AUTONAMA_TIMEFRAMES=config python run_complete_optimization.py   # 1d + 15m from one fetch
 
 The script will:
 1. Run optimization on all 100 top assets
@@ -19,14 +21,19 @@ import os
 import sys
 import json
 import logging
+import argparse
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import pandas as pd
 
 # Add the current directory to Python path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from crypto_engine import CryptoEngine
+import export_bundle
+import timeframes
+import run_ledger
+from instrumentation import sampled_logging
 
 # Set up logging
 logging.basicConfig(
@@ -41,15 +48,25 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class CompleteOptimizationRunner:
-    def __init__(self, config_file: str = "config.json"):
+    def __init__(self, config_file: str = "config.json", log_sample_every: Optional[int] = None):
         """
         Initialize the complete optimization runner
         
         Args:
             config_file: Path to configuration file
+            log_sample_every: Silence per-symbol INFO logs during the run, keeping
+                every Nth symbol (0 = silence all, None = log everything).
+                Defaults to AUTONAMA_LOG_SAMPLE_EVERY when set.
         """
         self.config_file = config_file
         self.engine = None
+        if log_sample_every is None and os.getenv('AUTONAMA_LOG_SAMPLE_EVERY'):
+            log_sample_every = int(os.getenv('AUTONAMA_LOG_SAMPLE_EVERY'))
+        self.log_sample_every = log_sample_every
+        self.metrics_file = None
+        self.bundle = None
+        # Incremental report of the last run (None for full runs)
+        self.incremental = None
         self.base_results_dir = "export_results"
         
         # Create base results directory if it doesn't exist
@@ -60,24 +77,11 @@ class CompleteOptimizationRunner:
         self.results_dir = os.path.join(self.base_results_dir, f"optimization_run_{self.timestamp}")
         os.makedirs(self.results_dir, exist_ok=True)
         
-        # Create subdirectories for different data types
-        self.alerts_dir = os.path.join(self.results_dir, "alerts")
-        self.analytics_dir = os.path.join(self.results_dir, "analytics")
-        self.plots_dir = os.path.join(self.results_dir, "plots")
-        self.summary_dir = os.path.join(self.results_dir, "summary")
+        # Raw engine exports; the results bundle lives in the run folder itself
         self.raw_data_dir = os.path.join(self.results_dir, "raw_data")
-        
-        os.makedirs(self.alerts_dir, exist_ok=True)
-        os.makedirs(self.analytics_dir, exist_ok=True)
-        os.makedirs(self.plots_dir, exist_ok=True)
-        os.makedirs(self.summary_dir, exist_ok=True)
         os.makedirs(self.raw_data_dir, exist_ok=True)
         
         logger.info(f"Created comprehensive results directory: {self.results_dir}")
-        logger.info(f"  - Alerts: {self.alerts_dir}")
-        logger.info(f"  - Analytics: {self.analytics_dir}")
-        logger.info(f"  - Plots: {self.plots_dir}")
-        logger.info(f"  - Summary: {self.summary_dir}")
         logger.info(f"  - Raw Data: {self.raw_data_dir}")
         
     def initialize_engine(self):
@@ -90,13 +94,16 @@ class CompleteOptimizationRunner:
             logger.error(f"Failed to initialize Crypto Engine: {e}")
             raise
     
-    def run_optimization_all_assets(self, interval: str = '1d', days: int = 720) -> Dict:
+    def run_optimization_all_assets(self, interval: str = '1d', days: int = 720,
+                                    intervals: Optional[List[str]] = None, incremental: bool = False) -> Dict:
         """
         Run optimization on all 100 assets
         
         Args:
             interval: Time interval for analysis
             days: Number of days of historical data
+            intervals: Analyze all of these in one multi-timeframe pass instead
+            incremental: Reuse stored results of assets whose input is unchanged
             
         Returns:
             Dictionary containing analysis results and metadata
@@ -105,7 +112,7 @@ class CompleteOptimizationRunner:
             logger.info("="*80)
             logger.info("STARTING COMPLETE OPTIMIZATION FOR ALL 100 ASSETS")
             logger.info("="*80)
-            logger.info(f"Interval: {interval}")
+            logger.info(f"Interval: {', '.join(intervals) if intervals else interval}")
             logger.info(f"Days: {days}")
             logger.info(f"Optimization: ENABLED for all assets")
             
@@ -121,7 +128,9 @@ class CompleteOptimizationRunner:
                 interval=interval,
                 days=days,
                 optimize_all_assets=True,  # This ensures optimization runs for ALL assets
-                output_format='both'  # Export both CSV and JSON
+                output_format='both',  # Export both CSV and JSON
+                intervals=intervals,
+                incremental=incremental
             )
             
             end_time = datetime.now()
@@ -132,6 +141,11 @@ class CompleteOptimizationRunner:
             logger.info("="*80)
             logger.info(f"Total duration: {duration}")
             logger.info(f"Assets analyzed: {len(analysis_result['results'])}")
+            if analysis_result.get('incremental'):
+                report = analysis_result['incremental']
+                logger.info(f"Assets skipped (unchanged input): {report['assets_skipped']}, "
+                            f"recomputed: {report['assets_recomputed']}, "
+                            f"time saved: ~{report['seconds_saved']:.0f}s")
             logger.info(f"CSV file: {analysis_result['csv_filepath']}")
             logger.info(f"JSON file: {analysis_result['json_filepath']}")
             
@@ -143,7 +157,7 @@ class CompleteOptimizationRunner:
     
     def create_docker_ingestion_files(self, analysis_result: Dict) -> Dict:
         """
-        Create files specifically formatted for Docker ingestion
+        Write the results bundle for Docker ingestion
         
         Args:
             analysis_result: Results from the optimization analysis
@@ -154,23 +168,16 @@ class CompleteOptimizationRunner:
         try:
             logger.info("Creating Docker ingestion files...")
             
-            # 1. Create alerts file (for real-time alerts)
-            alerts_file = self.create_alerts_file(analysis_result['results'], self.timestamp)
-            
-            # 2. Create analytics file (for detailed analytics)
-            analytics_file = self.create_analytics_file(analysis_result, self.timestamp)
-            
-            # 3. Create summary file (for dashboard overview)
-            summary_file = self.create_summary_file(analysis_result, self.timestamp)
-            
-            # 4. Create plots data file (for chart generation)
-            plots_file = self.create_plots_data_file(analysis_result['results'], self.timestamp)
+            # One zstd Parquet table with the summary aggregates in its footer
+            self.bundle = export_bundle.write_bundle(
+                analysis_result['results'], self.results_dir, self.timestamp,
+                metadata={'optimization_enabled': True, 'duration': analysis_result.get('duration')}
+            )
+            logger.info(f"Wrote {self.bundle['rows']} results to {self.bundle['file']} "
+                        f"({self.bundle['bytes']:,} bytes)")
             
             ingestion_files = {
-                'alerts_file': alerts_file,
-                'analytics_file': analytics_file,
-                'summary_file': summary_file,
-                'plots_file': plots_file,
+                'results_file': self.bundle['path'],
                 'original_csv': analysis_result['csv_filepath'],
                 'original_json': analysis_result['json_filepath'],
                 'timestamp': self.timestamp
@@ -187,264 +194,85 @@ class CompleteOptimizationRunner:
             logger.error(f"Error creating Docker ingestion files: {e}")
             raise
     
-    def create_alerts_file(self, results: List[Dict], timestamp: str) -> str:
-        """Create alerts file for real-time alerting system"""
-        try:
-            alerts_data = []
-            
-            for result in results:
-                # Include ALL assets with their signals (BUY, SELL, HOLD)
-                alert = {
-                    'symbol': result['symbol'],
-                    'signal': result.get('signal', 'HOLD'),
-                    'current_price': result.get('current_price', 0),
-                    'potential_return': result.get('potential_return', 0),
-                    'signal_strength': result.get('signal_strength', 0),
-                    'risk_level': result.get('risk_level', 'MEDIUM'),
-                    'timestamp': datetime.now().isoformat(),
-                    'interval': result.get('interval', '1d'),
-                    'optimized_degree': result.get('optimized_degree'),
-                    'optimized_kstd': result.get('optimized_kstd'),
-                    'optimized_lookback': result.get('optimized_lookback'),
-                    'total_return': result.get('total_return', 0),
-                    'sharpe_ratio': result.get('sharpe_ratio', 0),
-                    'max_drawdown': result.get('max_drawdown', 0),
-                    'data_points': result.get('data_points', 0),
-                    'total_available': result.get('total_available', 0)
-                }
-                alerts_data.append(alert)
-            
-            filename = f"alerts_{timestamp}.json"
-            filepath = os.path.join(self.alerts_dir, filename)
-            
-            with open(filepath, 'w') as f:
-                json.dump(alerts_data, f, indent=2)
-            
-            logger.info(f"Created alerts file with {len(alerts_data)} alerts: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            logger.error(f"Error creating alerts file: {e}")
-            raise
-    
-    def create_analytics_file(self, analysis_result: Dict, timestamp: str) -> str:
-        """Create detailed analytics file for comprehensive analysis"""
-        try:
-            # Ensure all results have consistent fields
-            processed_results = []
-            for result in analysis_result['results']:
-                processed_result = {
-                    'symbol': result['symbol'],
-                    'signal': result.get('signal', 'HOLD'),
-                    'current_price': result.get('current_price', 0),
-                    'potential_return': result.get('potential_return', 0),
-                    'total_return': result.get('total_return', 0),
-                    'signal_strength': result.get('signal_strength', 0),
-                    'risk_level': result.get('risk_level', 'MEDIUM'),
-                    'sharpe_ratio': result.get('sharpe_ratio', 0),
-                    'max_drawdown': result.get('max_drawdown', 0),
-                    'optimized_degree': result.get('optimized_degree'),
-                    'optimized_kstd': result.get('optimized_kstd'),
-                    'optimized_lookback': result.get('optimized_lookback'),
-                    'degree': result.get('degree'),
-                    'kstd': result.get('kstd'),
-                    'lookback': result.get('lookback'),
-                    'interval': result.get('interval', '1d'),
-                    'data_points': result.get('data_points', 0),
-                    'total_available': result.get('total_available', 0),
-                    'analysis_date': result.get('analysis_date', datetime.now().isoformat())
-                }
-                processed_results.append(processed_result)
-            
-            analytics_data = {
-                'metadata': {
-                    'analysis_date': datetime.now().isoformat(),
-                    'total_assets': len(processed_results),
-                    'optimization_enabled': True,
-                    'interval': processed_results[0].get('interval', '1d') if processed_results else '1d'
-                },
-                'summary': analysis_result['summary'],
-                'individual_analyses': processed_results,
-                'optimization_results': []
-            }
-            
-            # Extract optimization results
-            for result in processed_results:
-                if result.get('optimized_degree') is not None:
-                    opt_result = {
-                        'symbol': result['symbol'],
-                        'optimized_degree': result.get('optimized_degree'),
-                        'optimized_kstd': result.get('optimized_kstd'),
-                        'optimized_lookback': result.get('optimized_lookback'),
-                        'original_degree': result.get('degree'),
-                        'original_kstd': result.get('kstd'),
-                        'optimization_improvement': result.get('optimization_improvement', 0)
-                    }
-                    analytics_data['optimization_results'].append(opt_result)
-            
-            filename = f"analytics_{timestamp}.json"
-            filepath = os.path.join(self.analytics_dir, filename)
-            
-            with open(filepath, 'w') as f:
-                json.dump(analytics_data, f, indent=2, default=str)
-            
-            logger.info(f"Created analytics file: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            logger.error(f"Error creating analytics file: {e}")
-            raise
-    
-    def create_summary_file(self, analysis_result: Dict, timestamp: str) -> str:
-        """Create summary file for dashboard overview"""
-        try:
-            summary_data = {
-                'timestamp': datetime.now().isoformat(),
-                'total_assets_analyzed': len(analysis_result['results']),
-                'optimization_enabled': True,
-                'analysis_summary': analysis_result['summary'],
-                'top_performers': {
-                    'buy_signals': sorted(
-                        [r for r in analysis_result['results'] if r.get('signal') == 'BUY'],
-                        key=lambda x: x.get('potential_return', 0) or 0,
-                        reverse=True
-                    )[:10],
-                    'sell_signals': sorted(
-                        [r for r in analysis_result['results'] if r.get('signal') == 'SELL'],
-                        key=lambda x: x.get('potential_return', 0) or 0,
-                        reverse=True
-                    )[:10]
-                },
-                'optimization_stats': {
-                    'assets_optimized': len([r for r in analysis_result['results'] if r.get('optimized_degree') is not None]),
-                    'avg_optimization_improvement': sum([r.get('optimization_improvement', 0) for r in analysis_result['results']]) / len(analysis_result['results'])
-                }
-            }
-            
-            filename = f"summary_{timestamp}.json"
-            filepath = os.path.join(self.summary_dir, filename)
-            
-            with open(filepath, 'w') as f:
-                json.dump(summary_data, f, indent=2, default=str)
-            
-            logger.info(f"Created summary file: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            logger.error(f"Error creating summary file: {e}")
-            raise
-    
-    def create_plots_data_file(self, results: List[Dict], timestamp: str) -> str:
-        """Create data file for generating charts and plots"""
-        try:
-            plots_data = {
-                'timestamp': datetime.now().isoformat(),
-                'potential_returns': [
-                    {
-                        'symbol': r['symbol'],
-                        'signal': r.get('signal', 'HOLD'),
-                        'current_price': r.get('current_price', 0),
-                        'potential_return': r.get('potential_return', 0),
-                        'total_return': r.get('total_return', 0),
-                        'sharpe_ratio': r.get('sharpe_ratio', 0),
-                        'max_drawdown': r.get('max_drawdown', 0),
-                        'optimized_degree': r.get('optimized_degree'),
-                        'optimized_kstd': r.get('optimized_kstd'),
-                        'optimized_lookback': r.get('optimized_lookback'),
-                        'interval': r.get('interval', '1d'),
-                        'data_points': r.get('data_points', 0),
-                        'total_available': r.get('total_available', 0)
-                    }
-                    for r in results
-                ],
-                'signal_distribution': {
-                    'labels': ['BUY', 'SELL', 'HOLD'],
-                    'values': [
-                        len([r for r in results if r.get('signal') == 'BUY']),
-                        len([r for r in results if r.get('signal') == 'SELL']),
-                        len([r for r in results if r.get('signal') == 'HOLD'])
-                    ]
-                },
-                'optimization_comparison': [
-                    {
-                        'symbol': r['symbol'],
-                        'original_degree': r.get('degree'),
-                        'optimized_degree': r.get('optimized_degree'),
-                        'original_kstd': r.get('kstd'),
-                        'optimized_kstd': r.get('optimized_kstd'),
-                        'improvement': r.get('optimization_improvement', 0)
-                    }
-                    for r in results if r.get('optimized_degree') is not None
-                ]
-            }
-            
-            filename = f"plots_data_{timestamp}.json"
-            filepath = os.path.join(self.plots_dir, filename)
-            
-            with open(filepath, 'w') as f:
-                json.dump(plots_data, f, indent=2, default=str)
-            
-            logger.info(f"Created plots data file: {filepath}")
-            return filepath
-            
-        except Exception as e:
-            logger.error(f"Error creating plots data file: {e}")
-            raise
-    
     def create_ingestion_manifest(self, ingestion_files: Dict) -> str:
         """Create a manifest file listing all files for ingestion"""
         try:
+            bundle = {key: value for key, value in self.bundle.items() if key != 'path'}
             manifest = {
                 'ingestion_timestamp': datetime.now().isoformat(),
                 'files': ingestion_files,
+                'bundle': bundle,
+                'checksums': {
+                    os.path.basename(path): export_bundle.file_sha256(path)
+                    for key, path in ingestion_files.items()
+                    if key != 'timestamp' and path and os.path.exists(path)
+                },
                 'instructions': {
-                    'alerts_file': 'Use for real-time alerting system',
-                    'analytics_file': 'Use for detailed analytics and reporting',
-                    'summary_file': 'Use for dashboard overview and summaries',
-                    'plots_file': 'Use for generating charts and visualizations',
-                    'original_csv': 'Original CSV export from VectorBT analysis',
-                    'original_json': 'Original JSON export from VectorBT analysis'
+                    'results_file': 'Columnar results (Parquet, zstd); summary aggregates in the file footer',
+                    'original_csv': 'Original CSV export from the engine',
+                    'original_json': 'Original JSON export from the engine'
                 },
-                'total_assets_analyzed': len(self.engine.get_top_100_assets()),
-                'optimization_enabled': True
+                'total_assets_analyzed': bundle['rows'],
+                'optimization_enabled': True,
+                'incremental': self.incremental,
+                'instrumentation': self.engine.metrics.summary(),
+                'metrics_file': self.metrics_file
             }
             
             manifest_file = os.path.join(self.results_dir, f"manifest_{self.timestamp}.json")
             
             with open(manifest_file, 'w') as f:
-                json.dump(manifest, f, indent=2)
+                json.dump(manifest, f, indent=2, default=str)
             
             logger.info(f"Created ingestion manifest: {manifest_file}")
+            
+            # Run completed: record it for ingest_to_docker and notify the data service
+            run_ledger.publish_run('optimization_run', manifest_file, self.base_results_dir)
             return manifest_file
             
         except Exception as e:
             logger.error(f"Error creating ingestion manifest: {e}")
             raise
     
-    def run_complete_pipeline(self, interval: str = '1d', days: int = 720) -> Dict:
+    def run_complete_pipeline(self, interval: str = '1d', days: int = 720,
+                              intervals: Optional[List[str]] = None, incremental: bool = False) -> Dict:
         """
         Run the complete optimization and export pipeline
         
         Args:
             interval: Time interval for analysis
             days: Number of days of historical data
+            intervals: Several intervals analyzed from one fetch per symbol
+                (overrides interval)
+            incremental: Only re-analyze assets with a new candle or changed parameters
             
         Returns:
             Dictionary with all results and file paths
         """
+        logger.info("Starting complete optimization pipeline...")
+        
+        # Step 1: Initialize engine
+        self.initialize_engine()
+        self.engine.metrics.reset()
+        
+        with sampled_logging(self.engine.metrics, self.log_sample_every, logging.getLogger('crypto_engine')):
+            return self._run_pipeline_stages(interval, days, intervals, incremental)
+    
+    def _run_pipeline_stages(self, interval: str, days: int, intervals: Optional[List[str]] = None,
+                             incremental: bool = False) -> Dict:
+        """Pipeline steps 1-7, each timed as a run-level stage"""
+        metrics = self.engine.metrics
+        # Multi-timeframe runs only store and update the finest interval
+        fetch_interval = timeframes.finest_interval(intervals) if intervals else interval
         try:
-            logger.info("Starting complete optimization pipeline...")
-            
-            # Step 1: Initialize engine
-            self.initialize_engine()
-            
             # Step 2: Check data status and update efficiently
             logger.info("="*80)
             logger.info("STEP 1: CHECKING DATA STATUS")
             logger.info("="*80)
             
             # Get current data status
-            data_status = self.engine.get_data_status(interval=interval)
+            with metrics.span('run.data_status'):
+                data_status = self.engine.get_data_status(interval=fetch_interval)
             logger.info(f"Data Status Summary:")
             logger.info(f"  Total symbols: {data_status.get('total_symbols', 0)}")
             logger.info(f"  Symbols with data: {data_status.get('symbols_with_data', 0)}")
@@ -456,7 +284,8 @@ class CompleteOptimizationRunner:
             logger.info("="*80)
             logger.info("STEP 2: UPDATING DATA EFFICIENTLY")
             logger.info("="*80)
-            update_success = self.engine.update_all_data(interval=interval, days=days)
+            with metrics.span('run.data_update'):
+                update_success = self.engine.update_all_data(interval=fetch_interval, days=days)
             if update_success:
                 logger.info("SUCCESS: Data update completed successfully")
             else:
@@ -466,7 +295,9 @@ class CompleteOptimizationRunner:
             logger.info("="*80)
             logger.info("STEP 3: RUNNING OPTIMIZATION ON ALL ASSETS")
             logger.info("="*80)
-            analysis_result = self.run_optimization_all_assets(interval, days)
+            with metrics.span('run.optimization'):
+                analysis_result = self.run_optimization_all_assets(interval, days, intervals, incremental)
+            self.incremental = analysis_result.get('incremental')
             
             # Step 4: Save raw optimization results
             logger.info("="*80)
@@ -492,13 +323,17 @@ class CompleteOptimizationRunner:
             logger.info("="*80)
             logger.info("STEP 5: CREATING DOCKER INGESTION FILES")
             logger.info("="*80)
-            ingestion_files = self.create_docker_ingestion_files(analysis_result)
+            with metrics.span('run.ingestion_files'):
+                ingestion_files = self.create_docker_ingestion_files(analysis_result)
             
             # Step 6: Create ingestion manifest
             logger.info("="*80)
             logger.info("STEP 6: CREATING INGESTION MANIFEST")
             logger.info("="*80)
+            self.metrics_file = os.path.join(self.results_dir, f"metrics_{self.timestamp}.prom")
+            metrics.write_prometheus(self.metrics_file)
             manifest_file = self.create_ingestion_manifest(ingestion_files)
+            self.log_stage_breakdown()
             
             # Step 7: Create final summary
             logger.info("="*80)
@@ -513,11 +348,9 @@ class CompleteOptimizationRunner:
                 'instructions': {
                     'next_steps': [
                         "1. Copy all files from 'export_results' directory to your Docker ingestion system",
-                        "2. Use the ingestion_manifest.json to understand what each file contains",
-                        "3. Process alerts_file.json for real-time alerts",
-                        "4. Use analytics_file.json for detailed analytics",
-                        "5. Use summary_file.json for dashboard overview",
-                        "6. Use plots_data_file.json for generating charts"
+                        "2. Use the manifest to locate and verify the results file (sha256)",
+                        "3. Run ingest_to_docker.py to publish alerts, analytics and summary",
+                        "4. Read only the columns you need from the results Parquet file"
                     ]
                 }
             }
@@ -529,12 +362,10 @@ class CompleteOptimizationRunner:
 This directory contains the complete results from the optimization run performed on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}.
 
 ## Directory Structure
-- `alerts/` - Real-time trading alerts and signals
-- `analytics/` - Detailed analytics and optimization results
-- `plots/` - Chart data and visualization files
-- `summary/` - Summary reports and overview data
+- `results_{self.timestamp}.parquet` - One row per asset (zstd Parquet); summary aggregates in the footer
 - `raw_data/` - Raw optimization results (CSV/JSON)
-- `manifest_{self.timestamp}.json` - Complete file manifest
+- `metrics_{self.timestamp}.prom` - Stage timings in Prometheus text format
+- `manifest_{self.timestamp}.json` - File manifest with checksums
 
 ## Analysis Details
 - **Total Assets Analyzed**: {analysis_result['summary']['total_assets']}
@@ -543,6 +374,7 @@ This directory contains the complete results from the optimization run performed
 - **HOLD Signals**: {analysis_result['summary']['hold_signals']}
 - **Average Potential Return**: {analysis_result['summary']['avg_potential_return']:.2f}%
 - **Optimization Enabled**: Yes
+- **Incremental**: {self._incremental_line()}
 - **Data Interval**: 1d
 - **Historical Days**: {days}
 
@@ -551,11 +383,10 @@ This directory contains the complete results from the optimization run performed
 - manifest_{self.timestamp}.json
 
 ## Usage
-1. Use `alerts/` files for real-time trading signals
-2. Use `analytics/` files for detailed analysis
-3. Use `plots/` files for chart generation
-4. Use `summary/` files for dashboard overview
-5. Use `raw_data/` files for custom analysis
+1. Run `ingest_to_docker.py` to publish alerts, analytics and summary for the web app
+2. Load the results with `export_bundle.read_results(path, columns=[...])`
+3. Read the summary without loading rows with `export_bundle.read_summary(path)`
+4. Use `raw_data/` files for custom analysis
 
 ## Docker Integration
 All files are formatted for immediate Docker ingestion.
@@ -578,17 +409,47 @@ All files are formatted for immediate Docker ingestion.
         except Exception as e:
             logger.error(f"Pipeline failed: {e}")
             raise
+    
+    def _incremental_line(self) -> str:
+        if not self.incremental:
+            return "No (all assets analyzed)"
+        return (f"{self.incremental['assets_skipped']} unchanged assets reused, "
+                f"{self.incremental['assets_recomputed']} recomputed, "
+                f"~{self.incremental['seconds_saved']:.0f}s saved")
+    
+    def log_stage_breakdown(self):
+        """Log where the run spent its time, slowest stage first"""
+        stages = self.engine.metrics.stage_stats()
+        logger.info("Stage timings (total / p50 / p95 / max, seconds):")
+        for stage, s in sorted(stages.items(), key=lambda item: item[1]['total_s'], reverse=True):
+            logger.info(f"  {stage:<20} {s['total_s']:>10.2f} {s['p50_s']:>8.3f} {s['p95_s']:>8.3f} {s['max_s']:>8.3f}  (n={s['count']})")
 
 def main():
     """Main function to run the complete optimization pipeline"""
+    parser = argparse.ArgumentParser(description="Complete optimization and export pipeline")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse stored results for assets with no new candle and unchanged parameters")
+    args = parser.parse_args()
     try:
         # Initialize the runner
         runner = CompleteOptimizationRunner()
         
         # Run the complete pipeline
+        # AUTONAMA_TIMEFRAMES=1d,4h (or "config" for analysis_settings.timeframes)
+        # runs every interval from one fetch per symbol
+        intervals = None
+        timeframes_env = os.getenv('AUTONAMA_TIMEFRAMES')
+        if timeframes_env == 'config':
+            with open(runner.config_file) as f:
+                intervals = json.load(f).get('analysis_settings', {}).get('timeframes')
+        elif timeframes_env:
+            intervals = [t.strip() for t in timeframes_env.split(',')]
+        
         result = runner.run_complete_pipeline(
             interval='1d',  # Daily analysis
-            days=720        # 2 years of historical data
+            days=720,       # 2 years of historical data
+            intervals=intervals,
+            incremental=args.incremental
         )
         
         # Print final summary
@@ -601,6 +462,8 @@ def main():
         print(f"SELL signals: {result['analysis_result']['summary']['sell_signals']}")
         print(f"HOLD signals: {result['analysis_result']['summary']['hold_signals']}")
         print(f"Average potential return: {result['analysis_result']['summary']['avg_potential_return']:.2f}%")
+        if runner.incremental:
+            print(f"Incremental: {runner._incremental_line()}")
         print("\nFiles created:")
         for key, filepath in result['ingestion_files'].items():
             if key != 'timestamp':
@@ -11,6 +11,7 @@ Usage:
 Example:
     python run_crypto_engine.py --config config.json --test
     python run_crypto_engine.py --config config.json --symbols BTCUSDT,ETHUSDT,SOLUSDT
+    python run_crypto_engine.py --config config.json --timeframes 1d,4h,15m
 """
 
 import argparse
@@ -81,9 +82,14 @@ def main():
     parser.add_argument('--config', default='config.json', help='Configuration file path')
     parser.add_argument('--symbols', help='Comma-separated list of symbols to analyze')
     parser.add_argument('--interval', default='1d', help='Time interval (default: 1d)')
+    parser.add_argument('--timeframes', nargs='?', const='config',
+                        help='Comma-separated intervals analyzed in one pass from a single fetch per symbol '
+                             '(no value: analysis_settings.timeframes from the config)')
     parser.add_argument('--days', type=int, default=720, help='Number of days to analyze (default: 720)')
     parser.add_argument('--test', action='store_true', help='Run engine tests only')
     parser.add_argument('--optimize', action='store_true', help='Optimize parameters for major coins')
+    parser.add_argument('--walk-forward', action='store_true',
+                        help='Add out-of-sample metrics from a rolling walk-forward evaluation')
     parser.add_argument('--format', choices=['csv', 'json', 'both'], default='both', help='Output format')
     
     args = parser.parse_args()
@@ -119,9 +125,15 @@ def main():
         symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
         print(f"📊 Analyzing core symbols: {symbols}")
     
-    print(f"⏰ Interval: {args.interval}")
+    intervals = None
+    if args.timeframes == 'config':
+        intervals = config.get('analysis_settings', {}).get('timeframes')
+    elif args.timeframes:
+        intervals = [t.strip() for t in args.timeframes.split(',')]
+    print(f"⏰ Interval: {', '.join(intervals) if intervals else args.interval}")
     print(f"📅 Days: {args.days}")
     print(f"🔧 Optimize major coins: {args.optimize}")
+    print(f"🔁 Walk-forward: {args.walk_forward}")
     print(f"📁 Output format: {args.format}")
     
     # Run analysis
@@ -136,8 +148,10 @@ def main():
             symbols=symbols,
             interval=args.interval,
             days=args.days,
-            optimize_major_coins=args.optimize,
-            output_format=args.format
+            optimize_all_assets=args.optimize,
+            output_format=args.format,
+            intervals=intervals,
+            walk_forward=args.walk_forward
         )
         
         end_time = datetime.now()
@@ -155,6 +169,8 @@ def main():
         print(f"HOLD signals: {summary['hold_signals']}")
         print(f"Average potential return: {summary['avg_potential_return']:.2f}%")
         print(f"Average total return: {summary['avg_total_return']:.2f}%")
+        if args.walk_forward:
+            print(f"Average out-of-sample return: {analysis_result['results'].mean('oos_return'):.2f}%")
         print(f"Analysis duration: {duration}")
         
         # Show top signals
@@ -206,6 +222,7 @@ Usage:
 Example:
     python run_crypto_engine.py --config config.json --test
     python run_crypto_engine.py --config config.json --symbols BTCUSDT,ETHUSDT,SOLUSDT
+    python run_crypto_engine.py --config config.json --timeframes 1d,4h,15m
 """
 
 import argparse
@@ -276,9 +293,14 @@ def main():
     parser.add_argument('--config', default='config.json', help='Configuration file path')
     parser.add_argument('--symbols', help='Comma-separated list of symbols to analyze')
     parser.add_argument('--interval', default='1d', help='Time interval (default: 1d)')
+    parser.add_argument('--timeframes', nargs='?', const='config',
+                        help='Comma-separated intervals analyzed in one pass from a single fetch per symbol '
+                             '(no value: analysis_settings.timeframes from the config)')
     parser.add_argument('--days', type=int, default=720, help='Number of days to analyze (default: 720)')
     parser.add_argument('--test', action='store_true', help='Run engine tests only')
     parser.add_argument('--optimize', action='store_true', help='Optimize parameters for major coins')
+    parser.add_argument('--walk-forward', action='store_true',
+                        help='Add out-of-sample metrics from a rolling walk-forward evaluation')
     parser.add_argument('--format', choices=['csv', 'json', 'both'], default='both', help='Output format')
     
     args = parser.parse_args()
@@ -314,9 +336,15 @@ def main():
         symbols = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
         print(f"📊 Analyzing core symbols: {symbols}")
     
-    print(f"⏰ Interval: {args.interval}")
+    intervals = None
+    if args.timeframes == 'config':
+        intervals = config.get('analysis_settings', {}).get('timeframes')
+    elif args.timeframes:
+        intervals = [t.strip() for t in args.timeframes.split(',')]
+    print(f"⏰ Interval: {', '.join(intervals) if intervals else args.interval}")
     print(f"📅 Days: {args.days}")
     print(f"🔧 Optimize major coins: {args.optimize}")
+    print(f"🔁 Walk-forward: {args.walk_forward}")
     print(f"📁 Output format: {args.format}")
     
     # Run analysis
@@ -331,8 +359,10 @@ def main():
             symbols=symbols,
             interval=args.interval,
             days=args.days,
-            optimize_major_coins=args.optimize,
-            output_format=args.format
+            optimize_all_assets=args.optimize,
+            output_format=args.format,
+            intervals=intervals,
+            walk_forward=args.walk_forward
         )
         
         end_time = datetime.now()
@@ -350,6 +380,8 @@ def main():
         print(f"HOLD signals: {summary['hold_signals']}")
         print(f"Average potential return: {summary['avg_potential_return']:.2f}%")
         print(f"Average total return: {summary['avg_total_return']:.2f}%")
+        if args.walk_forward:
+            print(f"Average out-of-sample return: {analysis_result['results'].mean('oos_return'):.2f}%")
         print(f"Analysis duration: {duration}")
         
         # Show top signals
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Run Ledger
+
+Completed engine runs and which consumers have ingested them, so ingestion
+is triggered by the run finishing instead of by polling export directories.
+
+- Writers (the optimisation manifest writer, the enhanced analysis and local
+  backtest result writers) call record_run() once a file is fully written
+- Readers find the newest run with latest(): one indexed query, no directory
+  listing or mtime sort
+- claim()/finish() record which files a consumer has processed, so every
+  file is read once per consumer; a failed ingestion, or one still
+  'running' after CLAIM_TIMEOUT_SECONDS, can be claimed again
+- notify_run_completed() also sends a "run completed" Celery message to the
+  data service when AUTONAMA_INGEST_BROKER_URL is set, so its worker ingests
+  the file within seconds without a monitoring task occupying a slot
+
+The ledger is a small SQLite database (run_ledger.db) in the directory the
+runs are written to. Paths are stored relative to that directory, so the
+same ledger works from the host and from a container that mounts it.
+
+Usage:
+    ledger = RunLedger("export_results")
+    ledger.record_run('optimization_run', manifest_file)
+
+    run = ledger.latest('optimization_run')
+    if run and ledger.claim('docker', run['path']):
+        ...
+        ledger.finish('docker', run['path'])
+"""
+
+import os
+import sqlite3
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+import db_pool
+import export_bundle
+
+logger = logging.getLogger(__name__)
+
+LEDGER_FILE = "run_ledger.db"
+
+STATUS_RUNNING = 'running'
+STATUS_DONE = 'done'
+STATUS_FAILED = 'failed'
+
+# A 'running' claim older than this belongs to a consumer that died mid-ingestion
+CLAIM_TIMEOUT_SECONDS = int(os.getenv('RUN_LEDGER_CLAIM_TIMEOUT_SECONDS', '1800'))
+
+# Data service task (and its queue, see autonama.data/utils/task_queues.py)
+# notified when a run of each kind completes. enhanced_results has no task:
+# it is read from the ledger by the engine's own ingestion_system.py
+INGEST_TASKS = {
+    'backtest_results': ('tasks.backtest_ingestion.ingest_completed_run', 'cpu'),
+    'optimization_run': ('tasks.optimization_ingestion.ingest_optimization_data', 'cpu'),
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    path TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    sha256 TEXT,
+    completed_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_kind_completed ON runs (kind, completed_at);
+CREATE TABLE IF NOT EXISTS ingestions (
+    consumer TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    detail TEXT,
+    PRIMARY KEY (consumer, path)
+);
+"""
+
+
+def _stale_before() -> str:
+    """started_at bound below which a 'running' claim is stale (ISO strings sort chronologically)."""
+    return (datetime.now() - timedelta(seconds=CLAIM_TIMEOUT_SECONDS)).isoformat()
+
+
+class RunLedger:
+    """Completed runs in one output directory and their ingestion status per consumer."""
+
+    def __init__(self, directory: str):
+        self.directory = os.path.abspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self.db_path = os.path.join(self.directory, LEDGER_FILE)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        # This thread's persistent connection; `with` commits or rolls back without closing it
+        conn = db_pool.sqlite_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(os.path.abspath(path), self.directory).replace(os.sep, '/')
+
+    def _absolute(self, row: sqlite3.Row) -> Dict[str, Any]:
+        run = dict(row)
+        run['path'] = os.path.join(self.directory, *run['path'].split('/'))
+        return run
+
+    # Writers
+
+    def record_run(self, kind: str, path: str, checksum: bool = True) -> Dict[str, Any]:
+        """Record a fully written run file; recording the same file again updates it."""
+        run = {
+            'path': self._relative(path),
+            'kind': kind,
+            'sha256': export_bundle.file_sha256(path) if checksum else None,
+            'completed_at': datetime.now().isoformat(),
+        }
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs (path, kind, sha256, completed_at) "
+                "VALUES (:path, :kind, :sha256, :completed_at)", run)
+        logger.info(f"Recorded completed {kind}: {run['path']}")
+        return {**run, 'path': os.path.abspath(path)}
+
+    # Readers
+
+    def latest(self, kind: str) -> Optional[Dict[str, Any]]:
+        """Newest recorded run of a kind, or None."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT * FROM runs WHERE kind = ? ORDER BY completed_at DESC LIMIT 1", (kind,)).fetchone()
+        return self._absolute(row) if row else None
+
+    def pending(self, kind: str, consumer: str) -> List[Dict[str, Any]]:
+        """Runs of a kind the consumer has not ingested (failed, or stale claims included), oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT r.* FROM runs r LEFT JOIN ingestions i ON i.path = r.path AND i.consumer = ? "
+                "WHERE r.kind = ? AND (i.status IS NULL OR i.status = ? OR (i.status = ? AND i.started_at < ?)) "
+                "ORDER BY r.completed_at",
+                (consumer, kind, STATUS_FAILED, STATUS_RUNNING, _stale_before())).fetchall()
+        return [self._absolute(row) for row in rows]
+
+    def status(self, consumer: str, path: str) -> Optional[str]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT status FROM ingestions WHERE consumer = ? AND path = ?",
+                               (consumer, self._relative(path))).fetchone()
+        return row['status'] if row else None
+
+    # Consumers
+
+    def claim(self, consumer: str, path: str, force: bool = False) -> bool:
+        """
+        Mark a run as being ingested by consumer.
+
+        Returns False when the consumer already ingested it (or is ingesting
+        it); failed ingestions and 'running' claims older than
+        CLAIM_TIMEOUT_SECONDS can be claimed again. force re-claims in any state.
+        """
+        params = [consumer, self._relative(path), STATUS_RUNNING, datetime.now().isoformat()]
+        condition = ""
+        if not force:
+            condition = ("WHERE ingestions.status = ? "
+                         "OR (ingestions.status = ? AND ingestions.started_at < ?)")
+            params += [STATUS_FAILED, STATUS_RUNNING, _stale_before()]
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO ingestions (consumer, path, status, started_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (consumer, path) DO UPDATE SET status = excluded.status, "
+                f"started_at = excluded.started_at, finished_at = NULL, detail = NULL {condition}",
+                params)
+            return cursor.rowcount == 1
+
+    def finish(self, consumer: str, path: str, status: str = STATUS_DONE, detail: Optional[str] = None):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE ingestions SET status = ?, finished_at = ?, detail = ? WHERE consumer = ? AND path = ?",
+                (status, datetime.now().isoformat(), detail, consumer, self._relative(path)))
+
+
+def notify_run_completed(kind: str, path: str, broker_url: Optional[str] = None,
+                         directory: Optional[str] = None) -> bool:
+    """
+    Send a "run completed" message to the data service's ingestion task.
+
+    The message carries the file's path relative to directory (its ledger
+    directory; the file name when omitted); the worker resolves it against
+    its own mount of the output directory. Does nothing unless a broker is
+    configured (broker_url or AUTONAMA_INGEST_BROKER_URL) and Celery is
+    installed; a failed send is logged and the run stays pending in the
+    ledger for the next sweep.
+    """
+    broker_url = broker_url or os.getenv('AUTONAMA_INGEST_BROKER_URL')
+    task_name, queue = INGEST_TASKS.get(kind, (None, None))
+    if not broker_url or not task_name:
+        return False
+    try:
+        from celery import Celery
+    except ImportError:
+        logger.warning("AUTONAMA_INGEST_BROKER_URL is set but celery is not installed; skipping notification")
+        return False
+
+    name = os.path.relpath(os.path.abspath(path), directory).replace(os.sep, '/') if directory else os.path.basename(path)
+    try:
+        app = Celery('autonama_engine', broker=broker_url)
+        app.send_task(task_name, args=[name], queue=queue)
+        logger.info(f"Notified {task_name} of completed {kind}: {name}")
+        return True
+    except Exception as e:
+        logger.error(f"Could not notify {task_name}: {e}")
+        return False
+
+
+def publish_run(kind: str, path: str, directory: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Record a completed run in its directory's ledger and notify the data service.
+
+    Errors are logged rather than raised: the run's files are already written,
+    and ingestion falls back to scanning the directory for unrecorded runs.
+    """
+    try:
+        ledger = RunLedger(directory or os.path.dirname(os.path.abspath(path)))
+        run = ledger.record_run(kind, path)
+    except Exception as e:
+        logger.error(f"Could not record completed {kind} {path}: {e}")
+        return None
+    run['notified'] = notify_run_completed(kind, path, directory=ledger.directory)
+    return run
@@ -130,8 +130,9 @@ def main():
     print(f"Next steps:")
     print(f"1. The results file can be ingested into the database using:")
     print(f"   docker-compose exec celery_worker python -c \"from tasks.backtest_ingestion import ingest_backtest_results; result = ingest_backtest_results.delay('{filepath}'); print('Ingestion task submitted:', result.id)\"")
-    print(f"2. Or monitor the results directory automatically:")
-    print(f"   docker-compose exec celery_worker python -c \"from tasks.backtest_ingestion import monitor_backtest_results_directory; result = monitor_backtest_results_directory.delay('{os.path.abspath(args.output)}'); print('Monitoring task submitted:', result.id)\"")
+    print(f"2. With AUTONAMA_INGEST_BROKER_URL set, the run was already reported to the data service and is ingested automatically;")
+    print(f"   otherwise queue every results file that has not been ingested yet:")
+    print(f"   docker-compose exec celery_worker python -c \"from tasks.backtest_ingestion import monitor_backtest_results_directory; result = monitor_backtest_results_directory.delay('{os.path.abspath(args.output)}'); print('Sweep task submitted:', result.id)\"")
     print(f"{'='*50}")
 
 if __name__ == "__main__":
@@ -267,8 +268,9 @@ def main():
     print(f"Next steps:")
     print(f"1. The results file can be ingested into the database using:")
     print(f"   docker-compose exec celery_worker python -c \"from tasks.backtest_ingestion import ingest_backtest_results; result = ingest_backtest_results.delay('{filepath}'); print('Ingestion task submitted:', result.id)\"")
-    print(f"2. Or monitor the results directory automatically:")
-    print(f"   docker-compose exec celery_worker python -c \"from tasks.backtest_ingestion import monitor_backtest_results_directory; result = monitor_backtest_results_directory.delay('{os.path.abspath(args.output)}'); print('Monitoring task submitted:', result.id)\"")
+    print(f"2. With AUTONAMA_INGEST_BROKER_URL set, the run was already reported to the data service and is ingested automatically;")
+    print(f"   otherwise queue every results file that has not been ingested yet:")
+    print(f"   docker-compose exec celery_worker python -c \"from tasks.backtest_ingestion import monitor_backtest_results_directory; result = monitor_backtest_results_directory.delay('{os.path.abspath(args.output)}'); print('Sweep task submitted:', result.id)\"")
     print(f"{'='*50}")
 
 if __name__ == "__main__":
@@ -11,6 +11,8 @@ from run_complete_optimization import CompleteOptimizationRunner
 def main():
     parser = argparse.ArgumentParser(description="Quick 100-asset analysis (no optimization)")
     parser.add_argument("--export", action="store_true", help="Create export files after analysis")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Reuse stored results for assets with no new candle and unchanged parameters")
     args = parser.parse_args()
 
     runner = CompleteOptimizationRunner()
@@ -29,9 +31,15 @@ def main():
         days=720,
         optimize_all_assets=False,
         output_format='both',
-        update_data_first=False
+        update_data_first=False,
+        incremental=args.incremental
     )
 
+    if analysis_result.get('incremental'):
+        report = analysis_result['incremental']
+        print(f"Incremental: {report['assets_skipped']} unchanged assets reused, "
+              f"{report['assets_recomputed']} recomputed, ~{report['seconds_saved']:.0f}s saved")
+
     if args.export:
         print("Creating export files for dashboard/ingestion...")
         ingestion_files = runner.create_docker_ingestion_files(analysis_result)
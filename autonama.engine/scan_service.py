@@ -0,0 +1,455 @@
+#!/usr/bin/env python3
+"""
+Crypto Scan Service
+
+Background refresher for the Streamlit crypto scanner. The scanner page used
+to fetch klines and fit every channel inside the Streamlit process on each
+"Run Scan" click, for every user, and kept the full indicator frames in
+session state. This service does that work once per candle close and writes
+compact snapshots the page only reads:
+
+- for every (symbol, timeframe) it refreshes when a new candle has closed
+  since the stored snapshot (klines updated incrementally in the DuckDB
+  store, channel fitted with channel_kernel on closed candles only)
+- a snapshot holds the last price, the current bands, the signal, and the
+  price / regression / band series downsampled to SERIES_POINTS points for
+  the charts
+- snapshots are computed for one or more parameter sets (degree, kstd,
+  lookback); the page offers the sets that have snapshots
+- the universe is the top 100 USDT pairs by quote volume (refreshed hourly)
+  plus the core movers; snapshots of symbols that left it are dropped
+
+Snapshots live in a small SQLite database (data/scanner_snapshots.db) so the
+service and any number of Streamlit sessions share them.
+
+Usage:
+    python scan_service.py                  # refresh on every candle close
+    python scan_service.py --once           # one refresh pass, then exit
+    python scan_service.py --params 4,2.0,500 --params 3,2.5,300
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+import channel_kernel
+import db_pool
+import trading_universe
+from timeframes import interval_seconds
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_DB = os.path.join("data", "scanner_snapshots.db")
+DUCKDB_PATH = os.path.join("data", "crypto_data.duckdb")
+
+DEFAULT_TIMEFRAMES = ['15m', '1h', '4h', '1d']
+CORE_MOVERS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT']
+MAJORS = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'ADAUSDT', 'XRPUSDT']
+FALLBACK_UNIVERSE = ['BTCUSDT', 'ETHUSDT', 'SOLUSDT', 'BNBUSDT', 'ADAUSDT', 'XRPUSDT', 'DOTUSDT',
+                     'LINKUSDT', 'AVAXUSDT', 'MATICUSDT']
+UNIVERSE_SIZE = 100
+UNIVERSE_TTL_SECONDS = 3600
+
+# Require at least this many closes for a reliable regression
+MIN_BARS = 50
+# Points kept per chart series
+SERIES_POINTS = 120
+# Wait after a candle close before fetching, so the exchange has published it
+CLOSE_GRACE_SECONDS = 5
+
+KLINE_COLUMNS = ["timestamp", "open", "high", "low", "close", "volume", "close_time",
+                 "quote_asset_volume", "number_of_trades", "taker_buy_base",
+                 "taker_buy_quote", "ignore"]
+
+# 1970-01-01 was a Thursday; weekly candles open on Monday
+_WEEK_ANCHOR_SECONDS = 4 * 86400
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS scan_snapshots (
+    symbol TEXT NOT NULL,
+    timeframe TEXT NOT NULL,
+    params TEXT NOT NULL,
+    candle_time INTEGER NOT NULL,
+    price REAL,
+    signal TEXT NOT NULL,
+    upper_band REAL,
+    lower_band REAL,
+    regression REAL,
+    potential_return REAL,
+    bars INTEGER,
+    error TEXT,
+    series TEXT,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (symbol, timeframe, params)
+);
+CREATE INDEX IF NOT EXISTS idx_scan_snapshots_params ON scan_snapshots (params, timeframe);
+"""
+
+
+@dataclass(frozen=True)
+class ScanParams:
+    """Channel parameters a snapshot was computed with."""
+    degree: int = 4
+    kstd: float = 2.0
+    lookback: int = 500
+
+    @property
+    def key(self) -> str:
+        return f"{self.degree}/{self.kstd:g}/{self.lookback}"
+
+    @classmethod
+    def from_key(cls, key: str) -> 'ScanParams':
+        degree, kstd, lookback = key.replace(',', '/').split('/')
+        return cls(int(degree), float(kstd), int(lookback))
+
+
+def last_closed_open(interval: str, now: Optional[float] = None) -> int:
+    """Open time (ms) of the most recently closed candle of an interval."""
+    step = interval_seconds(interval)
+    anchor = _WEEK_ANCHOR_SECONDS if interval.endswith('w') else 0
+    now = time.time() if now is None else now
+    current_open = (int(now) - anchor) // step * step + anchor
+    return (current_open - step) * 1000
+
+
+def next_close(intervals: Iterable[str], now: Optional[float] = None) -> float:
+    """Epoch seconds of the next candle close across intervals."""
+    now = time.time() if now is None else now
+    closes = []
+    for interval in intervals:
+        step = interval_seconds(interval)
+        anchor = _WEEK_ANCHOR_SECONDS if interval.endswith('w') else 0
+        closes.append((int(now) - anchor) // step * step + anchor + step)
+    return min(closes)
+
+
+def _compact(values: np.ndarray) -> List[Optional[float]]:
+    return [float(f"{v:.6g}") if np.isfinite(v) else None for v in values]
+
+
+def channel_snapshot(symbol: str, timeframe: str, close: pd.Series, params: ScanParams,
+                     candle_time: int) -> Optional[Dict[str, Any]]:
+    """
+    Fit the channel on the last `lookback` closes and build a snapshot.
+
+    Returns None when there is not enough data or the fit fails, except for
+    core movers, which always get a HOLD snapshot carrying the error.
+    """
+    close = close.tail(params.lookback)
+    snapshot = {
+        'symbol': symbol, 'timeframe': timeframe, 'params': params.key, 'candle_time': candle_time,
+        'price': None, 'signal': 'HOLD', 'upper_band': None, 'lower_band': None, 'regression': None,
+        'potential_return': 0.0, 'bars': int(len(close)), 'error': None, 'series': None,
+    }
+
+    if len(close) < MIN_BARS:
+        snapshot['error'] = 'Insufficient data'
+        return snapshot if symbol in CORE_MOVERS else None
+
+    values, keep = channel_kernel.preprocess_close(
+        close.to_numpy(dtype=np.float64), window=5, zscore_threshold=None, keys=close.index.to_numpy())
+    index = close.index[keep]
+    snapshot['price'] = float(values[-1]) if len(values) else None
+    fit = channel_kernel.fit_channel(values, params.degree, params.kstd)
+    if fit is None:
+        snapshot['error'] = 'Regression calculation failed'
+        return snapshot if symbol in CORE_MOVERS else None
+
+    price, upper, lower = float(values[-1]), float(fit.upper_band[-1]), float(fit.lower_band[-1])
+    if price < lower:
+        snapshot['signal'] = 'BUY'
+    elif price > upper:
+        snapshot['signal'] = 'SELL'
+    snapshot.update({
+        'upper_band': upper,
+        'lower_band': lower,
+        'regression': float(fit.regression_line[-1]),
+        'potential_return': ((upper - lower) / lower) * 100 if lower != 0 else 0.0,
+    })
+
+    # Evenly spaced sample of the series, always keeping the first and last point
+    positions = np.unique(np.linspace(0, len(values) - 1, min(SERIES_POINTS, len(values))).round().astype(int))
+    snapshot['series'] = json.dumps({
+        't': (pd.DatetimeIndex(index[positions]).as_unit('ms').asi8).tolist(),
+        'close': _compact(values[positions]),
+        'regression_line': _compact(fit.regression_line[positions]),
+        'upper_band': _compact(fit.upper_band[positions]),
+        'lower_band': _compact(fit.lower_band[positions]),
+    }, separators=(',', ':'))
+    return snapshot
+
+
+class SnapshotStore:
+    """Scanner snapshots, one row per (symbol, timeframe, parameter set)."""
+
+    def __init__(self, db_path: str = SNAPSHOT_DB):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = db_pool.sqlite_connection(self.db_path)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def candle_times(self, timeframe: str, params: ScanParams) -> Dict[str, int]:
+        """Candle each stored snapshot was computed up to, by symbol."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT symbol, candle_time FROM scan_snapshots WHERE timeframe = ? AND params = ?",
+                                (timeframe, params.key)).fetchall()
+        return {row['symbol']: row['candle_time'] for row in rows}
+
+    def save(self, snapshots: List[Dict[str, Any]]):
+        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO scan_snapshots (symbol, timeframe, params, candle_time, price, signal, "
+                "upper_band, lower_band, regression, potential_return, bars, error, series, updated_at) VALUES "
+                "(:symbol, :timeframe, :params, :candle_time, :price, :signal, :upper_band, :lower_band, "
+                ":regression, :potential_return, :bars, :error, :series, :updated_at)",
+                [{**snapshot, 'updated_at': now} for snapshot in snapshots])
+
+    def retain(self, symbols: Iterable[str]) -> int:
+        """Drop snapshots of symbols outside the universe."""
+        symbols = list(symbols)
+        with self._connect() as conn:
+            cursor = conn.execute(
+                f"DELETE FROM scan_snapshots WHERE symbol NOT IN ({','.join('?' * len(symbols))})", symbols)
+        return cursor.rowcount
+
+    def parameter_sets(self) -> List[str]:
+        with self._connect() as conn:
+            return [row['params'] for row in conn.execute(
+                "SELECT params, COUNT(*) AS n FROM scan_snapshots GROUP BY params ORDER BY n DESC")]
+
+    def summary(self, params: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+        """Snapshot count and last update per timeframe."""
+        query = "SELECT timeframe, COUNT(*) AS snapshots, MAX(updated_at) AS updated_at FROM scan_snapshots"
+        args: Tuple = ()
+        if params:
+            query += " WHERE params = ?"
+            args = (params,)
+        with self._connect() as conn:
+            rows = conn.execute(query + " GROUP BY timeframe", args).fetchall()
+        return {row['timeframe']: {'snapshots': row['snapshots'], 'updated_at': row['updated_at']} for row in rows}
+
+    def load(self, params: str, timeframes: Optional[Iterable[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Snapshots as scan results: coin, timeframe, signal, price, bands,
+        potential_return, error (when set) and 'indicators', a small frame of
+        the downsampled Close / regression_line / upper_band / lower_band series.
+        """
+        query = "SELECT * FROM scan_snapshots WHERE params = ?"
+        args: List[Any] = [params]
+        if timeframes is not None:
+            timeframes = list(timeframes)
+            query += f" AND timeframe IN ({','.join('?' * len(timeframes))})"
+            args.extend(timeframes)
+        with self._connect() as conn:
+            rows = conn.execute(query, args).fetchall()
+
+        results = []
+        for row in rows:
+            if row['series']:
+                series = json.loads(row['series'])
+                indicators = pd.DataFrame({
+                    'Close': series['close'],
+                    'regression_line': series['regression_line'],
+                    'upper_band': series['upper_band'],
+                    'lower_band': series['lower_band'],
+                }, index=pd.to_datetime(series['t'], unit='ms'), dtype=np.float64)
+            else:
+                indicators = pd.DataFrame()
+            result = {
+                'coin': row['symbol'],
+                'timeframe': row['timeframe'],
+                'signal': row['signal'],
+                'price': row['price'] if row['price'] is not None else 0.0,
+                'indicators': indicators,
+                'potential_return': row['potential_return'] or 0.0,
+                'upper_band': row['upper_band'],
+                'lower_band': row['lower_band'],
+                'candle_time': pd.to_datetime(row['candle_time'], unit='ms'),
+                'updated_at': row['updated_at'],
+            }
+            if row['error']:
+                result['error'] = row['error']
+            results.append(result)
+        return results
+
+
+class ScanService:
+    """Refreshes scanner snapshots for the top USDT pairs on candle close."""
+
+    def __init__(self, client, db_handler, store: SnapshotStore,
+                 timeframes: Iterable[str] = DEFAULT_TIMEFRAMES,
+                 param_sets: Iterable[ScanParams] = (ScanParams(),), max_workers: int = 10):
+        self.client = client
+        self.db_handler = db_handler
+        self.store = store
+        self.timeframes = list(timeframes)
+        self.param_sets = list(param_sets)
+        self.max_workers = max_workers
+        self.universe: List[str] = []
+        self.universe_updated = 0.0
+
+    # Universe
+
+    def top_coins(self, limit: int = UNIVERSE_SIZE) -> List[str]:
+        """Top USDT pairs by 24h quote volume, from the shared trading universe."""
+        universe = trading_universe.shared_client(fetch_tickers=self.client.get_ticker)
+        return universe.symbols(limit, fallback=FALLBACK_UNIVERSE)
+
+    def refresh_universe(self, force: bool = False) -> List[str]:
+        if force or not self.universe or time.time() - self.universe_updated > UNIVERSE_TTL_SECONDS:
+            self.universe = list(dict.fromkeys(self.top_coins() + CORE_MOVERS))
+            self.universe_updated = time.time()
+            dropped = self.store.retain(self.universe)
+            logger.info(f"Scan universe: {len(self.universe)} symbols ({dropped} stale snapshots dropped)")
+        return self.universe
+
+    # Data
+
+    def _download(self, symbol: str, interval: str, start: datetime, end: datetime) -> int:
+        klines = self.client.get_historical_klines(
+            symbol=symbol, interval=interval,
+            start_str=start.strftime('%Y-%m-%d %H:%M:%S'),
+            end_str=end.strftime('%Y-%m-%d %H:%M:%S'))
+        if not klines:
+            return 0
+        df = pd.DataFrame(klines, columns=KLINE_COLUMNS)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        df = df.set_index('timestamp')[['open', 'high', 'low', 'close', 'volume']].astype(float)
+        df.index.name = 'DateTime'
+        df = df.rename(columns={'open': 'Open', 'high': 'High', 'low': 'Low', 'close': 'Close', 'volume': 'Volume'})
+        self.db_handler.insert_data(symbol, interval.upper(), df)
+        return len(df)
+
+    def closes(self, symbol: str, interval: str, lookback: int, closed_open: int) -> pd.Series:
+        """
+        Close prices of the last `lookback` closed candles.
+
+        Downloads a longer history once when the store has too little for the
+        symbol and only the new candles afterwards.
+        """
+        interval_key = interval.upper()
+        step = timedelta(seconds=interval_seconds(interval))
+        end_date = datetime.now()
+        latest = self.db_handler.get_latest_timestamp(symbol, interval_key)
+        earliest = self.db_handler.get_earliest_timestamp(symbol, interval_key)
+        min_candles = max(2000 if symbol in MAJORS else 1000, lookback)
+
+        if latest is None or earliest is None or end_date - earliest < step * min_candles:
+            # Try to get 2x the minimum history
+            bars = self._download(symbol, interval, end_date - step * min_candles * 2, end_date)
+            logger.info(f"Downloaded {bars} bars for {symbol} {interval}")
+        elif latest < pd.to_datetime(closed_open, unit='ms'):
+            self._download(symbol, interval, latest + timedelta(minutes=1), end_date)
+
+        df = self.db_handler.get_data(symbol, interval_key, end_date - step * (lookback + 2), end_date)
+        if df.empty:
+            return pd.Series(dtype=np.float64, name='close')
+        df = df.rename(columns={'datetime': 'timestamp'}).set_index('timestamp')
+        close = df['close'].astype(np.float64)
+        # Closed candles only; the candle still forming is picked up at its close
+        return close[close.index <= pd.to_datetime(closed_open, unit='ms')].tail(lookback)
+
+    # Refresh
+
+    def _scan(self, symbol: str, timeframe: str, param_sets: List[ScanParams], closed_open: int) -> List[Dict[str, Any]]:
+        try:
+            close = self.closes(symbol, timeframe, max(params.lookback for params in param_sets), closed_open)
+        except Exception as e:
+            logger.warning(f"Could not fetch data for {symbol} ({timeframe}): {e}")
+            close = pd.Series(dtype=np.float64)
+        snapshots = []
+        for params in param_sets:
+            snapshot = channel_snapshot(symbol, timeframe, close, params, closed_open)
+            if snapshot is not None:
+                snapshots.append(snapshot)
+        return snapshots
+
+    def due(self, now: Optional[float] = None) -> Dict[Tuple[str, str], Tuple[List[ScanParams], int]]:
+        """(symbol, timeframe) pairs with a candle closed since their snapshot, and the parameter sets to update."""
+        jobs: Dict[Tuple[str, str], Tuple[List[ScanParams], int]] = {}
+        for timeframe in self.timeframes:
+            closed_open = last_closed_open(timeframe, now)
+            for params in self.param_sets:
+                stored = self.store.candle_times(timeframe, params)
+                for symbol in self.universe:
+                    if stored.get(symbol, -1) < closed_open:
+                        jobs.setdefault((symbol, timeframe), ([], closed_open))[0].append(params)
+        return jobs
+
+    def refresh(self) -> int:
+        """Recompute every due snapshot; returns the number written."""
+        self.refresh_universe()
+        jobs = self.due()
+        if not jobs:
+            return 0
+        start = time.time()
+        snapshots: List[Dict[str, Any]] = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._scan, symbol, timeframe, param_sets, closed_open)
+                       for (symbol, timeframe), (param_sets, closed_open) in jobs.items()]
+            for future in as_completed(futures):
+                try:
+                    snapshots.extend(future.result())
+                except Exception as e:
+                    logger.error(f"Scan job failed: {e}")
+        self.store.save(snapshots)
+        logger.info(f"Refreshed {len(snapshots)} snapshots for {len(jobs)} symbol/timeframe pairs "
+                    f"in {time.time() - start:.1f}s")
+        return len(snapshots)
+
+    def run_forever(self):
+        """Refresh, then sleep until the next candle close of any scanned timeframe."""
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Scan refresh failed: {e}", exc_info=True)
+            wake = next_close(self.timeframes) + CLOSE_GRACE_SECONDS
+            time.sleep(max(wake - time.time(), 1.0))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Refresh crypto scanner snapshots on candle close")
+    parser.add_argument("--once", action="store_true", help="Run one refresh pass and exit")
+    parser.add_argument("--timeframes", nargs="+", default=DEFAULT_TIMEFRAMES, help="Timeframes to scan")
+    parser.add_argument("--params", action="append", metavar="DEGREE,KSTD,LOOKBACK",
+                        help="Channel parameter set (repeatable, default 4,2.0,500)")
+    parser.add_argument("--workers", type=int, default=10, help="Concurrent symbol/timeframe jobs")
+    parser.add_argument("--db", default=SNAPSHOT_DB, help="Snapshot database path")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    from binance.client import Client
+    # The DuckDB kline store lives next to the engine
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from crypto_data_handler import CryptoDataHandler
+
+    param_sets = [ScanParams.from_key(value) for value in args.params] if args.params else [ScanParams()]
+    service = ScanService(Client(), CryptoDataHandler(DUCKDB_PATH), SnapshotStore(args.db),
+                          timeframes=args.timeframes, param_sets=param_sets, max_workers=args.workers)
+    if args.once:
+        service.refresh()
+    else:
+        service.run_forever()
+
+
+if __name__ == "__main__":
+    main()
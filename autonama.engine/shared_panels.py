@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Shared Panels
+
+Zero-copy handoff of a universe's OHLCV data from the loader to parallel
+analysis workers.
+
+The loader stacks every symbol's bars end to end into one contiguous float64
+block per field (close, high, low, volume, ...) plus an int64 block of bar
+times, held in multiprocessing.shared_memory or, with a path, a memory-mapped
+file. Each symbol is an (offset, length) slice of those blocks. Workers
+receive a PanelHandle (block name, fields and the offset table), attach to
+the same pages once per process and read NumPy views, so:
+
+- nothing is pickled per symbol; a task message is just the symbol name
+- resident memory is one copy of the universe, whatever the worker count
+- pandas Series handed out by series() wrap the shared buffer without copying
+
+Views are read-only; workers that need to modify data copy their slice.
+
+Usage:
+    with SharedPanels.create(frames) as panels:
+        results = map_symbols(scan, panels, workers=8)
+
+    def scan(panels, symbol):
+        close = panels.view(symbol, 'close')
+        ...
+"""
+
+import os
+import atexit
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, Iterable, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+PANEL_FIELDS = ('close', 'high', 'low', 'volume')
+
+
+class PanelHandle(NamedTuple):
+    """Everything a worker needs to attach to a panel set; cheap to pickle."""
+    name: Optional[str]      # shared_memory block name (None for a memory-mapped file)
+    path: Optional[str]      # memory-mapped file (None for shared memory)
+    fields: Tuple[str, ...]
+    symbols: Tuple[str, ...]
+    offsets: Tuple[int, ...]
+    lengths: Tuple[int, ...]
+    rows: int
+
+
+class SharedPanels:
+    """A universe's OHLCV fields as contiguous shared float64 panels, one slice per symbol."""
+
+    def __init__(self, handle: PanelHandle, buffer, owner: bool, shm: Optional[shared_memory.SharedMemory] = None):
+        self.handle = handle
+        self._shm = shm
+        self._owner = owner
+        self._slices = {
+            symbol: (offset, length)
+            for symbol, offset, length in zip(handle.symbols, handle.offsets, handle.lengths)
+        }
+        self._field_index = {field: i for i, field in enumerate(handle.fields)}
+        # Layout: len(fields) float64 rows of `rows` values, then one int64 row of bar times (ns)
+        width = len(handle.fields) + 1
+        block = np.ndarray((width, handle.rows), dtype=np.float64, buffer=buffer)
+        self._values = block[:-1]
+        self._times = block[-1].view(np.int64)
+        if not owner:
+            self._values.flags.writeable = False
+            self._times.flags.writeable = False
+
+    # Construction
+
+    @classmethod
+    def create(cls, frames: Dict[str, pd.DataFrame], fields: Iterable[str] = PANEL_FIELDS,
+               path: Optional[str] = None) -> 'SharedPanels':
+        """
+        Stack per-symbol OHLCV frames (DatetimeIndex) into shared panels.
+
+        Args:
+            frames: symbol -> frame with the requested columns; empty frames are skipped
+            fields: Columns to share
+            path: Back the panels with this file (np.memmap) instead of shared memory
+        """
+        fields = tuple(fields)
+        symbols, offsets, lengths = [], [], []
+        rows = 0
+        for symbol, df in frames.items():
+            if df is None or df.empty:
+                continue
+            symbols.append(symbol)
+            offsets.append(rows)
+            lengths.append(len(df))
+            rows += len(df)
+
+        nbytes = max(1, (len(fields) + 1) * rows * 8)
+        if path is not None:
+            buffer = np.memmap(path, dtype=np.uint8, mode='w+', shape=(nbytes,))
+            shm, name = None, None
+        else:
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            buffer, name = shm.buf, shm.name
+        handle = PanelHandle(name, path, fields, tuple(symbols), tuple(offsets), tuple(lengths), rows)
+        panels = cls(handle, buffer, owner=True, shm=shm)
+
+        for symbol, offset, length in zip(symbols, offsets, lengths):
+            df = frames[symbol]
+            window = slice(offset, offset + length)
+            for i, field in enumerate(fields):
+                panels._values[i, window] = df[field].to_numpy(dtype=np.float64)
+            panels._times[window] = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+        if path is not None:
+            buffer.flush()
+        return panels
+
+    @classmethod
+    def attach(cls, handle: PanelHandle) -> 'SharedPanels':
+        """Read-only view of panels created in another process (cached per process)."""
+        key = handle.name or handle.path
+        panels = _attached.get(key)
+        if panels is None:
+            if handle.path is not None:
+                buffer = np.memmap(handle.path, dtype=np.uint8, mode='r')
+                shm = None
+            else:
+                shm = _open_shared_memory(handle.name)
+                buffer = shm.buf
+            panels = cls(handle, buffer, owner=False, shm=shm)
+            _attached[key] = panels
+        return panels
+
+    # Access
+
+    @property
+    def symbols(self) -> Tuple[str, ...]:
+        return self.handle.symbols
+
+    @property
+    def nbytes(self) -> int:
+        return self._values.nbytes + self._times.nbytes
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._slices
+
+    def __len__(self) -> int:
+        return len(self._slices)
+
+    def view(self, symbol: str, field: str = 'close') -> np.ndarray:
+        """float64 view of one symbol's field (no copy)."""
+        offset, length = self._slices[symbol]
+        return self._values[self._field_index[field], offset:offset + length]
+
+    def times(self, symbol: str) -> np.ndarray:
+        offset, length = self._slices[symbol]
+        return self._times[offset:offset + length].view('datetime64[ns]')
+
+    def series(self, symbol: str, field: str = 'close') -> pd.Series:
+        """pandas Series over the shared view, indexed by bar time."""
+        return pd.Series(self.view(symbol, field), index=pd.DatetimeIndex(self.times(symbol), name='timestamp'),
+                         name=field, copy=False)
+
+    def frame(self, symbol: str) -> pd.DataFrame:
+        """All fields of one symbol as a DataFrame (a copy; prefer view()/series() in hot paths)."""
+        index = pd.DatetimeIndex(self.times(symbol), name='timestamp')
+        return pd.DataFrame({field: self.view(symbol, field) for field in self.handle.fields}, index=index)
+
+    # Lifecycle
+
+    def close(self):
+        """Release this process's mapping; the owner also frees the block."""
+        self._values = self._times = None
+        if self._shm is not None:
+            try:
+                self._shm.close()
+            except BufferError:
+                # Views handed out are still alive; the mapping goes when they do
+                pass
+            if self._owner:
+                try:
+                    self._shm.unlink()
+                except FileNotFoundError:
+                    pass
+            self._shm = None
+        elif self._owner and self.handle.path and os.path.exists(self.handle.path):
+            os.remove(self.handle.path)
+
+    def __enter__(self) -> 'SharedPanels':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __repr__(self) -> str:
+        return (f"SharedPanels({len(self)} symbols, {self.handle.rows} rows, "
+                f"fields={list(self.handle.fields)}, {self.nbytes / 1e6:.1f} MB)")
+
+
+# Panels attached by this (worker) process, keyed by block name or path
+_attached: Dict[str, SharedPanels] = {}
+# Set by the pool initializer, so tasks only carry the symbol
+_worker_handle: Optional[PanelHandle] = None
+
+
+def _open_shared_memory(name: str) -> shared_memory.SharedMemory:
+    """
+    Attach to an existing block without taking ownership of it.
+
+    Pool workers share their parent's resource tracker, so attaching there is
+    harmless. An unrelated process attaching on Python < 3.13 registers the
+    block with its own tracker, which unlinks it when that process exits;
+    track=False (3.13+) avoids that.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+@atexit.register
+def _detach_all():
+    for panels in _attached.values():
+        panels.close()
+    _attached.clear()
+
+
+def _init_worker(handle: PanelHandle):
+    global _worker_handle
+    _worker_handle = handle
+    SharedPanels.attach(handle)
+
+
+def _run(func: Callable, symbol: str, args: Tuple) -> Tuple[str, Any]:
+    return symbol, func(SharedPanels.attach(_worker_handle), symbol, *args)
+
+
+def map_symbols(func: Callable[..., Any], panels: SharedPanels, symbols: Optional[Iterable[str]] = None,
+                workers: Optional[int] = None, args: Tuple = (), chunksize: int = 8) -> Dict[str, Any]:
+    """
+    Run func(panels, symbol, *args) for every symbol in a process pool.
+
+    Workers attach to the panels once at startup; each task only carries the
+    symbol name. func must be a module-level function (it is pickled by
+    reference).
+
+    Returns:
+        symbol -> func result
+    """
+    symbols = list(panels.symbols if symbols is None else symbols)
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(panels.handle,)) as pool:
+        results = pool.map(_run, [func] * len(symbols), symbols, [args] * len(symbols), chunksize=chunksize)
+        return dict(results)
+
+
+def load_panels(load: Callable[[str], pd.DataFrame], symbols: Iterable[str], fields: Iterable[str] = PANEL_FIELDS,
+                path: Optional[str] = None, max_workers: int = 10) -> SharedPanels:
+    """
+    Load every symbol with load(symbol) on an I/O thread pool and stack the
+    results into shared panels. The per-symbol frames are dropped once copied
+    in, so the panels are the only copy left for the analysis phase.
+
+    Args:
+        load: symbol -> OHLCV frame (e.g. CryptoEngine.get_historical_data_from_db)
+        symbols: Universe to load; symbols that fail or come back empty are left out
+        fields: Columns to share
+        path: Back the panels with a memory-mapped file instead of shared memory
+        max_workers: Loader threads
+    """
+    def safe_load(symbol):
+        try:
+            return load(symbol)
+        except Exception as e:
+            logger.warning(f"Could not load {symbol} for the shared panels: {e}")
+            return None
+
+    symbols = list(symbols)
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        frames = dict(zip(symbols, pool.map(safe_load, symbols)))
+    return SharedPanels.create(frames, fields, path)
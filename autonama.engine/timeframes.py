@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Timeframes
+
+Binance interval arithmetic and OHLCV resampling for multi-timeframe runs.
+
+A multi-timeframe run fetches each symbol once at the finest configured
+interval and derives the coarser bars locally:
+
+- interval_seconds / finest_interval: compare Binance interval strings
+- resample_ohlcv: one vectorised pass over the fine bars. Bars are bucketed
+  by flooring their open time to the coarse interval (Binance aligns 1h..1d
+  bars to UTC multiples and weekly bars to Monday 00:00), and each bucket's
+  open/high/low/close/volume come from np.*.reduceat over the bucket
+  boundaries, so there is no per-bar Python and no groupby
+- derive_timeframes: every configured interval from one fine frame
+
+A leading bucket only partly covered by the fetched window is dropped, so the
+first coarse bar is never a stub. The trailing bucket is kept even if still
+open, which matches what Binance returns for the current bar.
+"""
+
+from typing import Dict, Iterable, List
+
+import numpy as np
+import pandas as pd
+
+_UNIT_SECONDS = {'m': 60, 'h': 3600, 'd': 86400, 'w': 7 * 86400}
+
+# 1970-01-01 was a Thursday; weekly bars open on Monday
+_WEEK_ANCHOR_SECONDS = 4 * 86400
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+
+def interval_seconds(interval: str) -> int:
+    """Length of a Binance interval string ('15m', '4h', '1d', '1w') in seconds."""
+    try:
+        return int(interval[:-1]) * _UNIT_SECONDS[interval[-1]]
+    except (KeyError, ValueError, IndexError):
+        raise ValueError(f"Unsupported interval: {interval!r}")
+
+
+def finest_interval(intervals: Iterable[str]) -> str:
+    return min(intervals, key=interval_seconds)
+
+
+def sort_intervals(intervals: Iterable[str]) -> List[str]:
+    """Unique intervals, finest first."""
+    return sorted(set(intervals), key=interval_seconds)
+
+
+def can_derive(target: str, source: str) -> bool:
+    """Whether target bars can be built exactly from source bars."""
+    target_s, source_s = interval_seconds(target), interval_seconds(source)
+    return target_s >= source_s and target_s % source_s == 0
+
+
+def resample_ohlcv(df: pd.DataFrame, interval: str, source_interval: str = None) -> pd.DataFrame:
+    """
+    Aggregate OHLCV bars (DatetimeIndex of bar open times, ascending) to a
+    coarser interval.
+
+    Args:
+        df: Frame with open/high/low/close/volume columns
+        interval: Target interval
+        source_interval: Interval of df; used to drop a partial leading bucket
+
+    Returns:
+        Frame with the same columns, indexed by the coarse bar open times
+    """
+    if df.empty:
+        return df[OHLCV_COLUMNS].copy()
+
+    step = interval_seconds(interval)
+    anchor = _WEEK_ANCHOR_SECONDS if interval.endswith('w') else 0
+
+    index = pd.DatetimeIndex(df.index)
+    seconds = index.as_unit('s').asi8
+    buckets = (seconds - anchor) // step * step + anchor
+
+    # Bucket boundaries: positions where the floored open time changes
+    starts = np.flatnonzero(np.concatenate(([True], buckets[1:] != buckets[:-1])))
+
+    # Drop a leading bucket the fetched window only partly covers
+    if source_interval is not None and len(starts) > 1 and seconds[0] != buckets[0]:
+        first_full = starts[1]
+        starts = starts[1:] - first_full
+        seconds, buckets = seconds[first_full:], buckets[first_full:]
+        df = df.iloc[first_full:]
+
+    opens = df['open'].to_numpy(dtype=np.float64)
+    highs = df['high'].to_numpy(dtype=np.float64)
+    lows = df['low'].to_numpy(dtype=np.float64)
+    closes = df['close'].to_numpy(dtype=np.float64)
+    volumes = df['volume'].to_numpy(dtype=np.float64)
+    ends = np.append(starts[1:], len(closes)) - 1
+
+    out = pd.DataFrame({
+        'open': opens[starts],
+        'high': np.maximum.reduceat(highs, starts),
+        'low': np.minimum.reduceat(lows, starts),
+        'close': closes[ends],
+        'volume': np.add.reduceat(volumes, starts),
+    }, index=pd.DatetimeIndex(pd.to_datetime(buckets[starts], unit='s'), name=index.name))
+    if index.tz is not None:
+        out.index = out.index.tz_localize('UTC').tz_convert(index.tz)
+    return out
+
+
+def derive_timeframes(df: pd.DataFrame, source_interval: str, intervals: Iterable[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Bars for every interval from one frame at source_interval.
+
+    The source frame is returned as-is for its own interval; intervals that
+    are not whole multiples of the source are skipped (the caller fetches
+    those separately).
+    """
+    frames = {}
+    for interval in sort_intervals(intervals):
+        if interval == source_interval:
+            frames[interval] = df
+        elif can_derive(interval, source_interval):
+            frames[interval] = resample_ohlcv(df, interval, source_interval)
+    return frames
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+"""
+Trading Universe
+
+Copy of autonama.data/utils/trading_universe.py for the engine scripts, which
+run from autonama.engine only. Keep the three files identical.
+
+One ranked list of the most traded Binance USDT pairs for the engines, the
+data tasks and the API, so the full 24h ticker (one of the heaviest Binance
+endpoints by request weight) is fetched once per refresh interval for the
+whole deployment instead of on every top-100 lookup.
+
+- tasks/binance_asset_loader.py refreshes the snapshot on a schedule: one
+  ticker fetch, ranked by quote volume, stored with a version stamp (the
+  refresh time, epoch seconds)
+- UniverseStore keeps the snapshot in Redis (app:universe:<exchange>:<quote>
+  plus a small :version key) and, when given an SQLAlchemy engine, in
+  trading.universe_snapshots
+- UniverseClient reads it for callers: a local copy is served for `ttl`
+  seconds, then revalidated with one GET of the version key, and reloaded
+  only when the version moved. Without Redis it falls back to Postgres, then
+  to a local JSON file (engine scripts running outside the deployment)
+- A client created with fetch_tickers refreshes the snapshot itself when
+  none is available or it is older than twice the refresh interval. The
+  refresh takes a Redis lock (SET NX) and is skipped when a fresh snapshot
+  exists, so concurrent callers still fetch once
+
+Symbols come in two spellings: 'BTCUSDT' (python-binance, engines) and
+'BTC/USDT' (ccxt, data tasks); symbols(pairs=True) returns the latter.
+"""
+
+import os
+import json
+import time
+import logging
+import tempfile
+import threading
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EXCHANGE = 'binance'
+QUOTE = 'USDT'
+# Pairs kept per snapshot; callers slice the top N they need
+UNIVERSE_SIZE = int(os.getenv('UNIVERSE_SIZE', '250'))
+REFRESH_SECONDS = int(os.getenv('UNIVERSE_REFRESH_SECONDS', '3600'))
+CACHE_TTL = int(os.getenv('UNIVERSE_CACHE_TTL', '300'))
+LOCK_SECONDS = 120
+LOCK_WAIT_SECONDS = 30
+# USDT/USDT is not a market
+EXCLUDED_BASES = ('USDT',)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS trading.universe_snapshots (
+    version BIGINT NOT NULL,
+    exchange VARCHAR(50) NOT NULL,
+    quote VARCHAR(10) NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    size INTEGER NOT NULL,
+    assets JSONB NOT NULL,
+    PRIMARY KEY (exchange, quote, version)
+)
+"""
+
+
+@dataclass(frozen=True)
+class Asset:
+    symbol: str          # BTCUSDT
+    pair: str            # BTC/USDT
+    base: str
+    quote: str
+    rank: int
+    volume_24h: float    # quote volume
+    price: float
+    change_percent_24h: float
+
+
+@dataclass(frozen=True)
+class UniverseSnapshot:
+    version: int
+    exchange: str
+    quote: str
+    assets: Tuple[Asset, ...]
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.version
+
+    def symbols(self, limit: Optional[int] = 100, pairs: bool = False) -> List[str]:
+        assets = self.assets[:limit] if limit else self.assets
+        return [asset.pair if pairs else asset.symbol for asset in assets]
+
+    def to_json(self) -> str:
+        return json.dumps({'version': self.version, 'exchange': self.exchange, 'quote': self.quote,
+                           'assets': [asdict(asset) for asset in self.assets]})
+
+    @classmethod
+    def from_json(cls, data) -> 'UniverseSnapshot':
+        data = json.loads(data) if isinstance(data, (str, bytes)) else data
+        return cls(int(data['version']), data['exchange'], data['quote'],
+                   tuple(Asset(**asset) for asset in data['assets']))
+
+
+def _float(value) -> float:
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rank_tickers(tickers, quote: str = QUOTE, size: int = UNIVERSE_SIZE) -> List[Asset]:
+    """
+    Rank a full ticker response by quote volume.
+
+    Accepts ccxt fetch_tickers() output ({'BTC/USDT': {...}}) or the raw
+    Binance /ticker/24hr list (python-binance get_ticker()).
+    """
+    rows = []
+    if isinstance(tickers, dict):
+        for pair, ticker in tickers.items():
+            if pair.endswith('/' + quote) and ':' not in pair:
+                base = pair.split('/')[0]
+                rows.append((base, _float(ticker.get('quoteVolume')), _float(ticker.get('last')),
+                             _float(ticker.get('percentage'))))
+    else:
+        for ticker in tickers:
+            symbol = ticker['symbol']
+            if symbol.endswith(quote) and len(symbol) > len(quote):
+                rows.append((symbol[:-len(quote)], _float(ticker.get('quoteVolume')),
+                             _float(ticker.get('lastPrice')), _float(ticker.get('priceChangePercent'))))
+    rows = [row for row in rows if row[1] > 0 and row[0] not in EXCLUDED_BASES]
+    rows.sort(key=lambda row: row[1], reverse=True)
+    return [Asset(symbol=f"{base}{quote}", pair=f"{base}/{quote}", base=base, quote=quote, rank=rank,
+                  volume_24h=volume, price=price, change_percent_24h=change)
+            for rank, (base, volume, price, change) in enumerate(rows[:size], start=1)]
+
+
+def build_snapshot(tickers, exchange: str = EXCHANGE, quote: str = QUOTE, size: int = UNIVERSE_SIZE,
+                   version: Optional[int] = None) -> UniverseSnapshot:
+    return UniverseSnapshot(int(version or time.time()), exchange, quote, tuple(rank_tickers(tickers, quote, size)))
+
+
+class UniverseStore:
+    """Snapshot persistence: Redis for readers, Postgres (optional) for history and as a fallback."""
+
+    def __init__(self, redis_client=None, engine=None, exchange: str = EXCHANGE, quote: str = QUOTE):
+        self.redis = redis_client
+        self.engine = engine
+        self.exchange = exchange
+        self.quote = quote
+        self.key = f"app:universe:{exchange}:{quote}"
+        self._schema_ready = False
+
+    @classmethod
+    def from_env(cls, **kwargs) -> 'UniverseStore':
+        """Store on the Redis named by REDIS_URL / REDIS_HOST, if any and if redis is installed."""
+        url = os.getenv('REDIS_URL')
+        host = os.getenv('REDIS_HOST')
+        client = None
+        if url or host:
+            try:
+                import redis
+                client = (redis.Redis.from_url(url, decode_responses=True, socket_timeout=5) if url else
+                          redis.Redis(host=host, port=int(os.getenv('REDIS_PORT', '6379')),
+                                      db=int(os.getenv('REDIS_DB', '0')), decode_responses=True, socket_timeout=5))
+            except ImportError:
+                logger.info("redis is not installed; trading universe is read without Redis")
+        return cls(client, **kwargs)
+
+    # Redis
+
+    def version(self) -> Optional[int]:
+        if self.redis is None:
+            return None
+        try:
+            value = self.redis.get(f"{self.key}:version")
+            return int(value) if value else None
+        except Exception as e:
+            logger.warning(f"Trading universe version lookup failed: {e}")
+            return None
+
+    def _load_redis(self) -> Optional[UniverseSnapshot]:
+        if self.redis is None:
+            return None
+        try:
+            data = self.redis.get(self.key)
+            return UniverseSnapshot.from_json(data) if data else None
+        except Exception as e:
+            logger.warning(f"Trading universe read from Redis failed: {e}")
+            return None
+
+    def acquire_lock(self) -> bool:
+        """Refresh lock; always granted without Redis (single process)."""
+        if self.redis is None:
+            return True
+        try:
+            return bool(self.redis.set(f"{self.key}:lock", os.getpid(), nx=True, ex=LOCK_SECONDS))
+        except Exception as e:
+            logger.warning(f"Trading universe lock failed: {e}")
+            return False
+
+    def release_lock(self):
+        if self.redis is not None:
+            try:
+                self.redis.delete(f"{self.key}:lock")
+            except Exception:
+                pass
+
+    # Postgres
+
+    def _ensure_schema(self):
+        if self._schema_ready:
+            return
+        from sqlalchemy import text
+        with self.engine.begin() as conn:
+            conn.execute(text(_SCHEMA))
+        self._schema_ready = True
+
+    def _load_postgres(self) -> Optional[UniverseSnapshot]:
+        if self.engine is None:
+            return None
+        try:
+            from sqlalchemy import text
+            self._ensure_schema()
+            with self.engine.connect() as conn:
+                row = conn.execute(text("""
+                    SELECT version, assets FROM trading.universe_snapshots
+                    WHERE exchange = :exchange AND quote = :quote
+                    ORDER BY version DESC LIMIT 1
+                """), {'exchange': self.exchange, 'quote': self.quote}).fetchone()
+            if row is None:
+                return None
+            return UniverseSnapshot.from_json({'version': row[0], 'exchange': self.exchange, 'quote': self.quote,
+                                               'assets': row[1] if not isinstance(row[1], str) else json.loads(row[1])})
+        except Exception as e:
+            logger.warning(f"Trading universe read from Postgres failed: {e}")
+            return None
+
+    def load(self) -> Optional[UniverseSnapshot]:
+        snapshot = self._load_redis()
+        if snapshot is None:
+            snapshot = self._load_postgres()
+            if snapshot is not None:
+                self._publish_redis(snapshot)
+        return snapshot
+
+    def _publish_redis(self, snapshot: UniverseSnapshot):
+        if self.redis is None:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.set(self.key, snapshot.to_json())
+            pipe.set(f"{self.key}:version", snapshot.version)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to publish trading universe to Redis: {e}")
+
+    def publish(self, snapshot: UniverseSnapshot, keep_days: int = 30):
+        """Store a new snapshot (Postgres first, so Redis never announces a version Postgres lacks)."""
+        if self.engine is not None:
+            try:
+                from sqlalchemy import text
+                self._ensure_schema()
+                with self.engine.begin() as conn:
+                    conn.execute(text("""
+                        INSERT INTO trading.universe_snapshots (version, exchange, quote, size, assets)
+                        VALUES (:version, :exchange, :quote, :size, CAST(:assets AS JSONB))
+                        ON CONFLICT (exchange, quote, version) DO NOTHING
+                    """), {'version': snapshot.version, 'exchange': snapshot.exchange, 'quote': snapshot.quote,
+                           'size': len(snapshot.assets),
+                           'assets': json.dumps([asdict(asset) for asset in snapshot.assets])})
+                    conn.execute(text("""
+                        DELETE FROM trading.universe_snapshots
+                        WHERE exchange = :exchange AND quote = :quote AND version < :cutoff
+                    """), {'exchange': snapshot.exchange, 'quote': snapshot.quote,
+                           'cutoff': snapshot.version - keep_days * 86400})
+            except Exception as e:
+                logger.error(f"Failed to store trading universe in Postgres: {e}")
+        self._publish_redis(snapshot)
+
+
+def refresh(fetch_tickers: Callable[[], Any], store: UniverseStore, min_interval: int = REFRESH_SECONDS,
+            force: bool = False, size: int = UNIVERSE_SIZE) -> Tuple[Optional[UniverseSnapshot], bool]:
+    """
+    Fetch, rank and publish a new snapshot unless one younger than
+    min_interval exists or another process holds the refresh lock.
+
+    Returns (current snapshot, whether tickers were fetched).
+    """
+    current = store.load()
+    if not force and current is not None and current.age() < min_interval:
+        return current, False
+    if not store.acquire_lock():
+        logger.info("Trading universe refresh already running elsewhere")
+        # With nothing to serve, wait for the lock holder's snapshot
+        deadline = time.time() + (LOCK_WAIT_SECONDS if current is None else 0)
+        while current is None and time.time() < deadline:
+            time.sleep(0.5)
+            current = store.load()
+        return current, False
+    try:
+        snapshot = build_snapshot(fetch_tickers(), store.exchange, store.quote, size)
+        if not snapshot.assets:
+            logger.warning("Ticker response produced an empty trading universe; keeping the previous one")
+            return current, True
+        store.publish(snapshot)
+        logger.info(f"Trading universe refreshed: {len(snapshot.assets)} pairs, version {snapshot.version}")
+        return snapshot, True
+    finally:
+        store.release_lock()
+
+
+class UniverseClient:
+    """Read side with a local TTL cache; see the module docstring."""
+
+    def __init__(self, store: Optional[UniverseStore] = None, ttl: int = CACHE_TTL,
+                 fetch_tickers: Optional[Callable[[], Any]] = None, cache_path: Optional[str] = None,
+                 refresh_interval: int = REFRESH_SECONDS, clock: Callable[[], float] = time.time):
+        self.store = store or UniverseStore()
+        self.ttl = ttl
+        self.fetch_tickers = fetch_tickers
+        self.cache_path = cache_path
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self._snapshot: Optional[UniverseSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def _read_file(self) -> Optional[UniverseSnapshot]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path) as f:
+                return UniverseSnapshot.from_json(f.read())
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable trading universe cache {self.cache_path}: {e}")
+            return None
+
+    def _write_file(self, snapshot: UniverseSnapshot):
+        if not self.cache_path:
+            return
+        try:
+            tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                f.write(snapshot.to_json())
+            os.replace(tmp, self.cache_path)
+        except Exception as e:
+            logger.warning(f"Failed to write trading universe cache {self.cache_path}: {e}")
+
+    def _stale(self, snapshot: Optional[UniverseSnapshot]) -> bool:
+        return snapshot is None or snapshot.age(self.clock()) > 2 * self.refresh_interval
+
+    def _load(self) -> Optional[UniverseSnapshot]:
+        cached = self._snapshot
+        version = self.store.version()
+        if cached is not None and version == cached.version:
+            return cached
+        snapshot = self.store.load()
+        if snapshot is None:
+            file_snapshot = self._read_file()
+            if file_snapshot is not None and (cached is None or file_snapshot.version > cached.version):
+                snapshot = file_snapshot
+            else:
+                snapshot = cached
+        if self._stale(snapshot) and self.fetch_tickers is not None:
+            try:
+                snapshot = refresh(self.fetch_tickers, self.store, self.refresh_interval)[0] or snapshot
+            except Exception as e:
+                logger.error(f"Trading universe refresh failed: {e}")
+        if snapshot is not None and (cached is None or snapshot.version != cached.version):
+            self._write_file(snapshot)
+        return snapshot
+
+    def snapshot(self) -> Optional[UniverseSnapshot]:
+        """Current snapshot, or None when none was ever published and none could be fetched."""
+        now = self.clock()
+        if self._snapshot is not None and now - self._checked_at < self.ttl:
+            return self._snapshot
+        with self._lock:
+            if self._snapshot is None or self.clock() - self._checked_at >= self.ttl:
+                snapshot = self._load()
+                if snapshot is not None:
+                    if self._stale(snapshot):
+                        logger.warning(f"Trading universe is {snapshot.age(self.clock()) / 3600:.1f}h old")
+                    self._snapshot = snapshot
+                self._checked_at = self.clock()
+            return self._snapshot
+
+    def symbols(self, limit: Optional[int] = 100, pairs: bool = False,
+                fallback: Optional[Iterable[str]] = None) -> List[str]:
+        """Top `limit` symbols by 24h quote volume (fallback when no snapshot is available)."""
+        snapshot = self.snapshot()
+        if snapshot is None or not snapshot.assets:
+            logger.warning("No trading universe available; using the fallback symbols")
+            return list(fallback or [])
+        return snapshot.symbols(limit, pairs)
+
+
+_shared: Optional[UniverseClient] = None
+_shared_lock = threading.Lock()
+
+
+def shared_client(fetch_tickers: Optional[Callable[[], Any]] = None, **kwargs) -> UniverseClient:
+    """
+    Process-wide client on the Redis from the environment, with a file cache
+    (UNIVERSE_CACHE_FILE, default in the temp directory). The first caller's
+    fetch_tickers is used for fallback refreshes.
+    """
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            cache_path = os.getenv('UNIVERSE_CACHE_FILE',
+                                   os.path.join(tempfile.gettempdir(), f"autonama_universe_{EXCHANGE}_{QUOTE}.json"))
+            _shared = UniverseClient(UniverseStore.from_env(), fetch_tickers=fetch_tickers,
+                                     cache_path=cache_path, **kwargs)
+        elif _shared.fetch_tickers is None and fetch_tickers is not None:
+            _shared.fetch_tickers = fetch_tickers
+        return _shared
@@ -18,6 +18,8 @@ from typing import Dict, List, Optional, Any
 import glob
 from psycopg2.extras import RealDictCursor
 
+import db_pool
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -46,23 +48,24 @@ class VectorBTIngestionSystem:
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = psycopg2.connect(
-                host=self.db_config['host'],
-                port=self.db_config['port'],
-                database=self.db_config['database'],
-                user=self.db_config['user'],
-                password=self.db_config['password']
-            )
+            # Borrowed from the process-wide pool; close_database() hands it back
+            self.connection = db_pool.acquire_postgres(self.pg_config)
             logger.info("Database connection established")
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
+    @property
+    def pg_config(self) -> Dict:
+        """psycopg2 connection parameters (the pool key)"""
+        return {key: self.db_config[key] for key in ('host', 'port', 'database', 'user', 'password')}
+    
     def close_database(self):
-        """Close database connection"""
+        """Return the database connection to the pool"""
         if self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
+            db_pool.release_postgres(self.pg_config, self.connection)
+            self.connection = None
+            logger.info("Database connection released")
     
     def get_latest_results_files(self) -> Dict[str, str]:
         """
@@ -554,6 +557,8 @@ from typing import Dict, List, Optional, Any
 import glob
 from psycopg2.extras import RealDictCursor
 
+import db_pool
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -582,23 +587,24 @@ class VectorBTIngestionSystem:
     def connect_database(self):
         """Establish database connection"""
         try:
-            self.connection = psycopg2.connect(
-                host=self.db_config['host'],
-                port=self.db_config['port'],
-                database=self.db_config['database'],
-                user=self.db_config['user'],
-                password=self.db_config['password']
-            )
+            # Borrowed from the process-wide pool; close_database() hands it back
+            self.connection = db_pool.acquire_postgres(self.pg_config)
             logger.info("Database connection established")
         except Exception as e:
             logger.error(f"Database connection failed: {e}")
             raise
     
+    @property
+    def pg_config(self) -> Dict:
+        """psycopg2 connection parameters (the pool key)"""
+        return {key: self.db_config[key] for key in ('host', 'port', 'database', 'user', 'password')}
+    
     def close_database(self):
-        """Close database connection"""
+        """Return the database connection to the pool"""
         if self.connection:
-            self.connection.close()
-            logger.info("Database connection closed")
+            db_pool.release_postgres(self.pg_config, self.connection)
+            self.connection = None
+            logger.info("Database connection released")
     
     def get_latest_results_files(self) -> Dict[str, str]:
         """
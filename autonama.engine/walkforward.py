@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Walk-Forward Evaluation
+
+Out-of-sample evaluation of the polynomial-channel strategy. The series is
+split into rolling folds (train window followed by a test window); on every
+train window the (lookback, degree, kstd) grid is searched for the best
+total return, and that choice is traded on the following test window. The
+test windows stitched together give the out-of-sample metrics.
+
+Out of sample the channel is used as it is live: at every bar the channel
+is fitted to the `lookback` candles ending at that bar, and the bar's close
+is compared with the bands at that bar. Everything is computed once per
+series and shared by all folds:
+
+- rolling_channel: all trailing-window fits of one lookback at once. With an
+  orthonormal basis Q of the polynomials on the window's x axis (the same
+  for every window), a window's fitted values are Q Q^T y, so the line at
+  the window end is Q[-1] . (Q^T y) and the residual sum of squares is
+  y.y - |Q^T y|^2. Q^T y for every window is one sliding matmul, and the
+  fits of every lower degree are prefixes of the same sums
+- band_events: entry/exit events for every (degree, kstd) of a lookback by
+  broadcasting, with the bands bounded as in clamp_bands
+- segment_log_growth: backtests of every grid combination on every fold in
+  one array pass. The position after each bar is the last entry/exit event
+  so far (events that do not change the position are no-ops), which turns
+  the trade loop into a forward fill; fees and slippage enter as log terms
+  at position changes, so a fold's return is a sum
+
+Preprocessing is the causal part of preprocess_close (trailing rolling
+mean); the z-score outlier filter looks at the whole series and is left out.
+Sharpe and drawdown follow calculate_polynomial_regression.
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from numpy.polynomial import polynomial as P
+
+import channel_kernel
+
+INIT_CASH = 100_000.0
+# Train returns above this (as in optimize_parameters) are treated as invalid
+MAX_RETURN_PCT = 1000.0
+
+ENTRY, EXIT, NONE = 1, 0, -1
+
+
+@dataclass
+class WalkForwardSettings:
+    folds: int = 10
+    train_bars: int = 240
+    test_bars: int = 30
+    min_test_bars: int = 10
+    lookbacks: Tuple[int, ...] = (50, 100, 150, 200)
+    degrees: Tuple[int, ...] = (1, 2, 3, 4)
+    kstds: Tuple[float, ...] = tuple(np.round(np.arange(1.0, 3.01, 0.1), 1))
+    smoothing_window: int = 5
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict]) -> 'WalkForwardSettings':
+        """Settings from the config's walk_forward_settings section (missing keys keep the defaults)."""
+        config = dict(config or {})
+        for key in ('lookbacks', 'degrees', 'kstds'):
+            if key in config:
+                config[key] = tuple(config[key])
+        return cls(**{k: v for k, v in config.items() if k in cls.__dataclass_fields__})
+
+    def as_dict(self) -> Dict:
+        return {key: list(value) if isinstance(value, tuple) else value
+                for key, value in self.__dict__.items()}
+
+
+@dataclass
+class Fold:
+    train_start: int
+    test_start: int
+    test_end: int
+    lookback: int = 0
+    degree: int = 0
+    kstd: float = 0.0
+    is_return: float = 0.0
+    oos_return: float = 0.0
+    trades: int = 0
+
+
+@dataclass
+class WalkForwardResult:
+    folds: List[Fold]
+    oos_return: float
+    oos_sharpe: float
+    oos_max_drawdown: float
+    is_return: float
+    efficiency: float
+    positive_folds: float
+    trades: int
+    train_bars: int
+    test_bars: int
+    equity: np.ndarray = field(repr=False, default=None)
+
+    def summary(self) -> Dict:
+        """Flat per-asset metrics, added to the analysis result."""
+        last = self.folds[-1]
+        return {
+            'oos_return': self.oos_return,
+            'oos_sharpe_ratio': self.oos_sharpe,
+            'oos_max_drawdown': self.oos_max_drawdown,
+            'is_return': self.is_return,
+            'wf_efficiency': self.efficiency,
+            'wf_positive_folds': self.positive_folds,
+            'wf_folds': len(self.folds),
+            'wf_trades': self.trades,
+            'wf_degree': last.degree,
+            'wf_kstd': last.kstd,
+            'wf_lookback': last.lookback,
+        }
+
+
+def splits(n: int, folds: int, train_bars: int, test_bars: int, warmup: int = 0,
+           min_test_bars: int = 1) -> List[Fold]:
+    """
+    Rolling folds ending at the last bar: each train window is followed by
+    its test window, test windows are consecutive. The test length shrinks
+    to fit the series; no folds when it would drop below min_test_bars.
+    """
+    test_bars = min(test_bars, (n - warmup - train_bars) // max(folds, 1))
+    if folds < 1 or test_bars < max(min_test_bars, 1):
+        return []
+    first_test = n - folds * test_bars
+    return [Fold(start - train_bars, start, start + test_bars)
+            for start in range(first_test, n, test_bars)]
+
+
+def rolling_channel(y: np.ndarray, lookback: int, max_degree: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Line and residual std at the end of every trailing window of `lookback`
+    points, for every degree 1..max_degree.
+
+    Returns two (max_degree, len(y)) arrays, NaN before the first full window.
+    """
+    n = y.shape[0]
+    line = np.full((max_degree, n), np.nan)
+    std = np.full((max_degree, n), np.nan)
+    if n < lookback or lookback <= max_degree:
+        return line, std
+
+    basis, _ = np.linalg.qr(P.polyvander(np.linspace(-1.0, 1.0, lookback), max_degree))
+    projections = sliding_window_view(y, lookback) @ basis   # (windows, max_degree + 1)
+    csum = np.concatenate(([0.0], np.cumsum(y * y)))
+    sum_sq = csum[lookback:] - csum[:-lookback]
+
+    fitted = np.cumsum(projections * basis[-1], axis=1)[:, 1:]
+    rss = sum_sq[:, None] - np.cumsum(projections * projections, axis=1)[:, 1:]
+    line[:, lookback - 1:] = fitted.T
+    std[:, lookback - 1:] = np.sqrt(np.maximum(rss, 0.0) / lookback).T
+    return line, std
+
+
+def band_events(close: np.ndarray, line: np.ndarray, std: np.ndarray, kstds: np.ndarray,
+                min_multiplier: float = 0.2, max_multiplier: float = 1.5,
+                min_gap_ratio: float = 0.95) -> np.ndarray:
+    """
+    Events (ENTRY below the lower band, EXIT above the upper band, else NONE)
+    for every degree and kstd: an int8 array of shape (degrees, kstds, bars).
+    """
+    width = kstds[None, :, None] * std[:, None, :]
+    lo = close * min_multiplier
+    hi = close * max_multiplier
+    upper = np.clip(line[:, None, :] + width, lo, hi)
+    lower = np.minimum(np.clip(line[:, None, :] - width, lo, hi), upper * min_gap_ratio)
+    valid = (np.isfinite(line) & (line > 0) & (std > 0))[:, None, :]
+    events = np.full(upper.shape, NONE, dtype=np.int8)
+    events[valid & (close < lower)] = ENTRY
+    events[valid & (close > upper)] = EXIT
+    return events
+
+
+def delay_events(events: np.ndarray, bars: int) -> np.ndarray:
+    """Events acted on `bars` later (order_delay_bars)."""
+    if bars <= 0:
+        return events
+    delayed = np.full_like(events, NONE)
+    delayed[..., bars:] = events[..., :-bars]
+    return delayed
+
+
+def _log_increments(events: np.ndarray, log_close: np.ndarray, starts: np.ndarray, length: int,
+                    cost: float, paired: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-bar log equity increments of flat-start backtests of every event row
+    on every segment [start, start + length), closed at the segment end.
+
+    events: (rows, bars); returns increments (rows, segments, length) and the
+    number of entries (rows, segments). With paired, row i is only run on
+    segment i (rows == segments) and the shapes are (segments, length) and
+    (segments,).
+    """
+    index = starts[:, None] + np.arange(length)              # (segments, length)
+    seg_events = events[np.arange(len(starts))[:, None], index] if paired else events[:, index]
+    positions = np.arange(length)
+    last = np.where(seg_events != NONE, positions, -1)
+    np.maximum.accumulate(last, axis=-1, out=last)
+    holding = np.take_along_axis(seg_events, np.maximum(last, 0), axis=-1) == ENTRY
+    holding &= last >= 0
+    held_before = np.zeros_like(holding)
+    held_before[..., 1:] = holding[..., :-1]
+
+    moves = np.zeros(index.shape)
+    moves[:, 1:] = log_close[index[:, 1:]] - log_close[index[:, :-1]]
+    buys = holding & ~held_before
+    sells = held_before & ~holding
+    sells[..., -1] |= holding[..., -1]
+
+    increments = np.where(held_before, moves, 0.0)
+    increments += buys * np.log(1.0 / (1.0 + cost)) + sells * np.log(1.0 - cost)
+    return increments, buys.sum(axis=-1)
+
+
+def segment_log_growth(events: np.ndarray, log_close: np.ndarray, starts: np.ndarray, length: int,
+                       cost: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Log growth and entries of every event row on every segment: two (rows, segments) arrays."""
+    increments, entries = _log_increments(events, log_close, starts, length, cost)
+    return increments.sum(axis=-1), entries
+
+
+def _path_metrics(increments: np.ndarray) -> Tuple[float, float, float]:
+    """Total return %, Sharpe and max drawdown % of a stitched log-increment path."""
+    equity = INIT_CASH * np.exp(np.cumsum(increments))
+    total_return = (equity[-1] / INIT_CASH - 1.0) * 100.0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rets = np.diff(equity) / equity[:-1]
+    rets = np.concatenate(([0.0], np.where(np.isfinite(rets), rets, 0.0)))
+    r_std = float(rets.std(ddof=1)) if rets.size > 1 else 0.0
+    sharpe = float(rets.mean() / r_std * np.sqrt(252.0)) if r_std > 0 else 0.0
+    max_dd = float((equity / np.maximum.accumulate(equity) - 1.0).min() * 100.0)
+    return float(total_return), sharpe, max_dd
+
+
+def walk_forward(close, settings: WalkForwardSettings = None, fees: float = 0.0015,
+                 slippage: float = 0.0005, order_delay_bars: int = 0) -> Optional[WalkForwardResult]:
+    """
+    Walk-forward evaluation of one close series.
+
+    Returns None when the series is too short for the configured folds.
+    """
+    settings = settings or WalkForwardSettings()
+    y = channel_kernel.as_float_array(close)
+    y = channel_kernel.fill_missing(y)
+    if y.shape[0] >= settings.smoothing_window > 1:
+        y = channel_kernel.rolling_mean(y, settings.smoothing_window)
+    if y.shape[0] == 0 or not np.all(np.isfinite(y)) or y.min() <= 0:
+        return None
+
+    lookbacks = sorted(set(int(lb) for lb in settings.lookbacks))
+    degrees = np.array(sorted(set(int(d) for d in settings.degrees)))
+    kstds = np.asarray(settings.kstds, dtype=np.float64)
+    folds = splits(y.shape[0], settings.folds, settings.train_bars, settings.test_bars,
+                   warmup=lookbacks[-1] - 1, min_test_bars=settings.min_test_bars)
+    if not folds:
+        return None
+
+    # Every (lookback, degree, kstd) as one event row
+    events = []
+    for lookback in lookbacks:
+        line, std = rolling_channel(y, lookback, int(degrees.max()))
+        events.append(band_events(y, line[degrees - 1], std[degrees - 1], kstds).reshape(-1, y.shape[0]))
+    events = delay_events(np.concatenate(events), order_delay_bars)
+    grid = [(lookback, int(degree), float(kstd)) for lookback in lookbacks for degree in degrees for kstd in kstds]
+
+    log_close = np.log(y)
+    cost = slippage + fees
+    train_starts = np.array([fold.train_start for fold in folds])
+    test_starts = np.array([fold.test_start for fold in folds])
+    train_bars = folds[0].test_start - folds[0].train_start
+    test_bars = folds[0].test_end - folds[0].test_start
+
+    # All grid rows on all train windows in one pass; pick the best per fold
+    growth, _ = segment_log_growth(events, log_close, train_starts, train_bars, cost)
+    growth[~np.isfinite(growth) | (np.expm1(growth) * 100.0 > MAX_RETURN_PCT)] = -np.inf
+    best = np.argmax(growth, axis=0)
+
+    # The chosen row of each fold on its own test window only
+    increments, entries = _log_increments(events[best], log_close, test_starts, test_bars, cost, paired=True)
+
+    for i, fold in enumerate(folds):
+        fold.lookback, fold.degree, fold.kstd = grid[best[i]]
+        fold.is_return = float(np.expm1(growth[best[i], i]) * 100.0) if np.isfinite(growth[best[i], i]) else 0.0
+        fold.oos_return = float(np.expm1(increments[i].sum()) * 100.0)
+        fold.trades = int(entries[i])
+
+    oos_return, oos_sharpe, oos_max_dd = _path_metrics(increments.ravel())
+    is_mean = float(np.mean([fold.is_return for fold in folds]))
+    oos_mean = float(np.mean([fold.oos_return for fold in folds]))
+    # Per-bar comparison, since train and test windows differ in length
+    efficiency = (oos_mean / test_bars) / (is_mean / train_bars) if is_mean > 0 else 0.0
+    return WalkForwardResult(
+        folds=folds,
+        oos_return=oos_return,
+        oos_sharpe=oos_sharpe,
+        oos_max_drawdown=oos_max_dd,
+        is_return=is_mean,
+        efficiency=float(efficiency),
+        positive_folds=float(np.mean([fold.oos_return > 0 for fold in folds])),
+        trades=int(entries.sum()),
+        train_bars=train_bars,
+        test_bars=test_bars,
+        equity=INIT_CASH * np.exp(np.cumsum(increments.ravel())),
+    )
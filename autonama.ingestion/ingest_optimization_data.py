@@ -22,6 +22,8 @@ import psycopg2
 from psycopg2.extras import RealDictCursor, execute_values
 import pandas as pd
 
+import export_bundle
+
 # Set up logging
 logging.basicConfig(
     level=logging.INFO,
@@ -84,6 +86,13 @@ class DockerOptimizationIngestion:
         try:
             files = {}
             
+            # Find latest results bundle (replaces the per-type JSON files)
+            results_file = export_bundle.find_results_file(self.hotbox_dir)
+            if results_file:
+                files['results'] = results_file
+                logger.info(f"Found latest results bundle: {files['results']}")
+                return files
+            
             # Find latest alerts file
             alerts_pattern = os.path.join(self.hotbox_dir, "alerts_*.json")
             alerts_files = glob.glob(alerts_pattern)
@@ -385,6 +394,31 @@ class DockerOptimizationIngestion:
             self.connection.rollback()
             raise
     
+    def load_results_bundle(self, filepath: str) -> Dict[str, Any]:
+        """
+        Load alerts, analytics and summary from a results bundle
+        
+        Alerts only read the columns they need; the summary comes from the
+        file footer, so nothing is re-aggregated here.
+        """
+        footer = export_bundle.read_footer(filepath)
+        summary = footer.get('summary', {})
+        
+        alerts = export_bundle.read_results(filepath, columns=export_bundle.ALERT_COLUMNS).to_pylist()
+        for alert in alerts:
+            alert['timestamp'] = alert['analysis_date'] or footer.get('timestamp')
+        
+        return {
+            'alerts': alerts,
+            'analytics': export_bundle.read_results(filepath).to_pylist(),
+            'summary': {
+                'timestamp': footer.get('timestamp'),
+                'total_assets_analyzed': summary.get('total_assets'),
+                'analysis_summary': summary,
+                'optimization_enabled': footer.get('metadata', {}).get('optimization_enabled', True)
+            }
+        }
+    
     def load_json_file(self, filepath: str) -> Any:
         """Load JSON file"""
         try:
@@ -417,7 +451,17 @@ class DockerOptimizationIngestion:
             
             results = {}
             
-            # Ingest alerts
+            # Runs exported as a results bundle
+            if 'results' in files:
+                bundle = self.load_results_bundle(files['results'])
+                results['alerts_ingested'] = self.ingest_alerts(bundle['alerts'])
+                results['analytics_ingested'] = self.ingest_asset_analytics(bundle['analytics'])
+                results['summary_ingested'] = self.ingest_optimization_summary(bundle['summary'])
+                self.close_database()
+                logger.info("Optimization data ingestion into Docker database completed successfully")
+                return results
+            
+            # Ingest alerts (runs exported before the results bundle)
             if 'alerts' in files:
                 alerts_data = self.load_json_file(files['alerts'])
                 results['alerts_ingested'] = self.ingest_alerts(alerts_data)
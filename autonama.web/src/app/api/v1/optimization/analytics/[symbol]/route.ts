@@ -19,11 +19,23 @@ export async function GET(
       }, { status: 404 });
     }
     
-    // Read and parse the asset analytics file
+    // Read and parse the asset analytics file (one row per interval)
     const assetData = fs.readFileSync(dataPath, 'utf-8');
-    const assetAnalytics = JSON.parse(assetData);
+    const parsed = JSON.parse(assetData);
+    const rows = Array.isArray(parsed) ? parsed : [parsed];
 
-    return NextResponse.json(assetAnalytics);
+    // ?interval=1d returns that interval's row; without it, every interval
+    const interval = request.nextUrl.searchParams.get('interval');
+    if (interval === null) {
+      return NextResponse.json(rows);
+    }
+    const row = rows.find((r: { interval?: string }) => r.interval === interval);
+    if (!row) {
+      return NextResponse.json({ 
+        error: `No analytics found for ${symbol} (${interval}).` 
+      }, { status: 404 });
+    }
+    return NextResponse.json(row);
   } catch (error) {
     console.error('Error fetching asset analytics:', error);
     return NextResponse.json(
@@ -14,16 +14,12 @@ function testDataAccess() {
     const apiDir = path.join(dataDir, 'api');
     
     try {
-        // Test main data file
-        const mainDataPath = path.join(dataDir, 'optimization_data.json');
-        if (fs.existsSync(mainDataPath)) {
-            const mainData = JSON.parse(fs.readFileSync(mainDataPath, 'utf-8'));
-            console.log('✅ Main data file accessible');
-            console.log(`   - Alerts: ${mainData.alerts?.length || 0}`);
-            console.log(`   - Analytics: ${mainData.analytics?.length || 0}`);
-            console.log(`   - Assets: ${mainData.assets?.length || 0}`);
+        // Test results table (read by the Python API)
+        const resultsPath = path.join(apiDir, 'results.parquet');
+        if (fs.existsSync(resultsPath)) {
+            console.log(`✅ results.parquet accessible (${fs.statSync(resultsPath).size} bytes)`);
         } else {
-            console.log('❌ Main data file not found');
+            console.log('❌ results.parquet not found');
         }
         
         // Test API files
@@ -50,8 +46,9 @@ function testDataAccess() {
             for (const asset of testAssets) {
                 const assetPath = path.join(assetsDir, asset);
                 if (fs.existsSync(assetPath)) {
-                    const assetData = JSON.parse(fs.readFileSync(assetPath, 'utf-8'));
-                    console.log(`   - ${asset}: ${assetData.symbol} (${assetData.signal})`);
+                    const assetRows = [].concat(JSON.parse(fs.readFileSync(assetPath, 'utf-8')));
+                    const intervals = assetRows.map(row => `${row.interval}: ${row.signal}`).join(', ');
+                    console.log(`   - ${asset}: ${assetRows[0]?.symbol} (${intervals})`);
                 } else {
                     console.log(`   - ${asset}: Not found`);
                 }
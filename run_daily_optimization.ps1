@@ -1,7 +1,9 @@
 param(
     [switch]$QuickUpdateFirst = $true,
     [switch]$SkipDocker = $false,
-    [switch]$DirectConsole = $true
+    [switch]$DirectConsole = $true,
+    # Only re-analyze assets with a new candle or changed parameters (-Incremental:$false for a full run)
+    [switch]$Incremental = $true
 )
 
 # Be strict and use UTF-8 console for clean tqdm rendering
@@ -29,6 +31,10 @@ $env:PYTHONNOUSERSITE = '1'
 $env:PYTHONUNBUFFERED = '1'
 $env:PYTHONFAULTHANDLER = '1'
 
+# Extra runner arguments
+$runArgs = @()
+if ($Incremental) { $runArgs += '--incremental' }
+
 # Preflight: verify core dependencies (non-fatal)
 Write-Host "Preflight: Checking core Python dependencies..." -ForegroundColor Yellow
 try {
@@ -46,10 +52,10 @@ if ($QuickUpdateFirst) {
         if (Test-Path "autonama.engine/run_quick_100.py") { Set-Location autonama.engine }
         $env:PYTHONUNBUFFERED = '1'
         if ($DirectConsole) {
-            conda run -n enigma311 python -u run_quick_100.py
+            conda run -n enigma311 python -u run_quick_100.py @runArgs
         } else {
             $quickLog = Join-Path $PSScriptRoot ("autonama.engine\\quick_100_" + (Get-Date -Format yyyyMMdd_HHmmss) + ".log")
-            conda run -n enigma311 python -u run_quick_100.py 2>&1 | Tee-Object -FilePath $quickLog
+            conda run -n enigma311 python -u run_quick_100.py @runArgs 2>&1 | Tee-Object -FilePath $quickLog
         }
         $quickExit = $LASTEXITCODE
     } finally {
@@ -77,10 +83,10 @@ try {
     # Ensure unbuffered output so progress streams live (use conda run to guarantee env)
     $env:PYTHONUNBUFFERED = '1'
     if ($DirectConsole) {
-        conda run -n enigma311 python -u run_complete_optimization.py
+        conda run -n enigma311 python -u run_complete_optimization.py @runArgs
     } else {
         $optLog = Join-Path $PSScriptRoot ("autonama.engine\\complete_optimization_" + (Get-Date -Format yyyyMMdd_HHmmss) + ".log")
-        conda run -n enigma311 python -u run_complete_optimization.py 2>&1 | Tee-Object -FilePath $optLog
+        conda run -n enigma311 python -u run_complete_optimization.py @runArgs 2>&1 | Tee-Object -FilePath $optLog
     }
 } finally {
     Pop-Location